@@ -0,0 +1,225 @@
+"""!
+@brief Monte Carlo z adaptacyjną liczbą turniejów i przedziałami ufności
+
+run_adaptive() rozgrywa turnieje rundami porcji (jak parallel.run_parallel())
+i po każdej rundzie liczy przedziały ufności szans każdej drużyny na tytuł
+i na wyjście z grupy. Symulacja kończy się, gdy połowa szerokości
+największego przedziału spadnie do żądanej dokładności albo gdy skończy się
+budżet turniejów lub czasu - wyrównane turnieje dostają miliony przebiegów,
+a jednostronne kończą się po kilku porcjach.
+
+Wielkość kolejnej rundy wynika z dotychczasowych liczników (szacowana
+liczba turniejów potrzebna do osiągnięcia dokładności), a porcje dostają
+kolejne strumienie SeedSequence(seed).spawn(). Wszystkie rundy (także
+pierwsza, min_runs) są wielokrotnościami chunk_size, a niepełna może być
+tylko ostatnia porcja budżetu, więc bez limitu czasu wynik dla danego
+ziarna nie zależy od liczby procesów i jest równy run_parallel() z tą samą
+liczbą turniejów i wielkością porcji.
+
+@requires numpy
+@requires concurrent.futures
+"""
+
+import contextlib
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from formats import DEFAULT_FORMAT, compile_format
+from parallel import DEFAULT_CHUNK_SIZE, ENGINES, empty_totals, merge_totals, run_chunk
+from simulation import place_labels
+from strength_tables import DEFAULT_MODEL, STRENGTH_MODELS
+
+INTERVALS = ('wilson', 'normal')  #!< Dostępne przedziały ufności
+DEFAULT_PRECISION = 0.005         #!< Domyślna połowa szerokości przedziału (0,5 punktu procentowego)
+DEFAULT_CONFIDENCE = 0.95         #!< Domyślny poziom ufności
+DEFAULT_MAX_RUNS = 10_000_000     #!< Domyślny budżet turniejów
+MAX_GROWTH = 4                    #!< Runda ma najwyżej tyle razy więcej turniejów niż wszystkie dotychczasowe
+STOP_REASONS = {'precision': "osiągnięta dokładność", 'runs': "limit turniejów", 'time': "limit czasu"}
+"""!Opisy powodów zakończenia run_adaptive()"""
+TRACKED = ('mistrz', 'awans')
+"""!Śledzone szanse: tytuł i wyjście z grupy (miejsce w fazie pucharowej)"""
+
+
+def z_score(confidence):
+    """!
+    @brief Kwantyl rozkładu normalnego dla dwustronnego przedziału ufności
+
+    @param confidence float Poziom ufności (0-1)
+    @return float Wartość z (1.96 dla 0.95)
+
+    @throws ValueError Dla poziomu ufności spoza (0, 1)
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("Poziom ufności musi być liczbą z przedziału (0, 1).")
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def confidence_interval(successes, runs, z, method='wilson'):
+    """!
+    @brief Przedziały ufności prawdopodobieństw z liczników sukcesów
+
+    @details Przedział Wilsona zachowuje poprawne pokrycie także dla szans
+    bliskich 0 i 1 (drużyny bez szans na tytuł), gdzie przedział normalny
+    (Walda) ma zerową szerokość.
+
+    @param successes np.ndarray Liczby sukcesów
+    @param runs int Liczba prób
+    @param z float Kwantyl z z_score()
+    @param method str Rodzaj przedziału z INTERVALS
+    @return tuple(np.ndarray, np.ndarray) Dolne i górne granice przedziałów
+
+    @throws ValueError Dla nieznanego rodzaju przedziału
+    """
+    p = np.asarray(successes) / runs
+    if method == 'normal':
+        half = z * np.sqrt(p * (1 - p) / runs)
+        return np.clip(p - half, 0, 1), np.clip(p + half, 0, 1)
+    if method != 'wilson':
+        raise ValueError(f"Nieznany przedział ufności: {method}. Dostępne: {', '.join(INTERVALS)}.")
+    z2 = z * z / runs
+    center = (p + z2 / 2) / (1 + z2)
+    half = z / (1 + z2) * np.sqrt(p * (1 - p) / runs + z2 / (4 * runs))
+    return center - half, center + half
+
+
+def tracked_counts(totals):
+    """!
+    @brief Liczniki śledzonych zdarzeń z sum wyników
+
+    @details Wyjście z grupy liczone jest z drużyn fazy pucharowej ('advanced'),
+    a nie z miejsc - w formatach z ćwierćfinałami i wcześniejszymi rundami
+    część drużyn spoza podium także wyszła z grupy.
+
+    @param totals dict Sumy wyników z parallel.empty_totals()
+    @return dict {nazwa z TRACKED: liczniki (n,)}
+    """
+    return {'mistrz': totals['places'][:, 0], 'awans': totals['advanced']}
+
+
+def _next_round(counts, runs, precision, z, chunk_size, max_runs):
+    """!
+    @brief Liczba turniejów kolejnej rundy (wielokrotność chunk_size)
+
+    @details Potrzebna liczba turniejów to z^2 p (1 - p) / precision^2 dla
+    największej wariancji śledzonych szans, ograniczona do MAX_GROWTH razy
+    dotychczasowej liczby i do budżetu.
+    """
+    variance = max(float((c * (runs - c)).max()) for c in counts.values()) / (runs * runs)
+    needed = z * z * variance / (precision * precision) - runs
+    size = min(max(needed, chunk_size), MAX_GROWTH * runs)
+    return min(math.ceil(size / chunk_size) * chunk_size, max_runs - runs)
+
+
+def run_adaptive(ranks, precision=DEFAULT_PRECISION, confidence=DEFAULT_CONFIDENCE, max_runs=DEFAULT_MAX_RUNS,
+                 max_time=None, seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, engine='batch',
+                 fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL, interval='wilson', min_runs=None):
+    """!
+    @brief Rozgrywa turnieje, aż szanse drużyn osiągną żądaną dokładność
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA
+    @param precision float Największa dopuszczalna połowa szerokości przedziału ufności
+    @param confidence float Poziom ufności przedziałów
+    @param max_runs int Budżet turniejów
+    @param max_time float Budżet czasu w sekundach (None - bez limitu; sprawdzany po każdej rundzie)
+    @param seed int Ziarno główne (None - losowe, zapisane w wyniku jako 'seed')
+    @param workers int Liczba procesów (None - liczba rdzeni, 1 - bez puli procesów)
+    @param chunk_size int Liczba turniejów w porcji
+    @param engine str Silnik porcji z parallel.ENGINES
+    @param fmt str | TournamentFormat Format turnieju (formats.FORMATS)
+    @param model str | StrengthTables Model siły
+    @param interval str Rodzaj przedziału ufności z INTERVALS
+    @param min_runs int Najmniejsza liczba turniejów pierwszej rundy (domyślnie jedna porcja;
+    zaokrąglana w górę do wielokrotności chunk_size, żeby podział na porcje był taki jak w run_parallel())
+
+    @return dict Sumy wyników jak parallel.run_parallel() uzupełnione o:
+    - 'intervals': {nazwa z TRACKED: macierz (n, 2) granic przedziałów}
+    - 'error': {nazwa z TRACKED: połowy szerokości przedziałów (n,)}
+    - 'max_error': największa połowa szerokości przedziału
+    - 'stopped': powód zakończenia z STOP_REASONS
+    - 'elapsed': czas symulacji w sekundach
+
+    @throws ValueError Dla niepoprawnej dokładności, budżetu, przedziału, silnika,
+    modelu lub liczby drużyn niezgodnej z formatem
+    """
+    if precision <= 0 or max_runs < 1:
+        raise ValueError("Dokładność i budżet turniejów muszą być dodatnie.")
+    if interval not in INTERVALS:
+        raise ValueError(f"Nieznany przedział ufności: {interval}. Dostępne: {', '.join(INTERVALS)}.")
+    if engine not in ENGINES:
+        raise ValueError(f"Nieznany silnik: {engine}. Dostępne: {', '.join(ENGINES)}.")
+    if isinstance(model, str) and model not in STRENGTH_MODELS:
+        raise ValueError(f"Nieznany model siły: {model}. Dostępne: {', '.join(STRENGTH_MODELS)}.")
+    z = z_score(confidence)
+    ranks = tuple(int(r) for r in ranks)
+    fmt = compile_format(fmt).fmt
+    if len(ranks) != fmt.teams:
+        raise ValueError(f"Turniej wymaga dokładnie {fmt.teams} drużyn.")
+
+    start = time.perf_counter()
+    seed_seq = np.random.SeedSequence(seed)
+    total = empty_totals(len(ranks), fmt)
+    size = min(math.ceil((min_runs or chunk_size) / chunk_size) * chunk_size, max_runs)
+    workers = workers or os.cpu_count() or 1
+    with contextlib.ExitStack() as stack:
+        mapper = map
+        if workers > 1:
+            mapper = stack.enter_context(ProcessPoolExecutor(max_workers=workers)).map
+        while True:
+            sizes = [min(chunk_size, size - offset) for offset in range(0, size, chunk_size)]
+            count = len(sizes)
+            args = ([ranks] * count, sizes, seed_seq.spawn(count), [engine] * count, [fmt] * count,
+                    [model] * count)
+            for part in mapper(run_chunk, *args):
+                merge_totals(total, part)
+
+            runs = total['runs']
+            counts = tracked_counts(total)
+            bounds = {name: confidence_interval(c, runs, z, interval) for name, c in counts.items()}
+            max_error = max(float((high - low).max()) / 2 for low, high in bounds.values())
+            if max_error <= precision:
+                stopped = 'precision'
+            elif runs >= max_runs:
+                stopped = 'runs'
+            elif max_time is not None and time.perf_counter() - start >= max_time:
+                stopped = 'time'
+            else:
+                size = _next_round(counts, runs, precision, z, chunk_size, max_runs)
+                continue
+            break
+
+    total['seed'] = seed_seq.entropy
+    total['probabilities'] = total['places'] / runs
+    total['advancement'] = total['advanced'] / runs
+    total['intervals'] = {name: np.stack(bound, axis=1) for name, bound in bounds.items()}
+    total['error'] = {name: (high - low) / 2 for name, (low, high) in bounds.items()}
+    total['max_error'] = max_error
+    total['stopped'] = stopped
+    total['elapsed'] = time.perf_counter() - start
+    return total
+
+
+def simulate_adaptive(teams, precision=DEFAULT_PRECISION, confidence=DEFAULT_CONFIDENCE, **kwargs):
+    """!
+    @brief Szanse drużyn z dokładnością podaną zamiast liczby turniejów
+
+    @param teams List[Team] Lista drużyn (8 dla formatu domyślnego)
+    @param precision float Największa dopuszczalna połowa szerokości przedziału ufności
+    @param confidence float Poziom ufności przedziałów
+    @param kwargs Pozostałe argumenty run_adaptive()
+    @return dict Słownik {nazwa_drużyny: {miejsce: prawdopodobieństwo, 'awans',
+    'błąd mistrz', 'błąd awans'}}
+    """
+    result = run_adaptive([t.fifa_rank for t in teams], precision, confidence, **kwargs)
+    labels = place_labels(kwargs.get('fmt', DEFAULT_FORMAT))
+    odds = {}
+    for row, team in enumerate(teams):
+        entry = dict(zip(labels, result['probabilities'][row].tolist()))
+        entry['awans'] = float(result['advancement'][row])
+        entry.update({f"błąd {name}": float(result['error'][name][row]) for name in TRACKED})
+        odds[team.name] = entry
+    return odds
@@ -0,0 +1,408 @@
+"""!
+@brief Strumieniowe statystyki wielu turniejów w stałej pamięci
+
+Moduł zawiera:
+- Klasa RunningMoments: średnia i wariancja liczone algorytmem Welforda
+- Klasa StreamingStats: liczniki i histogramy wyników kolejnych turniejów
+- Generatory iter_tournaments() i iter_batches() dostarczające wyniki turniejów
+- Funkcja aggregate_parallel(): statystyki liczone w wielu procesach
+
+Wyniki turniejów są konsumowane jeden po drugim i od razu dodawane do
+liczników, więc pamięć nie rośnie z liczbą przebiegów. Obiekty StreamingStats
+można łączyć metodą merge() - każdy proces roboczy liczy własne statystyki,
+a proces główny scala je w jeden wynik.
+
+@requires numpy
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from formats import DEFAULT_FORMAT, compile_format
+from parallel import DEFAULT_CHUNK_SIZE, map_chunks, plan_chunks, play_tournament, python_rng, table_teams
+from simulation import place_labels, podium_columns, simulate_batch
+from state import MatchLog
+from strength_tables import DEFAULT_MODEL, MAX_GOALS, use_model
+
+TOURNAMENT_MATCHES = 16  #!< Liczba meczów turnieju 8 drużyn (12 grupowych i 4 pucharowe); inne formaty - Schedule.n_matches
+
+TeamSummary = namedtuple('TeamSummary', 'name fifa_rank points goals')
+"""!Średnie wyniki drużyny - odpowiednik Team w raporcie StreamingStats.report()"""
+
+
+class RunningMoments:
+    """!
+    @brief Średnia i wariancja strumienia wartości (algorytm Welforda)
+
+    Wartości mogą być skalarami albo tablicami o stałym kształcie - wtedy
+    momenty liczone są niezależnie dla każdego elementu.
+    """
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, shape=()):
+        """!
+        @brief Tworzy puste momenty
+
+        @param shape tuple Kształt pojedynczej obserwacji
+        """
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)  #!< Suma kwadratów odchyleń od średniej
+
+    def add(self, value):
+        """!
+        @brief Dodaje jedną obserwację
+
+        @param value float | np.ndarray Obserwacja
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def add_batch(self, values):
+        """!
+        @brief Dodaje wiele obserwacji naraz (pierwsza oś to kolejne obserwacje)
+
+        @param values np.ndarray Obserwacje
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            mean = values.mean(axis=0)
+            self._combine(len(values), mean, ((values - mean) ** 2).sum(axis=0))
+
+    def merge(self, other):
+        """!
+        @brief Dołącza momenty policzone na innej części strumienia
+
+        @param other RunningMoments Momenty do dołączenia
+        @return RunningMoments self
+        """
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        """!
+        @brief Wariancja z próby (0 dla mniej niż dwóch obserwacji)
+        """
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """!
+        @brief Odchylenie standardowe z próby
+        """
+        return np.sqrt(self.variance)
+
+
+class StreamingStats:
+    """!
+    @brief Statystyki wielu turniejów aktualizowane po każdym turnieju
+
+    Przechowuje wyłącznie liczniki o rozmiarze zależnym od liczby drużyn:
+    miejsca drużyn, sumy punktów i goli, histogram wyników meczów 8x8,
+    liczbę meczów pucharowych i serii rzutów karnych oraz momenty
+    (Welford) liczby goli drużyn i całego turnieju.
+    """
+
+    def __init__(self, names, ranks, fmt=DEFAULT_FORMAT):
+        """!
+        @brief Tworzy puste statystyki dla drużyn turnieju
+
+        @param names List[str] Nazwy drużyn (kolejność jak w wynikach turniejów)
+        @param ranks List[int] Pozycje drużyn w rankingu FIFA
+        @param fmt str | TournamentFormat Format turnieju (etykiety miejsc w raporcie)
+        """
+        n_teams = len(names)
+        self.names = list(names)
+        self.ranks = [int(r) for r in ranks]
+        self.labels = place_labels(fmt)  #!< Etykiety kolumn places (simulation.place_labels())
+        self.columns = podium_columns(fmt)  #!< Kolumny places dla kolejnych miejsc podium
+        self.runs = 0
+        self.places = np.zeros((n_teams, len(self.labels)), dtype=np.int64)  #!< Liczniki miejsc drużyn
+        self.points = np.zeros(n_teams, dtype=np.int64)  #!< Suma punktów z fazy grupowej
+        self.goals = np.zeros(n_teams, dtype=np.int64)   #!< Suma wszystkich goli
+        self.scorelines = np.zeros((MAX_GOALS + 1, MAX_GOALS + 1), dtype=np.int64)  #!< scorelines[g1, g2] - liczba meczów
+        self.knockouts = 0   #!< Liczba meczów pucharowych
+        self.shootouts = 0   #!< Liczba serii rzutów karnych
+        self.team_goals = RunningMoments(n_teams)  #!< Gole drużyny w turnieju
+        self.total_goals = RunningMoments()        #!< Gole wszystkich drużyn w turnieju
+
+    def add_tournament(self, log, podium, points, goals):
+        """!
+        @brief Dodaje wynik jednego turnieju
+
+        @param log MatchLog Mecze turnieju (albo None, gdy wyniki meczów są nieznane)
+        @param podium array-like Indeksy drużyn: mistrz, wicemistrz, 3. i 4. miejsce
+        @param points array-like Punkty drużyn z fazy grupowej
+        @param goals array-like Gole drużyn w turnieju
+        """
+        self.runs += 1
+        places = self.places
+        places[:, -1] += 1
+        for place, team in zip(self.columns, podium):
+            places[team, place] += 1
+            places[team, -1] -= 1
+        goals = np.asarray(goals, dtype=np.int64)
+        self.points += np.asarray(points, dtype=np.int64)
+        self.goals += goals
+        self.team_goals.add(goals)
+        self.total_goals.add(goals.sum())
+        if log is not None:
+            self._add_matches(log)
+
+    def _add_matches(self, log):
+        size = len(log)
+        g1 = np.frombuffer(log.g1, dtype=np.int8)[:size]
+        g2 = np.frombuffer(log.g2, dtype=np.int8)[:size]
+        self.scorelines += np.bincount(
+            g1.astype(np.intp) * (MAX_GOALS + 1) + g2, minlength=self.scorelines.size
+        ).reshape(self.scorelines.shape)
+        knockout = [code for code, phase in enumerate(log.phases) if not phase.startswith("Grupa")]
+        self.knockouts += int(np.isin(np.frombuffer(log.phase, dtype=np.int8)[:size], knockout).sum())
+        self.shootouts += int((np.frombuffer(log.p1, dtype=np.int8)[:size] >= 0).sum())
+
+    def add_batch(self, result):
+        """!
+        @brief Dodaje partię turniejów z simulation.simulate_batch(detail=True)
+
+        @details Silnik wektorowy nie zwraca wyników pojedynczych meczów, więc
+        histogram wyników i liczniki karnych nie są aktualizowane.
+
+        @param result dict Wynik simulate_batch() z kluczami 'podium', 'points', 'goals'
+        """
+        podium = result['podium']
+        runs, n_teams = len(podium), len(self.names)
+        self.runs += runs
+        for column, place in enumerate(self.columns):
+            self.places[:, place] += np.bincount(podium[:, column], minlength=n_teams)
+        self.places[:, -1] = self.runs - self.places[:, :-1].sum(axis=1)
+        self.points += result['points'].sum(axis=0, dtype=np.int64)
+        self.goals += result['goals'].sum(axis=0, dtype=np.int64)
+        self.team_goals.add_batch(result['goals'])
+        self.total_goals.add_batch(result['goals'].sum(axis=1))
+
+    def add_records(self, teams, matches=None, knockout_phases=()):
+        """!
+        @brief Dodaje turnieje zapisane przez results_store (jedna porcja rekordów)
+
+        @param teams np.ndarray Rekordy TEAM_RUN_DTYPE - kolejne turnieje, drużyny w kolejności numerów
+        @param matches np.ndarray Rekordy MATCH_RECORD_DTYPE tych samych turniejów (opcjonalnie)
+        @param knockout_phases Iterable[int] Numery faz pucharowych w rekordach meczów
+        """
+        n_teams = len(self.names)
+        runs = len(teams) // n_teams
+        self.runs += runs
+        places = np.asarray(teams['place']).reshape(runs, n_teams)
+        for place in range(len(self.labels)):
+            self.places[:, place] += (places == place).sum(axis=0)
+        goals = np.asarray(teams['goals'], dtype=np.int64).reshape(runs, n_teams)
+        self.points += np.asarray(teams['points'], dtype=np.int64).reshape(runs, n_teams).sum(axis=0)
+        self.goals += goals.sum(axis=0)
+        self.team_goals.add_batch(goals)
+        self.total_goals.add_batch(goals.sum(axis=1))
+        if matches is not None and len(matches):
+            self.scorelines += np.bincount(
+                matches['g1'].astype(np.intp) * (MAX_GOALS + 1) + matches['g2'], minlength=self.scorelines.size
+            ).reshape(self.scorelines.shape)
+            self.knockouts += int(np.isin(matches['phase'], list(knockout_phases)).sum())
+            self.shootouts += int((matches['p1'] >= 0).sum())
+
+    def consume(self, stream):
+        """!
+        @brief Dodaje wszystkie turnieje ze strumienia iter_tournaments()
+
+        @param stream Iterable Krotki (log, podium, points, goals)
+        @return StreamingStats self
+        """
+        for item in stream:
+            self.add_tournament(*item)
+        return self
+
+    def consume_batches(self, stream):
+        """!
+        @brief Dodaje wszystkie partie ze strumienia iter_batches()
+
+        @param stream Iterable Wyniki simulate_batch(detail=True)
+        @return StreamingStats self
+        """
+        for result in stream:
+            self.add_batch(result)
+        return self
+
+    def merge(self, other):
+        """!
+        @brief Dołącza statystyki policzone dla innych turniejów tych samych drużyn
+
+        @param other StreamingStats Statystyki do dołączenia
+        @return StreamingStats self
+
+        @throws ValueError Gdy statystyki dotyczą innych drużyn lub formatu o innych miejscach
+        """
+        if other.names != self.names or other.ranks != self.ranks or other.labels != self.labels:
+            raise ValueError("Można łączyć tylko statystyki tych samych drużyn.")
+        self.runs += other.runs
+        for name in ('places', 'points', 'goals', 'scorelines'):
+            getattr(self, name).__iadd__(getattr(other, name))
+        self.knockouts += other.knockouts
+        self.shootouts += other.shootouts
+        self.team_goals.merge(other.team_goals)
+        self.total_goals.merge(other.total_goals)
+        return self
+
+    @property
+    def penalty_rate(self):
+        """!
+        @brief Odsetek meczów pucharowych rozstrzygniętych w rzutach karnych
+        """
+        return self.shootouts / self.knockouts if self.knockouts else 0.0
+
+    def report(self, top_n=5):
+        """!
+        @brief Raport w formacie stats.generate_stats_report() uśredniony po turniejach
+
+        @details Pola 'total_goals', 'average_goals_per_team', 'top_scorers' i
+        'best_performance_by_rank' mają te same znaczenia co dla jednego turnieju,
+        ale zawierają średnie na turniej; 'best_performance_by_rank' zawiera
+        obiekty TeamSummary, więc raport można wypisać print_stats_report().
+
+        @param top_n int Liczba drużyn w listach najlepszych
+        @return dict Raport uzupełniony o 'runs', 'place_probabilities',
+        'title_odds', 'goals_std', 'total_goals_std', 'scorelines' i 'penalty_rate'
+        """
+        runs = max(self.runs, 1)
+        avg_points = self.points / runs
+        avg_goals = self.goals / runs
+        summaries = [
+            TeamSummary(name, rank, round(float(p), 2), round(float(g), 2))
+            for name, rank, p, g in zip(self.names, self.ranks, avg_points, avg_goals)
+        ]
+        by_goals = sorted(summaries, key=lambda t: t.goals, reverse=True)
+        probabilities = self.places / runs
+        total = float(self.total_goals.mean)
+        return {
+            'total_goals': round(total, 2),
+            'average_goals_per_team': round(total / len(self.names), 2) if self.names else 0,
+            'top_scorers': [(t.name, t.goals) for t in by_goals[:top_n]],
+            'best_performance_by_rank': sorted(summaries, key=lambda t: (t.points, t.goals), reverse=True)[:top_n],
+            'plots': [],
+            'runs': self.runs,
+            'place_probabilities': {
+                name: dict(zip(self.labels, row.tolist())) for name, row in zip(self.names, probabilities)
+            },
+            'title_odds': dict(zip(self.names, probabilities[:, 0].tolist())),
+            'goals_std': dict(zip(self.names, self.team_goals.std.tolist())),
+            'total_goals_std': float(self.total_goals.std),
+            'scorelines': self.scorelines / max(self.scorelines.sum(), 1),
+            'penalty_rate': self.penalty_rate,
+        }
+
+
+def iter_tournaments(ranks, runs, rng, names=None, fmt=DEFAULT_FORMAT):
+    """!
+    @brief Generator wyników kolejnych turniejów na obiektach Team i Match
+
+    @details Wszystkie turnieje korzystają z tych samych buforów TeamTable i
+    MatchLog - zwrócone dane są ważne tylko do pobrania następnego elementu.
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA
+    @param runs int Liczba turniejów
+    @param rng random.Random Generator liczb losowych
+    @param names List[str] Nazwy drużyn (opcjonalnie)
+    @param fmt str | TournamentFormat Format turnieju (formats.FORMATS)
+    @return Iterator Krotki (log, podium, points, goals) dla StreamingStats.consume()
+    """
+    schedule = compile_format(fmt)
+    table, teams = table_teams(ranks, names)
+    log = MatchLog(schedule.n_matches)
+    for _ in range(runs):
+        table.reset()
+        log.clear()
+        podium = [team._row for team in play_tournament(teams, rng, log, schedule)]
+        yield log, podium, table.points[:len(teams)], table.goals[:len(teams)]
+
+
+def iter_batches(ranks, runs, rng, batch_size=100_000, fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL):
+    """!
+    @brief Generator partii turniejów silnika wektorowego
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA
+    @param runs int Łączna liczba turniejów
+    @param rng np.random.Generator Generator liczb losowych
+    @param batch_size int Maksymalna liczba turniejów w partii
+    @param fmt str | TournamentFormat Format turnieju (formats.FORMATS)
+    @param model str | StrengthTables Model siły (strength_tables.STRENGTH_MODELS)
+    @return Iterator Wyniki simulate_batch(detail=True) dla StreamingStats.consume_batches()
+    """
+    for start in range(0, runs, batch_size):
+        yield simulate_batch(ranks, min(batch_size, runs - start), rng, fmt=fmt, model=model)
+
+
+def stats_chunk(names, ranks, runs, seed_seq, engine='object', fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL):
+    """!
+    @brief Statystyki jednej porcji turniejów (funkcja wykonywana w procesach roboczych)
+
+    @param names tuple Nazwy drużyn
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param runs int Liczba turniejów w porcji
+    @param seed_seq np.random.SeedSequence Strumień losowy porcji
+    @param engine str 'object' (z wynikami meczów) albo 'batch'
+    @param fmt str | TournamentFormat Format turnieju
+    @param model str | StrengthTables Model siły
+    @return StreamingStats Statystyki porcji
+    """
+    stats = StreamingStats(names, ranks, fmt)
+    if engine == 'batch':
+        return stats.consume_batches(iter_batches(ranks, runs, np.random.default_rng(seed_seq), fmt=fmt, model=model))
+    previous = use_model(model)
+    try:
+        return stats.consume(iter_tournaments(ranks, runs, python_rng(seed_seq), names, fmt))
+    finally:
+        use_model(previous)
+
+
+def aggregate_parallel(teams, runs, seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, engine='object',
+                       fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL):
+    """!
+    @brief Liczy statystyki wielu turniejów w procesach roboczych i scala je
+
+    @details Podział na porcje i ich ziarna jak w parallel.run_parallel(), więc
+    wynik nie zależy od liczby procesów.
+
+    @param teams List[Team] Lista drużyn
+    @param runs int Łączna liczba turniejów
+    @param seed int Ziarno główne (None - losowe)
+    @param workers int Liczba procesów (None - liczba rdzeni, 1 - bez puli procesów)
+    @param chunk_size int Liczba turniejów w porcji
+    @param engine str 'object' (z wynikami meczów) albo 'batch'
+    @param fmt str | TournamentFormat Format turnieju
+    @param model str | StrengthTables Model siły
+    @return StreamingStats Scalone statystyki
+
+    @throws ValueError Dla nieznanego silnika
+    """
+    if engine not in ('object', 'batch'):
+        raise ValueError(f"Nieznany silnik: {engine}. Dostępne: object, batch.")
+    names = tuple(team.name for team in teams)
+    ranks = tuple(int(team.fifa_rank) for team in teams)
+    _, sizes, children = plan_chunks(runs, seed, chunk_size)
+    count = len(sizes)
+    fmt = compile_format(fmt).fmt
+    total = StreamingStats(names, ranks, fmt)
+    args = ([names] * count, [ranks] * count, sizes, children, [engine] * count, [fmt] * count, [model] * count)
+    for part in map_chunks(stats_chunk, args, workers):
+        total.merge(part)
+    return total
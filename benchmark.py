@@ -0,0 +1,364 @@
+"""!
+@brief Pomiary wydajności symulatora z porównaniem do zapisanej linii bazowej
+
+Zestaw BENCHMARKS obejmuje:
+- match: pojedynczy models.Match.play()
+- tournament: cały turniej 8 drużyn na obiektach Team i Match
+- batch: wektorowy silnik Monte Carlo (simulation.simulate_batch),
+  batch_<model>: ten sam silnik z innymi modelami siły (strength_tables)
+- ranking_lookup: wyszukiwanie drużyn w rankingu (get_team_rank)
+- html_parse: parsowanie zapisanych stron Transfermarkt (tests/fixtures) parserem
+  domyślnym, html_parse_<parser>: każdym dostępnym parserem
+- stats_report: raport statystyk turnieju bez wykresów
+- ess_<tryb>: efektywna liczba turniejów na sekundę dla trybów losowania
+  z variance.VARIANCE_REDUCTIONS - liczba turniejów przeliczona przez
+  zmierzony spadek wariancji szans na tytuł i awans (ESS), ess_compare: to
+  samo dla różnicy szans dwóch scenariuszy na wspólnych liczbach losowych
+  (parallel.compare_parallel()) względem dwóch niezależnych symulacji
+- whatif: scenariusz z nowym wynikiem meczu grupowego w symulacji warunkowej
+  (whatif.ConditionalSimulation, 100 000 przebiegów)
+
+Każdy pomiar używa stałego ziarna, a wynikiem jest liczba operacji na
+sekundę (najlepszy z kilku powtórzeń). Wyniki zapisywane są w JSON
+i porównywane z linią bazową - spadek przepustowości większy niż tolerancja
+kończy program kodem 1.
+
+Użycie z linii poleceń:
+@code
+python benchmark.py --save-baseline
+python benchmark.py --tolerance 0.3 --json wyniki.json
+python benchmark.py match batch --quick
+@endcode
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(PROJECT_DIR, "tests", "fixtures")
+DEFAULT_BASELINE = os.path.join(PROJECT_DIR, "benchmark_baseline.json")  #!< Domyślny plik linii bazowej
+DEFAULT_TOLERANCE = 0.25  #!< Dopuszczalny względny spadek przepustowości
+SEED = 2024               #!< Ziarno wszystkich pomiarów
+RANKS = (1, 5, 12, 30, 45, 70, 120, 200)
+NAMES = ("Brazil", "Poland", "Japan", "Spain", "Ghana", "Panama", "Chile", "Fiji")
+LOOKUP_NAMES = ("Argentina", "Polska", "USA", "Korea Południowa", "côte d'ivoire", "Atlantyda")
+"""!Nazwy wyszukiwane w rankingu - angielskie, polskie, aliasy i drużyna spoza rankingu"""
+
+
+def _bench_match() -> Tuple[Callable[[], None], int]:
+    from models import Match
+    from parallel import table_teams
+
+    table, (team1, team2) = table_teams(RANKS[:2], NAMES[:2])
+    rng = random.Random(SEED)
+    matches = 100
+
+    def run():
+        table.reset()  # liczniki punktów w tabeli są 16-bitowe
+        for _ in range(matches):
+            Match(team1, team2, "Grupa A", rng=rng, verbose=False).play()
+    return run, matches
+
+
+def _bench_tournament() -> Tuple[Callable[[], None], int]:
+    from parallel import play_tournament, table_teams
+
+    table, teams = table_teams(RANKS, NAMES)
+    rng = random.Random(SEED)
+
+    def run():
+        table.reset()
+        play_tournament(teams, rng)
+    return run, 1
+
+
+def _bench_batch(model: str = 'rank') -> Tuple[Callable[[], None], int]:
+    import numpy as np
+
+    from simulation import simulate_batch
+
+    rng = np.random.default_rng(SEED)
+    runs = 10_000
+    return (lambda: simulate_batch(RANKS, runs, rng, detail=False, model=model)), runs
+
+
+def _tracked(result):
+    import numpy as np
+
+    n_teams = len(RANKS)
+    runs = len(result['podium'])
+    return np.concatenate((np.bincount(result['podium'][:, 0], minlength=n_teams),
+                           np.bincount(result['qualifiers'].ravel(), minlength=n_teams))) / runs
+
+
+def _bench_ess(variance: str, runs: int = 2000, replicates: int = 200) -> Tuple[Callable[[], None], float]:
+    """!
+    @brief Turnieje trybu losowania liczone jako efektywne turnieje (ESS)
+
+    @details ESS = suma p(1 - p) / suma zmierzonych wariancji oszacowań szans na
+    tytuł i awans z replicates niezależnych partii - tyle niezależnych turniejów
+    daje tę samą dokładność. Dla 'plain' ESS równa się liczbie turniejów.
+    """
+    import numpy as np
+
+    from simulation import simulate_batch
+
+    rng = np.random.default_rng(SEED)
+    estimates = np.array([_tracked(simulate_batch(RANKS, runs, rng, detail=False, variance=variance))
+                          for _ in range(replicates)])
+    p = estimates.mean(axis=0)
+    ess = runs if variance == 'plain' else (p * (1 - p)).sum() / estimates.var(axis=0, ddof=1).sum()
+    return (lambda: simulate_batch(RANKS, runs, rng, detail=False, variance=variance)), ess
+
+
+def _bench_ess_compare(runs: int = 20_000) -> Tuple[Callable[[], None], float]:
+    """!
+    @brief Porównanie scenariuszy (3. drużyna awansuje w rankingu) na wspólnych liczbach losowych
+
+    @details ESS = wariancja różnicy z dwóch niezależnych symulacji po runs
+    turniejów / zmierzona wariancja różnicy z compare_parallel() * runs.
+    """
+    import numpy as np
+
+    from parallel import compare_chunk, compare_parallel
+
+    changed = RANKS[:2] + (3,) + RANKS[3:]
+    result = compare_parallel(RANKS, changed, runs, seed=SEED, workers=1, chunk_size=runs)
+    pa, pb = result['probabilities_a'], result['probabilities_b']
+    independent = (pa * (1 - pa) + pb * (1 - pb)).sum() / runs
+    ess = runs * independent / (result['stderr'] ** 2).sum()
+    seed_seq = np.random.SeedSequence(SEED)
+    return (lambda: compare_chunk(RANKS, changed, runs, seed_seq)), ess
+
+
+def _fixture_pages() -> List[str]:
+    pages = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith("transfermarkt_page"):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+                pages.append(f.read())
+    return pages
+
+
+def _bench_ranking_lookup() -> Tuple[Callable[[], None], int]:
+    from transfermarkt_rankings import get_team_rank, parse_rankings_page
+
+    rankings = [team for html in _fixture_pages() for team in parse_rankings_page(html)]
+
+    def run():
+        for name in LOOKUP_NAMES:
+            get_team_rank(name, rankings)
+    return run, len(LOOKUP_NAMES)
+
+
+def _bench_html_parse(parser: Optional[str] = None) -> Tuple[Callable[[], None], int]:
+    from transfermarkt_rankings import parse_rankings_page
+
+    pages = _fixture_pages()
+
+    def run():
+        for html in pages:
+            parse_rankings_page(html, parser)
+    return run, len(pages)
+
+
+def _bench_stats_report() -> Tuple[Callable[[], None], int]:
+    from parallel import play_tournament, table_teams
+    from stats import generate_stats_report
+
+    table, teams = table_teams(RANKS, NAMES)
+    play_tournament(teams, random.Random(SEED))
+    return (lambda: generate_stats_report(teams, plots=False)), 1
+
+
+def _bench_whatif() -> Tuple[Callable[[], None], int]:
+    from whatif import ConditionalSimulation, TournamentState
+
+    state = TournamentState(groups=[NAMES[:4], NAMES[4:]], results=[(NAMES[0], NAMES[1], 2, 0)])
+    simulation = ConditionalSimulation(state, RANKS, 100_000, seed=SEED)
+    scores = iter(range(10**9))
+
+    def run():
+        # 64 wyniki na zmianę - więcej niż GROUP_CACHE_SIZE, więc tabela grupy liczona jest od nowa
+        score = next(scores) % 64
+        simulation.what_if(NAMES[2], NAMES[3], score % 8, score // 8)
+    return run, 1
+
+
+BENCHMARKS = {
+    "match": (_bench_match, "mecz"),
+    "tournament": (_bench_tournament, "turniej"),
+    "batch": (_bench_batch, "turniej"),
+    "ranking_lookup": (_bench_ranking_lookup, "wyszukiwanie"),
+    "html_parse": (_bench_html_parse, "strona"),
+    "stats_report": (_bench_stats_report, "raport"),
+    "ess_compare": (_bench_ess_compare, "efektywny turniej"),
+    "whatif": (_bench_whatif, "scenariusz"),
+}
+"""!Pomiary według nazwy: (funkcja przygotowująca, jednostka operacji).
+Funkcja przygotowująca zwraca (wywołanie, liczba operacji w jednym wywołaniu)."""
+
+
+def _register_variants():
+    from strength_tables import DEFAULT_MODEL, STRENGTH_MODELS
+    from transfermarkt_rankings import available_parsers
+    from variance import VARIANCE_REDUCTIONS
+
+    for model in STRENGTH_MODELS:
+        if model != DEFAULT_MODEL:
+            BENCHMARKS[f"batch_{model}"] = (functools.partial(_bench_batch, model), "turniej")
+    for variance in VARIANCE_REDUCTIONS:
+        BENCHMARKS[f"ess_{variance}"] = (functools.partial(_bench_ess, variance), "efektywny turniej")
+    for parser in available_parsers():
+        BENCHMARKS[f"html_parse_{parser}"] = (functools.partial(_bench_html_parse, parser), "strona")
+
+
+_register_variants()
+
+
+def run_benchmark(name: str, repeat: int = 5, min_time: float = 0.2) -> Dict:
+    """!
+    @brief Wykonuje jeden pomiar
+
+    @details Liczba wywołań w powtórzeniu dobierana jest tak, aby powtórzenie
+    trwało co najmniej min_time sekund. Wynikiem jest najszybsze powtórzenie.
+
+    @param name str Nazwa pomiaru z BENCHMARKS
+    @param repeat int Liczba powtórzeń
+    @param min_time float Minimalny czas jednego powtórzenia w sekundach
+    @return dict Słownik {'unit', 'ops_per_sec', 'us_per_op', 'calls'}
+
+    @throws ValueError Dla nieznanej nazwy pomiaru
+    """
+    if name not in BENCHMARKS:
+        raise ValueError(f"Nieznany pomiar: {name}. Dostępne: {', '.join(BENCHMARKS)}.")
+    setup, unit = BENCHMARKS[name]
+    func, ops = setup()
+    func()  # rozgrzewka: wczytanie modułów i tablic
+
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls = max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)))
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    ops_per_sec = calls * ops / best
+    return {"unit": unit, "ops_per_sec": ops_per_sec, "us_per_op": 1e6 / ops_per_sec, "calls": calls}
+
+
+def run_suite(names: Optional[List[str]] = None, repeat: int = 5, min_time: float = 0.2) -> Dict:
+    """!
+    @brief Wykonuje wybrane pomiary
+
+    @param names List[str] Nazwy pomiarów (domyślnie wszystkie)
+    @param repeat int Liczba powtórzeń każdego pomiaru
+    @param min_time float Minimalny czas jednego powtórzenia w sekundach
+    @return dict Wyniki w formacie JSON: {'python', 'platform', 'seed', 'results': {nazwa: wynik}}
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": SEED,
+        "results": {name: run_benchmark(name, repeat, min_time) for name in names or BENCHMARKS},
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """!
+    @brief Porównuje wyniki z linią bazową
+
+    @param results dict Wynik run_suite()
+    @param baseline dict Wynik run_suite() zapisany jako linia bazowa
+    @param tolerance float Dopuszczalny względny spadek przepustowości (0.25 - 25%)
+    @return List[dict] Porównania {'name', 'ratio', 'regression'} dla pomiarów
+    obecnych w obu zestawach; ratio > 1 oznacza przyspieszenie
+    """
+    comparison = []
+    for name, result in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["ops_per_sec"] / base["ops_per_sec"]
+        comparison.append({"name": name, "ratio": ratio, "regression": ratio < 1 - tolerance})
+    return comparison
+
+
+def format_results(results: Dict, comparison: Optional[List[Dict]] = None) -> str:
+    """!
+    @brief Formatuje wyniki jako tabelę tekstową
+
+    @param results dict Wynik run_suite()
+    @param comparison List[dict] Wynik compare() (opcjonalnie)
+    @return str Tabela wyników
+    """
+    ratios = {item["name"]: item for item in comparison or []}
+    lines = []
+    for name, result in results["results"].items():
+        line = f"{name:20} {result['ops_per_sec']:14,.0f} {result['unit']}/s  {result['us_per_op']:10.2f} us"
+        if name in ratios:
+            item = ratios[name]
+            line += f"  x{item['ratio']:.2f}" + ("  REGRESJA" if item["regression"] else "")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """!
+    @brief Obsługa linii poleceń: pomiary i porównanie z linią bazową
+
+    @param argv List[str] Argumenty (domyślnie sys.argv[1:])
+    @return int Kod wyjścia procesu (1, jeśli wykryto regresję)
+    """
+    parser = argparse.ArgumentParser(description="Pomiary wydajności symulatora")
+    parser.add_argument("names", nargs="*", help=f"pomiary: {', '.join(BENCHMARKS)} (domyślnie wszystkie)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="plik linii bazowej JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"dopuszczalny względny spadek przepustowości (domyślnie {DEFAULT_TOLERANCE})")
+    parser.add_argument("--save-baseline", action="store_true", help="zapisz wyniki jako nową linię bazową")
+    parser.add_argument("--json", help="zapisz wyniki do pliku JSON ('-' - na standardowe wyjście)")
+    parser.add_argument("--repeat", type=int, default=5, help="liczba powtórzeń (liczy się najlepsze)")
+    parser.add_argument("--quick", action="store_true", help="krótkie pomiary (mniej dokładne)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"nieznane pomiary: {', '.join(unknown)}")
+
+    results = run_suite(args.names, args.repeat, 0.02 if args.quick else 0.2)
+    comparison = None
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+        results["comparison"] = comparison
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        print(format_results(results, comparison))
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    return 1 if comparison and any(item["regression"] for item in comparison) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
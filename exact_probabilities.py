@@ -0,0 +1,352 @@
+"""!
+@brief Dokładne prawdopodobieństwa wyników meczów i miejsc w turnieju
+
+Model meczu z models.Match jest w pełni określony (obcięty rozkład normalny
+goli albo macierz wyników modelu Dixona-Colesa i seria rzutów karnych), więc
+szanse można policzyć bez losowania:
+- rozkład wyników meczu 8x8 i szansa wygrania karnych (strength_tables)
+- faza grupowa: wyliczenie 3^6 układów zwycięstw, remisów i porażek;
+  gole liczone są programowaniem dynamicznym tylko dla drużyn remisujących
+  punktami, i tylko jako różnice goli względem jednej z nich
+- faza pucharowa i losowanie grup: sumowanie po wszystkich przypadkach
+
+Format turnieju odpowiada main.main() i simulation.simulate_batch(), dlatego
+wyniki place_probabilities() są punktem odniesienia dla metody Monte Carlo.
+
+@requires numpy
+"""
+
+import functools
+import itertools
+
+import numpy as np
+
+from simulation import GROUP_PAIRS, PLACES
+from strength_tables import MAX_GOALS, MAX_RANK, get_tables
+
+WIN, DRAW, LOSS = 0, 1, 2  #!< Wynik meczu z punktu widzenia gospodarza
+
+_SIZE = MAX_GOALS + 1
+_SPAN = 3 * MAX_GOALS  # maksymalna liczba goli drużyny w grupie
+
+_HOME, _AWAY = np.divmod(np.arange(_SIZE * _SIZE), _SIZE)
+_RESULT_MASKS = np.stack((_HOME > _AWAY, _HOME == _AWAY, _HOME < _AWAY))
+_RESULT_POINTS = ((3, 0), (1, 1), (0, 3))
+
+
+def match_probabilities(rank1, rank2, model='rank'):
+    """!
+    @brief Dokładne prawdopodobieństwa wygranej, remisu i porażki
+
+    @param rank1 int Pozycja pierwszej drużyny w rankingu FIFA
+    @param rank2 int Pozycja drugiej drużyny w rankingu FIFA
+    @param model str | StrengthTables Model siły
+    @return np.ndarray Wektor [wygrana, remis, porażka] pierwszej drużyny
+    """
+    scores = get_tables(model).score_matrix(rank1, rank2).ravel()
+    return _RESULT_MASKS @ scores
+
+
+def knockout_probability(rank1, rank2, model='rank'):
+    """!
+    @brief Dokładna szansa awansu pierwszej drużyny w meczu pucharowym
+
+    @param rank1 int Pozycja pierwszej drużyny w rankingu FIFA
+    @param rank2 int Pozycja drugiej drużyny w rankingu FIFA
+    @param model str | StrengthTables Model siły
+    @return float Prawdopodobieństwo zwycięstwa (w meczu lub w rzutach karnych)
+    """
+    win, draw, _ = match_probabilities(rank1, rank2, model)
+    return float(win + draw * get_tables(model).pen_win[rank1, rank2])
+
+
+def _classify(points):
+    """!
+    @brief Ustala, które drużyny awansują na podstawie samych punktów
+
+    @param points tuple Punkty 4 drużyn grupy
+    @return tuple (pewny zwycięzca lub None, drużyny rozstrzygane golami, liczba miejsc do obsadzenia)
+    """
+    order = sorted(range(4), key=lambda i: points[i], reverse=True)
+    top = [i for i in order if points[i] == points[order[0]]]
+    if len(top) >= 2:
+        return None, tuple(top), 2
+    rest = [i for i in order if points[i] == points[order[1]]]
+    return top[0], tuple(rest), 1
+
+
+@functools.lru_cache(maxsize=1)
+def _patterns():
+    """!
+    @brief Wszystkie układy wyników 6 meczów grupy, pogrupowane według sposobu rozstrzygnięcia
+
+    @return dict Słownik:
+    - 'results': tablica (729, 6) wyników meczów (WIN, DRAW, LOSS)
+    - 'points': tablica (729, 4) punktów drużyn
+    - 'decided': (indeksy układów, komórka leader * 4 + second) dla układów rozstrzygniętych punktami
+    - 'relevant': maska (729, 6) meczów z udziałem drużyn rozstrzyganych golami
+    - 'tied': słownik {(drużyny, wyniki ich meczów): [(lider, liczba miejsc, indeksy układów)]}
+    """
+    results = np.array(list(itertools.product((WIN, DRAW, LOSS), repeat=len(GROUP_PAIRS))))
+    points = np.zeros((len(results), 4), dtype=np.int64)
+    for k, (i, j) in enumerate(GROUP_PAIRS):
+        home, away = np.array(_RESULT_POINTS)[results[:, k]].T
+        points[:, i] += home
+        points[:, j] += away
+
+    decided = ([], [])
+    relevant = np.zeros(results.shape, dtype=bool)
+    tied_patterns = {}
+    for index, (pattern, row) in enumerate(zip(results.tolist(), points.tolist())):
+        leader, tied, places = _classify(tuple(row))
+        if len(tied) == 1:
+            decided[0].append(index)
+            decided[1].append(leader * 4 + tied[0])
+            continue
+        # tylko mecze z udziałem drużyn remisujących zmieniają ich różnice goli
+        relevant[index] = [i in tied or j in tied for i, j in GROUP_PAIRS]
+        key = (tied, tuple((k, pattern[k]) for k in np.flatnonzero(relevant[index]).tolist()))
+        tied_patterns.setdefault(key, {}).setdefault((leader, places), []).append(index)
+
+    return {
+        'results': results,
+        'points': points,
+        'decided': tuple(np.array(a) for a in decided),
+        'relevant': relevant,
+        'tied': {
+            key: [(leader, places, np.array(indices)) for (leader, places), indices in cases.items()]
+            for key, cases in tied_patterns.items()
+        },
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _shifts(home, away, tied, result):
+    """!
+    @brief Zmiana różnic goli drużyn remisujących dla wyników meczu o danym rozstrzygnięciu
+
+    @details Różnice liczone są względem pierwszej drużyny z tied:
+    d_k = gole(tied[0]) - gole(tied[k]).
+
+    @param home int Pozycja gospodarza w grupie
+    @param away int Pozycja gościa w grupie
+    @param tied tuple Pozycje drużyn rozstrzyganych golami
+    @param result int Wynik meczu (WIN, DRAW, LOSS)
+    @return tuple Unikalne przesunięcia (u, len(tied)-1) i macierz (64, u) przypisania wyników do przesunięć
+    """
+    goals = np.zeros((_SIZE * _SIZE, 4), dtype=np.int64)
+    goals[:, home] += _HOME
+    goals[:, away] += _AWAY
+    shifts = (goals[:, tied[:1]] - goals[:, list(tied[1:])])[_RESULT_MASKS[result]]
+    unique, inverse = np.unique(shifts, axis=0, return_inverse=True)
+    assign = np.zeros((_SIZE * _SIZE, len(unique)))
+    assign[np.flatnonzero(_RESULT_MASKS[result]), inverse.ravel()] = 1.0
+    return unique, assign
+
+
+@functools.lru_cache(maxsize=None)
+def _order_weights(size, places):
+    """!
+    @brief Prawdopodobieństwa kolejności drużyn dla każdej komórki różnic goli
+
+    @details Drużyny z równą liczbą punktów i goli zajmują miejsca w losowej
+    kolejności (random.shuffle w main.main i stabilne sortowanie), więc każde
+    ich ustawienie jest jednakowo prawdopodobne.
+
+    @param size int Liczba drużyn rozstrzyganych golami
+    @param places int 1 - tylko najlepsza drużyna, 2 - dwie najlepsze w kolejności
+    @return np.ndarray Tablica (2*_SPAN+1,)*(size-1) + (size,)*places
+    """
+    grid = np.meshgrid(*[np.arange(-_SPAN, _SPAN + 1)] * (size - 1), indexing='ij')
+    values = np.stack([np.zeros_like(grid[0])] + [-d for d in grid], axis=-1)  # gole względem tied[0]
+    is_best = values == values.max(axis=-1, keepdims=True)
+    n_best = is_best.sum(axis=-1, keepdims=True)
+    first = is_best / n_best
+    if places == 1:
+        return first
+
+    below = np.where(is_best, np.iinfo(values.dtype).min, values)
+    runner = below == below.max(axis=-1, keepdims=True)
+    second = np.where(n_best > 1, is_best / np.maximum(n_best - 1, 1), runner / runner.sum(axis=-1, keepdims=True))
+    return first[..., :, None] * second[..., None, :] * (1 - np.eye(size))
+
+
+def _goal_differences(kernels, groups):
+    """!
+    @brief Rozkład różnic goli jako splot rozkładów kolejnych meczów
+
+    @param kernels list Lista par (przesunięcia (u, wymiar), prawdopodobieństwa (grupy, u))
+    @param groups int Liczba liczonych jednocześnie grup
+    @return tuple Tablica (grupy, ...) prawdopodobieństw oraz indeks jej pierwszej
+    komórki w osiach _order_weights() (różnica 0 to indeks _SPAN)
+    """
+    dims = kernels[0][0].shape[1]
+    state = np.ones((groups,) + (1,) * dims)
+    lo = np.full(dims, _SPAN)
+    for shifts, probs in kernels:
+        low = shifts.min(axis=0)
+        shifts = shifts - low
+        lo = lo + low
+        new = np.zeros(state.shape + np.concatenate(([0], shifts.max(axis=0))))
+        term = np.empty_like(state)
+        for shift, prob in zip(shifts.tolist(), probs.T):
+            window = (slice(None),) + tuple(slice(s, s + n) for s, n in zip(shift, state.shape[1:]))
+            np.multiply(state, prob.reshape((groups,) + (1,) * dims), out=term)
+            new[window] += term
+        state = new
+    return state, lo
+
+
+def _group_distributions(ranks, model):
+    """!
+    @brief Dokładne rozkłady tabel wielu grup jednocześnie
+
+    @param ranks np.ndarray Macierz (grupy, 4) pozycji drużyn w rankingu FIFA
+    @param model str | StrengthTables Model siły
+    @return tuple Macierze awansu (grupy, 4, 4) i rozkładu punktów (grupy, 4, 10)
+
+    @throws ValueError Dla pozycji spoza zakresu 1..211
+    """
+    if ranks.min() < 1 or ranks.max() > MAX_RANK:
+        raise ValueError(f"Pozycja w rankingu musi mieścić się w zakresie 1-{MAX_RANK}.")
+    groups = len(ranks)
+    home = ranks[:, [i for i, _ in GROUP_PAIRS]]
+    away = ranks[:, [j for _, j in GROUP_PAIRS]]
+    scores = get_tables(model).scores(home, away).reshape(groups, len(GROUP_PAIRS), -1)
+    result_probs = scores @ _RESULT_MASKS.T  # (grupy, 6, 3)
+
+    plan = _patterns()
+    results = plan['results']
+    matches = np.arange(len(GROUP_PAIRS))
+    outcome = result_probs[:, matches, results]  # (grupy, 729, 6)
+    pattern_probs = outcome.prod(axis=-1)
+    points = np.zeros((groups, 4, 10))
+    for team in range(4):
+        points[:, team] = pattern_probs @ np.eye(10)[plan['points'][:, team]]
+
+    indices, cells = plan['decided']
+    advance = (pattern_probs[:, indices] @ np.eye(16)[cells]).reshape(groups, 4, 4)
+    # prawdopodobieństwo meczów bez udziału drużyn remisujących
+    outside = np.where(plan['relevant'], 1.0, outcome).prod(axis=-1)
+    for (tied, relevant), cases in plan['tied'].items():
+        kernels = []
+        for k, result in relevant:
+            unique, assign = _shifts(*GROUP_PAIRS[k], tied, result)
+            kernels.append((unique, scores[:, k] @ assign))
+        # najwięcej przesunięć, póki tablica jest mała
+        kernels.sort(key=lambda kernel: -len(kernel[0]))
+        state, lo = _goal_differences(kernels, groups)
+
+        index = np.array(tied)
+        axes = (list(range(1, state.ndim)), list(range(state.ndim - 1)))
+        for leader, places, patterns in cases:
+            weights = _order_weights(len(tied), places)
+            window = weights[tuple(slice(l, l + n) for l, n in zip(lo, state.shape[1:]))]
+            order = np.tensordot(state, window, axes=axes) * outside[:, patterns].sum(axis=1).reshape((-1,) + (1,) * places)
+            if places == 2:
+                advance[:, index[:, None], index] += order
+            else:
+                advance[:, leader, index] += order
+    return advance, points
+
+
+@functools.lru_cache(maxsize=256)
+def group_probabilities(ranks, model='rank'):
+    """!
+    @brief Dokładny rozkład tabeli grupy 4 drużyn
+
+    @details Dla każdego z 3^6 układów wyników punkty są znane. Gole mają
+    znaczenie tylko wtedy, gdy drużyny walczące o awans mają równo punktów -
+    wtedy rozkład ich różnic goli liczony jest splotem rozkładów wyników
+    meczów z nimi, zawężonych do danego wyniku.
+
+    @param ranks tuple Pozycje 4 drużyn w rankingu FIFA (kolejność jak w grupie)
+    @param model str | StrengthTables Model siły
+    @return dict Słownik:
+    - 'advance': macierz (4, 4) - P[i, j] to szansa, że i wygra grupę, a j będzie drugi
+    - 'points': macierz (4, 10) rozkładu punktów drużyn
+    """
+    advance, points = _group_distributions(np.array([ranks], dtype=np.intp), model)
+    return {'advance': advance[0], 'points': points[0]}
+
+
+def _knockout_matrix(ranks, model):
+    """!
+    @brief Szanse awansu w meczach pucharowych między drużynami turnieju
+
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param model str | StrengthTables Model siły
+    @return np.ndarray Macierz K[i, j] - szansa awansu drużyny i w meczu z drużyną j
+    """
+    tables = get_tables(model)
+    index = np.array(ranks)
+    scores = tables.scores(index[:, None], index[None, :])
+    win = np.tril(np.ones(scores.shape[-2:]), -1)
+    draw = np.trace(scores, axis1=-2, axis2=-1)
+    return (scores * win).sum(axis=(-2, -1)) + draw * tables.pen_win[np.ix_(index, index)]
+
+
+def place_probabilities(ranks, model='rank'):
+    """!
+    @brief Dokładne prawdopodobieństwa miejsc w turnieju w formacie main.main()
+
+    @details Każdy z 35 podziałów na grupy jest jednakowo prawdopodobny
+    (zamiana grup A i B daje te same pary półfinałowe). Rozkład par
+    (lider, wicelider) obu grup łączony jest w tablicę X[a1, a2, b1, b2],
+    a półfinały, mecz o 3. miejsce i finał sumowane są po wszystkich
+    wynikach.
+
+    @param ranks array-like Pozycje 8 drużyn w rankingu FIFA
+    @param model str | StrengthTables Model siły
+    @return np.ndarray Macierz (8, len(PLACES)) prawdopodobieństw miejsc,
+    zgodna z simulation.place_probabilities()
+
+    @throws ValueError Jeśli liczba drużyn jest różna od 8
+    """
+    ranks = tuple(int(r) for r in ranks)
+    n_teams = len(ranks)
+    if n_teams != 8:
+        raise ValueError("Turniej wymaga dokładnie 8 drużyn.")
+
+    splits = [group for group in itertools.combinations(range(n_teams), 4) if 0 in group]
+    groups_a = np.array(splits)
+    groups_b = np.array([[t for t in range(n_teams) if t not in group] for group in splits])
+    index = np.array(ranks)
+    advance, _ = _group_distributions(index[np.concatenate((groups_a, groups_b))], model)
+    leaders = np.zeros((n_teams,) * 4)
+    for group_a, group_b, advance_a, advance_b in zip(groups_a, groups_b, advance, advance[len(splits):]):
+        leaders[np.ix_(group_a, group_a, group_b, group_b)] += advance_a[:, :, None, None] * advance_b
+    leaders /= len(splits)
+
+    knock = _knockout_matrix(ranks, model)
+    a1, a2, b1, b2 = np.indices(leaders.shape)
+    probs = np.zeros((len(PLACES), n_teams))
+    # półfinały: A1-B2 oraz B1-A2
+    for semi1 in ((a1, b2), (b2, a1)):
+        for semi2 in ((b1, a2), (a2, b1)):
+            (w1, l1), (w2, l2) = semi1, semi2
+            prob = leaders * knock[w1, l1] * knock[w2, l2]
+            final = knock[w1, w2]
+            third = knock[l1, l2]
+            for place, (team, weight) in enumerate((
+                (w1, final), (w2, 1 - final), (w1, 1 - final), (w2, final),
+                (l1, third), (l2, 1 - third), (l1, 1 - third), (l2, third),
+            )):
+                probs[place // 2] += np.bincount(team.ravel(), weights=(prob * weight).ravel(), minlength=n_teams)
+    probs[-1] = 1 - probs[:-1].sum(axis=0)
+    return probs.T
+
+
+def tournament_probabilities(teams, model='rank'):
+    """!
+    @brief Dokładne szanse drużyn na poszczególne miejsca w turnieju
+
+    @param teams List[Team] Lista 8 obiektów Team
+    @param model str | StrengthTables Model siły
+    @return dict Słownik {nazwa_drużyny: {miejsce: prawdopodobieństwo}}, jak simulation.simulate_tournaments()
+    """
+    probs = place_probabilities([t.fifa_rank for t in teams], model)
+    return {
+        team.name: dict(zip(PLACES, row.tolist()))
+        for team, row in zip(teams, probs)
+    }
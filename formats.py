@@ -0,0 +1,257 @@
+"""!
+@brief Konfigurowalne formaty turnieju: grupy, awans i drabinka pucharowa
+
+Format opisany jest deklaratywnie (TournamentFormat): liczba drużyn i grup,
+liczba drużyn awansujących z każdej grupy, liczba najlepszych drużyn
+z kolejnego miejsca (np. 4 z 6 trzecich miejsc na Euro) i pary pierwszej
+rundy pucharowej. compile_format() zamienia opis raz na terminarz
+(Schedule): pary meczów grupowych, źródła miejsc w drużynce pucharowej,
+pary pierwszej rundy i nazwy faz. Silniki symulacji wykonują już tylko
+gotowy terminarz:
+- play_format(): obiekty models.Team i models.Match (także main.play_tournament())
+- simulation.simulate_batch(): wektorowo na tablicach NumPy
+
+Domyślna drabinka rozstawia kwalifikantów standardowo (1-N, 2-(N-1), ...)
+w kolejności: zwycięzcy grup, wicemistrzowie grup, ..., najlepsze drużyny
+z kolejnego miejsca. Najlepsze trzecie drużyny zajmują miejsca T1..Tk według
+wyników, a nie według tabeli kombinacji UEFA/FIFA.
+
+Kolejność w grupach ustala standings.GroupStandings według zasady tiebreak
+formatu: classic8 zachowuje pierwotną zasadę main.main() (punkty, gole), pozostałe
+formaty stosują kryteria FIFA (różnica goli, mecze bezpośrednie, fair play).
+
+@requires random
+"""
+
+import functools
+import itertools
+import random
+import string
+from collections import namedtuple
+
+from standings import DEFAULT_TIEBREAK, TIEBREAKS, GroupStandings
+
+TournamentFormat = namedtuple(
+    'TournamentFormat', 'name teams groups advance best_thirds bracket third_place tiebreak',
+    defaults=(0, None, True, DEFAULT_TIEBREAK),
+)
+"""!Opis formatu: nazwa, liczba drużyn, liczba grup, awansujący z grupy,
+liczba najlepszych drużyn z miejsca advance+1, pary pierwszej rundy
+(np. (("A1", "B2"), ...) - None oznacza rozstawienie standardowe),
+czy rozgrywany jest mecz o 3. miejsce i zasada kolejności w grupie
+(standings.TIEBREAKS)"""
+
+FORMATS = {
+    fmt.name: fmt for fmt in (
+        TournamentFormat('classic8', 8, 2, 2, tiebreak='goals'),
+        TournamentFormat('fifa8', 8, 2, 2),
+        TournamentFormat('groups16', 16, 4, 2),
+        TournamentFormat('euro24', 24, 6, 2, best_thirds=4, third_place=False),
+        TournamentFormat('wc32', 32, 8, 2),
+        TournamentFormat('wc48', 48, 12, 2, best_thirds=8),
+    )
+}
+"""!Wbudowane formaty turnieju według nazwy"""
+
+DEFAULT_FORMAT = 'classic8'  #!< Format main.main(): 2 grupy po 4, półfinały na krzyż, mecz o 3. miejsce
+
+ROUND_NAMES = {1: "Finał", 2: "Półfinał", 4: "Ćwierćfinał", 8: "1/8 finału", 16: "1/16 finału", 32: "1/32 finału"}
+"""!Nazwy rund pucharowych według liczby meczów w rundzie"""
+
+THIRD_PLACE_PHASE = "Mecz o 3. miejsce"  #!< Nazwa meczu o 3. miejsce
+
+
+def get_format(fmt=DEFAULT_FORMAT):
+    """!
+    @brief Zwraca opis formatu
+
+    @param fmt str | TournamentFormat Nazwa z FORMATS albo gotowy opis
+    @return TournamentFormat Opis formatu
+
+    @throws ValueError Dla nieznanej nazwy formatu
+    """
+    if isinstance(fmt, TournamentFormat):
+        return fmt
+    if fmt not in FORMATS:
+        raise ValueError(f"Nieznany format: {fmt}. Dostępne: {', '.join(FORMATS)}.")
+    return FORMATS[fmt]
+
+
+def seed_order(size):
+    """!
+    @brief Kolejność rozstawionych numerów w drabince (1 i 2 spotykają się w finale)
+
+    @param size int Liczba miejsc w drabince (potęga dwójki)
+    @return List[int] Numery rozstawienia 1..size w kolejności drabinki
+    """
+    order = [1]
+    while len(order) < size:
+        order = [s for seed in order for s in (seed, 2 * len(order) + 1 - seed)]
+    return order
+
+
+class Schedule:
+    """!
+    @brief Terminarz turnieju skompilowany z opisu formatu
+
+    Indeksy miejsc w drabince (slots) odpowiadają kolejności qualifiers:
+    ('A', 1) to zwycięzca grupy A, ('T', 2) druga najlepsza drużyna
+    z miejsca advance+1.
+    """
+
+    __slots__ = ('fmt', 'group_size', 'group_names', 'group_pairs', 'qualifiers',
+                 'first_round', 'round_phases', 'n_matches')
+
+    def __init__(self, fmt):
+        """!
+        @brief Kompiluje opis formatu
+
+        @param fmt TournamentFormat Opis formatu
+
+        @throws ValueError Dla niespójnego opisu
+        """
+        if fmt.groups < 1 or fmt.teams % fmt.groups:
+            raise ValueError(f"{fmt.teams} drużyn nie dzieli się na {fmt.groups} równych grup.")
+        self.fmt = fmt
+        self.group_size = fmt.teams // fmt.groups
+        if not 1 <= fmt.advance <= self.group_size or fmt.best_thirds > fmt.groups:
+            raise ValueError("Niepoprawna liczba drużyn awansujących z grup.")
+        if fmt.best_thirds and fmt.advance >= self.group_size:
+            raise ValueError("Brak drużyn na miejscu, z którego awansują najlepsze drużyny.")
+        if fmt.tiebreak not in TIEBREAKS:
+            raise ValueError(f"Nieznana zasada kolejności: {fmt.tiebreak}. Dostępne: {', '.join(TIEBREAKS)}.")
+        self.group_names = tuple(string.ascii_uppercase[:fmt.groups])
+        self.group_pairs = tuple(itertools.combinations(range(self.group_size), 2))
+
+        self.qualifiers = tuple(
+            [(group, place) for place in range(1, fmt.advance + 1) for group in self.group_names]
+            + [('T', k) for k in range(1, fmt.best_thirds + 1)]
+        )
+        size = len(self.qualifiers)
+        if size < 4 or size & (size - 1):
+            raise ValueError(f"Faza pucharowa wymaga 2^k (co najmniej 4) drużyn, awansuje {size}.")
+
+        labels = {f"{group}{place}": index for index, (group, place) in enumerate(self.qualifiers)}
+        if fmt.bracket is None:
+            order = [s - 1 for s in seed_order(size)]
+            self.first_round = tuple(zip(order[0::2], order[1::2]))
+        else:
+            self.first_round = tuple((labels[a], labels[b]) for a, b in fmt.bracket)
+            used = sorted(i for pair in self.first_round for i in pair)
+            if used != list(range(size)):
+                raise ValueError("Pary pierwszej rundy muszą zawierać każde miejsce drabinki dokładnie raz.")
+
+        self.round_phases = []
+        matches = size // 2
+        while matches:
+            name = ROUND_NAMES.get(matches, f"1/{matches} finału")
+            self.round_phases.append([name] if matches == 1 else [f"{name} {m + 1}" for m in range(matches)])
+            matches //= 2
+        self.n_matches = fmt.groups * len(self.group_pairs) + size - 1 + bool(fmt.third_place)
+
+    @property
+    def teams(self):
+        """!
+        @brief Liczba drużyn w turnieju
+        """
+        return self.fmt.teams
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(fmt):
+    return Schedule(fmt)
+
+
+def compile_format(fmt=DEFAULT_FORMAT):
+    """!
+    @brief Zwraca terminarz formatu, kompilując go tylko raz
+
+    @param fmt str | TournamentFormat | Schedule Nazwa, opis formatu albo gotowy terminarz
+    @return Schedule Terminarz turnieju
+    """
+    if isinstance(fmt, Schedule):
+        return fmt
+    return _compile(get_format(fmt))
+
+
+def _play(team1, team2, phase, rng, log, verbose):
+    from models import Match
+
+    match = Match(team1, team2, phase, log, rng=rng, verbose=verbose)
+    match.play()
+    if verbose:
+        print(match.summary())
+    return match
+
+
+def play_format(schedule, teams, rng=random, log=None, verbose=False, qualifiers=None):
+    """!
+    @brief Rozgrywa turniej według terminarza na obiektach Team i Match
+
+    @details Kolejność losowań jest taka sama jak w main.main() dla formatu
+    classic8: losowanie grup (rng.shuffle), mecze kolejnych grup, rundy
+    pucharowe, mecz o 3. miejsce i finał.
+
+    @param schedule Schedule | str Terminarz (compile_format())
+    @param teams List[Team] Drużyny turnieju (punkty i gole powinny być wyzerowane)
+    @param rng random.Random Generator liczb losowych (domyślnie globalny moduł random)
+    @param log MatchLog Opcjonalny bufor na wyniki meczów
+    @param verbose bool Czy wypisywać przebieg turnieju
+    @param qualifiers list Opcjonalna lista, do której trafiają drużyny, które wyszły z grup
+    (kolejność miejsc Schedule.qualifiers)
+    @return List[Team] Mistrz, wicemistrz, 3. i 4. miejsce (bez meczu o 3. miejsce
+    - obaj przegrani półfinałów, którzy dzielą miejsce simulation.SEMIFINAL;
+    kolumny miejsc wyznacza simulation.podium_columns())
+
+    @throws ValueError Gdy liczba drużyn nie zgadza się z formatem
+    """
+    schedule = compile_format(schedule)
+    fmt = schedule.fmt
+    if len(teams) != fmt.teams:
+        raise ValueError(f"Format {fmt.name} wymaga {fmt.teams} drużyn, podano {len(teams)}.")
+    teams = list(teams)
+    rng.shuffle(teams)
+
+    size, rule = schedule.group_size, fmt.tiebreak
+    standings = {}
+    for g, group_name in enumerate(schedule.group_names):
+        group = teams[g * size:(g + 1) * size]
+        table = GroupStandings(group)
+        if verbose:
+            print(f"\n=== Faza grupowa: Grupa {group_name} ===")
+        for i, j in schedule.group_pairs:
+            table.record(i, j, *_play(group[i], group[j], f"Grupa {group_name}", rng, log, verbose).score)
+        standings[group_name] = table
+
+    # drużyny z miejsca advance+1 porównywane kryteriami ogólnymi, przy remisie wyżej wcześniejsza grupa
+    candidates = []
+    for table in standings.values() if fmt.best_thirds else ():
+        position = table.order(rule)[fmt.advance]
+        candidates.append((table.key(position, rule), table.teams[position]))
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    thirds = [team for _, team in candidates[:fmt.best_thirds]]
+    slots = [standings[group].ranked(rule)[place - 1] if group != 'T' else thirds[place - 1]
+             for group, place in schedule.qualifiers]
+    if qualifiers is not None:
+        qualifiers.extend(slots)
+
+    pairs = [(slots[a], slots[b]) for a, b in schedule.first_round]
+    for phases in schedule.round_phases:
+        if len(phases) == 1:
+            if fmt.third_place:
+                if verbose:
+                    print(f"\n=== {THIRD_PLACE_PHASE} ===")
+                third_place = _play(*losers, THIRD_PLACE_PHASE, rng, log, verbose)
+                semifinal = [third_place.get_winner(), third_place.get_loser()]
+            else:
+                semifinal = losers  # bez meczu o 3. miejsce - wspólne miejsce obu drużyn
+        winners, losers = [], []
+        for (team1, team2), phase in zip(pairs, phases):
+            if verbose:
+                print(f"\n=== {phase} ===")
+            match = _play(team1, team2, phase, rng, log, verbose)
+            winners.append(match.get_winner())
+            losers.append(match.get_loser())
+        pairs = list(zip(winners[0::2], winners[1::2]))
+
+    return winners + losers + semifinal
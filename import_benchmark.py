@@ -0,0 +1,141 @@
+"""!
+@brief Pomiar czasu importu modułów symulatora (python -X importtime)
+
+Każdy pomiar uruchamia nowy interpreter z opcją -X importtime, więc mierzony
+jest zimny start procesu - taki sam, jaki płaci każdy proces roboczy
+parallel.run_parallel(). Moduł pilnuje, aby rdzeń symulacji:
+- mieścił się w budżecie czasu importu (DEFAULT_BUDGET_MS)
+- nie wczytywał bibliotek do wykresów i pobierania stron (HEAVY_MODULES)
+
+Użycie z linii poleceń:
+@code
+python import_benchmark.py
+python import_benchmark.py main parallel --budget-ms 250 --top 15
+@endcode
+
+@requires subprocess
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+CORE_MODULES = ("main", "simulation", "variance", "parallel", "adaptive", "exact_probabilities", "service")
+"""!Moduły rdzenia symulacji sprawdzane domyślnie"""
+HEAVY_MODULES = ("matplotlib", "bs4", "requests")  #!< Biblioteki, które rdzeń może wczytać dopiero przy użyciu
+DEFAULT_BUDGET_MS = 400.0  #!< Domyślny budżet czasu importu jednego modułu w milisekundach
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """!
+    @brief Parsuje wynik opcji -X importtime
+
+    @param output str Treść stderr interpretera
+    @return dict Słownik {moduł: (czas własny, czas łączny)} w mikrosekundach
+    """
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def import_times(module: str, python: str = sys.executable) -> Dict[str, Tuple[int, int]]:
+    """!
+    @brief Importuje moduł w nowym interpreterze i zwraca czasy importu
+
+    @param module str Nazwa modułu
+    @param python str Ścieżka interpretera (domyślnie bieżący)
+    @return dict Słownik {moduł: (czas własny, czas łączny)} w mikrosekundach
+
+    @throws RuntimeError Gdy import modułu się nie powiedzie
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import modułu {module} nie powiódł się:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(module: str, budget_ms: float = DEFAULT_BUDGET_MS, repeat: int = 3) -> Dict:
+    """!
+    @brief Mierzy zimny start modułu i porównuje go z budżetem
+
+    @details Wynikiem jest najlepszy z repeat pomiarów - pozostałe zawierają
+    głównie szum systemu (pierwsze czytanie plików, inne procesy).
+
+    @param module str Nazwa modułu
+    @param budget_ms float Budżet czasu importu w milisekundach
+    @param repeat int Liczba pomiarów
+    @return dict Słownik {'module', 'ms', 'budget_ms', 'heavy', 'top', 'ok'}, gdzie
+    'heavy' to wczytane biblioteki z HEAVY_MODULES, a 'top' lista (moduł, ms)
+    najdroższych importów według czasu własnego
+    """
+    best = None
+    for _ in range(max(repeat, 1)):
+        times = import_times(module)
+        if best is None or times[module][1] < best[module][1]:
+            best = times
+
+    heavy = sorted({name.split(".")[0] for name in best} & set(HEAVY_MODULES))
+    top = sorted(best.items(), key=lambda item: item[1][0], reverse=True)
+    ms = best[module][1] / 1000
+    return {
+        "module": module,
+        "ms": ms,
+        "budget_ms": budget_ms,
+        "heavy": heavy,
+        "top": [(name, own / 1000) for name, (own, _) in top],
+        "ok": ms <= budget_ms and not heavy,
+    }
+
+
+def format_result(result: Dict, top: int = 5) -> str:
+    """!
+    @brief Formatuje wynik measure()
+
+    @param result dict Wynik measure()
+    @param top int Liczba najdroższych importów do wypisania
+    @return str Opis pomiaru w kilku wierszach
+    """
+    state = "OK" if result["ok"] else "PRZEKROCZONY"
+    lines = [f"{result['module']}: {result['ms']:.1f} ms (budżet {result['budget_ms']:.0f} ms) - {state}"]
+    if result["heavy"]:
+        lines.append(f"  wczytane ciężkie biblioteki: {', '.join(result['heavy'])}")
+    for name, ms in result["top"][:top]:
+        lines.append(f"  {ms:8.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """!
+    @brief Obsługa linii poleceń: pomiar czasu importu modułów rdzenia
+
+    @param argv List[str] Argumenty (domyślnie sys.argv[1:])
+    @return int Kod wyjścia procesu (1, jeśli któryś moduł przekroczył budżet)
+    """
+    parser = argparse.ArgumentParser(description="Czas importu modułów symulatora")
+    parser.add_argument("modules", nargs="*", default=list(CORE_MODULES), help="moduły do zmierzenia")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="budżet czasu importu w ms")
+    parser.add_argument("--repeat", type=int, default=3, help="liczba pomiarów (liczy się najlepszy)")
+    parser.add_argument("--top", type=int, default=5, help="liczba najdroższych importów do wypisania")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for module in args.modules:
+        result = measure(module, args.budget_ms, args.repeat)
+        print(format_result(result, args.top))
+        failed += not result["ok"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,374 @@
+"""!
+@brief Pomiary czasu i liczniki wywołań w kluczowych miejscach symulatora
+
+Moduł zawiera:
+- enable() / disable(): podmiana funkcji z TARGETS na wersje mierzące czas
+- timer() i count(): ręczne pomiary dowolnych fragmentów kodu
+- profile(): pomiar cProfile, Sampler: próbkowanie stosu w osobnym wątku
+- format_summary(), to_json(), to_prometheus(): podsumowanie faz i eksport metryk
+
+Wyłączony pomiar nie kosztuje nic: funkcje są podmieniane na wersje mierzące
+czas dopiero w enable(), a disable() przywraca oryginały. Podmieniane są
+atrybuty modułu i klasy oraz kopie funkcji zaimportowane do innych modułów
+projektu (np. save_results w main).
+
+Czasy są łączne - Match.play zawiera czas Match.play_penalties. Pomiary
+dotyczą bieżącego procesu (procesy robocze parallel.py nie są mierzone).
+"""
+
+import collections
+import contextlib
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TARGETS = {
+    "transfermarkt_rankings.get_full_rankings": "ranking",
+    "transfermarkt_rankings.get_rankings_incremental": "ranking",
+    "models.Team.__init__": "drużyny",
+    "models.Match.play": "mecze",
+    "models.Match.play_penalties": "karne",
+    "utils.save_results": "zapis",
+    "stats.plot_goals_distribution": "wykresy",
+    "stats.plot_rank_vs_performance": "wykresy",
+    "stats.render_charts": "wykresy",
+}
+"""!Mierzone funkcje ('moduł.nazwa' albo 'moduł.Klasa.metoda') i fazy, do których należą"""
+
+METRIC_PREFIX = "symulator"  #!< Przedrostek nazw metryk Prometheus
+
+_stats = {}      # nazwa -> [liczba wywołań, łączny czas, najdłuższe wywołanie]
+_counters = collections.Counter()
+_patched = []    # (obiekt, atrybut, oryginał) do przywrócenia w disable()
+
+
+def _record(name, elapsed):
+    entry = _stats.get(name)
+    if entry is None:
+        _stats[name] = [1, elapsed, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+
+def _timed(name, func):
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, perf_counter() - start)
+    return wrapper
+
+
+def _project_modules():
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None) or ""
+        if os.path.dirname(os.path.abspath(path)) == PROJECT_DIR:
+            yield module
+
+
+def enable(targets=TARGETS):
+    """!
+    @brief Włącza pomiar funkcji z TARGETS (ponowne wywołanie nic nie zmienia)
+
+    @param targets Iterable[str] Nazwy mierzonych funkcji
+    """
+    if _patched:
+        return
+    for name in targets:
+        module_name, *path = name.split(".")
+        owner = importlib.import_module(module_name)
+        for attr in path[:-1]:
+            owner = getattr(owner, attr)
+        original = owner.__dict__[path[-1]]
+        wrapper = _timed(".".join(path), original)
+        setattr(owner, path[-1], wrapper)
+        _patched.append((owner, path[-1], original))
+        if len(path) == 1:
+            # kopie zaimportowane przez "from moduł import funkcja"
+            for module in _project_modules():
+                if module is not owner and module.__dict__.get(path[-1]) is original:
+                    setattr(module, path[-1], wrapper)
+                    _patched.append((module, path[-1], original))
+
+
+def disable():
+    """!
+    @brief Przywraca oryginalne funkcje (zebrane pomiary zostają)
+    """
+    while _patched:
+        owner, attr, original = _patched.pop()
+        setattr(owner, attr, original)
+
+
+def is_enabled():
+    """!
+    @brief Czy funkcje z TARGETS są mierzone
+    """
+    return bool(_patched)
+
+
+def reset():
+    """!
+    @brief Zeruje pomiary i liczniki
+    """
+    _stats.clear()
+    _counters.clear()
+
+
+@contextlib.contextmanager
+def instrumented(targets=TARGETS):
+    """!
+    @brief Mierzy funkcje z TARGETS w obrębie bloku with
+
+    @param targets Iterable[str] Nazwy mierzonych funkcji
+    """
+    enable(targets)
+    try:
+        yield
+    finally:
+        disable()
+
+
+@contextlib.contextmanager
+def timer(name):
+    """!
+    @brief Mierzy czas bloku with pod podaną nazwą (także przy wyłączonym enable())
+
+    @param name str Nazwa pomiaru
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def count(name, value=1):
+    """!
+    @brief Zwiększa licznik
+
+    @param name str Nazwa licznika
+    @param value int Przyrost
+    """
+    _counters[name] += value
+
+
+def snapshot():
+    """!
+    @brief Bieżące pomiary
+
+    @return dict {'timers': {nazwa: {'count', 'total_s', 'mean_us', 'max_us'}}, 'counters': {nazwa: wartość}}
+    """
+    timers = {
+        name: {"count": calls, "total_s": total, "mean_us": total / calls * 1e6, "max_us": longest * 1e6}
+        for name, (calls, total, longest) in _stats.items()
+    }
+    return {"timers": timers, "counters": dict(_counters)}
+
+
+def phase_summary():
+    """!
+    @brief Łączny czas i liczba wywołań w fazach z TARGETS
+
+    @details Pomiary z timer() spoza TARGETS tworzą fazy o własnych nazwach.
+
+    @return dict {faza: {'count', 'total_s'}} w kolejności malejącego czasu
+    """
+    phases = {}
+    for name, (calls, total, _) in _stats.items():
+        phase = next((p for target, p in TARGETS.items() if target.endswith("." + name)), name)
+        entry = phases.setdefault(phase, {"count": 0, "total_s": 0.0})
+        entry["count"] += calls
+        entry["total_s"] += total
+    return dict(sorted(phases.items(), key=lambda item: item[1]["total_s"], reverse=True))
+
+
+def format_summary():
+    """!
+    @brief Tabela czasów faz i funkcji
+
+    @return str Podsumowanie w kilku wierszach
+    """
+    lines = ["=== ⏱️ Czas faz ==="]
+    for phase, entry in phase_summary().items():
+        lines.append(f"{phase:12} {entry['total_s'] * 1000:10.1f} ms  {entry['count']:9d} wywołań")
+    for name, entry in snapshot()["timers"].items():
+        lines.append(f"  {name:30} {entry['mean_us']:10.1f} us/wywołanie (max {entry['max_us']:.1f} us)")
+    for name, value in _counters.items():
+        lines.append(f"  {name:30} {value:10d}")
+    return "\n".join(lines)
+
+
+def to_json(path=None):
+    """!
+    @brief Eksport pomiarów do JSON
+
+    @param path str Ścieżka pliku (None - tylko zwraca tekst)
+    @return str Dokument JSON z snapshot() i phase_summary()
+    """
+    data = dict(snapshot(), phases=phase_summary())
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(path=None):
+    """!
+    @brief Eksport pomiarów w formacie tekstowym Prometheus
+
+    @param path str Ścieżka pliku (None - tylko zwraca tekst)
+    @return str Metryki: liczba wywołań, łączny i najdłuższy czas funkcji, liczniki
+    """
+    prefix = METRIC_PREFIX
+    lines = [
+        f"# HELP {prefix}_calls_total Liczba wywołań mierzonej funkcji",
+        f"# TYPE {prefix}_calls_total counter",
+    ]
+    timers = snapshot()["timers"]
+    lines += [f'{prefix}_calls_total{{name="{_label(n)}"}} {t["count"]}' for n, t in timers.items()]
+    lines += [f"# HELP {prefix}_seconds_total Łączny czas mierzonej funkcji",
+              f"# TYPE {prefix}_seconds_total counter"]
+    lines += [f'{prefix}_seconds_total{{name="{_label(n)}"}} {t["total_s"]:.9f}' for n, t in timers.items()]
+    lines += [f"# HELP {prefix}_seconds_max Najdłuższe wywołanie mierzonej funkcji",
+              f"# TYPE {prefix}_seconds_max gauge"]
+    lines += [f'{prefix}_seconds_max{{name="{_label(n)}"}} {t["max_us"] / 1e6:.9f}' for n, t in timers.items()]
+    if _counters:
+        lines += [f"# HELP {prefix}_events_total Liczniki zdarzeń", f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{name="{_label(n)}"}} {v}' for n, v in _counters.items()]
+    text = "\n".join(lines) + "\n"
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def export(path):
+    """!
+    @brief Zapisuje metryki w formacie wybranym po rozszerzeniu (.prom/.txt - Prometheus, inne - JSON)
+
+    @param path str Ścieżka pliku
+    """
+    if path.endswith((".prom", ".txt")):
+        to_prometheus(path)
+    else:
+        to_json(path)
+
+
+@contextlib.contextmanager
+def profile(path=None, sort="cumulative", limit=25, stream=None):
+    """!
+    @brief Profiluje blok with modułem cProfile
+
+    @param path str Plik na surowe statystyki (pstats, np. dla snakeviz) - opcjonalnie
+    @param sort str Klucz sortowania raportu
+    @param limit int Liczba wierszy raportu
+    @param stream file Strumień na raport tekstowy (None - bez raportu)
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+        if stream is not None:
+            pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+
+
+class Sampler:
+    """!
+    @brief Próbkujący profiler: co interval sekund zapisuje stos wywołań wątku
+
+    Koszt nie zależy od liczby wywołań funkcji (w przeciwieństwie do cProfile),
+    więc nadaje się do długich symulacji. Wynik collapsed() można przekazać
+    do narzędzi rysujących flame graph.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        """!
+        @brief Tworzy profiler dla wątku (domyślnie bieżącego)
+
+        @param interval float Odstęp między próbkami w sekundach
+        @param thread_id int Identyfikator próbkowanego wątku
+        """
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples = collections.Counter()  #!< Liczba próbek dla stosu "plik:funkcja;..."
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        """!
+        @brief Uruchamia próbkowanie w wątku tła
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """!
+        @brief Zatrzymuje próbkowanie
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def collapsed(self):
+        """!
+        @brief Próbki w formacie "stos liczba" (jeden stos w wierszu)
+        """
+        return "\n".join(f"{stack} {n}" for stack, n in self.samples.most_common())
+
+    def top(self, n=10):
+        """!
+        @brief Funkcje najczęściej będące na szczycie stosu
+
+        @param n int Liczba funkcji
+        @return List[tuple] Pary (funkcja, udział próbek)
+        """
+        total = sum(self.samples.values()) or 1
+        leaves = collections.Counter()
+        for stack, hits in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += hits
+        return [(name, hits / total) for name, hits in leaves.most_common(n)]
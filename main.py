@@ -8,31 +8,61 @@ Zawiera logikę przepływu turnieju od fazy grupowej do finału.
 
 """
 
-from models import Team, Match
-from utils import save_results
-from stats import get_total_goals, generate_stats_report, print_stats_report
+import argparse
+import contextlib
 import random
 
-def get_teams_from_user():
+import instrumentation
+
+from adaptive import DEFAULT_MAX_RUNS, STOP_REASONS, TRACKED, run_adaptive
+from formats import DEFAULT_FORMAT, FORMATS, compile_format, play_format
+from models import Team
+from ranking_cache import snapshot_hash
+from result_cache import ResultCache, scenario_key
+from simulation import place_labels, podium_columns
+from state import TeamTable
+from strength_tables import DEFAULT_MODEL, STRENGTH_MODELS, compile_model, get_tables, use_model
+from transfermarkt_rankings import normalize_country_name
+from utils import save_results, save_summary
+from stats import get_total_goals, generate_stats_report, print_stats_report
+from whatif import ConditionalSimulation, TournamentState
+
+
+def podium_labels(fmt=DEFAULT_FORMAT):
+    """!
+    @brief Etykiety miejsc podsumowania (kolumny simulation.place_labels() bez drużyn spoza podium)
+
+    @param fmt str Nazwa formatu turnieju
+    @return tuple "mistrz", "wicemistrz", a dalej "trzecie miejsce" i "czwarte miejsce"
+    albo - bez meczu o 3. miejsce - wspólne "półfinał"
+    """
+    return place_labels(fmt)[:-1]
+
+
+def get_teams_from_user(count=8):
     """!
-    @brief Pobiera od użytkownika nazwy 8 drużyn
+    @brief Pobiera od użytkownika nazwy drużyn
 
     Interaktywnie zbiera nazwy drużyn od użytkownika i tworzy obiekty Team.
     Weryfikuje poprawność danych wejściowych.
 
+    @param count int Liczba drużyn (domyślnie 8)
     @return List[Team] Lista obiektów Team reprezentujących drużyny
-    @throws ValueError Jeśli nazwa drużyny jest pusta
+    @throws ValueError Jeśli nazwa drużyny jest pusta lub drużyna już została dodana
     """
     print("=== Symulator turnieju piłkarskiego reprezentacji ===")
     print("Proszę podać nazwy reprezentacji w języku angielskim:")
 
     teams = []
-    while len(teams) < 8:
+    while len(teams) < count:
         try:
             name = input(f"Wpisz reprezentacje {len(teams) + 1}: ").strip()
             if not name:
                 raise ValueError("Nazwa nie może być pusta.")
 
+            if normalize_country_name(name) in {team.name for team in teams}:
+                raise ValueError(f"Drużyna {normalize_country_name(name)} już została dodana.")
+
             team = Team(name)
 
             if team.fifa_rank == 211:
@@ -45,100 +75,366 @@ def get_teams_from_user():
     return teams
 
 
-def play_group_matches(group_name, teams):
+def read_team_names(path):
+    """!
+    @brief Wczytuje nazwy drużyn z pliku tekstowego
+
+    Jedna drużyna w wierszu; puste wiersze i wiersze zaczynające się od '#'
+    są pomijane.
+
+    @param path str Ścieżka do pliku
+    @return List[str] Nazwy drużyn
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def create_teams(names, verbose=True):
+    """!
+    @brief Tworzy obiekty Team dla podanych nazw
+
+    @param names List[str] Nazwy drużyn
+    @param verbose bool Czy wypisywać ostrzeżenia o drużynach spoza rankingu
+    @return List[Team] Lista drużyn
+    """
+    teams = [Team(name) for name in names]
+    if verbose:
+        for team in teams:
+            if team.fifa_rank == 211:
+                print(f"Uwaga: {team.name} nie znaleziono w rankingu FIFA. Przypisujemy najmniejszą pozycje w rankingu(211)")
+    return teams
+
+
+def play_tournament(teams, rng=random, verbose=True, fmt=DEFAULT_FORMAT):
     """!
-    @brief Przeprowadza wszystkie mecze w fazie grupowej
+    @brief Rozgrywa cały turniej: losowanie grup, faza grupowa i pucharowa
 
-    @param group_name str Nazwa grupy (np. 'A', 'B')
-    @param teams List[Team] Lista obiektów Team w grupie
+    @details Przebieg turnieju i kolejność w grupach (dla classic8 punkty,
+    a potem gole) wyznacza formats.play_format() według terminarza formatu.
 
-    @return List[Match] Lista obiektów Match z rozegranymi meczami
+    @param teams List[Team] Lista drużyn (8 dla formatu domyślnego)
+    @param rng random.Random Generator liczb losowych (domyślnie globalny moduł random)
+    @param verbose bool Czy wypisywać przebieg turnieju
+    @param fmt str Nazwa formatu turnieju (formats.FORMATS)
+
+    @return List[Team] Mistrz, wicemistrz, 3. i 4. miejsce
     """
-    print(f"\n=== Faza grupowa: Grupa {group_name} ===")
-    matches = []
-    for i, t1 in enumerate(teams):
-        for t2 in teams[i + 1:]:
-            match = Match(t1, t2, f"Grupa {group_name}")
-            match.play()
-            print(match.summary())
-            matches.append(match)
-    return matches
-
-
-def sort_group(teams):
+    return play_format(compile_format(fmt), teams, rng, verbose=verbose)
+
+
+def run_many(teams, runs, rng=random, fmt=DEFAULT_FORMAT):
     """!
-    @brief Sortuje drużyny według zasad klasyfikacji turniejowej
+    @brief Rozgrywa wiele turniejów bez wypisywania i sumuje wyniki
+
+    @details Stan drużyn przechowywany jest w TeamTable i zerowany przed
+    każdym turniejem, więc kolejne przebiegi nie tworzą nowych obiektów Team.
+
+    @param teams List[Team] Lista drużyn (zostaną podpięte do nowej tabeli)
+    @param runs int Liczba turniejów
+    @param rng random.Random Generator liczb losowych
+    @param fmt str Nazwa formatu turnieju
+
+    @return dict Podsumowanie {nazwa: {'fifa_ranking', miejsca z podium_labels(fmt),
+    'średnie punkty', 'średnie bramki'}}
 
-    Kryteria sortowania:
-    - Liczba punktów (malejąco)
-    - Liczba bramek (malejąco)
+    @throws ValueError Jeśli dwie drużyny mają tę samą nazwę (po normalizacji)
+    """
+    if len({team.name for team in teams}) != len(teams):
+        raise ValueError("Drużyny nie mogą się powtarzać.")
+    table = TeamTable(len(teams))
+    for team in teams:
+        team.attach(table)
+    labels, columns = podium_labels(fmt), podium_columns(fmt)
+    places = {team.name: [0] * len(labels) for team in teams}
+    points = [0] * len(teams)
+    goals = [0] * len(teams)
+
+    for _ in range(runs):
+        table.reset()
+        for place, team in zip(columns, play_tournament(teams, rng, verbose=False, fmt=fmt)):
+            places[team.name][place] += 1
+        for row in range(len(teams)):
+            points[row] += table.points[row]
+            goals[row] += table.goals[row]
+
+    summary = {}
+    for row, team in enumerate(teams):
+        entry = {"fifa_ranking": team.fifa_rank}
+        entry.update({label: count / runs for label, count in zip(labels, places[team.name])})
+        entry["średnie punkty"] = points[row] / runs
+        entry["średnie bramki"] = goals[row] / runs
+        summary[team.name] = entry
+    return summary
+
+
+def run_many_cached(args, teams, rng):
+    """!
+    @brief run_many() z wynikiem zapisanym w katalogu --cache
 
-    @param teams List[Team] Lista drużyn do posortowania
+    @details Kluczem wyniku są drużyny, format, model siły, liczba turniejów,
+    ziarno i skrót rankingu (result_cache.scenario_key()). Zmiana rankingu
+    usuwa wyniki zapisane dla poprzedniego stanu.
 
-    @return List[Team] Posortowana lista drużyn
+    @param args argparse.Namespace Wynik parse_args()
+    @param teams List[Team] Drużyny turnieju
+    @param rng random.Random Generator liczb losowych
+    @return dict Podsumowanie z run_many()
     """
-    return sorted(teams, key=lambda t: (t.points, t.goals), reverse=True)
+    if not args.cache:
+        return run_many(teams, args.runs, rng, args.format)
+    cache = ResultCache(args.cache, snapshot=snapshot_hash(Team.rankings()))
+    key = scenario_key([team.name for team in teams], args.format, args.model, args.runs, args.seed,
+                       cache.snapshot, engine="object")
+    summary, cached = cache.get_or_compute(key, lambda: run_many(teams, args.runs, rng, args.format))
+    if cached and not args.quiet:
+        print(f"Wynik z pamięci podręcznej: {args.cache}")
+    return summary
+
+
+def run_conditional(args, teams):
+    """!
+    @brief Szanse drużyn warunkowo względem stanu turnieju z pliku --state
 
+    @details Symulowane są tylko nierozegrane mecze (whatif.ConditionalSimulation)
+    z modelem siły wybranym dla tego uruchomienia.
 
-def play_knockout(name, team1, team2):
+    @param args argparse.Namespace Wynik parse_args() (args.state - TournamentState)
+    @param teams List[Team] Drużyny w kolejności args.state.teams
+    @return tuple (podsumowanie {nazwa: {'fifa_ranking', miejsca z podium_labels()}},
+    liczba turniejów zgodnych ze stanem)
+    """
+    simulation = ConditionalSimulation(args.state, [team.fifa_rank for team in teams], args.runs, args.seed,
+                                       get_tables())
+    result = simulation.probabilities()
+    labels = podium_labels(args.format)
+    summary = {}
+    for team, row in zip(teams, result["probabilities"]):
+        entry = {"fifa_ranking": team.fifa_rank}
+        entry.update(zip(labels, row.tolist()))
+        summary[team.name] = entry
+    return summary, result["runs"]
+
+
+def run_precise(args, teams):
     """!
-    @brief Przeprowadza mecz w fazie pucharowej
+    @brief Szanse drużyn z dokładnością --precision zamiast stałej liczby turniejów
+
+    @details Turnieje rozgrywane są silnikiem wektorowym (adaptive.run_adaptive()),
+    aż przedziały ufności 95% szans na tytuł i wyjście z grupy będą węższe
+    niż ±precision albo skończy się budżet --runs lub --max-time.
 
-    @param name str Nazwa fazy (np. 'Półfinał 1')
-    @param team1 Team Pierwsza drużyna
-    @param team2 Team Druga drużyna
+    @param args argparse.Namespace Wynik parse_args()
+    @param teams List[Team] Drużyny turnieju
+    @return tuple (podsumowanie {nazwa: {'fifa_ranking', miejsca z podium_labels(), 'awans',
+    'błąd mistrz', 'błąd awans'}}, wynik run_adaptive())
+    """
+    result = run_adaptive([team.fifa_rank for team in teams], args.precision,
+                          max_runs=args.runs if args.runs > 1 else DEFAULT_MAX_RUNS, max_time=args.max_time,
+                          seed=args.seed, fmt=args.format, model=get_tables())
+    labels = podium_labels(args.format)
+    summary = {}
+    for row, team in enumerate(teams):
+        probs = result["probabilities"][row]
+        entry = {"fifa_ranking": team.fifa_rank}
+        entry.update(zip(labels, probs.tolist()))
+        entry["awans"] = float(result["advancement"][row])
+        entry.update({f"błąd {name}": float(result["error"][name][row]) for name in TRACKED})
+        summary[team.name] = entry
+    return summary, result
+
+
+def print_summary(summary, runs, fmt=DEFAULT_FORMAT):
+    """!
+    @brief Wyświetla szanse drużyn na podium po wielu turniejach
 
-    @return Match Obiekt reprezentujący rozegrany mecz
+    @param summary dict Podsumowanie z run_many()
+    @param runs int Liczba rozegranych turniejów
+    @param fmt str Nazwa formatu turnieju (etykiety miejsc)
     """
-    print(f"\n=== {name} ===")
-    match = Match(team1, team2, name)
-    match.play()
-    print(match.summary())
-    return match
+    print(f"\n=== 🏆 Szanse na podium ({runs} turniejów) ===")
+    ordered = sorted(summary.items(), key=lambda item: item[1]["mistrz"], reverse=True)
+    for name, entry in ordered:
+        odds = ", ".join(f"{label}: {entry[label]:.1%}" for label in podium_labels(fmt)[:3])
+        print(f"- {name} (rank {entry['fifa_ranking']}): {odds}")
+
 
+def parse_args(argv=None):
+    """!
+    @brief Parsuje argumenty wiersza poleceń
 
-def main():
+    @param argv List[str] Argumenty (domyślnie sys.argv[1:])
+    @return argparse.Namespace Sparsowane argumenty
+    """
+    parser = argparse.ArgumentParser(description="Symulator turnieju piłkarskiego reprezentacji")
+    parser.add_argument("teams", nargs="*", help="nazwy drużyn (bez nich program pyta o drużyny)")
+    parser.add_argument("-f", "--teams-file", help="plik z nazwami drużyn, jedna w wierszu")
+    parser.add_argument("-n", "--runs", type=int, default=1, help="liczba turniejów (domyślnie 1)")
+    parser.add_argument("--seed", type=int, help="ziarno generatora liczb losowych")
+    parser.add_argument("-q", "--quiet", action="store_true", help="nie wypisuj przebiegu ani raportu")
+    parser.add_argument("--no-plots", action="store_true", help="nie generuj wykresów")
+    parser.add_argument("--format", default=DEFAULT_FORMAT, choices=FORMATS,
+                        help=f"format turnieju (domyślnie {DEFAULT_FORMAT})")
+    parser.add_argument("--model", default=DEFAULT_MODEL, choices=STRENGTH_MODELS,
+                        help=f"model siły drużyn (domyślnie {DEFAULT_MODEL})")
+    parser.add_argument("--metrics", help="zapisz czasy faz i liczniki (.prom - format Prometheus, inne - JSON)")
+    parser.add_argument("--profile", help="zapisz profil cProfile do pliku (pstats)")
+    parser.add_argument("-o", "--output", default="data.json", help="plik wyników JSON (domyślnie data.json)")
+    parser.add_argument("--cache", metavar="KATALOG",
+                        help="katalog zapisanych wyników wielu turniejów - te same drużyny, format, model, "
+                             "liczba turniejów, ziarno i ranking dają wynik bez ponownej symulacji")
+    parser.add_argument("--precision", type=float, metavar="EPS",
+                        help="rozgrywaj turnieje, aż szanse na tytuł i awans będą znane z dokładnością "
+                             "±EPS (przedział ufności 95%%); --runs staje się limitem turniejów")
+    parser.add_argument("--max-time", type=float, metavar="S", help="limit czasu symulacji z --precision w sekundach")
+    parser.add_argument("--state", metavar="PLIK",
+                        help="stan turnieju JSON (grupy albo drabinka i rozegrane mecze) - szanse z symulacji "
+                             "tylko pozostałych meczów; drużyny i format pochodzą ze stanu")
+    args = parser.parse_args(argv)
+
+    if args.teams_file:
+        args.teams = args.teams + read_team_names(args.teams_file)
+    if args.state:
+        if args.teams:
+            parser.error("drużyny pochodzą ze stanu turnieju (--state)")
+        if args.runs < 2:
+            parser.error("stan turnieju wymaga wielu turniejów (--runs)")
+        try:
+            args.state = TournamentState.load(args.state)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            parser.error(f"nie można wczytać stanu turnieju: {e}")
+        args.format = args.state.fmt
+        args.teams = list(args.state.teams)
+    count = FORMATS[args.format].teams
+    if args.teams and not args.state and len(args.teams) != count:
+        parser.error(f"turniej wymaga {count} drużyn, podano {len(args.teams)}")
+    names = [normalize_country_name(name) for name in args.teams]
+    repeated = sorted({name for name in names if names.count(name) > 1})
+    if repeated:
+        parser.error(f"drużyny nie mogą się powtarzać: {', '.join(repeated)}")
+    if args.runs < 1:
+        parser.error("liczba turniejów musi być dodatnia")
+    if args.precision is not None and not 0 < args.precision < 1:
+        parser.error("dokładność musi być liczbą z przedziału (0, 1)")
+    if args.precision is not None and args.state:
+        parser.error("--precision nie działa ze stanem turnieju (--state)")
+    if args.max_time is not None and args.precision is None:
+        parser.error("--max-time wymaga --precision")
+    return args
+
+
+def main(argv=None):
     """!
     @brief Główna funkcja uruchamiająca symulator turnieju
 
     Kolejność działań:
-    1. Pobranie drużyn od użytkownika
+    1. Pobranie drużyn z argumentów, pliku lub od użytkownika
     2. Losowe przydzielenie do grup
     3. Rozegranie fazy grupowej
     4. Rozegranie fazy pucharowej
     5. Wyświetlenie wyników
     6. Zapis statystyk
-    """
-    print("=== Symulator Turnieju Piłkarskiego (8 drużyn) ===")
-    teams = get_teams_from_user()
-    random.shuffle(teams)
 
-    group_a = teams[:4]
-    group_b = teams[4:]
+    Przy --runs > 1 turnieje rozgrywane są bez wypisywania i wykresów,
+    a zapisywane jest podsumowanie szans drużyn.
 
-    matches_a = play_group_matches("A", group_a)
-    top_a = sort_group(group_a)[:2]
+    Z --metrics lub --profile przebieg jest mierzony (moduł instrumentation),
+    a na końcu wypisywane jest podsumowanie czasu faz.
 
-    matches_b = play_group_matches("B", group_b)
-    top_b = sort_group(group_b)[:2]
+    @param argv List[str] Argumenty wiersza poleceń (domyślnie sys.argv[1:])
+    """
+    args = parse_args(argv)
+    if not (args.metrics or args.profile):
+        run(args)
+        return
+
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        with instrumentation.profile(args.profile) if args.profile else contextlib.nullcontext():
+            run(args)
+    finally:
+        instrumentation.disable()
+    if not args.quiet:
+        print()
+        print(instrumentation.format_summary())
+    if args.metrics:
+        instrumentation.export(args.metrics)
+
+
+def run(args):
+    """!
+    @brief Rozgrywa turniej (lub wiele turniejów) według sparsowanych argumentów
+
+    @param args argparse.Namespace Wynik parse_args()
+    """
+    verbose = not args.quiet
+    rng = random.Random(args.seed) if args.seed is not None else random
 
-    semi1 = play_knockout("Półfinał 1", top_a[0], top_b[1])
-    semi2 = play_knockout("Półfinał 2", top_b[0], top_a[1])
+    if args.teams:
+        teams = create_teams(args.teams, verbose)
+    else:
+        count = FORMATS[args.format].teams
+        print(f"=== Symulator Turnieju Piłkarskiego ({count} drużyn) ===")
+        teams = get_teams_from_user(count)
 
-    third_place = play_knockout("Mecz o 3. miejsce", semi1.get_loser(), semi2.get_loser())
-    final = play_knockout("Finał", semi1.get_winner(), semi2.get_winner())
+    # model siły obowiązuje tylko w czasie tego uruchomienia
+    previous = use_model(compile_model(args.model, Team.rankings()))
+    try:
+        run_tournaments(args, teams, rng)
+    finally:
+        use_model(previous)
 
-    print("\n=== 🏆 Końcowa Klasyfikacja ===")
-    print(f"🥇 Mistrz: {final.get_winner().name}")
-    print(f"🥈 Wicemistrz: {final.get_loser().name}")
-    print(f"🥉 Trzecie miejsce: {third_place.get_winner().name}")
 
-    save_results(teams, "data.json")
-    print(f"\n📈 Łączna liczba goli w turnieju: {get_total_goals(teams)}")
+def run_tournaments(args, teams, rng):
+    """!
+    @brief Rozgrywa turniej (lub wiele turniejów) dla utworzonych drużyn i zapisuje wyniki
 
-    report = generate_stats_report(teams)
-    print_stats_report(report)
+    @param args argparse.Namespace Wynik parse_args()
+    @param teams List[Team] Drużyny turnieju
+    @param rng random.Random Generator liczb losowych
+    """
+    verbose = not args.quiet
+    if args.state:
+        summary, runs = run_conditional(args, teams)
+        if verbose:
+            print_summary(summary, runs, args.format)
+        save_summary(summary, runs, args.seed, args.output, verbose)
+        return
+    if args.precision is not None:
+        summary, result = run_precise(args, teams)
+        if verbose:
+            print_summary(summary, result["runs"], args.format)
+            print(f"Dokładność: ±{result['max_error']:.2%} (95%), koniec: {STOP_REASONS[result['stopped']]}, "
+                  f"czas: {result['elapsed']:.1f} s")
+        save_summary(summary, result["runs"], args.seed, args.output, verbose)
+        return
+    if args.runs > 1:
+        summary = run_many_cached(args, teams, rng)
+        if verbose:
+            print_summary(summary, args.runs, args.format)
+        save_summary(summary, args.runs, args.seed, args.output, verbose)
+        return
+
+    champion, runner_up, third, fourth = play_tournament(teams, rng, verbose, args.format)
+
+    if verbose:
+        print("\n=== 🏆 Końcowa Klasyfikacja ===")
+        print(f"🥇 Mistrz: {champion.name}")
+        print(f"🥈 Wicemistrz: {runner_up.name}")
+        if FORMATS[args.format].third_place:
+            print(f"🥉 Trzecie miejsce: {third.name}")
+        else:
+            print(f"🥉 Półfinał: {third.name}, {fourth.name}")
+
+    save_results(teams, args.output, verbose)
+    if verbose:
+        print(f"\n📈 Łączna liczba goli w turnieju: {get_total_goals(teams)}")
+
+    report = generate_stats_report(teams, plots=not args.no_plots)
+    if verbose:
+        print_stats_report(report)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
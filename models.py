@@ -4,61 +4,157 @@
 Zawiera:
 - Klasa Team: Reprezentuje drużynę piłkarską z jej statystykami
 - Klasa Match: Reprezentuje mecz piłkarski i jego wynik
+
+Obie klasy używają __slots__ i mogą być widokami na wiersze state.TeamTable
+oraz state.MatchLog (patrz Team.attach() i parametr log w Match).
 """
 
 import random
-from transfermarkt_rankings import get_full_rankings, normalize_country_name, get_team_rank
+from ranking_cache import load_rankings
+from strength_tables import get_tables
+from transfermarkt_rankings import normalize_country_name, get_team_rank, RankingIndex
 
 class Team:
     """!
     @brief Klasa reprezentująca drużynę piłkarską
 
     Przechowuje informacje o drużynie i oblicza jej siłę na podstawie rankingu FIFA.
+    Po podpięciu do TeamTable punkty, gole i ranking są czytane z kolumn tabeli.
     """
 
-    def __init__(self, name):
+    __slots__ = ('original_name', 'name', '_table', '_row', '_points', '_goals', '_fifa_rank')
+
+    def __init__(self, name, table=None):
         """!
         @brief Inicjalizacja obiektu drużyny
 
         @param name str Nazwa drużyny w formacie do normalizacji
+        @param table TeamTable Opcjonalna tabela, w której drużyna ma przechowywać stan
         """
         self.original_name = name
         self.name = normalize_country_name(name)
-        self.points = 0  #!< Punkty zdobyte w turnieju
-        self.goals = 0   #!< Bramki zdobyte w turnieju
-        self.fifa_rank = self._get_fifa_rank()  #!< Pozycja w rankingu FIFA
+        self._table = None
+        self._row = -1
+        self._points = 0  #!< Punkty zdobyte w turnieju
+        self._goals = 0   #!< Bramki zdobyte w turnieju
+        self._fifa_rank = self._get_fifa_rank()  #!< Pozycja w rankingu FIFA
+        if table is not None:
+            self.attach(table)
+
+    @classmethod
+    def from_row(cls, table, row):
+        """!
+        @brief Tworzy widok na istniejący wiersz tabeli bez wyszukiwania w rankingu
+
+        @param table TeamTable Tabela drużyn
+        @param row int Numer wiersza
+        @return Team Obiekt drużyny powiązany z wierszem
+        """
+        team = cls.__new__(cls)
+        team.original_name = team.name = table.names[row]
+        team._table = table
+        team._row = row
+        team._points = team._goals = team._fifa_rank = 0
+        return team
+
+    def attach(self, table):
+        """!
+        @brief Przenosi stan drużyny do nowego wiersza tabeli
+
+        @param table TeamTable Tabela drużyn
+        @return int Numer wiersza drużyny
+        """
+        self._row = table.add(self.name, self.fifa_rank, self.points, self.goals)
+        self._table = table
+        return self._row
+
+    @property
+    def points(self):
+        """!
+        @brief Punkty zdobyte w turnieju
+        """
+        table = self._table
+        return self._points if table is None else table.points[self._row]
+
+    @points.setter
+    def points(self, value):
+        table = self._table
+        if table is None:
+            self._points = value
+        else:
+            table.points[self._row] = value
+
+    @property
+    def goals(self):
+        """!
+        @brief Bramki zdobyte w turnieju
+        """
+        table = self._table
+        return self._goals if table is None else table.goals[self._row]
+
+    @goals.setter
+    def goals(self, value):
+        table = self._table
+        if table is None:
+            self._goals = value
+        else:
+            table.goals[self._row] = value
+
+    @property
+    def fifa_rank(self):
+        """!
+        @brief Pozycja w rankingu FIFA
+        """
+        table = self._table
+        return self._fifa_rank if table is None else table.fifa_rank[self._row]
+
+    @fifa_rank.setter
+    def fifa_rank(self, value):
+        table = self._table
+        if table is None:
+            self._fifa_rank = value
+        else:
+            table.fifa_rank[self._row] = value
 
     def _get_fifa_rank(self):
         """!
         @brief Pobiera ranking FIFA dla drużyny
 
         @details Wykorzystuje zewnętrzną funkcję get_team_rank() do pobrania rankingu.
+        Ranking wczytywany jest raz na proces z pamięci podręcznej (load_rankings())
+        i od razu indeksowany (RankingIndex), więc wyszukiwanie ma stały koszt.
         Dla nieznalezionych drużyn zwraca wartość 211 (najniższy możliwy ranking).
 
         @return int Pozycja w rankingu FIFA
         """
-        if not hasattr(Team, '_rankings'):
-            Team._rankings = get_full_rankings()
+        Team.rankings()
+        return get_team_rank(self.original_name, Team._ranking_index)
 
-        return get_team_rank(self.original_name, Team._rankings)
+    @staticmethod
+    def rankings():
+        """!
+        @brief Ranking FIFA wczytany raz na proces (load_rankings())
+
+        @return List[Dict] Ranking w formacie get_full_rankings()
+        """
+        if not hasattr(Team, '_rankings'):
+            Team._rankings = load_rankings()
+            Team._ranking_index = RankingIndex(Team._rankings)
+        return Team._rankings
 
     def get_strength(self):
         """!
         @brief Oblicza siłę drużyny w przedziale 0-1
 
-        @details Wzór obliczeniowy:
+        @details Siła pochodzi z modelu wybranego przez strength_tables.use_model().
+        Wzór obliczeniowy domyślnego modelu 'rank':
         - Top 10: 0.9 - (rank * 0.02)
         - Top 50: 0.7 - ((rank-10) * 0.01)
-        - Pozostałe: 0.3 - ((rank-50) * 0.0025)
+        - Pozostałe: max(MIN_STRENGTH, 0.3 - ((rank-50) * 0.0025))
 
         @return float Wartość siły drużyny (0-1)
         """
-        if self.fifa_rank <= 10:
-            return 0.9 - (self.fifa_rank * 0.02)
-        elif self.fifa_rank <= 50:
-            return 0.7 - ((self.fifa_rank - 10) * 0.01)
-        else:
-            return 0.3 - ((self.fifa_rank - 50) * 0.0025)
+        return get_tables().team_strength(self.fifa_rank)
 
     def __str__(self):
         """!
@@ -73,45 +169,96 @@ class Match:
     """!
     @brief Klasa reprezentująca mecz piłkarski
 
-    Zawiera logikę symulacji meczu i rzutów karnych.
+    Zawiera logikę symulacji meczu i rzutów karnych. Z parametrem log wynik
+    zapisywany jest w wierszu prealokowanego bufora MatchLog, a parametr rng
+    pozwala losować z własnego generatora zamiast z globalnego modułu random.
     """
 
-    def __init__(self, team1, team2, phase="Faza grupowa"):
+    __slots__ = ('team1', 'team2', 'phase', '_log', '_slot', '_score', '_penalty_result', '_rng', '_verbose')
+
+    def __init__(self, team1, team2, phase="Faza grupowa", log=None, rng=random, verbose=True):
         """!
         @brief Inicjalizacja obiektu meczu
 
         @param team1 Team Pierwsza drużyna
         @param team2 Team Druga drużyna
         @param phase str Faza turnieju (domyślnie "Faza grupowa")
+        @param log MatchLog Opcjonalny bufor, w którym zapisany zostanie wynik
+        @param rng random.Random Generator liczb losowych (domyślnie globalny moduł random)
+        @param verbose bool Czy wypisywać komunikat o rzutach karnych
         """
         self.team1 = team1
         self.team2 = team2
-        self.score = (0, 0)
         self.phase = phase
-        self.penalty_result = None
+        self._log = log
+        self._slot = -1 if log is None else log.append(team1._row, team2._row, phase)
+        self._score = (0, 0)
+        self._penalty_result = None
+        self._rng = rng
+        self._verbose = verbose
+
+    @property
+    def score(self):
+        """!
+        @brief Wynik meczu (gole drużyny 1, gole drużyny 2)
+        """
+        log = self._log
+        if log is None:
+            return self._score
+        return (log.g1[self._slot], log.g2[self._slot])
+
+    @score.setter
+    def score(self, value):
+        log = self._log
+        if log is None:
+            self._score = value
+        else:
+            log.g1[self._slot], log.g2[self._slot] = value
+
+    @property
+    def penalty_result(self):
+        """!
+        @brief Wynik rzutów karnych lub None, jeśli nie były rozgrywane
+        """
+        log = self._log
+        if log is None:
+            return self._penalty_result
+        if log.p1[self._slot] < 0:
+            return None
+        return (log.p1[self._slot], log.p2[self._slot])
+
+    @penalty_result.setter
+    def penalty_result(self, value):
+        log = self._log
+        if log is None:
+            self._penalty_result = value
+        elif value is None:
+            log.p1[self._slot] = log.p2[self._slot] = -1
+        else:
+            log.p1[self._slot], log.p2[self._slot] = value
 
     def play(self):
         """!
         @brief Symuluje mecz piłkarski
 
         @details Algorytm symulacji:
-        1. Oblicza siłę obu drużyn
-        2. Generuje liczbę goli z rozkładu normalnego
+        1. Odczytuje oczekiwane liczby goli obu drużyn z tablic (get_tables())
+        2. Generuje liczbę goli z rozkładu normalnego (w modelu 'dixon_coles'
+           losuje wynik z macierzy wyników)
         3. Ogranicza wynik do max 7 goli
         4. W fazie grupowej przyznaje punkty
         5. W fazie pucharowej w przypadku remisu przeprowadza rzuty karne
         """
-        strength1 = self.team1.get_strength()
-        strength2 = self.team2.get_strength()
-
-        avg_goals = 2.5
-        lambda1 = avg_goals * (strength1 / (strength1 + strength2))
-        lambda2 = avg_goals * (strength2 / (strength1 + strength2))
-
-        g1 = max(0, int(random.gauss(lambda1, 1)))
-        g2 = max(0, int(random.gauss(lambda2, 1)))
-        g1 = min(g1, 7)
-        g2 = min(g2, 7)
+        tables = get_tables()
+        if tables.rho is None:
+            lambda1, lambda2 = tables.match_lambdas(self.team1.fifa_rank, self.team2.fifa_rank)
+            gauss = self._rng.gauss
+            g1 = max(0, int(gauss(lambda1, 1)))
+            g2 = max(0, int(gauss(lambda2, 1)))
+            g1 = min(g1, 7)
+            g2 = min(g2, 7)
+        else:
+            g1, g2 = tables.sample_score(self.team1.fifa_rank, self.team2.fifa_rank, self._rng.random())
 
         self.score = (g1, g2)
         self.team1.goals += g1
@@ -134,23 +281,23 @@ class Match:
         @brief Symuluje rzuty karne
 
         @details Każda drużyna wykonuje 5 strzałów:
-        - Prawdopodobieństwo trafienia zależy od siły drużyny
+        - Prawdopodobieństwo trafienia zależy od siły drużyny (odczyt z get_tables())
         - W przypadku remisu następuje seria "nagłej śmierci"
         """
-        print(f"   🔄 Remis! Rzuty karne między {self.team1.name} i {self.team2.name}")
-
-        strength1 = self.team1.get_strength()
-        strength2 = self.team2.get_strength()
+        if self._verbose:
+            print(f"   🔄 Remis! Rzuty karne między {self.team1.name} i {self.team2.name}")
 
-        prob1 = 0.7 + (strength1 * 0.2)
-        prob2 = 0.7 + (strength2 * 0.2)
+        tables = get_tables()
+        prob1 = tables.penalty_probability(self.team1.fifa_rank)
+        prob2 = tables.penalty_probability(self.team2.fifa_rank)
 
-        p1 = sum(1 for _ in range(5) if random.random() < prob1)
-        p2 = sum(1 for _ in range(5) if random.random() < prob2)
+        rand = self._rng.random
+        p1 = sum(1 for _ in range(5) if rand() < prob1)
+        p2 = sum(1 for _ in range(5) if rand() < prob2)
 
         while p1 == p2:
-            p1 += 1 if random.random() < prob1 else 0
-            p2 += 1 if random.random() < prob2 else 0
+            p1 += 1 if rand() < prob1 else 0
+            p2 += 1 if rand() < prob2 else 0
 
         self.penalty_result = (p1, p2)
 
@@ -0,0 +1,367 @@
+"""!
+@brief Równoległe symulacje turnieju w wielu procesach
+
+Symulacje dzielone są na porcje o stałym rozmiarze. Każda porcja dostaje
+własny strumień liczb losowych z numpy.random.SeedSequence(seed).spawn(),
+więc wynik dla danego ziarna nie zależy od liczby procesów - zmienia się
+tylko to, który proces policzy daną porcję. Procesy odsyłają same sumy
+(liczniki miejsc, punkty, gole), a nie wyniki poszczególnych meczów.
+
+Dostępne silniki porcji:
+- 'batch': wektorowy simulation.simulate_batch()
+- 'object': obiekty models.Team i models.Match z generatorem random.Random
+  przekazanym do meczu zamiast globalnego modułu random
+
+compare_parallel() porównuje dwa scenariusze (np. drużyna przed i po zmianie
+pozycji w rankingu) na wspólnych liczbach losowych - oba scenariusze każdej
+porcji rozgrywane są z tego samego strumienia, więc różnica szans ma mały
+błąd.
+
+@requires numpy
+@requires concurrent.futures
+"""
+
+import contextlib
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from formats import DEFAULT_FORMAT, compile_format, play_format
+from models import Team
+from simulation import count_places, place_labels, simulate_batch, podium_to_places
+from state import TeamTable
+from strength_tables import DEFAULT_MODEL, STRENGTH_MODELS, use_model
+from variance import VARIANCE_REDUCTIONS
+
+DEFAULT_CHUNK_SIZE = 20_000  #!< Liczba turniejów w jednej porcji (część kontraktu powtarzalności)
+ENGINES = ('batch', 'object')  #!< Dostępne silniki porcji
+
+
+def empty_totals(n_teams, fmt=DEFAULT_FORMAT):
+    """!
+    @brief Zerowe sumy wyników dla turnieju n drużyn
+
+    @param n_teams int Liczba drużyn
+    @param fmt str | TournamentFormat | Schedule Format turnieju (liczba kolumn miejsc)
+    @return dict Słownik {'runs', 'places' (n, len(place_labels(fmt))), 'advanced' (n,), 'points' (n,),
+    'goals' (n,)}, gdzie 'advanced' to liczba turniejów, w których drużyna wyszła z grupy
+    """
+    return {
+        'runs': 0,
+        'places': np.zeros((n_teams, len(place_labels(fmt))), dtype=np.int64),
+        'advanced': np.zeros(n_teams, dtype=np.int64),
+        'points': np.zeros(n_teams, dtype=np.int64),
+        'goals': np.zeros(n_teams, dtype=np.int64),
+    }
+
+
+def merge_totals(total, part):
+    """!
+    @brief Dodaje sumy jednej porcji do sum łącznych
+
+    @param total dict Sumy łączne (modyfikowane)
+    @param part dict Sumy porcji
+    @return dict Sumy łączne
+    """
+    total['runs'] += part['runs']
+    for key in ('places', 'advanced', 'points', 'goals'):
+        total[key] += part[key]
+    return total
+
+
+def play_tournament(teams, rng, log=None, fmt=DEFAULT_FORMAT):
+    """!
+    @brief Rozgrywa jeden turniej bez wypisywania meczów
+
+    @param teams List[Team] Lista drużyn (punkty i gole powinny być wyzerowane)
+    @param rng random.Random Generator liczb losowych
+    @param log MatchLog Opcjonalny bufor na wyniki wszystkich meczów turnieju
+    @param fmt str | TournamentFormat | Schedule Format turnieju (domyślnie jak main.main())
+    @return List[Team] Mistrz, wicemistrz, 3. i 4. miejsce
+    """
+    return play_format(fmt, teams, rng, log)
+
+
+def python_rng(seed_seq):
+    """!
+    @brief Generator random.Random zasilany strumieniem porcji
+
+    @param seed_seq np.random.SeedSequence Strumień losowy porcji
+    @return random.Random Generator dla ścieżki obiektowej
+    """
+    return random.Random(int.from_bytes(seed_seq.generate_state(4).tobytes(), "little"))
+
+
+def table_teams(ranks, names=None):
+    """!
+    @brief Tworzy tabelę drużyn i widoki Team na jej wiersze
+
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param names List[str] Nazwy drużyn (domyślnie "Drużyna 1", "Drużyna 2", ...)
+    @return tuple (TeamTable, List[Team])
+    """
+    table = TeamTable(len(ranks))
+    for row, rank in enumerate(ranks):
+        table.add(names[row] if names else f"Drużyna {row + 1}", rank)
+    return table, [Team.from_row(table, row) for row in range(len(ranks))]
+
+
+def _object_chunk(ranks, runs, seed_seq, fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL):
+    """!
+    @brief Porcja symulacji na obiektach Team i Match
+    """
+    rng = python_rng(seed_seq)
+    table, teams = table_teams(ranks)
+    schedule = compile_format(fmt)
+
+    totals = empty_totals(len(ranks), schedule)
+    podium = np.empty((runs, 4), dtype=np.intp)
+    qualifiers = []
+    previous = use_model(model)
+    try:
+        for run in range(runs):
+            table.reset()
+            podium[run] = [team._row for team in play_format(schedule, teams, rng, qualifiers=qualifiers)]
+            for team in qualifiers:
+                totals['advanced'][team._row] += 1
+            qualifiers.clear()
+            arrays = table.arrays()
+            totals['points'] += arrays['points']
+            totals['goals'] += arrays['goals']
+    finally:
+        use_model(previous)
+    totals['runs'] = runs
+    totals['places'] = count_places(podium, len(ranks), schedule)
+    return totals
+
+
+def _batch_chunk(ranks, runs, seed_seq, fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL, variance='plain'):
+    """!
+    @brief Porcja symulacji silnikiem wektorowym
+    """
+    result = simulate_batch(ranks, runs, np.random.default_rng(seed_seq), fmt=fmt, model=model, variance=variance)
+    totals = empty_totals(len(ranks), fmt)
+    totals['runs'] = runs
+    totals['places'] = count_places(result['podium'], len(ranks), fmt)
+    totals['advanced'] = np.bincount(result['qualifiers'].ravel(), minlength=len(ranks)).astype(np.int64)
+    totals['points'] = result['points'].sum(axis=0, dtype=np.int64)
+    totals['goals'] = result['goals'].sum(axis=0, dtype=np.int64)
+    return totals
+
+
+def run_chunk(ranks, runs, seed_seq, engine='batch', fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL, variance='plain'):
+    """!
+    @brief Rozgrywa jedną porcję turniejów (funkcja wykonywana w procesach roboczych)
+
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param runs int Liczba turniejów w porcji
+    @param seed_seq np.random.SeedSequence Strumień losowy porcji
+    @param engine str Silnik porcji z ENGINES
+    @param fmt str | TournamentFormat Format turnieju
+    @param model str | StrengthTables Model siły
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS (tylko silnik 'batch')
+    @return dict Sumy wyników porcji (empty_totals())
+    """
+    if engine == 'object':
+        return _object_chunk(ranks, runs, seed_seq, fmt, model)
+    return _batch_chunk(ranks, runs, seed_seq, fmt, model, variance)
+
+
+def plan_chunks(runs, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """!
+    @brief Dzieli turnieje na porcje i przydziela im strumienie losowe
+
+    @param runs int Łączna liczba turniejów
+    @param seed int Ziarno główne (None - losowe)
+    @param chunk_size int Liczba turniejów w porcji
+    @return tuple (SeedSequence ziarna głównego, rozmiary porcji, strumienie porcji)
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, runs - start) for start in range(0, runs, chunk_size)]
+    return seed_seq, sizes, seed_seq.spawn(len(sizes))
+
+
+def map_chunks(func, args, workers=None):
+    """!
+    @brief Wykonuje funkcję porcji w puli procesów (lub w bieżącym procesie)
+
+    @param func Callable Funkcja porcji (musi dać się przekazać do innego procesu)
+    @param args tuple Listy argumentów, jak dla map(func, *args)
+    @param workers int Liczba procesów (None - liczba rdzeni, 1 - bez puli procesów)
+    @return Iterator Wyniki porcji w kolejności porcji
+    """
+    workers = min(workers or os.cpu_count() or 1, len(args[0]))
+    with contextlib.ExitStack() as stack:
+        mapper = map
+        if workers > 1:
+            mapper = stack.enter_context(ProcessPoolExecutor(max_workers=workers)).map
+        yield from mapper(func, *args)
+
+
+def _check_engine(engine, model, variance='plain'):
+    """!
+    @brief Sprawdza silnik, model siły i tryb losowania
+
+    @throws ValueError Dla nieznanej wartości albo redukcji wariancji w silniku 'object'
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Nieznany silnik: {engine}. Dostępne: {', '.join(ENGINES)}.")
+    if isinstance(model, str) and model not in STRENGTH_MODELS:
+        raise ValueError(f"Nieznany model siły: {model}. Dostępne: {', '.join(STRENGTH_MODELS)}.")
+    if variance not in VARIANCE_REDUCTIONS:
+        raise ValueError(f"Nieznany tryb redukcji wariancji: {variance}. "
+                         f"Dostępne: {', '.join(VARIANCE_REDUCTIONS)}.")
+    if variance != 'plain' and engine != 'batch':
+        raise ValueError("Redukcja wariancji działa tylko w silniku 'batch'.")
+
+
+def run_parallel(ranks, runs, seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, engine='batch',
+                 fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL, variance='plain'):
+    """!
+    @brief Rozgrywa turnieje równolegle i sumuje wyniki procesów
+
+    @details Porcje i ich ziarna zależą tylko od seed, runs i chunk_size, więc
+    wynik jest identyczny dla dowolnej liczby procesów.
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA
+    @param runs int Łączna liczba turniejów
+    @param seed int Ziarno główne (None - losowe, zapisane w wyniku jako 'seed')
+    @param workers int Liczba procesów (None - liczba rdzeni, 1 - bez puli procesów)
+    @param chunk_size int Liczba turniejów w porcji
+    @param engine str Silnik porcji z ENGINES
+    @param fmt str | TournamentFormat Format turnieju (formats.FORMATS)
+    @param model str | StrengthTables Model siły (strength_tables.STRENGTH_MODELS)
+    albo tablice z compile_model() - przekazywane do procesów roboczych
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS (tylko silnik 'batch')
+
+    @return dict Sumy wyników (empty_totals()) uzupełnione o:
+    - 'seed': ziarno główne
+    - 'probabilities': macierz (n, len(place_labels(fmt))) prawdopodobieństw miejsc
+    - 'advancement': szanse wyjścia z grupy (n,)
+
+    @throws ValueError Dla nieznanego silnika, modelu, trybu losowania lub liczby drużyn niezgodnej z formatem
+    """
+    _check_engine(engine, model, variance)
+    ranks = tuple(int(r) for r in ranks)
+    fmt = compile_format(fmt).fmt
+    if len(ranks) != fmt.teams:
+        raise ValueError(f"Turniej wymaga dokładnie {fmt.teams} drużyn.")
+
+    seed_seq, sizes, children = plan_chunks(runs, seed, chunk_size)
+    count = len(sizes)
+    args = ([ranks] * count, sizes, children, [engine] * count, [fmt] * count, [model] * count,
+            [variance] * count)
+
+    total = empty_totals(len(ranks), fmt)
+    for part in map_chunks(run_chunk, args, workers):
+        merge_totals(total, part)
+
+    total['seed'] = seed_seq.entropy
+    total['probabilities'] = total['places'] / max(total['runs'], 1)
+    total['advancement'] = total['advanced'] / max(total['runs'], 1)
+    return total
+
+
+def simulate_parallel(teams, runs, seed=None, workers=None, engine='batch', fmt=DEFAULT_FORMAT,
+                      model=DEFAULT_MODEL):
+    """!
+    @brief Szacuje szanse drużyn na miejsca, rozgrywając turnieje w wielu procesach
+
+    @param teams List[Team] Lista drużyn (8 dla formatu domyślnego)
+    @param runs int Liczba symulowanych turniejów
+    @param seed int Ziarno główne (None - losowe)
+    @param workers int Liczba procesów (None - liczba rdzeni)
+    @param engine str Silnik porcji z ENGINES
+    @param fmt str | TournamentFormat Format turnieju (formats.FORMATS)
+    @param model str | StrengthTables Model siły
+    @return dict Słownik {nazwa_drużyny: {miejsce: prawdopodobieństwo}}
+    """
+    result = run_parallel([t.fifa_rank for t in teams], runs, seed, workers, engine=engine, fmt=fmt, model=model)
+    labels = place_labels(fmt)
+    return {
+        team.name: dict(zip(labels, row.tolist()))
+        for team, row in zip(teams, result['probabilities'])
+    }
+
+
+def compare_chunk(ranks_a, ranks_b, runs, seed_seq, fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL, variance='common'):
+    """!
+    @brief Porcja porównania scenariuszy na wspólnych liczbach losowych
+
+    @return dict {'runs', 'places_a', 'places_b', 'discordant'} - liczniki miejsc obu scenariuszy
+    i liczby przebiegów, w których zdarzenie "drużyna na danym miejscu" zaszło tylko w jednym z nich
+    """
+    places = [
+        podium_to_places(simulate_batch(ranks, runs, np.random.default_rng(seed_seq), detail=False, fmt=fmt,
+                                        model=model, variance=variance)['podium'], len(ranks), fmt)
+        for ranks in (ranks_a, ranks_b)
+    ]
+    shape = (len(ranks_a), len(place_labels(fmt)))
+    part = {'runs': runs, 'places_a': np.zeros(shape, np.int64), 'places_b': np.zeros(shape, np.int64),
+            'discordant': np.zeros(shape, np.int64)}
+    for place in range(shape[1]):
+        hit_a, hit_b = places[0] == place, places[1] == place
+        part['places_a'][:, place] = hit_a.sum(axis=0)
+        part['places_b'][:, place] = hit_b.sum(axis=0)
+        part['discordant'][:, place] = (hit_a != hit_b).sum(axis=0)
+    return part
+
+
+def compare_parallel(ranks_a, ranks_b, runs, seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     fmt=DEFAULT_FORMAT, model=DEFAULT_MODEL, variance='common'):
+    """!
+    @brief Różnica szans drużyn między dwoma scenariuszami na wspólnych liczbach losowych
+
+    @details Każda porcja rozgrywa oba scenariusze z tego samego strumienia
+    losowego, a silnik z trybem innym niż 'plain' pobiera liczby losowe
+    w kształcie niezależnym od wyników - ten sam mecz w obu scenariuszach
+    dostaje te same liczby. Błąd różnicy liczony jest z par przebiegów:
+    sqrt((P(zdarzenie tylko w jednym scenariuszu) - różnica^2) / runs).
+
+    @param ranks_a array-like Pozycje drużyn w rankingu FIFA w pierwszym scenariuszu
+    @param ranks_b array-like Pozycje tych samych drużyn w drugim scenariuszu
+    @param runs int Liczba turniejów każdego scenariusza
+    @param seed int Ziarno główne (None - losowe, zapisane w wyniku jako 'seed')
+    @param workers int Liczba procesów (None - liczba rdzeni, 1 - bez puli procesów)
+    @param chunk_size int Liczba turniejów w porcji
+    @param fmt str | TournamentFormat Format turnieju
+    @param model str | StrengthTables Model siły
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS inny niż 'plain'
+
+    @return dict Słownik:
+    - 'runs', 'seed'
+    - 'probabilities_a', 'probabilities_b': macierze (n, len(place_labels(fmt))) szans w obu scenariuszach
+    - 'difference': różnica szans (b - a)
+    - 'stderr': błąd standardowy różnicy
+
+    @throws ValueError Dla trybu 'plain', nieznanego modelu lub trybu albo różnej liczby drużyn
+    """
+    _check_engine('batch', model, variance)
+    if variance == 'plain':
+        raise ValueError("Porównanie scenariuszy wymaga wspólnych liczb losowych (tryb inny niż 'plain').")
+    ranks_a = tuple(int(r) for r in ranks_a)
+    ranks_b = tuple(int(r) for r in ranks_b)
+    fmt = compile_format(fmt).fmt
+    if not len(ranks_a) == len(ranks_b) == fmt.teams:
+        raise ValueError(f"Oba scenariusze wymagają dokładnie {fmt.teams} drużyn.")
+
+    seed_seq, sizes, children = plan_chunks(runs, seed, chunk_size)
+    count = len(sizes)
+    args = ([ranks_a] * count, [ranks_b] * count, sizes, children, [fmt] * count, [model] * count,
+            [variance] * count)
+    total = None
+    for part in map_chunks(compare_chunk, args, workers):
+        total = part if total is None else {key: total[key] + part[key] for key in part}
+
+    runs = total['runs']
+    difference = (total['places_b'] - total['places_a']) / runs
+    return {
+        'runs': runs,
+        'seed': seed_seq.entropy,
+        'probabilities_a': total['places_a'] / runs,
+        'probabilities_b': total['places_b'] / runs,
+        'difference': difference,
+        'stderr': np.sqrt(np.maximum(total['discordant'] / runs - difference ** 2, 0) / runs),
+    }
@@ -0,0 +1,271 @@
+"""!
+@brief Lokalna pamięć podręczna rankingu FIFA
+
+Moduł zawiera funkcje do:
+- Odczytu rankingu z pliku JSON z kontrolą wersji i terminu ważności (TTL)
+- Atomowego zapisu rankingu pobranego z Transfermarkt
+- Jawnego odświeżania rankingu z linii poleceń
+
+Plik przechowuje też stan stron rankingu (walidatory HTTP i skróty tabel),
+dzięki któremu odświeżenie pobiera i parsuje tylko zmienione strony.
+
+Pobieranie z sieci jest wyłączone, dopóki nie zostanie włączone parametrem
+allow_network albo zmienną środowiskową SYMULATOR_ALLOW_NETWORK=1.
+
+Użycie z linii poleceń:
+@code
+python ranking_cache.py refresh
+python ranking_cache.py refresh --full
+python ranking_cache.py status
+@endcode
+
+@requires json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+CACHE_VERSION = 1  #!< Wersja formatu pliku - zmiana unieważnia stare pliki
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rankings_cache.json")
+DEFAULT_TTL = 7 * 24 * 3600  #!< Domyślny czas ważności rankingu w sekundach (7 dni)
+
+
+def cache_path(path: Optional[str] = None) -> str:
+    """!
+    @brief Zwraca ścieżkę pliku z rankingiem
+
+    @param path str Ścieżka podana jawnie (ma pierwszeństwo)
+    @return str Ścieżka z parametru, zmiennej SYMULATOR_RANKINGS_CACHE lub domyślna
+    """
+    return path or os.environ.get("SYMULATOR_RANKINGS_CACHE") or DEFAULT_CACHE_PATH
+
+
+def cache_ttl(ttl: Optional[float] = None) -> float:
+    """!
+    @brief Zwraca czas ważności rankingu w sekundach
+
+    @param ttl float Wartość podana jawnie (ma pierwszeństwo)
+    @return float TTL z parametru, zmiennej SYMULATOR_RANKINGS_TTL lub DEFAULT_TTL
+    """
+    if ttl is not None:
+        return ttl
+    return float(os.environ.get("SYMULATOR_RANKINGS_TTL", DEFAULT_TTL))
+
+
+def network_allowed(allow_network: Optional[bool] = None) -> bool:
+    """!
+    @brief Sprawdza, czy wolno pobierać ranking z sieci
+
+    @param allow_network bool Wartość podana jawnie (ma pierwszeństwo)
+    @return bool True tylko po jawnym włączeniu pobierania
+    """
+    if allow_network is not None:
+        return allow_network
+    return os.environ.get("SYMULATOR_ALLOW_NETWORK") == "1"
+
+
+def read_cache(path: Optional[str] = None) -> Optional[Dict]:
+    """!
+    @brief Wczytuje plik z rankingiem
+
+    @param path str Ścieżka pliku (domyślnie cache_path())
+    @return dict Zawartość pliku lub None, jeśli plik nie istnieje, jest
+    uszkodzony albo ma inną wersję formatu
+    """
+    try:
+        with open(cache_path(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return None
+    return data
+
+
+def write_cache(rankings: List[Dict], path: Optional[str] = None, source: str = "",
+                pages: Optional[Dict] = None) -> Dict:
+    """!
+    @brief Atomowo zapisuje ranking do pliku
+
+    @details Dane trafiają najpierw do pliku tymczasowego w tym samym katalogu,
+    który następnie zastępuje plik docelowy (os.replace), więc równolegle
+    uruchomione procesy nigdy nie zobaczą częściowo zapisanego pliku.
+
+    @param rankings List[Dict] Ranking w formacie get_full_rankings()
+    @param path str Ścieżka pliku (domyślnie cache_path())
+    @param source str Opis źródła danych (np. adres strony)
+    @param pages dict Stan stron z get_rankings_incremental() (opcjonalnie)
+    @return dict Zapisana zawartość pliku
+
+    @throws OSError W przypadku problemów z zapisem
+    """
+    path = cache_path(path)
+    data = {
+        "version": CACHE_VERSION,
+        "fetched_at": time.time(),
+        "source": source,
+        "rankings": rankings,
+    }
+    if pages is not None:
+        data["pages"] = pages
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".rankings-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return data
+
+
+def is_fresh(data: Dict, ttl: Optional[float] = None) -> bool:
+    """!
+    @brief Sprawdza, czy zapisany ranking nie jest przeterminowany
+
+    @param data dict Zawartość pliku z read_cache()
+    @param ttl float Czas ważności w sekundach (domyślnie cache_ttl())
+    @return bool True, jeśli od pobrania minęło mniej niż TTL
+    """
+    return time.time() - data.get("fetched_at", 0) < cache_ttl(ttl)
+
+
+def snapshot_hash(rankings: List[Dict]) -> str:
+    """!
+    @brief Skrót stanu rankingu - zmienia się przy każdej zmianie pozycji, nazw lub punktów
+
+    @param rankings List[Dict] Ranking w formacie get_full_rankings()
+    @return str Skrót SHA-256 (szesnastkowo) kanonicznej postaci JSON rankingu
+    """
+    canonical = json.dumps(rankings, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def refresh_rankings(path: Optional[str] = None, fetch: Optional[Callable[[], List[Dict]]] = None,
+                     timings: Optional[Dict] = None, max_workers: int = 8, full: bool = False,
+                     url: Optional[str] = None, stats: Optional[Dict] = None) -> List[Dict]:
+    """!
+    @brief Pobiera ranking i zapisuje go w pamięci podręcznej
+
+    @details Bez funkcji fetch ranking odświeżany jest przyrostowo
+    (get_rankings_incremental()) na podstawie stanu stron zapisanego w pliku -
+    niezmienione strony nie są ponownie parsowane.
+
+    @param path str Ścieżka pliku (domyślnie cache_path())
+    @param fetch Callable Funkcja pobierająca ranking (domyślnie pobieranie z Transfermarkt)
+    @param timings dict Słownik na czasy pobierania (tylko bez fetch)
+    @param max_workers int Liczba równolegle pobieranych stron (tylko bez fetch)
+    @param full bool Pobranie i parsowanie wszystkich stron bez względu na zapisany stan
+    @param url str Adres pierwszej strony rankingu (domyślnie RANKINGS_URL)
+    @param stats dict Słownik uzupełniany statystykami stron z get_rankings_incremental()
+    @return List[Dict] Pobrany ranking (pusty, jeśli pobieranie się nie powiodło)
+
+    @post Plik jest nadpisywany tylko wtedy, gdy pobrano niepusty ranking
+    """
+    pages = None
+    if fetch is None:
+        from transfermarkt_rankings import get_rankings_incremental, RANKINGS_URL
+        source = url or RANKINGS_URL
+        data = None if full else read_cache(path)
+        if data is not None and data.get("source") == source:
+            previous, state = data["rankings"], data.get("pages")
+        else:
+            previous, state = None, None
+        rankings, pages, page_stats = get_rankings_incremental(previous, state, source, max_workers=max_workers,
+                                                               timings=timings)
+        if stats is not None:
+            stats.update(page_stats)
+    else:
+        rankings = fetch()
+        source = getattr(fetch, "__name__", "")
+
+    if rankings:
+        write_cache(rankings, path, source, pages)
+    return rankings
+
+
+def load_rankings(path: Optional[str] = None, ttl: Optional[float] = None,
+                  allow_network: Optional[bool] = None,
+                  fetch: Optional[Callable[[], List[Dict]]] = None) -> List[Dict]:
+    """!
+    @brief Zwraca ranking FIFA, korzystając w pierwszej kolejności z pliku
+
+    @details Kolejność działań:
+    1. Aktualny plik z rankingiem - zwracany bez dostępu do sieci
+    2. Brak pliku lub przeterminowany plik i włączona sieć - odświeżenie
+    3. Przeterminowany plik bez dostępu do sieci - zwracany z ostrzeżeniem
+    4. Brak danych - pusta lista (wszystkie drużyny dostaną ranking 211)
+
+    @param path str Ścieżka pliku (domyślnie cache_path())
+    @param ttl float Czas ważności w sekundach (domyślnie cache_ttl())
+    @param allow_network bool Czy wolno pobrać ranking (domyślnie network_allowed())
+    @param fetch Callable Funkcja pobierająca ranking (domyślnie get_full_rankings)
+    @return List[Dict] Ranking w formacie get_full_rankings()
+    """
+    data = read_cache(path)
+    if data is not None and is_fresh(data, ttl):
+        return data["rankings"]
+
+    if network_allowed(allow_network):
+        rankings = refresh_rankings(path, fetch)
+        if rankings:
+            return rankings
+
+    if data is not None:
+        print("Uwaga: zapisany ranking FIFA jest nieaktualny - odśwież go poleceniem: python ranking_cache.py refresh")
+        return data["rankings"]
+
+    print("Uwaga: brak zapisanego rankingu FIFA - pobierz go poleceniem: python ranking_cache.py refresh")
+    return []
+
+
+def main(argv=None):
+    """!
+    @brief Obsługa linii poleceń: odświeżenie lub stan pamięci podręcznej
+
+    @param argv List[str] Argumenty (domyślnie sys.argv[1:])
+    @return int Kod wyjścia procesu
+    """
+    parser = argparse.ArgumentParser(description="Pamięć podręczna rankingu FIFA")
+    parser.add_argument("command", choices=["refresh", "status"], help="refresh - pobierz ranking, status - pokaż stan pliku")
+    parser.add_argument("--path", help="ścieżka pliku z rankingiem")
+    parser.add_argument("--workers", type=int, default=8, help="liczba równolegle pobieranych stron")
+    parser.add_argument("--full", action="store_true", help="pobierz i przeparsuj wszystkie strony (bez odświeżania przyrostowego)")
+    args = parser.parse_args(argv)
+
+    if args.command == "refresh":
+        from transfermarkt_rankings import format_timings
+        timings, stats = {}, {}
+        rankings = refresh_rankings(args.path, timings=timings, max_workers=args.workers, full=args.full, stats=stats)
+        print(format_timings(timings))
+        if not rankings:
+            print("Nie udało się pobrać rankingu - plik nie został zmieniony.")
+            return 1
+        print(f"Strony: przeparsowane {len(stats['parsed'])}, bez zmian {len(stats['not_modified']) + len(stats['reused'])}"
+              f" - ranking {'zmieniony' if stats['changed'] else 'bez zmian'}")
+        print(f"Zapisano {len(rankings)} drużyn do: {cache_path(args.path)}")
+        return 0
+
+    data = read_cache(args.path)
+    if data is None:
+        print(f"Brak poprawnego pliku z rankingiem: {cache_path(args.path)}")
+        return 1
+    age_hours = (time.time() - data["fetched_at"]) / 3600
+    state = "aktualny" if is_fresh(data) else "nieaktualny"
+    print(f"{cache_path(args.path)}: {len(data['rankings'])} drużyn, wiek {age_hours:.1f} h ({state})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,311 @@
+"""!
+@brief Pamięć podręczna wyników scenariuszy adresowana treścią
+
+Wynik scenariusza (np. szanse drużyn z wielu turniejów) zapisywany jest pod
+kluczem scenario_key() - skrótem kanonicznej postaci wszystkich danych
+wejściowych: listy drużyn, formatu, skrótu rankingu (snapshot_hash), modelu
+siły, silnika, liczby turniejów i ziarna. Te same dane wejściowe dają ten sam
+klucz, więc powtórzone zapytanie zwraca zapisany wynik bez symulacji.
+
+Poziomy pamięci:
+- pamięć procesu: LRU ostatnich memory_items wyników
+- dysk (opcjonalnie): podkatalog CACHE_NAMESPACE wskazanego katalogu,
+  w nim katalog na każdy skrót rankingu i po jednym pliku JSON na wynik;
+  przy przekroczeniu max_bytes usuwane są najdawniej używane pliki
+
+Pamięć usuwa z dysku wyłącznie katalogi, które sama tworzy (skróty rankingu
+i NO_SNAPSHOT wewnątrz CACHE_NAMESPACE), więc inne pliki we wskazanym
+katalogu nigdy nie są kasowane.
+
+Zmiana rankingu zmienia klucze, a use_snapshot() od razu usuwa wyniki
+policzone dla innego stanu rankingu z obu poziomów.
+
+@requires json
+"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Callable, Iterable, Optional
+
+from transfermarkt_rankings import normalize_country_name
+
+CACHE_VERSION = 1  #!< Wersja klucza i formatu plików - zmiana unieważnia stare wyniki
+DEFAULT_MEMORY_ITEMS = 256           #!< Liczba wyników w pamięci procesu
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  #!< Największy łączny rozmiar plików na dysku
+NO_SNAPSHOT = "bez-rankingu"  #!< Katalog wyników zapisanych bez skrótu rankingu
+CACHE_NAMESPACE = f"result-cache-v{CACHE_VERSION}"  #!< Podkatalog wyników we wskazanym katalogu
+_SNAPSHOT_DIR = re.compile(r"[0-9a-f]{64}")
+
+
+def scenario_key(teams: Iterable[str], fmt: str, model: str, runs: int, seed: Optional[int],
+                 snapshot: str, engine: str = "batch") -> str:
+    """!
+    @brief Klucz wyniku scenariusza
+
+    @details Nazwy drużyn są normalizowane (normalize_country_name), więc
+    "Polska" i "Poland" dają ten sam klucz. Bez ziarna kolejność drużyn nie
+    ma znaczenia i lista jest sortowana; z ziarnem kolejność wpływa na losowanie
+    grup, więc zostaje zachowana.
+
+    @param teams Iterable[str] Nazwy drużyn
+    @param fmt str Nazwa formatu turnieju
+    @param model str Nazwa modelu siły
+    @param runs int Liczba turniejów
+    @param seed int Ziarno (None - losowe)
+    @param snapshot str Skrót rankingu (ranking_cache.snapshot_hash())
+    @param engine str Silnik symulacji ('batch', 'object')
+    @return str Skrót SHA-256 (szesnastkowo)
+    """
+    names = [normalize_country_name(name) for name in teams]
+    if seed is None:
+        names.sort()
+    canonical = json.dumps({
+        "version": CACHE_VERSION, "teams": names, "format": fmt, "model": model, "runs": runs,
+        "seed": seed, "snapshot": snapshot, "engine": engine,
+    }, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _snapshot_dir(snapshot: str) -> str:
+    """!
+    @brief Nazwa katalogu wyników dla skrótu rankingu
+
+    @details Skróty SHA-256 i NO_SNAPSHOT są używane wprost, każdy inny napis
+    zamieniany jest na swój skrót, więc nazwa katalogu zawsze pasuje do
+    _is_snapshot_dir() i nie może wskazać ścieżki poza CACHE_NAMESPACE.
+    """
+    if snapshot == NO_SNAPSHOT or _SNAPSHOT_DIR.fullmatch(snapshot):
+        return snapshot
+    return hashlib.sha256(snapshot.encode("utf-8")).hexdigest()
+
+
+def _is_snapshot_dir(name: str) -> bool:
+    """!
+    @brief Czy katalog o tej nazwie mógł zostać utworzony przez ResultCache
+    """
+    return name == NO_SNAPSHOT or _SNAPSHOT_DIR.fullmatch(name) is not None
+
+
+def _plain(value):
+    """!
+    @brief Zamiana skalarów NumPy na typy JSON
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Nie można zapisać wartości typu {type(value).__name__}")
+
+
+class ResultCache:
+    """!
+    @brief Dwupoziomowa pamięć wyników: LRU w pamięci przed katalogiem na dysku
+
+    Wyniki przechowywane są jako tekst JSON, więc każdy odczyt zwraca nową
+    kopię z typami JSON (skalary NumPy zamieniane są przy zapisie).
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_items: int = DEFAULT_MEMORY_ITEMS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, snapshot: Optional[str] = None):
+        """!
+        @brief Tworzy pamięć wyników
+
+        @param directory str Katalog poziomu dyskowego (None - tylko pamięć procesu); wyniki trafiają
+        do jego podkatalogu CACHE_NAMESPACE
+        @param memory_items int Liczba wyników w pamięci procesu
+        @param max_bytes int Największy łączny rozmiar plików na dysku
+        @param snapshot str Bieżący skrót rankingu (opcjonalnie, patrz use_snapshot())
+        """
+        self.directory = directory
+        self.root = os.path.join(directory, CACHE_NAMESPACE) if directory is not None else None
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self.snapshot = None
+        self.stats = collections.Counter()  #!< Liczniki 'memory_hits', 'disk_hits', 'misses', 'evictions'
+        self._memory = collections.OrderedDict()  # klucz -> (skrót rankingu, tekst JSON)
+        self._disk_bytes = None
+        if snapshot is not None:
+            self.use_snapshot(snapshot)
+
+    def use_snapshot(self, snapshot: str) -> bool:
+        """!
+        @brief Ustawia bieżący stan rankingu i usuwa wyniki policzone dla innych stanów
+
+        @param snapshot str Skrót rankingu (ranking_cache.snapshot_hash())
+        @return bool Czy stan rankingu się zmienił (i wyniki zostały unieważnione)
+        """
+        if snapshot == self.snapshot:
+            return False
+        self.snapshot = snapshot
+        for key in [k for k, (s, _) in self._memory.items() if s != snapshot]:
+            del self._memory[key]
+        self._remove_snapshots(keep=_snapshot_dir(snapshot))
+        self._disk_bytes = None
+        return True
+
+    def _remove_snapshots(self, keep=None):
+        """!
+        @brief Usuwa z dysku katalogi skrótów rankingu (poza keep) - tylko wewnątrz CACHE_NAMESPACE
+        """
+        if self.root is None or not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name != keep and _is_snapshot_dir(name) and os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _path(self, key: str, snapshot: str) -> str:
+        return os.path.join(self.root, _snapshot_dir(snapshot), key[:2], key + ".json")
+
+    def get(self, key: str, snapshot: Optional[str] = None):
+        """!
+        @brief Zwraca zapisany wynik (najpierw z pamięci, potem z dysku)
+
+        @param key str Klucz z scenario_key()
+        @param snapshot str Skrót rankingu użyty w kluczu (domyślnie bieżący)
+        @return Wynik lub None, jeśli go nie zapisano
+        """
+        snapshot = snapshot or self.snapshot or NO_SNAPSHOT
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return json.loads(entry[1])
+
+        if self.directory is not None:
+            path = self._path(key, snapshot)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+                os.utime(path)  # czas modyfikacji = czas ostatniego użycia
+            except OSError:
+                pass
+            else:
+                self.stats["disk_hits"] += 1
+                self._remember(key, snapshot, text)
+                return json.loads(text)
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value, snapshot: Optional[str] = None):
+        """!
+        @brief Zapisuje wynik w pamięci i (atomowo) na dysku
+
+        @param key str Klucz z scenario_key()
+        @param value Wynik (dane JSON, także ze skalarami NumPy)
+        @param snapshot str Skrót rankingu użyty w kluczu (domyślnie bieżący)
+
+        @throws TypeError Dla wyniku, którego nie da się zapisać jako JSON
+        """
+        snapshot = snapshot or self.snapshot or NO_SNAPSHOT
+        text = json.dumps(value, ensure_ascii=False, default=_plain)
+        self._remember(key, snapshot, text)
+        if self.directory is None:
+            return
+
+        path = self._path(key, snapshot)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        total = self.disk_bytes() - (os.path.getsize(path) if os.path.exists(path) else 0)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".wynik-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._disk_bytes = total + os.path.getsize(path)
+        if self._disk_bytes > self.max_bytes:
+            self._evict(keep=path)
+
+    def get_or_compute(self, key: str, compute: Callable[[], object], snapshot: Optional[str] = None):
+        """!
+        @brief Zwraca zapisany wynik albo liczy go i zapisuje
+
+        @param key str Klucz z scenario_key()
+        @param compute Callable Funkcja licząca wynik
+        @param snapshot str Skrót rankingu użyty w kluczu (domyślnie bieżący)
+        @return tuple (wynik, czy pochodzi z pamięci podręcznej)
+        """
+        value = self.get(key, snapshot)
+        if value is not None:
+            return value, True
+        value = compute()
+        self.put(key, value, snapshot)
+        return json.loads(json.dumps(value, default=_plain)), False
+
+    def _remember(self, key, snapshot, text):
+        self._memory[key] = (snapshot, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _files(self):
+        if not os.path.isdir(self.root):
+            return
+        for snapshot in os.listdir(self.root):
+            if not _is_snapshot_dir(snapshot):
+                continue
+            for root, _, names in os.walk(os.path.join(self.root, snapshot)):
+                for name in names:
+                    if name.endswith(".json"):
+                        path = os.path.join(root, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        yield stat.st_mtime, stat.st_size, path
+
+    def disk_bytes(self) -> int:
+        """!
+        @brief Łączny rozmiar plików wyników na dysku (liczony raz, potem aktualizowany)
+        """
+        if self.directory is None:
+            return 0
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._files())
+        return self._disk_bytes
+
+    def _evict(self, keep=None):
+        """!
+        @brief Usuwa najdawniej używane pliki, aż rozmiar spadnie do max_bytes
+        """
+        total = self.disk_bytes()
+        for _, size, path in sorted(self._files()):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats["evictions"] += 1
+        self._disk_bytes = total
+
+    def clear(self):
+        """!
+        @brief Usuwa wszystkie wyniki z pamięci i z dysku (pozostałe pliki katalogu zostają)
+        """
+        self._memory.clear()
+        self._remove_snapshots()
+        self._disk_bytes = None
+
+    def __len__(self):
+        """!
+        @brief Liczba wyników w pamięci procesu
+        """
+        return len(self._memory)
+
+    def __contains__(self, key):
+        """!
+        @brief Czy wynik jest w pamięci procesu lub w katalogu bieżącego stanu rankingu
+        """
+        if key in self._memory:
+            return True
+        return self.directory is not None and os.path.exists(self._path(key, self.snapshot or NO_SNAPSHOT))
@@ -0,0 +1,391 @@
+"""!
+@brief Kolumnowy zapis wyników wielu turniejów z odczytem przez mapowanie pamięci
+
+Wyniki zapisywane są w katalogu:
+- header.json: wersja schematu, drużyny, skrót rankingu, ziarna sesji zapisu
+  i nazwy faz turnieju
+- teams-NNNNNN.npy: porcje tablicy TEAM_RUN_DTYPE (wynik drużyny w turnieju)
+- matches-NNNNNN.npy: porcje tablicy MATCH_RECORD_DTYPE (wynik meczu)
+
+Zapis jest tylko dopisywaniem - każda porcja trafia do nowego pliku, który
+pojawia się w katalogu atomowo (os.replace), więc czytelnik nigdy nie zobaczy
+częściowo zapisanej porcji. Czytelnik otwiera porcje jako np.memmap, więc
+analiza milionów turniejów nie wymaga wczytania ich do pamięci.
+
+Eksport do JSON (ResultsStore.export_json()) pozostaje wolną ścieżką dla
+małych zbiorów wyników, jak utils.save_results().
+
+@requires numpy
+"""
+
+import glob
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from state import MATCH_DTYPE
+
+SCHEMA_VERSION = 1  #!< Wersja schematu - zmiana unieważnia istniejące katalogi
+DEFAULT_CHUNK_RUNS = 50_000  #!< Liczba turniejów w jednej porcji plików
+
+TEAM_RUN_DTYPE = np.dtype([
+    ('run', np.int64), ('team', np.int16), ('points', np.int16), ('goals', np.int16), ('place', np.int8),
+])
+"""!Wynik drużyny w turnieju; place to indeks w simulation.PLACES"""
+
+MATCH_RECORD_DTYPE = np.dtype([('run', np.int64)] + MATCH_DTYPE.descr)
+"""!Wynik meczu (state.MATCH_DTYPE) z numerem turnieju; phase to indeks w nagłówku 'phases'"""
+
+KINDS = {'teams': TEAM_RUN_DTYPE, 'matches': MATCH_RECORD_DTYPE}  #!< Rodzaje porcji i ich typy rekordów
+
+
+def _atomic_write(path, write):
+    """!
+    @brief Zapisuje plik przez plik tymczasowy i os.replace
+
+    @param path str Ścieżka docelowa
+    @param write Callable Funkcja zapisująca do otwartego pliku binarnego
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".store-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _chunk_paths(path, kind):
+    return sorted(glob.glob(os.path.join(path, f"{kind}-*.npy")))
+
+
+def read_header(path):
+    """!
+    @brief Wczytuje nagłówek katalogu wyników
+
+    @param path str Katalog wyników
+    @return dict Nagłówek lub None, jeśli katalog nie zawiera wyników
+
+    @throws ValueError Dla nieobsługiwanej wersji schematu
+    """
+    try:
+        with open(os.path.join(path, "header.json"), encoding="utf-8") as f:
+            header = json.load(f)
+    except FileNotFoundError:
+        return None
+    if header.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja schematu wyników: {header.get('schema_version')}.")
+    return header
+
+
+class ResultsWriter:
+    """!
+    @brief Dopisuje wyniki turniejów do katalogu wyników
+
+    Wyniki gromadzone są w prealokowanych buforach i zapisywane porcjami
+    po chunk_runs turniejów. Użycie jako menedżer kontekstu zapisuje ostatnią,
+    niepełną porcję przy wyjściu.
+    """
+
+    def __init__(self, path, names, ranks, seed=None, rankings_hash=None,
+                 chunk_runs=DEFAULT_CHUNK_RUNS, matches_per_run=16):
+        """!
+        @brief Otwiera katalog do dopisywania (tworzy go, jeśli nie istnieje)
+
+        @param path str Katalog wyników
+        @param names List[str] Nazwy drużyn
+        @param ranks List[int] Pozycje drużyn w rankingu FIFA
+        @param seed int Ziarno sesji zapisu (zapisywane w nagłówku)
+        @param rankings_hash str Skrót rankingu (ranking_cache.snapshot_hash())
+        @param chunk_runs int Liczba turniejów w jednej porcji
+        @param matches_per_run int Maksymalna liczba meczów w turnieju
+
+        @throws ValueError Gdy katalog zawiera wyniki innych drużyn lub innego rankingu
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.n_teams = len(names)
+        self.chunk_runs = chunk_runs
+        teams = [{"name": name, "fifa_rank": int(rank)} for name, rank in zip(names, ranks)]
+
+        header = read_header(path)
+        if header is None:
+            header = {
+                "schema_version": SCHEMA_VERSION,
+                "created_at": time.time(),
+                "teams": teams,
+                "ranking_snapshot": rankings_hash,
+                "phases": [],
+                "sessions": [],
+            }
+        elif header["teams"] != teams or header["ranking_snapshot"] != rankings_hash:
+            raise ValueError(f"Katalog {path} zawiera wyniki innych drużyn lub innego rankingu.")
+        self.header = header
+        self.next_run = self._stored_runs()
+        header["sessions"].append({"seed": seed, "first_run": self.next_run, "started_at": time.time()})
+        self._phase_codes = {phase: code for code, phase in enumerate(header["phases"])}
+        self._write_header()
+
+        self._teams = np.empty(chunk_runs * self.n_teams, dtype=TEAM_RUN_DTYPE)
+        self._matches = np.empty(chunk_runs * matches_per_run, dtype=MATCH_RECORD_DTYPE)
+        self._team_rows = self._match_rows = 0
+        self._chunk = len(_chunk_paths(path, "teams"))
+
+    def _stored_runs(self):
+        paths = _chunk_paths(self.path, "teams")
+        if not paths:
+            return 0
+        last = np.load(paths[-1], mmap_mode="r")
+        return int(last["run"][-1]) + 1 if len(last) else 0
+
+    def _write_header(self):
+        data = json.dumps(self.header, ensure_ascii=False, indent=1).encode("utf-8")
+        _atomic_write(os.path.join(self.path, "header.json"), lambda f: f.write(data))
+
+    def _phase_map(self, phases):
+        """!
+        @brief Zamienia numery faz MatchLog na numery faz z nagłówka
+        """
+        new = [phase for phase in phases if phase not in self._phase_codes]
+        if new:
+            for phase in new:
+                self._phase_codes[phase] = len(self.header["phases"])
+                self.header["phases"].append(phase)
+            self._write_header()
+        return np.array([self._phase_codes[phase] for phase in phases], dtype=np.int8)
+
+    def add_tournament(self, log, podium, points, goals):
+        """!
+        @brief Dodaje wynik jednego turnieju (elementy aggregation.iter_tournaments())
+
+        @param log MatchLog Mecze turnieju (None - bez zapisu meczów)
+        @param podium array-like Indeksy drużyn: mistrz, wicemistrz, 3. i 4. miejsce
+        @param points array-like Punkty drużyn z fazy grupowej
+        @param goals array-like Gole drużyn w turnieju
+        """
+        run, n_teams = self.next_run, self.n_teams
+        rows = self._teams[self._team_rows:self._team_rows + n_teams]
+        rows['run'] = run
+        rows['team'] = np.arange(n_teams)
+        rows['points'] = points
+        rows['goals'] = goals
+        rows['place'] = len(podium)
+        rows['place'][np.asarray(podium)] = np.arange(len(podium))
+        self._team_rows += n_teams
+
+        if log is not None and len(log):
+            records = log.to_records()
+            rows = self._matches[self._match_rows:self._match_rows + len(records)]
+            for column in MATCH_DTYPE.names:
+                rows[column] = records[column]
+            rows['phase'] = self._phase_map(log.phases)[records['phase']]
+            rows['run'] = run
+            self._match_rows += len(records)
+
+        self.next_run += 1
+        if self._team_rows == len(self._teams):
+            self.flush()
+
+    def add_batch(self, result):
+        """!
+        @brief Dodaje partię turniejów z simulation.simulate_batch(detail=True) (bez meczów)
+
+        @param result dict Wynik simulate_batch() z kluczami 'podium', 'points', 'goals'
+        """
+        from simulation import podium_to_places
+
+        podium = result['podium']
+        places = podium_to_places(podium, self.n_teams)
+        done = 0
+        while done < len(podium):
+            size = min(len(podium) - done, (len(self._teams) - self._team_rows) // self.n_teams)
+            rows = self._teams[self._team_rows:self._team_rows + size * self.n_teams]
+            rows['run'] = np.repeat(np.arange(self.next_run, self.next_run + size), self.n_teams)
+            rows['team'] = np.tile(np.arange(self.n_teams), size)
+            rows['points'] = result['points'][done:done + size].ravel()
+            rows['goals'] = result['goals'][done:done + size].ravel()
+            rows['place'] = places[done:done + size].ravel()
+            self._team_rows += len(rows)
+            self.next_run += size
+            done += size
+            if self._team_rows == len(self._teams):
+                self.flush()
+
+    def consume(self, stream):
+        """!
+        @brief Zapisuje wszystkie turnieje ze strumienia aggregation.iter_tournaments()
+
+        @param stream Iterable Krotki (log, podium, points, goals)
+        @return ResultsWriter self
+        """
+        for item in stream:
+            self.add_tournament(*item)
+        return self
+
+    def flush(self):
+        """!
+        @brief Zapisuje zgromadzone wyniki jako nową porcję plików
+        """
+        if not self._team_rows:
+            return
+        name = f"{self._chunk:06d}.npy"
+        # porcja meczów trafia na dysk pierwsza - porcja drużyn oznacza kompletny zapis
+        matches = self._matches[:self._match_rows]
+        _atomic_write(os.path.join(self.path, f"matches-{name}"), lambda f: np.save(f, matches))
+        teams = self._teams[:self._team_rows]
+        _atomic_write(os.path.join(self.path, f"teams-{name}"), lambda f: np.save(f, teams))
+        self._chunk += 1
+        self._team_rows = self._match_rows = 0
+
+    def close(self):
+        """!
+        @brief Zapisuje ostatnią porcję
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResultsStore:
+    """!
+    @brief Odczyt katalogu wyników przez mapowanie porcji w pamięci
+    """
+
+    def __init__(self, path):
+        """!
+        @brief Otwiera katalog wyników
+
+        @param path str Katalog wyników
+
+        @throws FileNotFoundError Gdy katalog nie zawiera nagłówka
+        """
+        header = read_header(path)
+        if header is None:
+            raise FileNotFoundError(f"Brak wyników w katalogu: {path}")
+        self.path = path
+        self.header = header
+
+    @property
+    def names(self):
+        """!
+        @brief Nazwy drużyn w kolejności numerów drużyn
+        """
+        return [team["name"] for team in self.header["teams"]]
+
+    @property
+    def ranks(self):
+        """!
+        @brief Pozycje drużyn w rankingu FIFA
+        """
+        return [team["fifa_rank"] for team in self.header["teams"]]
+
+    def chunks(self, kind):
+        """!
+        @brief Porcje zapisanych rekordów jako tablice tylko do odczytu (np.memmap)
+
+        @details Uwzględniane są tylko porcje meczów, dla których istnieje już
+        porcja drużyn (kompletny zapis).
+
+        @param kind str 'teams' albo 'matches'
+        @return List[np.ndarray] Porcje w kolejności zapisu
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Nieznany rodzaj rekordów: {kind}. Dostępne: {', '.join(KINDS)}.")
+        count = len(_chunk_paths(self.path, "teams"))
+        return [np.load(p, mmap_mode="r") for p in _chunk_paths(self.path, kind)[:count]]
+
+    def __len__(self):
+        """!
+        @brief Liczba zapisanych turniejów
+        """
+        return sum(len(chunk) for chunk in self.chunks("teams")) // len(self.header["teams"])
+
+    def column(self, kind, name):
+        """!
+        @brief Jedna kolumna wszystkich porcji (kopiowana do pamięci)
+
+        @param kind str 'teams' albo 'matches'
+        @param name str Nazwa pola rekordu
+        @return np.ndarray Złączone wartości kolumny
+        """
+        chunks = self.chunks(kind)
+        if not chunks:
+            return np.empty(0, dtype=KINDS[kind][name])
+        return np.concatenate([chunk[name] for chunk in chunks])
+
+    def knockout_phases(self):
+        """!
+        @brief Numery faz pucharowych (wszystkie oprócz "Grupa ...")
+        """
+        return [code for code, phase in enumerate(self.header["phases"]) if not phase.startswith("Grupa")]
+
+    def to_stats(self):
+        """!
+        @brief Liczy statystyki aggregation.StreamingStats porcja po porcji
+
+        @return StreamingStats Statystyki wszystkich zapisanych turniejów
+        """
+        from aggregation import StreamingStats
+
+        stats = StreamingStats(self.names, self.ranks)
+        knockout = self.knockout_phases()
+        for teams, matches in zip(self.chunks("teams"), self.chunks("matches")):
+            stats.add_records(teams, matches, knockout)
+        return stats
+
+    def export_json(self, filename):
+        """!
+        @brief Eksportuje wszystkie wyniki do pliku JSON (wolna ścieżka dla małych zbiorów)
+
+        @param filename str Nazwa pliku wyjściowego
+        """
+        names, phases = self.names, self.header["phases"]
+        runs = {}
+        for chunk in self.chunks("teams"):
+            for row in chunk.tolist():
+                run, team, points, goals, place = row
+                runs.setdefault(run, {"run": run, "teams": [], "matches": []})["teams"].append(
+                    {"team": names[team], "punkty turnieju": points, "bramki strzelone": goals, "miejsce": place})
+        for chunk in self.chunks("matches"):
+            for run, team1, team2, phase, g1, g2, p1, p2 in chunk.tolist():
+                match = {"faza": phases[phase], "team1": names[team1], "team2": names[team2], "wynik": [g1, g2]}
+                if p1 >= 0:
+                    match["karne"] = [p1, p2]
+                runs[run]["matches"].append(match)
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump({"header": self.header, "runs": list(runs.values())}, f, indent=4, ensure_ascii=False)
+
+
+def simulate_to_store(path, teams, runs, seed=None, chunk_runs=DEFAULT_CHUNK_RUNS):
+    """!
+    @brief Rozgrywa turnieje na obiektach Team i Match i dopisuje je do katalogu wyników
+
+    @param path str Katalog wyników
+    @param teams List[Team] Lista 8 drużyn
+    @param runs int Liczba turniejów
+    @param seed int Ziarno (None - losowe, zapisane w nagłówku)
+    @param chunk_runs int Liczba turniejów w jednej porcji
+    @return ResultsStore Katalog wyników otwarty do odczytu
+    """
+    from aggregation import iter_tournaments
+    from models import Team
+    from parallel import python_rng
+    from ranking_cache import snapshot_hash
+
+    seed_seq = np.random.SeedSequence(seed)
+    rankings = getattr(Team, '_rankings', None)
+    names = [team.name for team in teams]
+    ranks = [team.fifa_rank for team in teams]
+    with ResultsWriter(path, names, ranks, seed_seq.entropy,
+                       snapshot_hash(rankings) if rankings is not None else None, chunk_runs) as writer:
+        writer.consume(iter_tournaments(ranks, runs, python_rng(seed_seq), names))
+    return ResultsStore(path)
@@ -0,0 +1,588 @@
+"""!
+@brief Serwis asyncio odpowiadający na zapytania o szanse drużyn
+
+Serwis trzyma w pamięci ranking FIFA, jego indeks (RankingIndex) i skompilowane
+tablice modeli siły, więc zapytania nie pobierają rankingu od nowa jak main.main().
+Protokół to HTTP/1.1 z ciałem JSON, przez TCP albo gniazdo uniksowe:
+- POST /simulate: {"teams": [...], "runs", "format", "model", "seed"} - szanse na miejsca
+- POST /match: {"teams": [drużyna1, drużyna2], "model"} - dokładne szanse jednego meczu
+- POST /reload: ponowne wczytanie rankingu (load_rankings())
+- GET /health, GET /metrics (format Prometheus), GET /metrics.json
+
+Wyniki symulacji zapamiętywane są w result_cache.ResultCache pod kluczem
+scenariusza (drużyny, format, model, liczba turniejów, ziarno, skrót rankingu),
+więc powtórzone zapytanie dostaje wynik od razu, a zmiana rankingu w /reload
+unieważnia zapisane wyniki.
+
+Zapytania o symulację napływające w oknie window sekund są łączone: zapytania
+o ten sam turniej (drużyny, format, model) bez ziarna dostają wspólny wynik
+jednej symulacji o największej żądanej liczbie turniejów, a zapytania z ziarnem
+- wspólny wynik tylko przy identycznym ziarnie i liczbie turniejów (jak osobne
+wywołanie parallel.run_parallel()). Każda połączona porcja jest liczona
+w puli wykonawców, więc pętla zdarzeń nie czeka na obliczenia.
+
+Użycie z linii poleceń:
+@code
+python service.py --port 8765
+python service.py --unix /tmp/symulator.sock --window-ms 10
+python service.py --cache-dir wyniki_cache
+@endcode
+
+@requires asyncio
+"""
+
+import argparse
+import asyncio
+import collections
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from exact_probabilities import knockout_probability, match_probabilities
+from formats import DEFAULT_FORMAT, FORMATS
+from instrumentation import METRIC_PREFIX
+from parallel import run_parallel
+from ranking_cache import load_rankings, snapshot_hash
+from result_cache import ResultCache, scenario_key
+from simulation import place_labels
+from strength_tables import DEFAULT_MODEL, STRENGTH_MODELS, compile_model
+from transfermarkt_rankings import RankingIndex, normalize_country_name
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_RUNS = 10_000      #!< Liczba turniejów, jeśli zapytanie jej nie podaje
+MAX_RUNS = 2_000_000       #!< Największa liczba turniejów jednego zapytania
+DEFAULT_WINDOW = 0.005     #!< Czas zbierania zapytań do wspólnej porcji w sekundach
+MAX_BODY = 1 << 20         #!< Największy rozmiar ciała zapytania w bajtach
+TEAM_CACHE_ITEMS = 4096    #!< Liczba zapamiętanych nazw drużyn (LRU)
+LATENCY_SAMPLES = 4096     #!< Liczba ostatnich czasów odpowiedzi do kwantyli
+QUANTILES = (0.5, 0.9, 0.99)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ServiceMetrics:
+    """!
+    @brief Liczniki zapytań, porcji i czasy odpowiedzi serwisu
+
+    Czasy odpowiedzi przechowywane są w buforze ostatnich LATENCY_SAMPLES
+    wartości, z którego liczone są kwantyle.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = collections.Counter()   #!< Zapytania według ścieżki
+        self.errors = collections.Counter()     #!< Odpowiedzi z błędem według ścieżki
+        self.batches = 0        #!< Porcje symulacji wysłane do puli
+        self.coalesced = 0      #!< Zapytania obsłużone wynikiem porcji innego zapytania
+        self.cache_hits = 0     #!< Zapytania obsłużone wynikiem z pamięci podręcznej
+        self.tournaments = 0    #!< Łączna liczba symulowanych turniejów
+        self.busy = 0.0         #!< Łączny czas obliczeń porcji w sekundach
+        self.pending = 0        #!< Zapytania czekające na wynik porcji
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    def observe(self, path, elapsed, error=False):
+        """!
+        @brief Zapisuje obsłużone zapytanie
+
+        @param path str Ścieżka zapytania
+        @param elapsed float Czas odpowiedzi w sekundach
+        @param error bool Czy odpowiedź była błędem
+        """
+        self.requests[path] += 1
+        if error:
+            self.errors[path] += 1
+        self.latencies.append(elapsed)
+
+    def quantiles(self):
+        """!
+        @brief Kwantyle QUANTILES czasów odpowiedzi w sekundach (puste bez zapytań)
+        """
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {}
+        return {q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] for q in QUANTILES}
+
+    def snapshot(self):
+        """!
+        @brief Bieżące metryki
+
+        @return dict {'uptime_s', 'requests', 'errors', 'batches', 'coalesced', 'cache_hits', 'pending',
+        'tournaments', 'busy_s', 'tournaments_per_s', 'requests_per_s', 'latency_s'}
+        """
+        uptime = time.monotonic() - self.started
+        total = sum(self.requests.values())
+        return {
+            "uptime_s": uptime,
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "batches": self.batches,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "pending": self.pending,
+            "tournaments": self.tournaments,
+            "busy_s": self.busy,
+            "tournaments_per_s": self.tournaments / self.busy if self.busy else 0.0,
+            "requests_per_s": total / uptime if uptime else 0.0,
+            "latency_s": {str(q): value for q, value in self.quantiles().items()},
+        }
+
+    def to_prometheus(self):
+        """!
+        @brief Metryki w formacie tekstowym Prometheus
+
+        @return str Liczniki zapytań, porcji i turniejów oraz kwantyle czasu odpowiedzi
+        """
+        prefix = f"{METRIC_PREFIX}_service"
+        lines = [f"# HELP {prefix}_requests_total Obsłużone zapytania", f"# TYPE {prefix}_requests_total counter"]
+        lines += [f'{prefix}_requests_total{{path="{p}"}} {n}' for p, n in self.requests.items()]
+        lines += [f"# HELP {prefix}_errors_total Zapytania zakończone błędem", f"# TYPE {prefix}_errors_total counter"]
+        lines += [f'{prefix}_errors_total{{path="{p}"}} {n}' for p, n in self.errors.items()]
+        for name, value, kind, text in (
+                ("batches_total", self.batches, "counter", "Porcje symulacji wysłane do puli"),
+                ("coalesced_total", self.coalesced, "counter", "Zapytania obsłużone wspólną porcją"),
+                ("cache_hits_total", self.cache_hits, "counter", "Zapytania obsłużone z pamięci podręcznej"),
+                ("tournaments_total", self.tournaments, "counter", "Symulowane turnieje"),
+                ("busy_seconds_total", f"{self.busy:.9f}", "counter", "Czas obliczeń porcji"),
+                ("pending", self.pending, "gauge", "Zapytania czekające na wynik")):
+            lines += [f"# HELP {prefix}_{name} {text}", f"# TYPE {prefix}_{name} {kind}", f"{prefix}_{name} {value}"]
+        lines += [f"# HELP {prefix}_latency_seconds Czas odpowiedzi", f"# TYPE {prefix}_latency_seconds summary"]
+        lines += [f'{prefix}_latency_seconds{{quantile="{q}"}} {v:.9f}' for q, v in self.quantiles().items()]
+        lines += [f"{prefix}_latency_seconds_count {len(self.latencies)}",
+                  f"{prefix}_latency_seconds_sum {sum(self.latencies):.9f}"]
+        return "\n".join(lines) + "\n"
+
+
+class _Batch:
+    """!
+    @brief Zapytania o ten sam turniej czekające na wspólną symulację
+    """
+
+    __slots__ = ('ranks', 'fmt', 'model', 'seed', 'runs', 'requests', 'future')
+
+    def __init__(self, ranks, fmt, model, seed, future):
+        self.ranks = ranks
+        self.fmt = fmt
+        self.model = model
+        self.seed = seed
+        self.runs = 0
+        self.requests = 0
+        self.future = future
+
+
+class SimulationService:
+    """!
+    @brief Serwis symulacji z rankingiem i tablicami modeli w pamięci
+
+    Metody simulate(), match() i handle() można wywoływać bezpośrednio
+    w pętli asyncio; start() udostępnia je przez HTTP.
+    """
+
+    def __init__(self, rankings=None, model=DEFAULT_MODEL, window=DEFAULT_WINDOW, executor=None, workers=None,
+                 cache=None):
+        """!
+        @brief Tworzy serwis i wczytuje ranking
+
+        @param rankings List[Dict] Ranking FIFA (None - load_rankings())
+        @param model str Domyślny model siły zapytań
+        @param window float Czas zbierania zapytań do wspólnej porcji w sekundach
+        @param executor concurrent.futures.Executor Pula obliczeń (None - własna pula wątków)
+        @param workers int Liczba wątków własnej puli (None - liczba rdzeni)
+        @param cache ResultCache Pamięć wyników (None - tylko w pamięci procesu)
+
+        @throws ValueError Dla nieznanego modelu siły
+        """
+        if model not in STRENGTH_MODELS:
+            raise ValueError(f"Nieznany model siły: {model}. Dostępne: {', '.join(STRENGTH_MODELS)}.")
+        self.model = model
+        self.window = window
+        self.metrics = ServiceMetrics()
+        self.cache = cache if cache is not None else ResultCache()
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        self._pending = {}
+        self._flush_handle = None
+        self._tasks = set()
+        self._servers = []
+        self.index = RankingIndex([])
+        self.reload(rankings)
+
+    def reload(self, rankings=None):
+        """!
+        @brief Podmienia ranking w pamięci (indeks, tablice modeli, znane drużyny)
+
+        @details Wyniki zapisane dla poprzedniego stanu rankingu są unieważniane.
+
+        @param rankings List[Dict] Nowy ranking (None - load_rankings())
+        @return dict Różnice rankingu z RankingIndex.update()
+        """
+        self.rankings = load_rankings() if rankings is None else rankings
+        self.snapshot = snapshot_hash(self.rankings)
+        diff = self.index.update(self.rankings)
+        self.cache.use_snapshot(self.snapshot)
+        self._teams = collections.OrderedDict()  # nazwa z zapytania -> (nazwa po normalizacji, pozycja)
+        self._tables = {}
+        return diff
+
+    def tables(self, model=None):
+        """!
+        @brief Tablice modelu siły dla bieżącego rankingu (kompilowane raz)
+
+        @param model str Nazwa modelu (None - domyślny model serwisu)
+        @return StrengthTables Tablice parametrów meczu
+
+        @throws ValueError Dla nieznanego modelu
+        """
+        model = model or self.model
+        if not isinstance(model, str):
+            raise ValueError("Model siły musi być napisem.")
+        tables = self._tables.get(model)
+        if tables is None:
+            if model not in STRENGTH_MODELS:
+                raise ValueError(f"Nieznany model siły: {model}. Dostępne: {', '.join(STRENGTH_MODELS)}.")
+            tables = self._tables[model] = compile_model(model, self.rankings)
+        return tables
+
+    def team(self, name):
+        """!
+        @brief Nazwa i pozycja drużyny w rankingu (zapamiętywane dla TEAM_CACHE_ITEMS ostatnich nazw)
+
+        @param name str Nazwa drużyny w dowolnym wariancie
+        @return tuple (nazwa po normalizacji, pozycja w rankingu)
+
+        @throws ValueError Dla pustej nazwy lub nazwy, która nie jest napisem
+        """
+        if not isinstance(name, str):
+            raise ValueError("Nazwa drużyny musi być napisem.")
+        team = self._teams.get(name)
+        if team is not None:
+            self._teams.move_to_end(name)
+            return team
+        if not name.strip():
+            raise ValueError("Nazwa drużyny nie może być pusta.")
+        team = self._teams[name] = (normalize_country_name(name), self.index.lookup(name))
+        if len(self._teams) > TEAM_CACHE_ITEMS:
+            self._teams.popitem(last=False)
+        return team
+
+    async def simulate(self, teams, runs=DEFAULT_RUNS, fmt=DEFAULT_FORMAT, model=None, seed=None):
+        """!
+        @brief Szanse drużyn na miejsca z (być może wspólnej) porcji symulacji
+
+        @param teams List[str] Nazwy drużyn (tyle, ile wymaga format)
+        @param runs int Liczba turniejów
+        @param fmt str Format turnieju (formats.FORMATS)
+        @param model str Model siły (None - domyślny model serwisu)
+        @param seed int Ziarno (None - losowe; wynik może być wspólny z innymi zapytaniami)
+
+        @return dict {'format', 'model', 'runs', 'seed', 'coalesced', 'cached', 'teams': {nazwa:
+        {'fifa_ranking', miejsca z simulation.place_labels(), 'średnie punkty', 'średnie bramki'}}}
+
+        @throws ValueError Dla błędnych drużyn, formatu, modelu lub liczby turniejów
+        """
+        if not isinstance(fmt, str) or fmt not in FORMATS:
+            raise ValueError(f"Nieznany format: {fmt}. Dostępne: {', '.join(FORMATS)}.")
+        if not isinstance(teams, list) or len(teams) != FORMATS[fmt].teams:
+            raise ValueError(f"Turniej wymaga dokładnie {FORMATS[fmt].teams} drużyn.")
+        if isinstance(runs, bool) or not isinstance(runs, int) or not 1 <= runs <= MAX_RUNS:
+            raise ValueError(f"Liczba turniejów musi być liczbą całkowitą od 1 do {MAX_RUNS}.")
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+            raise ValueError("Ziarno musi być liczbą całkowitą.")
+        model = model or self.model
+        self.tables(model)
+        resolved = [self.team(name) for name in teams]
+        if len({name for name, _ in resolved}) != len(resolved):
+            raise ValueError("Drużyny nie mogą się powtarzać.")
+
+        cache_key = scenario_key([name for name, _ in resolved], fmt, model, runs, seed, self.snapshot)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.metrics.cache_hits += 1
+            cached["cached"] = True
+            return cached
+
+        ranks = tuple(rank for _, rank in resolved)
+        key = (ranks, fmt, model, seed, runs if seed is not None else None)
+        batch = self._pending.get(key)
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = self._pending[key] = _Batch(ranks, fmt, model, seed, loop.create_future())
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+        batch.runs = max(batch.runs, runs)
+        batch.requests += 1
+        self.metrics.pending += 1
+        try:
+            total = await asyncio.shield(batch.future)
+        finally:
+            self.metrics.pending -= 1
+
+        summary = {}
+        labels = place_labels(fmt)
+        for row, (name, rank) in enumerate(resolved):
+            entry = {"fifa_ranking": rank}
+            entry.update(zip(labels, total['probabilities'][row].tolist()))
+            entry["średnie punkty"] = int(total['points'][row]) / total['runs']
+            entry["średnie bramki"] = int(total['goals'][row]) / total['runs']
+            summary[name] = entry
+        result = {"format": fmt, "model": model, "runs": total['runs'], "seed": int(total['seed']),
+                  "coalesced": batch.requests, "cached": False, "teams": summary}
+        self.cache.put(cache_key, result)
+        return result
+
+    def _flush(self):
+        """!
+        @brief Wysyła zebrane porcje do puli wykonawców
+        """
+        self._flush_handle = None
+        batches, self._pending = self._pending, {}
+        for batch in batches.values():
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        """!
+        @brief Liczy jedną porcję w puli wykonawców i przekazuje wynik zapytaniom
+        """
+        metrics = self.metrics
+        metrics.batches += 1
+        metrics.coalesced += batch.requests - 1
+        job = functools.partial(run_parallel, batch.ranks, batch.runs, batch.seed, workers=1,
+                                fmt=batch.fmt, model=self.tables(batch.model))
+        start = time.perf_counter()
+        try:
+            total = await asyncio.get_running_loop().run_in_executor(self.executor, job)
+        except Exception as e:
+            batch.future.set_exception(e)
+        else:
+            metrics.tournaments += total['runs']
+            batch.future.set_result(total)
+        finally:
+            metrics.busy += time.perf_counter() - start
+
+    def match(self, team1, team2, model=None):
+        """!
+        @brief Dokładne szanse jednego meczu (bez losowania)
+
+        @param team1 str Pierwsza drużyna
+        @param team2 str Druga drużyna
+        @param model str Model siły (None - domyślny model serwisu)
+        @return dict {'teams', 'fifa_ranking', 'wygrana', 'remis', 'porażka', 'awans'} z perspektywy
+        pierwszej drużyny ('awans' - zwycięstwo w meczu pucharowym, także po rzutach karnych)
+
+        @throws ValueError Dla pustej nazwy drużyny lub nieznanego modelu
+        """
+        tables = self.tables(model)
+        (name1, rank1), (name2, rank2) = self.team(team1), self.team(team2)
+        win, draw, loss = match_probabilities(rank1, rank2, tables).tolist()
+        return {"teams": [name1, name2], "fifa_ranking": [rank1, rank2], "wygrana": win, "remis": draw,
+                "porażka": loss, "awans": knockout_probability(rank1, rank2, tables)}
+
+    async def handle(self, method, path, body=None):
+        """!
+        @brief Obsługuje jedno zapytanie (bez warstwy HTTP)
+
+        @param method str Metoda HTTP
+        @param path str Ścieżka zapytania
+        @param body dict Ciało zapytania (JSON)
+        @return tuple (kod HTTP, odpowiedź: dict - JSON, str - tekst)
+        """
+        start = time.perf_counter()
+        status, payload = await self._route(method, path, body or {})
+        self.metrics.observe(path, time.perf_counter() - start, status != 200)
+        return status, payload
+
+    async def _route(self, method, path, body):
+        routes = {
+            "/simulate": "POST", "/match": "POST", "/reload": "POST",
+            "/health": "GET", "/metrics": "GET", "/metrics.json": "GET",
+        }
+        if path not in routes:
+            return 404, {"error": f"Nieznana ścieżka: {path}"}
+        if method != routes[path]:
+            return 405, {"error": f"Ścieżka {path} wymaga metody {routes[path]}"}
+        try:
+            if path == "/simulate":
+                return 200, await self.simulate(body.get("teams"), body.get("runs", DEFAULT_RUNS),
+                                                body.get("format", DEFAULT_FORMAT), body.get("model"),
+                                                body.get("seed"))
+            if path == "/match":
+                teams = body.get("teams")
+                if not isinstance(teams, list) or len(teams) != 2:
+                    raise ValueError("Mecz wymaga dokładnie 2 drużyn.")
+                return 200, self.match(teams[0], teams[1], body.get("model"))
+            if path == "/reload":
+                diff = self.reload()
+                return 200, {"snapshot": self.snapshot, "teams": len(self.rankings), "diff": diff}
+            if path == "/health":
+                return 200, {"status": "ok", "snapshot": self.snapshot, "teams": len(self.rankings)}
+            if path == "/metrics":
+                return 200, self.metrics.to_prometheus()
+            return 200, self.metrics.snapshot()
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:  # błąd obliczeń nie może zatrzymać serwisu
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def _connection(self, reader, writer):
+        """!
+        @brief Obsługa jednego połączenia HTTP (jedno zapytanie, potem zamknięcie)
+        """
+        try:
+            status, payload = await self._read_request(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+        writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            return 400, {"error": "Niepoprawne zapytanie HTTP"}
+        method, target, _ = request_line
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value) if value.strip().isdigit() else -1
+        if not 0 <= length <= MAX_BODY:
+            return 413, {"error": f"Ciało zapytania musi mieć od 0 do {MAX_BODY} bajtów"}
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                return 400, {"error": "Ciało zapytania nie jest poprawnym JSON"}
+            if not isinstance(body, dict):
+                return 400, {"error": "Ciało zapytania musi być obiektem JSON"}
+        return await self.handle(method, target.split("?", 1)[0], body)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """!
+        @brief Uruchamia serwer HTTP na porcie TCP albo gnieździe uniksowym
+
+        @param host str Adres nasłuchiwania
+        @param port int Port TCP (0 - wybrany przez system)
+        @param unix_path str Ścieżka gniazda uniksowego (zamiast TCP)
+        @return asyncio.AbstractServer Uruchomiony serwer
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self._connection, unix_path)
+        else:
+            server = await asyncio.start_server(self._connection, host, port)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        """!
+        @brief Zamyka serwery, czeka na rozpoczęte porcje i zwalnia własną pulę
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def request(method, path, payload=None, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    """!
+    @brief Klient serwisu: wysyła jedno zapytanie HTTP
+
+    @param method str Metoda HTTP
+    @param path str Ścieżka zapytania
+    @param payload dict Ciało zapytania (JSON)
+    @param host str Adres serwisu
+    @param port int Port TCP serwisu
+    @param unix_path str Ścieżka gniazda uniksowego (zamiast TCP)
+    @return tuple (kod HTTP, odpowiedź: dict dla JSON, str dla tekstu)
+    """
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(None, 2)[1])
+    if b"application/json" in head:
+        return status, json.loads(body)
+    return status, body.decode("utf-8")
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, **options):
+    """!
+    @brief Uruchamia serwis i obsługuje zapytania do przerwania
+
+    @param host str Adres nasłuchiwania
+    @param port int Port TCP
+    @param unix_path str Ścieżka gniazda uniksowego (zamiast TCP)
+    @param options dict Argumenty SimulationService (model, window, workers, cache)
+    """
+    async with SimulationService(**options) as service:
+        server = await service.start(host, port, unix_path)
+        print(f"Serwis symulacji nasłuchuje na {unix_path or f'http://{host}:{port}'} "
+              f"(ranking: {len(service.rankings)} drużyn)")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """!
+    @brief Obsługa linii poleceń: uruchomienie serwisu
+
+    @param argv List[str] Argumenty (domyślnie sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Serwis symulacji turnieju (HTTP + JSON)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"adres nasłuchiwania (domyślnie {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port TCP (domyślnie {DEFAULT_PORT})")
+    parser.add_argument("--unix", help="ścieżka gniazda uniksowego zamiast portu TCP")
+    parser.add_argument("--model", default=DEFAULT_MODEL, choices=STRENGTH_MODELS,
+                        help=f"domyślny model siły (domyślnie {DEFAULT_MODEL})")
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW * 1000,
+                        help="czas zbierania zapytań do wspólnej porcji w milisekundach")
+    parser.add_argument("--workers", type=int, help="liczba wątków obliczeń (domyślnie liczba rdzeni)")
+    parser.add_argument("--cache-dir", help="katalog zapisanych wyników (domyślnie tylko pamięć procesu)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, model=args.model,
+                          window=args.window_ms / 1000, workers=args.workers,
+                          cache=ResultCache(args.cache_dir)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
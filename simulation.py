@@ -0,0 +1,616 @@
+"""!
+@brief Wektorowy silnik Monte Carlo dla formatów turnieju z modułu formats
+
+Moduł rozgrywa wiele turniejów jednocześnie na tablicach NumPy, gdzie
+pierwsza oś odpowiada kolejnym przebiegom symulacji. Model meczu jest
+identyczny z models.Match:
+- gole: int(gauss(lambda, 1)) ograniczone do przedziału [0, 7]
+- rzuty karne: 5 strzałów na drużynę, następnie "nagła śmierć" - zwycięzca
+  losowany jest z dokładnego prawdopodobieństwa wygrania serii
+
+Parametry meczów (lambda, szanse w karnych) pochodzą z tablic
+strength_tables.get_tables() wybranego modelu siły, a pętla symulacji
+wykonuje wyłącznie odczyty tablic i losowania. W modelu 'dixon_coles' wynik
+meczu losowany jest z macierzy wyników metodą aliasów (sample_scores()).
+
+Przebieg turnieju wyznacza terminarz formatu (formats.compile_format()),
+ten sam, którego używa formats.play_format() w ścieżce obiektowej:
+simulate_format_batch() rozgrywa dowolny format (np. 'wc32', 'euro24'),
+a simulate_batch() ma szybszą ścieżkę dla formatu domyślnego (classic8):
+dwie grupy po 4, awans dwóch najlepszych, półfinały na krzyż, mecz
+o 3. miejsce i finał.
+
+Parametr variance wybiera źródło liczb losowych z variance.VARIANCE_REDUCTIONS
+(losowania antytetyczne, warstwowe albo wspólne dla porównań scenariuszy).
+
+@requires numpy
+"""
+
+import functools
+import itertools
+
+import numpy as np
+
+from formats import DEFAULT_FORMAT, compile_format
+from strength_tables import MAX_GOALS, MAX_RANK, get_tables
+from variance import CommonNoise, noise_source
+
+PLACES = ("mistrz", "wicemistrz", "trzecie miejsce", "czwarte miejsce", "faza grupowa")
+"""!Etykiety miejsc formatu domyślnego (kolumny macierzy prawdopodobieństw); inne formaty - place_labels()"""
+OUTSIDE_PODIUM = "poza podium"  #!< Etykieta ostatniej kolumny, gdy z grup awansuje więcej niż 4 drużyny
+SEMIFINAL = "półfinał"  #!< Wspólna kolumna przegranych półfinałów w formatach bez meczu o 3. miejsce
+
+GROUP_PAIRS = ((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3))
+"""!Kolejność meczów w grupie 4 drużyn (jak Schedule.group_pairs w formats.play_format())"""
+
+
+def place_labels(fmt=DEFAULT_FORMAT):
+    """!
+    @brief Etykiety kolumn macierzy prawdopodobieństw miejsc dla formatu
+
+    @details Ostatnia kolumna to drużyny spoza podium. Gdy faza pucharowa
+    zaczyna się od półfinałów (classic8, fifa8), są to dokładnie drużyny
+    odpadające w grupach; w większych formatach kolumna obejmuje także
+    przegranych wcześniejszych rund pucharowych i ma etykietę OUTSIDE_PODIUM.
+    Formaty bez meczu o 3. miejsce (euro24) nie rozróżniają 3. i 4. miejsca -
+    obaj przegrani półfinałów trafiają do jednej kolumny SEMIFINAL.
+
+    @param fmt str | TournamentFormat | Schedule Format turnieju
+    @return tuple Etykiety kolumn (5 z meczem o 3. miejsce, 4 bez niego)
+    """
+    schedule = compile_format(fmt)
+    last = PLACES[-1] if len(schedule.qualifiers) == 4 else OUTSIDE_PODIUM
+    if schedule.fmt.third_place:
+        return PLACES[:-1] + (last,)
+    return PLACES[:2] + (SEMIFINAL, last)
+
+
+def podium_columns(fmt=DEFAULT_FORMAT):
+    """!
+    @brief Kolumny place_labels() dla kolejnych kolumn macierzy podium
+
+    @param fmt str | TournamentFormat | Schedule Format turnieju
+    @return tuple Indeksy miejsc mistrza, wicemistrza oraz 3. i 4. kolumny podium
+    (bez meczu o 3. miejsce obie wskazują SEMIFINAL)
+    """
+    return (0, 1, 2, 3) if compile_format(fmt).fmt.third_place else (0, 1, 2, 2)
+
+
+def sample_goals(rng, lam1, lam2):
+    """!
+    @brief Losuje liczby goli obu drużyn dla tablic wartości lambda
+
+    @details Odpowiednik max(0, min(int(random.gauss(lam, 1)), 7)). Rzutowanie na
+    liczbę całkowitą obcina w stronę zera, więc po ograniczeniu do [0, 7]
+    wynik jest identyczny z int() w Match.play.
+
+    @param rng np.random.Generator | variance.CommonNoise Generator liczb losowych
+    @param lam1 np.ndarray Oczekiwane liczby goli pierwszej drużyny
+    @param lam2 np.ndarray Oczekiwane liczby goli drugiej drużyny (ten sam kształt)
+    @return tuple(np.ndarray, np.ndarray) Liczby goli (int8) obu drużyn
+    """
+    if isinstance(rng, CommonNoise):
+        goals = rng.standard_normal((2,) + lam1.shape, dtype=np.float32, axis=1)
+    else:
+        goals = rng.standard_normal((2,) + lam1.shape, dtype=np.float32)
+    goals[0] += lam1
+    goals[1] += lam2
+    np.clip(goals, 0, MAX_GOALS, out=goals)
+    goals = goals.astype(np.int8)
+    return goals[0], goals[1]
+
+
+def sample_scores(rng, table, pair):
+    """!
+    @brief Losuje wyniki meczów z macierzy wyników par drużyn (metoda aliasów)
+
+    @details Jedna liczba losowa na mecz: część całkowita u * 64 wybiera
+    komórkę macierzy, a część ułamkowa decyduje, czy zostaje ona, czy jej
+    alias - stały koszt niezależnie od rozkładu.
+
+    @param rng np.random.Generator Generator liczb losowych
+    @param table tuple Tablice (prawdopodobieństwa, aliasy) z _score_aliases()
+    @param pair np.ndarray Numery par (i * liczba drużyn + j) dla kolejnych meczów
+    @return tuple(np.ndarray, np.ndarray) Liczby goli (int8) obu drużyn
+    """
+    return scores_from_uniform(table, pair, rng.random(pair.shape))
+
+
+def scores_from_uniform(table, pair, u):
+    """!
+    @brief Wyniki meczów z macierzy wyników dla podanych liczb losowych
+
+    @details Deterministyczna część sample_scores() - te same liczby losowe
+    dają te same wyniki, co pozwala ponownie rozgrywać mecze z zapisanymi
+    liczbami losowymi (whatif.ConditionalSimulation).
+
+    @param table tuple Tablice (prawdopodobieństwa, aliasy) z _score_aliases()
+    @param pair np.ndarray Numery par (i * liczba drużyn + j) dla kolejnych meczów
+    @param u np.ndarray Liczby losowe z przedziału [0, 1) w kształcie pair
+    @return tuple(np.ndarray, np.ndarray) Liczby goli (int8) obu drużyn
+    """
+    prob, alias = table
+    cells = MAX_GOALS + 1
+    u = u * (cells * cells)
+    cell = u.astype(np.intp)
+    index = pair * (cells * cells) + cell
+    cell = np.where(u - cell < prob.take(index), cell, alias.take(index))
+    return (cell // cells).astype(np.int8), (cell % cells).astype(np.int8)
+
+
+def _alias_table(pmf):
+    """!
+    @brief Tablice metody aliasów (Vose) dla jednego rozkładu
+
+    @param pmf np.ndarray Prawdopodobieństwa komórek (suma 1)
+    @return tuple(np.ndarray, np.ndarray) Progi i aliasy komórek
+    """
+    size = len(pmf)
+    scaled = pmf * size
+    prob = np.ones(size)
+    alias = np.arange(size)
+    small = [i for i in range(size) if scaled[i] < 1.0]
+    large = [i for i in range(size) if scaled[i] >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        prob[less], alias[less] = scaled[less], more
+        scaled[more] += scaled[less] - 1.0
+        (small if scaled[more] < 1.0 else large).append(more)
+    return prob, alias
+
+
+@functools.lru_cache(maxsize=32)
+def _score_aliases(ranks, model):
+    """!
+    @brief Tablice metody aliasów dla macierzy wyników każdej pary drużyn turnieju
+
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param model str | StrengthTables Model siły z rozkładem wyników (rho różne od None)
+    @return tuple Spłaszczone tablice (n * n * 64) progów i aliasów dla sample_scores()
+    """
+    index = np.array(ranks, dtype=np.intp)
+    scores = get_tables(model).scores(index[:, None], index[None, :]).reshape(len(index) ** 2, -1)
+    tables = [_alias_table(row / row.sum()) for row in scores]
+    return (np.concatenate([prob for prob, _ in tables]),
+            np.concatenate([alias for _, alias in tables]).astype(np.intp))
+
+
+@functools.lru_cache(maxsize=32)
+def _pair_tables(ranks, model='rank'):
+    """!
+    @brief Tablice parametrów meczu dla każdej pary drużyn turnieju
+
+    @details Wycinek tablic strength_tables.get_tables() dla pozycji drużyn.
+
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param model str | StrengthTables Model siły (nazwa albo tablice z compile_model())
+    @return tuple(np.ndarray, np.ndarray) Macierz lambda[i, j] (gole i przeciwko j)
+    oraz macierz prawdopodobieństw wygrania karnych przez i przeciwko j
+
+    @throws ValueError Dla pozycji spoza zakresu 1..211
+    """
+    index = np.array(ranks, dtype=np.intp)
+    if index.min() < 1 or index.max() > MAX_RANK:
+        raise ValueError(f"Pozycja w rankingu musi mieścić się w zakresie 1-{MAX_RANK}.")
+    tables = get_tables(model)
+    pairs = np.ix_(index, index)
+    return tables.lam[pairs], tables.pen_win[pairs]
+
+
+@functools.lru_cache(maxsize=8)
+def _draw_tables(ranks, model='rank'):
+    """!
+    @brief Wszystkie możliwe losowania grup wraz z parametrami meczów grupowych
+
+    @details Losowanie indeksu permutacji zastępuje random.shuffle - jedna liczba
+    losowa na przebieg. Dla każdej permutacji zapisane są wartości lambda
+    wszystkich meczów grupowych (w modelach z macierzą wyników - numery par
+    drużyn), więc faza grupowa sprowadza się do odczytu jednego wiersza tablicy.
+
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param model str | StrengthTables Model siły
+    @return tuple Permutacje (P, n) oraz lambda gospodarzy i gości (P, 2, grupy, 6)
+    albo numery par (P, grupy, 6)
+    """
+    n_teams = len(ranks)
+    perms = np.array(list(itertools.permutations(range(n_teams))), dtype=np.intp)
+    groups = perms.reshape(len(perms), n_teams // 4, 4)
+    home = groups[..., [i for i, _ in GROUP_PAIRS]]
+    away = groups[..., [j for _, j in GROUP_PAIRS]]
+    if get_tables(model).rho is not None:
+        return perms, home * n_teams + away
+    lam, _ = _pair_tables(ranks, model)
+    return perms, np.stack((lam[home, away], lam[away, home]), axis=1).astype(np.float32)
+
+
+def play_knockout(rng, team1, team2, lam, pen_win, scores=None):
+    """!
+    @brief Rozgrywa mecz pucharowy w każdym przebiegu
+
+    @details Rzuty karne rozgrywane są tylko przy remisie - zwycięzca serii
+    losowany jest z dokładnego prawdopodobieństwa
+    strength_tables.shootout_win_probability().
+
+    @param rng np.random.Generator Generator liczb losowych
+    @param team1 np.ndarray Indeksy pierwszej drużyny
+    @param team2 np.ndarray Indeksy drugiej drużyny
+    @param lam np.ndarray Macierz lambda z _pair_tables()
+    @param pen_win np.ndarray Macierz wygranych karnych z _pair_tables()
+    @param scores tuple Tablice wyników z _score_aliases() (None - gole z sample_goals())
+
+    @return tuple Gole obu drużyn, zwycięzcy i przegrani
+    """
+    n_teams = lam.shape[0]
+    if scores is None:
+        flat_lam = lam.ravel()
+        g1, g2 = sample_goals(
+            rng, flat_lam.take(team1 * n_teams + team2), flat_lam.take(team2 * n_teams + team1)
+        )
+    else:
+        g1, g2 = sample_scores(rng, scores, team1 * n_teams + team2)
+    team1_wins = g1 > g2
+    draws = np.flatnonzero(g1 == g2)
+    if draws.size:
+        t1 = team1.ravel()[draws]
+        t2 = team2.ravel()[draws]
+        if isinstance(rng, CommonNoise):
+            # kształt losowania niezależny od liczby remisów - te same liczby w tych samych meczach
+            u = rng.random(team1.shape).ravel()[draws]
+        else:
+            u = rng.random(draws.size)
+        team1_wins.ravel()[draws] = u < pen_win.take(t1 * n_teams + t2)
+    return g1, g2, np.where(team1_wins, team1, team2), np.where(team1_wins, team2, team1)
+
+
+def _group_tables(points, goals, g1, g2, pairs=GROUP_PAIRS):
+    """!
+    @brief Sumuje punkty i gole meczów grupowych na pozycje w grupach
+
+    @param points np.ndarray Macierz (przebiegi, grupy, rozmiar grupy) punktów - modyfikowana
+    @param goals np.ndarray Macierz (przebiegi, grupy, rozmiar grupy) goli - modyfikowana
+    @param g1 np.ndarray Gole gospodarzy, kształt (przebiegi, grupy, len(pairs))
+    @param g2 np.ndarray Gole gości, kształt jak g1
+    @param pairs tuple Pary pozycji w grupie dla kolejnych meczów
+    """
+    draws = g1 == g2
+    pts1 = (g1 > g2) * np.int8(3) + draws
+    pts2 = (g2 > g1) * np.int8(3) + draws
+    for k, (i, j) in enumerate(pairs):
+        points[..., i] += pts1[..., k]
+        points[..., j] += pts2[..., k]
+        goals[..., i] += g1[..., k]
+        goals[..., j] += g2[..., k]
+
+
+def _group_leaders(points, goals):
+    """!
+    @brief Wyznacza dwie najlepsze drużyny każdej grupy jak main.sort_group
+
+    @details sorted(..., reverse=True) jest stabilne, więc przy równych punktach
+    i golach wyżej jest drużyna wcześniej wylosowana. Ta pozycja trafia na dwa
+    najmłodsze bity klucza - klucze są unikalne, a z maksimum można odczytać
+    pozycję drużyny bez argsort.
+
+    @param points np.ndarray Macierz (przebiegi, grupy, 4) punktów
+    @param goals np.ndarray Macierz (przebiegi, grupy, 4) goli
+    @return tuple(np.ndarray, np.ndarray) Pozycje (0-3) zwycięzcy i wicelidera grup
+    """
+    key = (points.astype(np.int16) * 64 + goals) * 4 + np.arange(3, -1, -1, dtype=np.int16)
+    keys = [key[..., i] for i in range(4)]
+    best = np.maximum(np.maximum(keys[0], keys[1]), np.maximum(keys[2], keys[3]))
+    keys = [np.where(k == best, -1, k) for k in keys]
+    runner_up = np.maximum(np.maximum(keys[0], keys[1]), np.maximum(keys[2], keys[3]))
+    return 3 - (best & 3), 3 - (runner_up & 3)
+
+
+def _group_keys(points, goals, g1, g2, pairs, tiebreak):
+    """!
+    @brief Klucze kolejności w grupach według zasady standings.GroupStandings
+
+    @details Klucz ogólny to (punkty, gole) albo dla zasady 'fifa' (punkty,
+    różnica goli, gole). Mała tabela meczów bezpośrednich liczona jest tylko
+    dla grup, w których któraś para drużyn ma równy klucz ogólny - drużyny
+    o równym kluczu tworzą jeden zbiór remisujących, więc mecz należy do ich
+    małej tabeli dokładnie wtedy, gdy klucze obu drużyn są równe. Najmłodsze
+    cyfry klucza to odwrócona pozycja w grupie (wcześniej wylosowana drużyna
+    wyżej), więc klucze są unikalne.
+
+    @param points np.ndarray Macierz (przebiegi, grupy, rozmiar grupy) punktów
+    @param goals np.ndarray Macierz punktów jak points - gole zdobyte w grupie
+    @param g1 np.ndarray Gole gospodarzy, kształt (przebiegi, grupy, len(pairs))
+    @param g2 np.ndarray Gole gości, kształt jak g1
+    @param pairs tuple Pary pozycji w grupie dla kolejnych meczów
+    @param tiebreak str Zasada z standings.TIEBREAKS
+    @return tuple(np.ndarray, np.ndarray) Klucz pełny i klucz ogólny (do porównań między grupami)
+    """
+    size = points.shape[-1]
+    position = np.arange(size - 1, -1, -1)
+    if tiebreak == 'goals':
+        overall = points.astype(np.int64) * 1024 + goals
+        return overall * size + position, overall
+
+    span = MAX_GOALS * (size - 1)  # największa liczba goli drużyny w grupie
+    conceded = np.zeros_like(goals)
+    for k, (i, j) in enumerate(pairs):
+        conceded[..., i] += g2[..., k]
+        conceded[..., j] += g1[..., k]
+
+    def criteria(pts, scored, against):
+        return (pts.astype(np.int64) * (2 * span + 1) + scored - against + span) * (span + 1) + scored
+
+    overall = criteria(points, goals, conceded)
+    stride = (3 * (size - 1) + 1) * (2 * span + 1) * (span + 1)
+    key = (overall * stride) * size + position
+
+    home = np.array([i for i, _ in pairs])
+    away = np.array([j for _, j in pairs])
+    flat_overall = overall.reshape(-1, size)
+    same = flat_overall[:, home] == flat_overall[:, away]
+    rows = np.flatnonzero(same.any(axis=1))
+    if rows.size:
+        same = same[rows]
+        h1 = g1.reshape(-1, len(pairs))[rows] * same
+        h2 = g2.reshape(-1, len(pairs))[rows] * same
+        draws = (h1 == h2) & same
+        h2h = [np.zeros((rows.size, size), dtype=np.int64) for _ in range(3)]
+        for k, (i, j) in enumerate(pairs):
+            for team, scored, against in ((i, h1[:, k], h2[:, k]), (j, h2[:, k], h1[:, k])):
+                h2h[0][:, team] += (scored > against) * 3 + draws[:, k]
+                h2h[1][:, team] += scored
+                h2h[2][:, team] += against
+        key.reshape(-1, size)[rows] += criteria(h2h[0], h2h[1], h2h[2]) * size
+    return key, overall
+
+
+def simulate_batch(ranks, runs, rng, detail=True, fmt=DEFAULT_FORMAT, model='rank', variance='plain'):
+    """!
+    @brief Rozgrywa partię turniejów w formacie domyślnym (classic8) albo w podanym formacie
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA (8 dla formatu domyślnego)
+    @param runs int Liczba turniejów w partii
+    @param rng np.random.Generator Generator liczb losowych
+    @param detail bool Czy zwracać punkty i gole drużyn (dodatkowy koszt)
+    @param fmt str | TournamentFormat | Schedule Format turnieju (formats.FORMATS)
+    @param model str | StrengthTables Model siły (strength_tables.STRENGTH_MODELS)
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS
+
+    @return dict Słownik wyników:
+    - 'podium': macierz (runs, 4) indeksów drużyn - mistrz, wicemistrz, 3. i 4. miejsce
+      (bez meczu o 3. miejsce: przegrani obu półfinałów, patrz podium_columns())
+    - 'qualifiers': macierz (runs, k) indeksów drużyn, które wyszły z grup (kolejność
+      miejsc Schedule.qualifiers)
+    - 'points': macierz (runs, n) punktów z fazy grupowej (tylko detail=True)
+    - 'goals': macierz (runs, n) wszystkich strzelonych goli (tylko detail=True)
+
+    @throws ValueError Gdy liczba drużyn nie zgadza się z formatem albo dla nieznanego trybu losowania
+    """
+    ranks = tuple(int(r) for r in ranks)
+    rng = noise_source(rng, variance)
+    schedule = compile_format(fmt)
+    if schedule is not compile_format(DEFAULT_FORMAT):
+        return simulate_format_batch(schedule, ranks, runs, rng, detail, model)
+    n_teams = len(ranks)
+    if n_teams != 8:
+        raise ValueError("Turniej wymaga dokładnie 8 drużyn.")
+    n_groups = n_teams // 4
+    lam, pen_win = _pair_tables(ranks, model)
+    scores = _score_aliases(ranks, model) if get_tables(model).rho is not None else None
+    perms, group_params = _draw_tables(ranks, model)
+
+    # random.shuffle - niezależna permutacja drużyn w każdym przebiegu
+    draw_id = rng.integers(len(perms), size=runs)
+    group_params = group_params.take(draw_id, axis=0)
+    if scores is None:
+        g1, g2 = sample_goals(rng, group_params[:, 0], group_params[:, 1])
+    else:
+        g1, g2 = sample_scores(rng, scores, group_params)
+    points = np.zeros((runs, n_groups, 4), dtype=np.int8)
+    goals = np.zeros((runs, n_groups, 4), dtype=np.int8)
+    _group_tables(points, goals, g1, g2)
+    first, second = _group_leaders(points, goals)
+
+    draw = perms.take(draw_id, axis=0)
+    offset = np.arange(0, n_teams, 4)
+    first = np.take_along_axis(draw, first + offset, axis=1)
+    second = np.take_along_axis(draw, second + offset, axis=1)
+
+    result = {}
+    if detail:
+        inverse = np.argsort(draw, axis=1)
+        result['points'] = np.take_along_axis(points.reshape(runs, n_teams), inverse, axis=1)
+        result['goals'] = np.take_along_axis(goals.reshape(runs, n_teams), inverse, axis=1)
+        flat_goals = result['goals'].ravel()
+        flat_rows = np.arange(runs)[:, None] * n_teams
+
+    def knockout(team1, team2):
+        g1, g2, winners, losers = play_knockout(rng, team1, team2, lam, pen_win, scores)
+        if detail:
+            flat_goals[flat_rows + team1] += g1
+            flat_goals[flat_rows + team2] += g2
+        return winners, losers
+
+    # półfinały: A1-B2 oraz B1-A2
+    semi_winners, semi_losers = knockout(first, second[:, ::-1])
+    third, fourth = knockout(semi_losers[:, :1], semi_losers[:, 1:])
+    champion, runner_up = knockout(semi_winners[:, :1], semi_winners[:, 1:])
+
+    result['podium'] = np.concatenate((champion, runner_up, third, fourth), axis=1)
+    result['qualifiers'] = np.concatenate((first, second), axis=1)
+    return result
+
+
+def simulate_format_batch(schedule, ranks, runs, rng, detail=True, model='rank', variance='plain'):
+    """!
+    @brief Rozgrywa partię turniejów według terminarza dowolnego formatu
+
+    @details Losowanie grup to niezależna permutacja drużyn w każdym przebiegu
+    (argsort liczb losowych). Kolejność w grupie rozstrzyga klucz z _group_keys()
+    - jak standings.GroupStandings, a najlepsze drużyny z miejsca advance+1
+    klucz ogólny i kolejność grup.
+
+    @param schedule Schedule Terminarz z formats.compile_format()
+    @param ranks tuple Pozycje drużyn w rankingu FIFA
+    @param runs int Liczba turniejów w partii
+    @param rng np.random.Generator Generator liczb losowych
+    @param detail bool Czy zwracać punkty i gole drużyn
+    @param model str | StrengthTables Model siły
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS
+
+    @return dict Słownik wyników jak simulate_batch()
+
+    @throws ValueError Gdy liczba drużyn nie zgadza się z formatem albo dla nieznanego trybu losowania
+    """
+    rng = noise_source(rng, variance)
+    fmt = schedule.fmt
+    n_teams, n_groups, size = fmt.teams, fmt.groups, schedule.group_size
+    if len(ranks) != n_teams:
+        raise ValueError(f"Format {fmt.name} wymaga {n_teams} drużyn, podano {len(ranks)}.")
+    lam, pen_win = _pair_tables(tuple(ranks), model)
+    scores = _score_aliases(tuple(ranks), model) if get_tables(model).rho is not None else None
+
+    draw = np.argsort(rng.random((runs, n_teams)), axis=1)
+    groups = draw.reshape(runs, n_groups, size)
+    home = groups[..., [i for i, _ in schedule.group_pairs]]
+    away = groups[..., [j for _, j in schedule.group_pairs]]
+    if scores is None:
+        flat_lam = lam.ravel().astype(np.float32)
+        g1, g2 = sample_goals(rng, flat_lam.take(home * n_teams + away), flat_lam.take(away * n_teams + home))
+    else:
+        g1, g2 = sample_scores(rng, scores, home * n_teams + away)
+    points = np.zeros((runs, n_groups, size), dtype=np.int16)
+    goals = np.zeros((runs, n_groups, size), dtype=np.int16)
+    _group_tables(points, goals, g1, g2, schedule.group_pairs)
+
+    key, overall = _group_keys(points, goals, g1, g2, schedule.group_pairs, fmt.tiebreak)
+    order = np.argsort(-key, axis=-1)
+    standings = np.take_along_axis(groups, order, axis=-1)
+
+    result = {}
+    if detail:
+        inverse = np.argsort(draw, axis=1)
+        result['points'] = np.take_along_axis(points.reshape(runs, n_teams), inverse, axis=1)
+        result['goals'] = np.take_along_axis(goals.reshape(runs, n_teams), inverse, axis=1)
+        flat_goals = result['goals'].ravel()
+        flat_rows = np.arange(runs)[:, None] * n_teams
+
+    slots = np.empty((runs, len(schedule.qualifiers)), dtype=np.intp)
+    group_index = {name: g for g, name in enumerate(schedule.group_names)}
+    if fmt.best_thirds:
+        place_key = np.take_along_axis(overall, order[..., fmt.advance:fmt.advance + 1], axis=-1)[..., 0]
+        place_key = place_key * n_groups + np.arange(n_groups - 1, -1, -1)
+        best = np.argsort(-place_key, axis=1)[:, :fmt.best_thirds]
+        thirds = np.take_along_axis(standings[..., fmt.advance], best, axis=1)
+    for slot, (group, place) in enumerate(schedule.qualifiers):
+        if group == 'T':
+            slots[:, slot] = thirds[:, place - 1]
+        else:
+            slots[:, slot] = standings[:, group_index[group], place - 1]
+
+    def knockout(team1, team2):
+        g1, g2, winners, losers = play_knockout(rng, team1, team2, lam, pen_win, scores)
+        if detail:
+            flat_goals[flat_rows + team1] += g1
+            flat_goals[flat_rows + team2] += g2
+        return winners, losers
+
+    first = np.array(schedule.first_round, dtype=np.intp)
+    team1, team2 = slots[:, first[:, 0]], slots[:, first[:, 1]]
+    while team1.shape[1] > 1:
+        winners, losers = knockout(team1, team2)
+        team1, team2 = winners[:, 0::2], winners[:, 1::2]
+    if fmt.third_place:
+        third, fourth = knockout(losers[:, :1], losers[:, 1:])
+    else:
+        third, fourth = losers[:, :1], losers[:, 1:]  # wspólne miejsce SEMIFINAL
+    champion, runner_up = knockout(team1, team2)
+
+    result['podium'] = np.concatenate((champion, runner_up, third, fourth), axis=1)
+    result['qualifiers'] = slots
+    return result
+
+
+def podium_to_places(podium, n_teams, fmt=DEFAULT_FORMAT):
+    """!
+    @brief Zamienia macierz podium na miejsca wszystkich drużyn
+
+    @param podium np.ndarray Macierz (runs, 4) z simulate_batch()
+    @param n_teams int Liczba drużyn w turnieju
+    @param fmt str | TournamentFormat | Schedule Format turnieju (podium_columns())
+    @return np.ndarray Macierz (runs, n_teams) indeksów miejsc (kolumn place_labels())
+    """
+    columns = podium_columns(fmt)
+    places = np.full((podium.shape[0], n_teams), columns[-1] + 1, dtype=np.int8)
+    np.put_along_axis(places, podium, np.array(columns, dtype=np.int8), axis=1)
+    return places
+
+
+def count_places(podium, n_teams, fmt=DEFAULT_FORMAT):
+    """!
+    @brief Liczniki miejsc drużyn z macierzy podium
+
+    @param podium np.ndarray Macierz (runs, 4) z simulate_batch()
+    @param n_teams int Liczba drużyn w turnieju
+    @param fmt str | TournamentFormat | Schedule Format turnieju
+    @return np.ndarray Macierz (n_teams, len(place_labels(fmt))) liczby turniejów na każdym miejscu
+    """
+    columns = podium_columns(fmt)
+    counts = np.zeros((n_teams, columns[-1] + 2), dtype=np.int64)
+    for column, place in enumerate(columns):
+        counts[:, place] += np.bincount(podium[:, column], minlength=n_teams)
+    counts[:, -1] = len(podium) - counts[:, :-1].sum(axis=1)
+    return counts
+
+
+def place_probabilities(ranks, runs, rng=None, batch_size=100_000, fmt=DEFAULT_FORMAT, model='rank',
+                        variance='plain'):
+    """!
+    @brief Szacuje prawdopodobieństwa miejsc metodą Monte Carlo
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA
+    @param runs int Łączna liczba symulowanych turniejów
+    @param rng np.random.Generator Generator liczb losowych (domyślnie nowy)
+    @param batch_size int Maksymalna liczba turniejów w jednej partii
+    @param fmt str | TournamentFormat Format turnieju
+    @param model str | StrengthTables Model siły
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS (pary antytetyczne
+    i warstwy obejmują jedną partię)
+
+    @return np.ndarray Macierz (n, len(place_labels(fmt))) prawdopodobieństw miejsc
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n_teams = len(ranks)
+    counts = np.zeros((n_teams, len(place_labels(fmt))), dtype=np.int64)
+    done = 0
+    while done < runs:
+        size = min(batch_size, runs - done)
+        podium = simulate_batch(ranks, size, rng, detail=False, fmt=fmt, model=model, variance=variance)['podium']
+        counts += count_places(podium, n_teams, fmt)
+        done += size
+    return counts / runs
+
+
+def simulate_tournaments(teams, runs, seed=None, batch_size=100_000, fmt=DEFAULT_FORMAT, model='rank',
+                         variance='plain'):
+    """!
+    @brief Szacuje szanse drużyn na poszczególne miejsca w turnieju
+
+    @param teams List[Team] Lista drużyn (8 dla formatu domyślnego)
+    @param runs int Liczba symulowanych turniejów
+    @param seed int Ziarno generatora (None - losowe)
+    @param batch_size int Maksymalna liczba turniejów w jednej partii
+    @param fmt str | TournamentFormat Format turnieju (formats.FORMATS)
+    @param model str | StrengthTables Model siły (strength_tables.STRENGTH_MODELS)
+    @param variance str Tryb losowania z variance.VARIANCE_REDUCTIONS
+
+    @return dict Słownik {nazwa_drużyny: {miejsce: prawdopodobieństwo}}
+    """
+    probs = place_probabilities(
+        [t.fifa_rank for t in teams], runs, np.random.default_rng(seed), batch_size, fmt, model, variance
+    )
+    labels = place_labels(fmt)
+    return {
+        team.name: dict(zip(labels, row.tolist()))
+        for team, row in zip(teams, probs)
+    }
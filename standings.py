@@ -0,0 +1,169 @@
+"""!
+@brief Tabela grupy aktualizowana po każdym meczu, z kryteriami rozstrzygania remisów
+
+Moduł zawiera:
+- Klasa GroupStandings: punkty, gole zdobyte i stracone oraz wyniki meczów grupy
+- Stałe TIEBREAKS: dostępne zasady ustalania kolejności
+
+Zasady kolejności:
+- 'goals': punkty, gole zdobyte (zasada formatu classic8 z main.main(),
+  odtwarzana dokładnie przez exact_probabilities)
+- 'fifa': punkty, różnica goli, gole zdobyte; dla drużyn nadal równych -
+  mała tabela ich wzajemnych meczów (punkty, różnica goli, gole), punkty
+  fair play i losowanie
+
+Tabela nie jest sortowana po każdym meczu: record() tylko dodaje wynik,
+a kolejność liczona jest przy pierwszym odczycie i zapamiętywana do
+następnego wyniku. Mała tabela meczów bezpośrednich liczona jest wyłącznie
+dla drużyn, które po kryteriach ogólnych pozostają równe.
+
+Losowanie zastępuje kolejność drużyn w grupie - jest ona losowa (losowanie
+grup), więc kolejne losowania nie są potrzebne, a wyniki nie zależą od
+dodatkowych liczb losowych.
+"""
+
+import itertools
+
+TIEBREAKS = ('goals', 'fifa')  #!< Zasady ustalania kolejności w grupie
+DEFAULT_TIEBREAK = 'fifa'      #!< Zasada domyślna dla nowych formatów turnieju
+
+
+def _points(goals, goals_against):
+    return 3 if goals > goals_against else 1 if goals == goals_against else 0
+
+
+class GroupStandings:
+    """!
+    @brief Tabela jednej grupy
+
+    Drużyny identyfikowane są pozycją w grupie (kolejność losowania),
+    a obiekty drużyn są tylko zwracane przez ranked().
+    """
+
+    __slots__ = ('teams', 'points', 'scored', 'conceded', 'fair_play', 'results', '_order')
+
+    def __init__(self, teams):
+        """!
+        @brief Tworzy pustą tabelę
+
+        @param teams List Drużyny grupy w kolejności losowania
+        """
+        size = len(teams)
+        self.teams = list(teams)
+        self.points = [0] * size
+        self.scored = [0] * size
+        self.conceded = [0] * size
+        self.fair_play = [0] * size  #!< Punkty fair play (kartki), 0 lub ujemne
+        self.results = []             #!< Wyniki meczów (i, j, gole i, gole j)
+        self._order = None
+
+    def record(self, i, j, goals_i, goals_j):
+        """!
+        @brief Dodaje wynik meczu grupowego
+
+        @param i int Pozycja gospodarza w grupie
+        @param j int Pozycja gościa w grupie
+        @param goals_i int Gole gospodarza
+        @param goals_j int Gole gościa
+        """
+        self.points[i] += _points(goals_i, goals_j)
+        self.points[j] += _points(goals_j, goals_i)
+        self.scored[i] += goals_i
+        self.scored[j] += goals_j
+        self.conceded[i] += goals_j
+        self.conceded[j] += goals_i
+        self.results.append((i, j, goals_i, goals_j))
+        self._order = None
+
+    def penalize(self, i, points):
+        """!
+        @brief Odejmuje drużynie punkty fair play (np. 1 za żółtą kartkę)
+
+        @param i int Pozycja drużyny w grupie
+        @param points int Liczba punktów karnych
+        """
+        self.fair_play[i] -= points
+        self._order = None
+
+    def goal_difference(self, i):
+        """!
+        @brief Różnica goli drużyny
+
+        @param i int Pozycja drużyny w grupie
+        @return int Gole zdobyte minus stracone
+        """
+        return self.scored[i] - self.conceded[i]
+
+    def key(self, i, rule=DEFAULT_TIEBREAK):
+        """!
+        @brief Kryteria ogólne drużyny (bez meczów bezpośrednich)
+
+        @details Służy także do porównywania drużyn z różnych grup, np.
+        najlepszych trzecich miejsc.
+
+        @param i int Pozycja drużyny w grupie
+        @param rule str Zasada z TIEBREAKS
+        @return tuple Klucz - większy oznacza wyższe miejsce
+        """
+        if rule == 'goals':
+            return (self.points[i], self.scored[i])
+        return (self.points[i], self.scored[i] - self.conceded[i], self.scored[i], self.fair_play[i])
+
+    def head_to_head(self, tied):
+        """!
+        @brief Mała tabela meczów między podanymi drużynami
+
+        @param tied Iterable[int] Pozycje drużyn w grupie
+        @return dict {pozycja: (punkty, różnica goli, gole)}
+        """
+        tied = set(tied)
+        table = {i: [0, 0, 0] for i in tied}
+        for i, j, goals_i, goals_j in self.results:
+            if i in tied and j in tied:
+                row_i, row_j = table[i], table[j]
+                row_i[0] += _points(goals_i, goals_j)
+                row_j[0] += _points(goals_j, goals_i)
+                row_i[1] += goals_i - goals_j
+                row_j[1] += goals_j - goals_i
+                row_i[2] += goals_i
+                row_j[2] += goals_j
+        return {i: tuple(row) for i, row in table.items()}
+
+    def order(self, rule=DEFAULT_TIEBREAK):
+        """!
+        @brief Pozycje drużyn od pierwszego miejsca
+
+        @param rule str Zasada z TIEBREAKS
+        @return List[int] Pozycje drużyn w grupie
+
+        @throws ValueError Dla nieznanej zasady
+        """
+        if self._order is not None and self._order[0] == rule:
+            return self._order[1]
+        if rule not in TIEBREAKS:
+            raise ValueError(f"Nieznana zasada kolejności: {rule}. Dostępne: {', '.join(TIEBREAKS)}.")
+
+        # sortowanie stabilne - przy pełnym remisie wyżej drużyna wcześniej wylosowana
+        if rule == 'goals':
+            order = sorted(range(len(self.teams)), key=lambda i: self.key(i, rule), reverse=True)
+        else:
+            overall = [(p, s - c, s) for p, s, c in zip(self.points, self.scored, self.conceded)]
+            order = []
+            for _, run in itertools.groupby(sorted(range(len(overall)), key=overall.__getitem__, reverse=True),
+                                            key=overall.__getitem__):
+                run = list(run)
+                if len(run) > 1:
+                    h2h = self.head_to_head(run)
+                    run.sort(key=lambda i: h2h[i] + (self.fair_play[i],), reverse=True)
+                order.extend(run)
+        self._order = (rule, order)
+        return order
+
+    def ranked(self, rule=DEFAULT_TIEBREAK):
+        """!
+        @brief Drużyny od pierwszego miejsca
+
+        @param rule str Zasada z TIEBREAKS
+        @return List Drużyny w kolejności tabeli
+        """
+        return [self.teams[i] for i in self.order(rule)]
@@ -0,0 +1,182 @@
+"""!
+@brief Zwarta reprezentacja stanu drużyn i wyników meczów
+
+Moduł zawiera:
+- Klasa TeamTable: tabela drużyn w układzie kolumnowym (struct-of-arrays)
+- Klasa MatchLog: prealokowany bufor wyników meczów
+
+Obiekty models.Team i models.Match mogą być widokami na wiersze tych tabel -
+wtedy punkty, gole i wyniki trafiają bezpośrednio do kolumn, a kolejne
+symulacje zerują tabelę zamiast kopiować lub tworzyć drużyny od nowa.
+
+Kolumny to array.array (odczyt zwraca zwykłe int), a np.frombuffer daje
+do nich widoki NumPy bez kopiowania.
+
+@requires array
+@requires numpy
+"""
+
+from array import array
+
+import numpy as np
+
+MATCH_DTYPE = np.dtype([
+    ('team1', np.int16), ('team2', np.int16), ('phase', np.int8),
+    ('g1', np.int8), ('g2', np.int8), ('p1', np.int8), ('p2', np.int8),
+])
+"""!Rekord wyniku meczu (9 bajtów); p1 = p2 = -1 oznacza brak rzutów karnych"""
+
+
+class TeamTable:
+    """!
+    @brief Tabela drużyn przechowywana kolumnami o stałej pojemności
+
+    Wiersz i odpowiada drużynie; kolumny fifa_rank, points i goals są typu
+    array.array('h').
+    """
+
+    __slots__ = ('names', 'fifa_rank', 'points', 'goals', 'capacity')
+
+    def __init__(self, capacity):
+        """!
+        @brief Alokuje tabelę o podanej pojemności
+
+        @param capacity int Maksymalna liczba drużyn
+        """
+        self.capacity = capacity
+        self.names = []
+        self.fifa_rank = array('h', bytes(2 * capacity))
+        self.points = array('h', bytes(2 * capacity))
+        self.goals = array('h', bytes(2 * capacity))
+
+    def __len__(self):
+        """!
+        @brief Liczba drużyn w tabeli
+        """
+        return len(self.names)
+
+    def add(self, name, fifa_rank, points=0, goals=0):
+        """!
+        @brief Dodaje drużynę do tabeli
+
+        @param name str Nazwa drużyny
+        @param fifa_rank int Pozycja w rankingu FIFA
+        @param points int Punkty początkowe
+        @param goals int Gole początkowe
+        @return int Numer wiersza drużyny
+
+        @throws ValueError Gdy tabela jest pełna
+        """
+        row = len(self.names)
+        if row >= self.capacity:
+            raise ValueError(f"Tabela drużyn jest pełna (pojemność {self.capacity}).")
+        self.names.append(name)
+        self.fifa_rank[row] = fifa_rank
+        self.points[row] = points
+        self.goals[row] = goals
+        return row
+
+    def reset(self):
+        """!
+        @brief Zeruje punkty i gole wszystkich drużyn przed kolejną symulacją
+        """
+        size = len(self.names)
+        self.points[:size] = array('h', bytes(2 * size))
+        self.goals[:size] = array('h', bytes(2 * size))
+
+    def arrays(self):
+        """!
+        @brief Widoki NumPy na kolumny (bez kopiowania danych)
+
+        @return dict Słownik {'fifa_rank', 'points', 'goals'} tablic int16 o długości len(self)
+        """
+        size = len(self.names)
+        return {
+            column: np.frombuffer(getattr(self, column), dtype=np.int16)[:size]
+            for column in ('fifa_rank', 'points', 'goals')
+        }
+
+
+class MatchLog:
+    """!
+    @brief Prealokowany bufor wyników meczów
+
+    Każdy mecz zajmuje jeden wiersz w kolumnach team1, team2, phase, g1, g2,
+    p1, p2. Bufor jest czyszczony metodą clear() bez zwalniania pamięci.
+    """
+
+    __slots__ = ('team1', 'team2', 'phase', 'g1', 'g2', 'p1', 'p2', 'size', 'capacity', 'phases', '_phase_codes')
+
+    def __init__(self, capacity):
+        """!
+        @brief Alokuje bufor na podaną liczbę meczów
+
+        @param capacity int Maksymalna liczba meczów
+        """
+        self.capacity = capacity
+        self.size = 0
+        self.team1 = array('h', bytes(2 * capacity))
+        self.team2 = array('h', bytes(2 * capacity))
+        for column in ('phase', 'g1', 'g2', 'p1', 'p2'):
+            setattr(self, column, array('b', bytes(capacity)))
+        self.phases = []
+        self._phase_codes = {}
+
+    def __len__(self):
+        """!
+        @brief Liczba zapisanych meczów
+        """
+        return self.size
+
+    def phase_code(self, phase):
+        """!
+        @brief Zwraca numer fazy turnieju zapisywany w kolumnie phase
+
+        @param phase str Nazwa fazy (np. "Grupa A", "Finał")
+        @return int Numer fazy
+        """
+        code = self._phase_codes.get(phase)
+        if code is None:
+            code = self._phase_codes[phase] = len(self.phases)
+            self.phases.append(phase)
+        return code
+
+    def append(self, team1, team2, phase):
+        """!
+        @brief Rezerwuje wiersz na wynik meczu
+
+        @param team1 int Wiersz pierwszej drużyny w TeamTable (-1 gdy brak)
+        @param team2 int Wiersz drugiej drużyny w TeamTable (-1 gdy brak)
+        @param phase str Nazwa fazy turnieju
+        @return int Numer wiersza meczu
+
+        @throws ValueError Gdy bufor jest pełny
+        """
+        slot = self.size
+        if slot >= self.capacity:
+            raise ValueError(f"Bufor meczów jest pełny (pojemność {self.capacity}).")
+        self.size += 1
+        self.team1[slot] = team1
+        self.team2[slot] = team2
+        self.phase[slot] = self.phase_code(phase)
+        self.g1[slot] = self.g2[slot] = 0
+        self.p1[slot] = self.p2[slot] = -1
+        return slot
+
+    def clear(self):
+        """!
+        @brief Opróżnia bufor przed kolejną symulacją (bez realokacji)
+        """
+        self.size = 0
+
+    def to_records(self):
+        """!
+        @brief Kopiuje zapisane mecze do tablicy rekordów MATCH_DTYPE
+
+        @return np.ndarray Tablica strukturalna o długości len(self)
+        """
+        records = np.empty(self.size, dtype=MATCH_DTYPE)
+        for column in MATCH_DTYPE.names:
+            dtype = MATCH_DTYPE[column]
+            records[column] = np.frombuffer(getattr(self, column), dtype=dtype)[:self.size]
+        return records
@@ -6,17 +6,47 @@ Moduł zawiera funkcje do:
 - Generowania wykresów
 - Tworzenia raportów
 
-@requires matplotlib.pyplot
+Statystyki liczone są na tablicach NumPy (team_arrays(), compute_stats()) -
+dla jednego turnieju (kształt (drużyny,)) albo wielu turniejów naraz
+(kształt (turnieje, drużyny)). Rysowanie wykresów jest osobnym etapem:
+chart_specs() opisuje wykresy zwykłymi danymi, a render_charts() rysuje je
+wszystkie w jednym przebiegu z nieinteraktywnym backendem, także w procesie
+w tle (render_in_background()).
+
+matplotlib importowany jest dopiero przy rysowaniu pierwszego wykresu (_pyplot()),
+więc obliczanie statystyk nie wymaga tej biblioteki.
+
 @requires numpy
+@requires matplotlib.pyplot
 @requires functools.reduce
 """
 
 from functools import reduce
-import matplotlib.pyplot as plt
-import numpy as np
 from typing import List
+import numpy as np
 from models import Team
 
+plt = None  #!< Moduł matplotlib.pyplot - ustawiany przy pierwszym użyciu przez _pyplot()
+
+RENDER_BACKEND = 'Agg'  #!< Nieinteraktywny backend matplotlib do zapisu wykresów w plikach
+
+
+def _pyplot(backend=None):
+    """!
+    @brief Zwraca moduł matplotlib.pyplot, importując go przy pierwszym wywołaniu
+
+    @param backend str Backend ustawiany przed importem pyplot (domyślnie bez zmian)
+    @return module matplotlib.pyplot
+    """
+    global plt
+    if plt is None:
+        if backend is not None:
+            import matplotlib
+            matplotlib.use(backend)
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return plt
+
 def get_total_goals(teams: List[Team]) -> int:
     """!
     @brief Oblicza łączną liczbę goli w turnieju
@@ -55,28 +85,115 @@ def get_top_scorers(teams: List[Team], top_n: int = 5) -> List[Team]:
     """
     return sorted(teams, key=lambda t: t.goals, reverse=True)[:top_n]
 
-def plot_goals_distribution(teams: List[Team]):
+def team_arrays(teams: List[Team]) -> dict:
     """!
-    @brief Generuje i zapisuje wykres słupkowy rozkładu goli
-
-    @details Wykres zawiera:
-    - Słupki przedstawiające liczbę goli każdej drużyny
-    - Etykiety z dokładnymi wartościami nad słupkami
-    - Automatyczne dopasowanie rozmiaru wykresu
+    @brief Zamienia listę drużyn na tablice NumPy
 
     @param teams List[Team] Lista obiektów Team
+    @return dict Słownik {'names': List[str], 'fifa_rank', 'points', 'goals': np.ndarray}
     """
-    teams_sorted = sorted(teams, key=lambda t: t.goals, reverse=True)
-    names = [t.name for t in teams_sorted]
-    goals = [t.goals for t in teams_sorted]
+    return {
+        'names': [t.name for t in teams],
+        'fifa_rank': np.array([t.fifa_rank for t in teams], dtype=np.int64),
+        'points': np.array([t.points for t in teams], dtype=np.int64),
+        'goals': np.array([t.goals for t in teams], dtype=np.int64),
+    }
+
+def top_indices(values, n: int, *tiebreaks) -> np.ndarray:
+    """!
+    @brief Indeksy n największych wartości w kolejności malejącej
+
+    @details Kandydaci wybierani są przez np.argpartition, a sortowana jest
+    tylko ta część. Remisy rozstrzygają kolejne kryteria (tiebreaks), a na
+    końcu mniejszy indeks - jak w stabilnym sorted(..., reverse=True).
+
+    @param values np.ndarray Wartości (oś 0)
+    @param n int Liczba zwracanych indeksów
+    @param tiebreaks np.ndarray Dodatkowe kryteria (większe lepsze) dla remisów
+    @return np.ndarray Indeksy najlepszych elementów
+    """
+    values = np.asarray(values)
+    n = min(n, len(values))
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    keys = [values] + [np.asarray(t) for t in tiebreaks]
+    if n < len(values):
+        kth = values[np.argpartition(-values, n - 1)[:n]].min()
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort([candidates] + [-k[candidates] for k in reversed(keys)])
+    return candidates[order[:n]]
+
+def rank_correlation(ranks, values) -> float:
+    """!
+    @brief Współczynnik korelacji Pearsona między pozycją w rankingu a wynikiem
+
+    @details Ujemna wartość oznacza, że drużyny wyżej w rankingu (mniejsza
+    pozycja) osiągają lepsze wyniki.
+
+    @param ranks np.ndarray Pozycje drużyn w rankingu FIFA
+    @param values np.ndarray Wyniki drużyn (punkty lub gole)
+    @return float Korelacja lub 0.0, gdy jedna z wielkości jest stała
+    """
+    ranks = np.asarray(ranks, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if ranks.std() == 0 or values.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ranks, values)[0, 1])
+
+def compute_stats(ranks, points, goals, names=None, top_n: int = 5) -> dict:
+    """!
+    @brief Statystyki jednego lub wielu turniejów liczone na tablicach
+
+    @details Dla tablic (turnieje, drużyny) sumy i średnie liczone są na turniej,
+    a najlepsze drużyny i korelacje - dla średnich wyników drużyn.
+
+    @param ranks np.ndarray Pozycje drużyn w rankingu FIFA, kształt (drużyny,)
+    @param points np.ndarray Punkty drużyn, kształt (drużyny,) lub (turnieje, drużyny)
+    @param goals np.ndarray Gole drużyn, kształt jak points
+    @param names List[str] Nazwy drużyn (domyślnie numery)
+    @param top_n int Liczba drużyn w listach najlepszych
+    @return dict Słownik:
+    - 'runs': liczba turniejów
+    - 'total_goals', 'average_goals_per_team': gole w turnieju (średnio na turniej)
+    - 'team_points', 'team_goals': średnie punkty i gole drużyn
+    - 'top_scorers': indeksy drużyn z największą liczbą goli
+    - 'best_performance': indeksy drużyn według (punkty, gole)
+    - 'rank_points_correlation', 'rank_goals_correlation': korelacje z rankingiem
+    """
+    points = np.asarray(points)
+    goals = np.asarray(goals)
+    if goals.ndim == 1:
+        points, goals = points[None], goals[None]
+    runs, n_teams = goals.shape
+    team_points = points.mean(axis=0)
+    team_goals = goals.mean(axis=0)
+    total = goals.sum() / runs if runs else 0
+    return {
+        'names': list(names) if names is not None else [str(i + 1) for i in range(n_teams)],
+        'runs': runs,
+        'total_goals': total,
+        'average_goals_per_team': total / n_teams if n_teams else 0,
+        'team_points': team_points,
+        'team_goals': team_goals,
+        'top_scorers': top_indices(team_goals, top_n),
+        'best_performance': top_indices(team_points, top_n, team_goals),
+        'rank_points_correlation': rank_correlation(ranks, team_points),
+        'rank_goals_correlation': rank_correlation(ranks, team_goals),
+    }
 
+def _draw_goals_distribution(plt, names, goals, filename):
+    """!
+    @brief Rysuje wykres słupkowy rozkładu goli (drużyny w kolejności podanej)
+    """
     plt.figure(figsize=(12, 6))
     bars = plt.bar(names, goals, color='skyblue')
 
     for bar in bars:
         height = bar.get_height()
         plt.text(bar.get_x() + bar.get_width()/2., height,
-                 f'{int(height)}',
+                 f'{int(height)}' if float(height).is_integer() else f'{height:.2f}',
                  ha='center', va='bottom')
 
     plt.title('Rozkład goli drużyn w turnieju', fontsize=14)
@@ -84,27 +201,13 @@ def plot_goals_distribution(teams: List[Team]):
     plt.ylabel('Liczba goli', fontsize=12)
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.savefig('goals_distribution.png')
+    plt.savefig(filename)
     plt.close()
 
-def plot_rank_vs_performance(teams: List[Team]):
+def _draw_rank_vs_performance(plt, names, ranks, points, goals, filename, dpi=300):
     """!
-    @brief Generuje wykres porównujący ranking FIFA z osiągnięciami
-
-    @details Tworzy podwójny wykres punktowy:
-    1. Ranking FIFA vs punkty w turnieju
-    2. Ranking FIFA vs liczba goli
-    Zawiera etykiety z nazwami drużyn.
-
-    @param teams List[Team] Lista obiektów Team
-    @post Zapisuje wykres do pliku rank_vs_performance.png
+    @brief Rysuje podwójny wykres punktowy ranking FIFA vs punkty i gole
     """
-    teams_sorted = sorted(teams, key=lambda t: t.fifa_rank)
-    ranks = [t.fifa_rank for t in teams_sorted]
-    points = [t.points for t in teams_sorted]
-    goals = [t.goals for t in teams_sorted]
-    names = [t.name for t in teams_sorted]
-
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
 
     # Wykres punktów vs ranking
@@ -141,10 +244,110 @@ def plot_rank_vs_performance(teams: List[Team]):
                      alpha=0.7)
 
     plt.tight_layout()
-    plt.savefig('rank_vs_performance.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+_DRAW = {
+    'goals_distribution': _draw_goals_distribution,
+    'rank_vs_performance': _draw_rank_vs_performance,
+}
+"""!Rodzaje wykresów: nazwa -> funkcja rysująca (pierwszy argument to pyplot)"""
+
+def chart_specs(names, ranks, points, goals, prefix: str = '') -> List[dict]:
+    """!
+    @brief Opisuje wykresy raportu zwykłymi danymi (do przekazania innemu procesowi)
+
+    @param names List[str] Nazwy drużyn
+    @param ranks np.ndarray Pozycje drużyn w rankingu FIFA
+    @param points np.ndarray Punkty drużyn (np. średnie z compute_stats())
+    @param goals np.ndarray Gole drużyn
+    @param prefix str Przedrostek nazw plików (np. katalog)
+    @return List[dict] Opisy wykresów {'kind', 'filename', ...argumenty rysowania}
+    """
+    ranks = np.asarray(ranks)
+    points = np.asarray(points)
+    goals = np.asarray(goals)
+    by_goals = np.argsort(-goals, kind='stable')
+    by_rank = np.argsort(ranks, kind='stable')
+    return [
+        {
+            'kind': 'goals_distribution',
+            'filename': f'{prefix}goals_distribution.png',
+            'names': [names[i] for i in by_goals],
+            'goals': goals[by_goals].tolist(),
+        },
+        {
+            'kind': 'rank_vs_performance',
+            'filename': f'{prefix}rank_vs_performance.png',
+            'names': [names[i] for i in by_rank],
+            'ranks': ranks[by_rank].tolist(),
+            'points': points[by_rank].tolist(),
+            'goals': goals[by_rank].tolist(),
+        },
+    ]
+
+def render_charts(specs: List[dict], backend: str = RENDER_BACKEND) -> List[str]:
+    """!
+    @brief Rysuje wszystkie opisane wykresy w jednym przebiegu
+
+    @param specs List[dict] Opisy wykresów z chart_specs()
+    @param backend str Backend matplotlib ustawiany przy pierwszym imporcie pyplot
+    @return List[str] Nazwy zapisanych plików
+    """
+    plt = _pyplot(backend)
+    for spec in specs:
+        args = {key: value for key, value in spec.items() if key != 'kind'}
+        _DRAW[spec['kind']](plt, **args)
+    return [spec['filename'] for spec in specs]
+
+def render_in_background(specs: List[dict], backend: str = RENDER_BACKEND):
+    """!
+    @brief Rysuje wykresy w osobnym procesie, nie blokując wywołującego
+
+    @param specs List[dict] Opisy wykresów z chart_specs()
+    @param backend str Backend matplotlib w procesie rysującym
+    @return concurrent.futures.Future Wynik render_charts() (lista plików)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=1)
+    future = executor.submit(render_charts, specs, backend)
+    executor.shutdown(wait=False)
+    return future
+
+def plot_goals_distribution(teams: List[Team]):
+    """!
+    @brief Generuje i zapisuje wykres słupkowy rozkładu goli
+
+    @details Wykres zawiera:
+    - Słupki przedstawiające liczbę goli każdej drużyny
+    - Etykiety z dokładnymi wartościami nad słupkami
+    - Automatyczne dopasowanie rozmiaru wykresu
+
+    @param teams List[Team] Lista obiektów Team
+    """
+    teams_sorted = sorted(teams, key=lambda t: t.goals, reverse=True)
+    _draw_goals_distribution(_pyplot(), [t.name for t in teams_sorted], [t.goals for t in teams_sorted],
+                             'goals_distribution.png')
 
-def generate_stats_report(teams: List[Team]) -> dict:
+def plot_rank_vs_performance(teams: List[Team]):
+    """!
+    @brief Generuje wykres porównujący ranking FIFA z osiągnięciami
+
+    @details Tworzy podwójny wykres punktowy:
+    1. Ranking FIFA vs punkty w turnieju
+    2. Ranking FIFA vs liczba goli
+    Zawiera etykiety z nazwami drużyn.
+
+    @param teams List[Team] Lista obiektów Team
+    @post Zapisuje wykres do pliku rank_vs_performance.png
+    """
+    teams_sorted = sorted(teams, key=lambda t: t.fifa_rank)
+    _draw_rank_vs_performance(_pyplot(), [t.name for t in teams_sorted], [t.fifa_rank for t in teams_sorted],
+                              [t.points for t in teams_sorted], [t.goals for t in teams_sorted],
+                              'rank_vs_performance.png')
+
+def generate_stats_report(teams: List[Team], plots: bool = True, background: bool = False) -> dict:
     """!
     @brief Generuje kompleksowy raport statystyczny
 
@@ -152,25 +355,36 @@ def generate_stats_report(teams: List[Team]) -> dict:
     - Łączną i średnią liczbę goli
     - Listę najlepszych strzelców
     - Listę drużyn z najlepszymi wynikami względem rankingu
-    - Automatycznie generuje wykresy
-
-    @param teams List[Team] Lista obiektów Team
+    - Korelacje pozycji w rankingu z punktami i golami
+    - Automatycznie generuje wykresy (o ile plots=True)
 
+    Statystyki liczy compute_stats(), a wykresy rysuje render_charts() - przy
+    background=True w osobnym procesie, a raport zawiera wtedy klucz
+    'render' z obiektem Future.
 
+    @param teams List[Team] Lista obiektów Team
+    @param plots bool Czy zapisać wykresy (domyślnie True)
+    @param background bool Czy rysować wykresy w tle (domyślnie False)
     """
+    arrays = team_arrays(teams)
+    stats = compute_stats(arrays['fifa_rank'], arrays['points'], arrays['goals'], arrays['names'])
     report = {
-        'total_goals': get_total_goals(teams),
-        'average_goals_per_team': round(get_average_goals_per_team(teams), 2),
-        'top_scorers': [(t.name, t.goals) for t in get_top_scorers(teams)],
-        'best_performance_by_rank': sorted(
-            teams,
-            key=lambda t: (t.points, t.goals),
-            reverse=True
-        )[:5]
+        'total_goals': int(stats['total_goals']),
+        'average_goals_per_team': round(stats['average_goals_per_team'], 2),
+        'top_scorers': [(teams[i].name, teams[i].goals) for i in stats['top_scorers']],
+        'best_performance_by_rank': [teams[i] for i in stats['best_performance']],
+        'rank_points_correlation': round(stats['rank_points_correlation'], 3),
+        'rank_goals_correlation': round(stats['rank_goals_correlation'], 3),
     }
 
-    plot_goals_distribution(teams)
-    plot_rank_vs_performance(teams)
+    report['plots'] = []
+    if plots:
+        specs = chart_specs(arrays['names'], arrays['fifa_rank'], arrays['points'], arrays['goals'])
+        if background:
+            report['render'] = render_in_background(specs)
+            report['plots'] = [spec['filename'] for spec in specs]
+        else:
+            report['plots'] = render_charts(specs)
 
     return report
 
@@ -192,6 +406,8 @@ def print_stats_report(report: dict):
     for team in report['best_performance_by_rank']:
         print(f"- {team.name} (rank {team.fifa_rank}): {team.points} pkt, {team.goals} goli")
 
-    print("\nWykresy statystyczne zostały zapisane jako:")
-    print("- goals_distribution.png")
-    print("- rank_vs_performance.png")
\ No newline at end of file
+    plots = report.get('plots', ['goals_distribution.png', 'rank_vs_performance.png'])
+    if plots:
+        print("\nWykresy statystyczne zostały zapisane jako:")
+        for filename in plots:
+            print(f"- {filename}")
\ No newline at end of file
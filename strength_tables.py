@@ -0,0 +1,522 @@
+"""!
+@brief Tablice siły drużyn i parametrów meczu dla wszystkich pozycji rankingu
+
+Parametry meczu zależą wyłącznie od pozycji obu drużyn w rankingu FIFA,
+więc dla pozycji 1..211 liczone są raz:
+- siła drużyny (Team.get_strength)
+- lambda1/lambda2, czyli oczekiwane liczby goli (Match.play)
+- skuteczność rzutów karnych i szansa wygrania serii (Match.play_penalties)
+- opcjonalnie dokładny rozkład liczby goli i macierz wyników 8x8
+
+Model siły (STRENGTH_MODELS) zamienia pozycje i punkty rankingu na te tablice:
+- 'rank': przedziałami liniowa funkcja pozycji (rank_strength)
+- 'points': siła proporcjonalna do punktów rankingu FIFA
+- 'elo': punkty jako ranking Elo (FIFA SUM, dzielnik 600) - udział w golach
+  równy oczekiwanemu wynikowi Elo
+- 'dixon_coles': gole z rozkładu Poissona z poprawką Dixona-Colesa dla
+  niskich wyników, parametr siły dopasowany do oczekiwanego wyniku Elo
+
+Tablice budowane są leniwie, osobno dla każdego modelu siły i stanu rankingu
+(compile_model(), get_tables()), a ścieżki symulacji wykonują już tylko
+odczyty i losowania - wybór modelu nie zmienia kosztu pętli symulacji.
+
+@requires numpy
+"""
+
+import bisect
+import functools
+import math
+
+import numpy as np
+
+AVG_GOALS = 2.5  #!< Średnia liczba goli w meczu (jak w Match.play)
+MAX_GOALS = 7    #!< Maksymalna liczba goli jednej drużyny w meczu
+PENALTY_KICKS = 5  #!< Liczba strzałów w podstawowej serii rzutów karnych
+MAX_RANK = 211   #!< Najniższa pozycja w rankingu (także dla drużyn spoza rankingu)
+MIN_STRENGTH = 0.01  #!< Dolne ograniczenie siły w modelu 'rank' (od pozycji 170 wzór daje zero lub mniej)
+DEFAULT_MODEL = 'rank'  #!< Model siły używany, dopóki use_model() nie wybierze innego
+
+DEFAULT_POINTS = ((1, 1890.0), (10, 1720.0), (25, 1620.0), (50, 1530.0),
+                  (100, 1330.0), (150, 1160.0), (MAX_RANK, 850.0))
+"""!Przybliżony profil punktów rankingu FIFA (pozycja, punkty) - używany, gdy nie podano rankingu"""
+
+
+def rank_strength(rank):
+    """!
+    @brief Oblicza siłę drużyny w przedziale 0-1 na podstawie pozycji w rankingu
+
+    @details Wzór obliczeniowy:
+    - Top 10: 0.9 - (rank * 0.02)
+    - Top 50: 0.7 - ((rank-10) * 0.01)
+    - Pozostałe: max(MIN_STRENGTH, 0.3 - ((rank-50) * 0.0025))
+
+    Bez dolnego ograniczenia dwie drużyny z pozycji 170+ miałyby zerową sumę
+    sił, a lambdy w Match.play byłyby NaN.
+
+    @param rank int Pozycja w rankingu FIFA
+    @return float Wartość siły drużyny (0-1)
+    """
+    if rank <= 10:
+        return 0.9 - (rank * 0.02)
+    elif rank <= 50:
+        return 0.7 - ((rank - 10) * 0.01)
+    else:
+        return max(MIN_STRENGTH, 0.3 - ((rank - 50) * 0.0025))
+
+
+def team_strengths(ranks):
+    """!
+    @brief Wektorowa wersja rank_strength()
+
+    @param ranks array-like Pozycje drużyn w rankingu FIFA
+    @return np.ndarray Siła drużyn w przedziale 0-1
+    """
+    ranks = np.asarray(ranks, dtype=np.float64)
+    return np.where(
+        ranks <= 10,
+        0.9 - (ranks * 0.02),
+        np.where(ranks <= 50, 0.7 - ((ranks - 10) * 0.01),
+                 np.maximum(MIN_STRENGTH, 0.3 - ((ranks - 50) * 0.0025))),
+    )
+
+
+def rank_points(rankings=None):
+    """!
+    @brief Punkty rankingu FIFA dla każdej pozycji 0..MAX_RANK
+
+    @details Brakujące pozycje uzupełniane są interpolacją liniową, a pozycje
+    poza zakresem rankingu dostają punkty skrajnych drużyn.
+
+    @param rankings List[Dict] Ranking w formacie get_full_rankings() (None lub pusty - DEFAULT_POINTS)
+    @return np.ndarray Punkty według pozycji
+    """
+    known = {}
+    for team in rankings or ():
+        known.setdefault(int(team['rank']), float(team['points']))
+    if known:
+        ranks = sorted(known)
+        points = [known[rank] for rank in ranks]
+    else:
+        ranks, points = zip(*DEFAULT_POINTS)
+    return np.interp(np.arange(MAX_RANK + 1), ranks, points)
+
+
+def poisson_pmf(lam):
+    """!
+    @brief Rozkład Poissona liczby goli obcięty jak w Match.play (7 i więcej goli to 7)
+
+    @param lam array-like Oczekiwane liczby goli
+    @return np.ndarray Prawdopodobieństwa 0..7 goli (ostatnia oś o długości 8)
+    """
+    lam = np.asarray(lam, dtype=np.float64)[..., None]
+    k = np.arange(MAX_GOALS)
+    factorial = np.array([math.factorial(i) for i in k], dtype=np.float64)
+    pmf = np.exp(-lam) * lam ** k / factorial
+    return np.concatenate((pmf, 1.0 - pmf.sum(axis=-1, keepdims=True)), axis=-1)
+
+
+def dixon_coles_scores(lam1, lam2, rho):
+    """!
+    @brief Macierze wyników 8x8 z poprawką Dixona-Colesa dla wyników 0:0, 1:0, 0:1 i 1:1
+
+    @details Niezależne rozkłady Poissona mnożone są przez tau(x, y); ujemne
+    rho zwiększa szansę remisów 0:0 i 1:1. Ujemne wartości tau (bardzo duże
+    lambda) są zerowane, a macierz normalizowana.
+
+    @param lam1 array-like Oczekiwane liczby goli pierwszej drużyny
+    @param lam2 array-like Oczekiwane liczby goli drugiej drużyny
+    @param rho float Parametr zależności niskich wyników
+    @return np.ndarray Macierze P[..., g1, g2]
+    """
+    lam1 = np.asarray(lam1, dtype=np.float64)
+    lam2 = np.asarray(lam2, dtype=np.float64)
+    scores = poisson_pmf(lam1)[..., :, None] * poisson_pmf(lam2)[..., None, :]
+    scores[..., 0, 0] *= np.maximum(1.0 - lam1 * lam2 * rho, 0.0)
+    scores[..., 0, 1] *= np.maximum(1.0 + lam1 * rho, 0.0)
+    scores[..., 1, 0] *= np.maximum(1.0 + lam2 * rho, 0.0)
+    scores[..., 1, 1] *= 1.0 - rho
+    return scores / scores.sum(axis=(-2, -1), keepdims=True)
+
+
+def goal_pmf(lam):
+    """!
+    @brief Dokładny rozkład liczby goli max(0, min(int(gauss(lam, 1)), 7))
+
+    @details int() obcina w stronę zera, więc 0 goli to x < 1, k goli to
+    k <= x < k+1, a 7 goli to x >= 7.
+
+    @param lam array-like Oczekiwane liczby goli
+    @return np.ndarray Prawdopodobieństwa 0..7 goli (ostatnia oś o długości 8)
+    """
+    lam = np.asarray(lam, dtype=np.float64)
+    edges = np.arange(1, MAX_GOALS + 1) - lam[..., None]
+    cdf = 0.5 * (1.0 + np.vectorize(math.erf, otypes=[np.float64])(edges / math.sqrt(2.0)))
+    zeros = np.zeros(lam.shape + (1,))
+    ones = np.ones(lam.shape + (1,))
+    return np.diff(np.concatenate((zeros, cdf, ones), axis=-1), axis=-1)
+
+
+def shootout_win_probability(prob1, prob2):
+    """!
+    @brief Dokładne prawdopodobieństwo wygrania serii rzutów karnych
+
+    @details Seria podstawowa to dwa niezależne rozkłady B(5, p). Przy remisie
+    "nagła śmierć" kończy się w pierwszej kolejce, w której trafi tylko jedna
+    drużyna, więc pierwsza drużyna wygrywa ją z prawdopodobieństwem
+    p1(1-p2) / (p1(1-p2) + p2(1-p1)).
+
+    @param prob1 np.ndarray Skuteczność strzałów pierwszej drużyny
+    @param prob2 np.ndarray Skuteczność strzałów drugiej drużyny
+    @return np.ndarray Prawdopodobieństwo zwycięstwa pierwszej drużyny
+    """
+    prob1 = np.asarray(prob1, dtype=np.float64)
+    prob2 = np.asarray(prob2, dtype=np.float64)
+    k = np.arange(PENALTY_KICKS + 1)
+    binom = np.array([math.comb(PENALTY_KICKS, i) for i in k], dtype=np.float64)
+    pmf1 = binom * prob1[..., None] ** k * (1 - prob1[..., None]) ** (PENALTY_KICKS - k)
+    pmf2 = binom * prob2[..., None] ** k * (1 - prob2[..., None]) ** (PENALTY_KICKS - k)
+
+    cdf2 = np.cumsum(pmf2, axis=-1)
+    win = (pmf1[..., 1:] * cdf2[..., :-1]).sum(axis=-1)
+    tie = (pmf1 * pmf2).sum(axis=-1)
+    sudden1 = prob1 * (1 - prob2)
+    sudden2 = prob2 * (1 - prob1)
+    return win + tie * sudden1 / (sudden1 + sudden2)
+
+
+class StrengthTables:
+    """!
+    @brief Parametry meczu dla każdej pary pozycji w rankingu 0..211
+
+    Tablice są indeksowane bezpośrednio pozycją w rankingu (wiersz 0 nie
+    odpowiada żadnej drużynie). Listy lam_list i pen_list to kopie
+    w zwykłych typach Pythona dla ścieżki obiektowej (Match.play).
+
+    Przy rho równym None gole losowane są jak w Match.play (obcięty rozkład
+    normalny), w przeciwnym razie z macierzy wyników dixon_coles_scores().
+    """
+
+    def __init__(self, strength, lam=None, rho=None, model=DEFAULT_MODEL):
+        """!
+        @brief Buduje tablice dla wektora sił
+
+        @param strength np.ndarray Siła drużyny dla pozycji 0..MAX_RANK
+        @param lam np.ndarray Macierz oczekiwanych liczb goli (None - podział AVG_GOALS według sił)
+        @param rho float Parametr Dixona-Colesa (None - gole z rozkładu normalnego)
+        @param model str Nazwa modelu siły, z którego pochodzą tablice
+        """
+        self.model = model  #!< Nazwa modelu siły
+        self.strength = strength  #!< Siła drużyny według pozycji
+        if lam is None:
+            total = strength[:, None] + strength[None, :]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # dwie drużyny o sile 0 (pozycja 170) - jak w Match.play, brak poprawnej wartości
+                lam = AVG_GOALS * (strength[:, None] / total)
+        self.lam = lam  #!< lam[r1, r2] - gole r1 przeciwko r2
+        self.rho = rho  #!< Parametr Dixona-Colesa albo None
+        self.pen_prob = 0.7 + (strength * 0.2)  #!< Skuteczność rzutów karnych
+        self.pen_win = shootout_win_probability(self.pen_prob[:, None], self.pen_prob[None, :])  #!< Szansa r1 na wygranie karnych z r2
+        self.strength_list = strength.tolist()
+        self.lam_list = self.lam.tolist()
+        self.pen_list = self.pen_prob.tolist()
+        self._goal_pmf = None
+        self._score_cdf = {}
+
+    @property
+    def goal_pmf(self):
+        """!
+        @brief Rozkład goli goal_pmf[r1, r2, k] drużyny r1 przeciwko r2 (liczony przy pierwszym użyciu)
+        """
+        if self._goal_pmf is None:
+            if self.rho is None:
+                self._goal_pmf = goal_pmf(self.lam)
+            else:
+                ranks = np.arange(MAX_RANK + 1)
+                self._goal_pmf = self.scores(ranks[:, None], ranks[None, :]).sum(axis=-1)
+        return self._goal_pmf
+
+    def scores(self, rank1, rank2):
+        """!
+        @brief Macierze 8x8 prawdopodobieństw wyników dla tablic pozycji
+
+        @param rank1 array-like Pozycje pierwszych drużyn
+        @param rank2 array-like Pozycje drugich drużyn (kształt zgodny z rank1)
+        @return np.ndarray Macierze P[..., g1, g2]
+        """
+        if self.rho is None:
+            pmf = self.goal_pmf
+            return pmf[rank1, rank2][..., :, None] * pmf[rank2, rank1][..., None, :]
+        return dixon_coles_scores(self.lam[rank1, rank2], self.lam[rank2, rank1], self.rho)
+
+    def score_matrix(self, rank1, rank2):
+        """!
+        @brief Macierz 8x8 prawdopodobieństw wyników meczu
+
+        @param rank1 int Pozycja pierwszej drużyny
+        @param rank2 int Pozycja drugiej drużyny
+        @return np.ndarray Macierz P[g1, g2]
+        """
+        return self.scores(rank1, rank2)
+
+    def sample_score(self, rank1, rank2, u):
+        """!
+        @brief Wynik meczu z macierzy wyników dla liczby losowej u (ścieżka obiektowa, rho różne od None)
+
+        @param rank1 int Pozycja pierwszej drużyny
+        @param rank2 int Pozycja drugiej drużyny
+        @param u float Liczba losowa z przedziału [0, 1)
+        @return tuple(int, int) Gole obu drużyn
+        """
+        key = (min(max(rank1, 0), MAX_RANK), min(max(rank2, 0), MAX_RANK))
+        cdf = self._score_cdf.get(key)
+        if cdf is None:
+            cdf = self._score_cdf[key] = np.cumsum(self.scores(*key).ravel()).tolist()
+        cell = min(bisect.bisect_right(cdf, u * cdf[-1]), len(cdf) - 1)
+        return divmod(cell, MAX_GOALS + 1)
+
+    def match_lambdas(self, rank1, rank2):
+        """!
+        @brief Oczekiwane liczby goli obu drużyn
+
+        @param rank1 int Pozycja pierwszej drużyny
+        @param rank2 int Pozycja drugiej drużyny
+        @return tuple(float, float) lambda1, lambda2 jak w Match.play
+        """
+        if 0 <= rank1 <= MAX_RANK and 0 <= rank2 <= MAX_RANK:
+            return self.lam_list[rank1][rank2], self.lam_list[rank2][rank1]
+        strength1 = self.team_strength(rank1)
+        strength2 = self.team_strength(rank2)
+        return (AVG_GOALS * (strength1 / (strength1 + strength2)),
+                AVG_GOALS * (strength2 / (strength1 + strength2)))
+
+    def penalty_probability(self, rank):
+        """!
+        @brief Skuteczność rzutów karnych drużyny
+
+        @param rank int Pozycja w rankingu
+        @return float Prawdopodobieństwo trafienia jednego rzutu
+        """
+        if 0 <= rank <= MAX_RANK:
+            return self.pen_list[rank]
+        return 0.7 + (self.team_strength(rank) * 0.2)
+
+    def team_strength(self, rank):
+        """!
+        @brief Siła drużyny o danej pozycji (Team.get_strength)
+
+        @param rank int Pozycja w rankingu
+        @return float Siła drużyny
+        """
+        if 0 <= rank <= MAX_RANK:
+            return self.strength_list[rank]
+        if self.model == 'rank':
+            return rank_strength(rank)
+        return self.strength_list[MAX_RANK]
+
+
+class StrengthModel:
+    """!
+    @brief Model siły: zamienia punkty rankingu według pozycji na StrengthTables
+
+    Podklasy nadpisują strength(), a modele z własnym rozkładem goli - compile().
+    """
+
+    uses_points = True  #!< Czy tablice zależą od punktów rankingu (a nie tylko od pozycji)
+
+    def __init__(self, name):
+        """!
+        @brief Tworzy model o podanej nazwie
+
+        @param name str Klucz modelu w STRENGTH_MODELS
+        """
+        self.name = name
+
+    def strength(self, points):
+        """!
+        @brief Siła drużyn (0-1) według pozycji
+
+        @param points np.ndarray Punkty rankingu dla pozycji 0..MAX_RANK (z rank_points())
+        @return np.ndarray Siła drużyn według pozycji
+        """
+        raise NotImplementedError
+
+    def compile(self, points):
+        """!
+        @brief Buduje tablice parametrów meczu
+
+        @param points np.ndarray Punkty rankingu dla pozycji 0..MAX_RANK
+        @return StrengthTables Tablice modelu
+        """
+        return StrengthTables(self.strength(points), model=self.name)
+
+
+class RankModel(StrengthModel):
+    """!
+    @brief Przedziałami liniowa funkcja pozycji w rankingu (rank_strength)
+    """
+
+    uses_points = False
+
+    def strength(self, points):
+        return team_strengths(np.arange(MAX_RANK + 1))
+
+
+class PointsModel(StrengthModel):
+    """!
+    @brief Siła proporcjonalna do punktów rankingu (lider ma siłę 1)
+    """
+
+    def strength(self, points):
+        return points / points.max()
+
+
+class EloModel(StrengthModel):
+    """!
+    @brief Punkty rankingu jako ranking Elo
+
+    Siła 10^((punkty - max) / scale) sprawia, że udział drużyny w oczekiwanej
+    liczbie goli s1 / (s1 + s2) równa się oczekiwanemu wynikowi Elo
+    1 / (1 + 10^(-(R1 - R2) / scale)).
+    """
+
+    def __init__(self, name, scale=600.0):
+        """!
+        @brief Tworzy model o podanej nazwie
+
+        @param name str Klucz modelu w STRENGTH_MODELS
+        @param scale float Dzielnik różnicy punktów (600 w rankingu FIFA SUM)
+        """
+        super().__init__(name)
+        self.scale = scale
+
+    def strength(self, points):
+        return 10.0 ** ((points - points.max()) / self.scale)
+
+
+class DixonColesModel(EloModel):
+    """!
+    @brief Gole z rozkładu Poissona z poprawką Dixona-Colesa
+
+    Oczekiwane liczby goli to lam[i, j] = AVG_GOALS / 2 * exp(beta * (R_i - R_j) / scale),
+    gdzie beta dopasowywane jest tak, aby oczekiwany wynik meczu (wygrana
+    + połowa remisu) był jak najbliższy oczekiwanemu wynikowi Elo dla różnic
+    punktów z fit_range.
+    """
+
+    def __init__(self, name, scale=600.0, rho=-0.1, fit_range=800.0):
+        """!
+        @brief Tworzy model o podanej nazwie
+
+        @param name str Klucz modelu w STRENGTH_MODELS
+        @param scale float Dzielnik różnicy punktów
+        @param rho float Parametr zależności niskich wyników (ujemny - więcej remisów 0:0 i 1:1)
+        @param fit_range float Największa różnica punktów uwzględniana przy dopasowaniu
+        """
+        super().__init__(name, scale)
+        self.rho = rho
+        self.fit_range = fit_range
+
+    def lambdas(self, diff, beta):
+        """!
+        @brief Oczekiwane liczby goli obu drużyn dla różnic punktów
+
+        @param diff np.ndarray Różnice punktów R1 - R2
+        @param beta float Parametr siły
+        @return tuple(np.ndarray, np.ndarray) lambda1, lambda2
+        """
+        base = AVG_GOALS / 2
+        return base * np.exp(beta * diff / self.scale), base * np.exp(-beta * diff / self.scale)
+
+    def fit_beta(self):
+        """!
+        @brief Dopasowuje beta do oczekiwanego wyniku Elo (metoda złotego podziału)
+
+        @return float Parametr siły
+        """
+        diff = np.linspace(-self.fit_range, self.fit_range, 33)
+        target = 1.0 / (1.0 + 10.0 ** (-diff / self.scale))
+        g1 = np.arange(MAX_GOALS + 1)
+
+        def error(beta):
+            scores = dixon_coles_scores(*self.lambdas(diff, beta), self.rho)
+            expected = (scores * ((g1[:, None] > g1[None, :]) + 0.5 * (g1[:, None] == g1[None, :]))).sum(axis=(1, 2))
+            return float(((expected - target) ** 2).sum())
+
+        low, high = 0.0, 10.0
+        ratio = (math.sqrt(5) - 1) / 2
+        for _ in range(60):
+            a, b = high - ratio * (high - low), low + ratio * (high - low)
+            if error(a) < error(b):
+                high = b
+            else:
+                low = a
+        return (low + high) / 2
+
+    def compile(self, points):
+        lam1, _ = self.lambdas(points[:, None] - points[None, :], self.fit_beta())
+        return StrengthTables(self.strength(points), lam=lam1, rho=self.rho, model=self.name)
+
+
+STRENGTH_MODELS = {
+    'rank': RankModel('rank'),
+    'points': PointsModel('points'),
+    'elo': EloModel('elo'),
+    'dixon_coles': DixonColesModel('dixon_coles'),
+}
+"""!Modele siły: nazwa -> StrengthModel"""
+
+_active_model = DEFAULT_MODEL
+
+
+@functools.lru_cache(maxsize=16)
+def _build_tables(model, points=None):
+    spec = STRENGTH_MODELS[model]
+    return spec.compile(np.array(points) if points is not None else rank_points())
+
+
+def compile_model(model=DEFAULT_MODEL, rankings=None):
+    """!
+    @brief Buduje (lub zwraca zapamiętane) tablice modelu siły dla stanu rankingu
+
+    @param model str Nazwa modelu z STRENGTH_MODELS
+    @param rankings List[Dict] Ranking z punktami (None - DEFAULT_POINTS); modele
+    zależne tylko od pozycji go pomijają
+    @return StrengthTables Tablice parametrów meczu
+
+    @throws KeyError Dla nieznanego modelu
+    """
+    if rankings and STRENGTH_MODELS[model].uses_points:
+        return _build_tables(model, tuple(rank_points(rankings).tolist()))
+    return _build_tables(model)
+
+
+def get_tables(model=None):
+    """!
+    @brief Zwraca tablice dla modelu siły, budując je przy pierwszym użyciu
+
+    @param model str | StrengthTables Nazwa modelu z STRENGTH_MODELS albo
+    tablice z compile_model() (None - model wybrany przez use_model())
+    @return StrengthTables Tablice parametrów meczu
+
+    @throws KeyError Dla nieznanego modelu
+    """
+    if model is None:
+        model = _active_model
+    if isinstance(model, StrengthTables):
+        return model
+    return _build_tables(model)
+
+
+def use_model(model):
+    """!
+    @brief Wybiera model używany przez get_tables() bez argumentu (models.Match, Team.get_strength)
+
+    @param model str | StrengthTables Nazwa modelu albo tablice z compile_model()
+    @return str | StrengthTables Poprzednio wybrany model
+
+    @throws KeyError Dla nieznanego modelu
+    """
+    global _active_model
+    get_tables(model)
+    previous, _active_model = _active_model, model
+    return previous
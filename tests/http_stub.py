@@ -0,0 +1,138 @@
+"""
+Lokalny serwer HTTP udający strony rankingu Transfermarkt w testach
+"""
+
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+RANKINGS_PATH = "/statistik/weltrangliste"
+
+
+def fixture_pages(version=1):
+    """
+    Zapisane strony rankingu w formacie {numer_strony: html}.
+
+    Wersja 2 (katalog fixtures/v2) zawiera tylko strony zmienione względem
+    wersji 1 - pozostałe strony są brane z wersji 1.
+    """
+    pages = {}
+    for page in range(1, 4):
+        path = os.path.join(FIXTURES, f"v{version}", f"transfermarkt_page{page}.html")
+        if version == 1 or not os.path.exists(path):
+            path = os.path.join(FIXTURES, f"transfermarkt_page{page}.html")
+        with open(path, encoding="utf-8") as f:
+            pages[page] = f.read()
+    return pages
+
+
+class _QuietServer(ThreadingHTTPServer):
+    """Serwer ignorujący połączenia zerwane przez klienta (np. po timeout)."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class StubServer:
+    """
+    Serwer HTTP serwujący strony rankingu z opcjonalnym opóźnieniem i błędami.
+
+    Atrybut failures to słownik {numer_strony: liczba_odpowiedzi_503}, a requests
+    zawiera listę (numer_strony, nagłówki) wszystkich obsłużonych żądań.
+
+    Przy validators=True odpowiedzi zawierają ETag (skrót treści) i Last-Modified
+    (czas ostatniej zmiany strony w publish()), a żądania warunkowe
+    If-None-Match / If-Modified-Since niezmienionych stron dostają 304.
+    """
+
+    def __init__(self, pages=None, delay=0.0, failures=None, validators=True):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.validators = validators
+        self.requests = []
+        self.pages = {}
+        self._modified = {}
+        self._lock = threading.Lock()
+        self.publish(pages if pages is not None else fixture_pages(), modified=time.time() - 3600)
+        self._server = _QuietServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """Adres pierwszej strony rankingu."""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{RANKINGS_PATH}"
+
+    def publish(self, pages, modified=None):
+        """Podmienia serwowane strony; Last-Modified zmienia się tylko dla stron o nowej treści."""
+        modified = int(modified if modified is not None else time.time())
+        with self._lock:
+            for page, html in pages.items():
+                if self.pages.get(page) != html:
+                    self._modified[page] = modified
+            self.pages = dict(pages)
+
+    def respond(self, page, headers):
+        """Zwraca (kod, treść, nagłówki) odpowiedzi dla danej strony."""
+        with self._lock:
+            self.requests.append((page, headers))
+            if self.failures.get(page, 0) > 0:
+                self.failures[page] -= 1
+                return 503, "", {}
+            if page not in self.pages:
+                return 404, "", {}
+            body, modified = self.pages[page], self._modified[page]
+        if not self.validators:
+            return 200, body, {}
+        etag = '"%s"' % hashlib.sha1(body.encode("utf-8")).hexdigest()
+        validators = {"ETag": etag, "Last-Modified": formatdate(modified, usegmt=True)}
+        if "If-None-Match" in headers:
+            not_modified = headers["If-None-Match"] == etag
+        elif "If-Modified-Since" in headers:
+            not_modified = parsedate_to_datetime(headers["If-Modified-Since"]).timestamp() >= modified
+        else:
+            not_modified = False
+        if not_modified:
+            return 304, "", validators
+        return 200, body, validators
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status, body, headers = stub.respond(page, dict(self.headers))
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,94 @@
+"""
+Testy symulacji z adaptacyjną liczbą turniejów (adaptive.py)
+"""
+
+import unittest
+
+import numpy as np
+
+from adaptive import confidence_interval, run_adaptive, simulate_adaptive, z_score
+from parallel import run_parallel, table_teams
+
+RANKS = (1, 5, 12, 30, 45, 70, 120, 200)
+
+
+class TestConfidenceInterval(unittest.TestCase):
+    """Testy przedziałów ufności."""
+
+    def test_wilson_and_normal(self):
+        """Test przedziałów Wilsona i normalnego oraz szans równych 0."""
+        z = z_score(0.95)
+        self.assertAlmostEqual(z, 1.959964, places=5)
+        low, high = confidence_interval(np.array([50, 0]), 100, z)
+        np.testing.assert_allclose(low, [0.4038, 0.0], atol=1e-4)
+        np.testing.assert_allclose(high, [0.5962, 0.0370], atol=1e-4)
+        low, high = confidence_interval(np.array([50, 0]), 100, z, 'normal')
+        np.testing.assert_allclose(high - low, [2 * z * 0.05, 0.0])
+        with self.assertRaises(ValueError):
+            confidence_interval(np.array([1]), 10, z, 'bayes')
+        with self.assertRaises(ValueError):
+            z_score(1.5)
+
+
+class TestRunAdaptive(unittest.TestCase):
+    """Testy zatrzymania po osiągnięciu dokładności lub budżetu."""
+
+    def test_precision_reached(self):
+        """Test dokładności, zgodności z run_parallel() i niezależności od liczby procesów."""
+        result = run_adaptive(RANKS, precision=0.01, seed=3, workers=1, chunk_size=2000)
+        self.assertEqual(result["stopped"], "precision")
+        self.assertLessEqual(result["max_error"], 0.01)
+        self.assertEqual(result["runs"] % 2000, 0)
+        for name in ("mistrz", "awans"):
+            low, high = result["intervals"][name].T
+            self.assertTrue(np.all(low <= high))
+            np.testing.assert_allclose(result["error"][name], (high - low) / 2)
+
+        expected = run_parallel(RANKS, result["runs"], seed=3, workers=1, chunk_size=2000)
+        np.testing.assert_array_equal(result["places"], expected["places"])
+        again = run_adaptive(RANKS, precision=0.01, seed=3, workers=2, chunk_size=2000)
+        np.testing.assert_array_equal(again["places"], result["places"])
+
+    def test_finer_precision_needs_more_runs(self):
+        """Test liczby turniejów rosnącej z żądaną dokładnością."""
+        coarse = run_adaptive(RANKS, precision=0.02, seed=1, workers=1, chunk_size=1000)
+        fine = run_adaptive(RANKS, precision=0.005, seed=1, workers=1, chunk_size=1000)
+        self.assertGreater(fine["runs"], 8 * coarse["runs"])
+        self.assertLess(fine["runs"], 60_000)
+
+    def test_budget(self):
+        """Test zatrzymania po limicie turniejów i czasu."""
+        result = run_adaptive(RANKS, precision=0.0001, max_runs=5000, seed=1, workers=1, chunk_size=2000)
+        self.assertEqual((result["stopped"], result["runs"]), ("runs", 5000))
+        self.assertGreater(result["max_error"], 0.0001)
+        result = run_adaptive(RANKS, precision=0.0001, max_time=0.0, seed=1, workers=1, chunk_size=2000)
+        self.assertEqual((result["stopped"], result["runs"]), ("time", 2000))
+        result = run_adaptive(RANKS, precision=0.0001, max_time=0.0, seed=1, workers=1, chunk_size=2000,
+                              min_runs=3000)
+        self.assertEqual(result["runs"], 4000)  # pierwsza runda wyrównana do pełnych porcji
+        expected = run_parallel(RANKS, 4000, seed=1, workers=1, chunk_size=2000)
+        np.testing.assert_array_equal(result["places"], expected["places"])
+        with self.assertRaises(ValueError):
+            run_adaptive(RANKS, precision=0)
+        with self.assertRaises(ValueError):
+            run_adaptive(RANKS[:4])
+
+    def test_simulate_adaptive(self):
+        """Test szans według nazw z błędami."""
+        _, teams = table_teams(RANKS, list("ABCDEFGH"))
+        odds = simulate_adaptive(teams, precision=0.02, seed=2, workers=1, chunk_size=1000)
+        self.assertAlmostEqual(odds["A"]["awans"], 1 - odds["A"]["faza grupowa"])
+        self.assertLessEqual(max(entry["błąd awans"] for entry in odds.values()), 0.02)
+
+    def test_advancement_in_large_format(self):
+        """Test śledzenia wyjścia z grupy w formacie wc32 (awansuje 16 z 32 drużyn)."""
+        ranks = list(range(1, 129, 4))
+        _, teams = table_teams(ranks)
+        odds = simulate_adaptive(teams, precision=0.03, seed=4, workers=1, chunk_size=1000, fmt='wc32')
+        self.assertAlmostEqual(sum(entry["awans"] for entry in odds.values()), 16.0)
+        self.assertGreater(odds["Drużyna 1"]["awans"], 0.8)
+        self.assertLessEqual(max(entry["błąd awans"] for entry in odds.values()), 0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()
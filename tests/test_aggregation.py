@@ -0,0 +1,123 @@
+"""
+Testy jednostkowe dla modułu aggregation.py
+"""
+
+import io
+import random
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from aggregation import (
+    RunningMoments, StreamingStats, TOURNAMENT_MATCHES, aggregate_parallel, iter_batches, iter_tournaments,
+)
+from parallel import table_teams
+from stats import print_stats_report
+
+RANKS = [1, 5, 12, 30, 45, 70, 120, 200]
+NAMES = [f"Drużyna {i + 1}" for i in range(len(RANKS))]
+
+
+class TestRunningMoments(unittest.TestCase):
+    """Testy algorytmu Welforda."""
+
+    def setUp(self):
+        """Losowe obserwacje 3-elementowe."""
+        self.values = np.random.default_rng(3).normal(5.0, 2.0, size=(500, 3))
+
+    def test_single_and_batch_updates(self):
+        """Test zgodności z numpy dla aktualizacji pojedynczych i partiami."""
+        single, batch = RunningMoments(3), RunningMoments(3)
+        for value in self.values:
+            single.add(value)
+        batch.add_batch(self.values[:123])
+        batch.add_batch(self.values[123:])
+        for moments in (single, batch):
+            np.testing.assert_allclose(moments.mean, self.values.mean(axis=0))
+            np.testing.assert_allclose(moments.variance, self.values.var(axis=0, ddof=1))
+
+    def test_merge(self):
+        """Test scalania momentów policzonych na częściach strumienia."""
+        left, right = RunningMoments(3), RunningMoments(3)
+        left.add_batch(self.values[:50])
+        right.add_batch(self.values[50:])
+        left.merge(right).merge(RunningMoments(3))
+        self.assertEqual(left.count, 500)
+        np.testing.assert_allclose(left.std, self.values.std(axis=0, ddof=1))
+
+
+class TestStreamingStats(unittest.TestCase):
+    """Testy strumieniowych statystyk turniejów."""
+
+    def test_counters_match_tournaments(self):
+        """Test liczników względem wyników pojedynczych turniejów."""
+        stats = StreamingStats(NAMES, RANKS)
+        goals = []
+        for log, podium, points, team_goals in iter_tournaments(RANKS, 200, random.Random(4), NAMES):
+            self.assertEqual(len(log), TOURNAMENT_MATCHES)
+            goals.append(list(team_goals))
+            stats.add_tournament(log, podium, points, team_goals)
+
+        goals = np.array(goals)
+        self.assertEqual(stats.runs, 200)
+        np.testing.assert_array_equal(stats.places.sum(axis=0), [200, 200, 200, 200, 800])
+        np.testing.assert_array_equal(stats.goals, goals.sum(axis=0))
+        np.testing.assert_allclose(stats.total_goals.variance, goals.sum(axis=1).var(ddof=1))
+        self.assertEqual(stats.scorelines.sum(), 200 * TOURNAMENT_MATCHES)
+        self.assertEqual(stats.knockouts, 200 * 4)
+        self.assertTrue(0 < stats.penalty_rate < 1)
+
+    def test_merge_equals_single_stream(self):
+        """Test scalenia dwóch części strumienia z jednym przebiegiem."""
+        whole = StreamingStats(NAMES, RANKS).consume(iter_tournaments(RANKS, 100, random.Random(8)))
+        rng = random.Random(8)
+        first = StreamingStats(NAMES, RANKS).consume(iter_tournaments(RANKS, 40, rng))
+        second = StreamingStats(NAMES, RANKS).consume(iter_tournaments(RANKS, 60, rng))
+        first.merge(second)
+
+        for name in ('places', 'points', 'goals', 'scorelines'):
+            np.testing.assert_array_equal(getattr(first, name), getattr(whole, name))
+        self.assertEqual((first.knockouts, first.shootouts), (whole.knockouts, whole.shootouts))
+        np.testing.assert_allclose(first.team_goals.variance, whole.team_goals.variance)
+        with self.assertRaises(ValueError):
+            first.merge(StreamingStats(NAMES, RANKS[::-1]))
+
+    def test_batches(self):
+        """Test partii silnika wektorowego."""
+        stats = StreamingStats(NAMES, RANKS).consume_batches(iter_batches(RANKS, 5_000, np.random.default_rng(2), 1_500))
+        self.assertEqual(stats.runs, 5_000)
+        np.testing.assert_array_equal(stats.places.sum(axis=1), [5_000] * len(RANKS))
+        self.assertEqual(stats.scorelines.sum(), 0)
+        self.assertGreater(stats.report()['title_odds'][NAMES[0]], stats.report()['title_odds'][NAMES[-1]])
+
+    def test_report_fields(self):
+        """Test pól raportu zgodnych z generate_stats_report()."""
+        report = StreamingStats(NAMES, RANKS).consume(iter_tournaments(RANKS, 50, random.Random(1))).report()
+        for key in ('total_goals', 'average_goals_per_team', 'top_scorers', 'best_performance_by_rank', 'plots'):
+            self.assertIn(key, report)
+        self.assertAlmostEqual(sum(report['title_odds'].values()), 1.0)
+        self.assertAlmostEqual(report['scorelines'].sum(), 1.0)
+        self.assertEqual(len(report['top_scorers']), 5)
+        with redirect_stdout(io.StringIO()) as out:
+            print_stats_report(report)
+        self.assertIn("Najlepsi strzelcy", out.getvalue())
+
+
+class TestAggregateParallel(unittest.TestCase):
+    """Testy statystyk liczonych w wielu procesach."""
+
+    def test_independent_of_workers(self):
+        """Test niezależności wyniku od liczby procesów."""
+        _, teams = table_teams(RANKS, NAMES)
+        for engine in ('object', 'batch'):
+            with self.subTest(engine=engine):
+                single = aggregate_parallel(teams, 1_200, seed=5, workers=1, chunk_size=500, engine=engine)
+                pooled = aggregate_parallel(teams, 1_200, seed=5, workers=2, chunk_size=500, engine=engine)
+                self.assertEqual(single.runs, 1_200)
+                np.testing.assert_array_equal(single.places, pooled.places)
+                np.testing.assert_allclose(single.team_goals.mean, pooled.team_goals.mean)
+
+
+if __name__ == "__main__":
+    unittest.main()
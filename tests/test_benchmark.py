@@ -0,0 +1,56 @@
+"""
+Testy zestawu pomiarów wydajności (benchmark.py)
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from benchmark import BENCHMARKS, compare, format_results, main, run_benchmark, run_suite
+
+
+def fake_results(**rates):
+    """Wyniki run_suite() o podanej przepustowości."""
+    return {"results": {name: {"unit": "op", "ops_per_sec": rate, "us_per_op": 1e6 / rate, "calls": 1}
+                        for name, rate in rates.items()}}
+
+
+class TestBenchmark(unittest.TestCase):
+    """Testy pomiarów i porównania z linią bazową."""
+
+    def test_all_benchmarks_run(self):
+        """Test wykonania każdego pomiaru w trybie krótkim."""
+        results = run_suite(repeat=1, min_time=0.001)
+        self.assertEqual(list(results["results"]), list(BENCHMARKS))
+        for result in results["results"].values():
+            self.assertGreater(result["ops_per_sec"], 0)
+        with self.assertRaises(ValueError):
+            run_benchmark("nieznany")
+
+    def test_compare_with_tolerance(self):
+        """Test wykrycia regresji tylko poza tolerancją."""
+        baseline = fake_results(match=100.0, batch=100.0, html_parse=100.0)
+        comparison = compare(fake_results(match=80.0, batch=70.0, stats_report=5.0), baseline, tolerance=0.25)
+        self.assertEqual([(c["name"], c["regression"]) for c in comparison], [("match", False), ("batch", True)])
+        self.assertIn("REGRESJA", format_results(fake_results(match=80.0, batch=70.0), comparison))
+
+    def test_command_line(self):
+        """Test zapisu JSON i kodu wyjścia przy regresji względem linii bazowej."""
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            output = os.path.join(tmp, "wyniki.json")
+            with open(baseline, "w", encoding="utf-8") as f:
+                json.dump(fake_results(match=1e12), f)
+            with redirect_stdout(io.StringIO()):
+                code = main(["match", "--quick", "--repeat", "1", "--baseline", baseline, "--json", output])
+            with open(output, encoding="utf-8") as f:
+                data = json.load(f)
+        self.assertEqual(code, 1)
+        self.assertTrue(data["comparison"][0]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Testy jednostkowe dla modułu exact_probabilities.py
+"""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from models import Team
+from exact_probabilities import (
+    match_probabilities, knockout_probability, group_probabilities,
+    place_probabilities, tournament_probabilities,
+)
+from simulation import PLACES, sample_goals, place_probabilities as simulated_probabilities
+from strength_tables import get_tables
+
+RANKS = [1, 5, 12, 30, 45, 70, 120, 200]
+
+
+class TestExactMatch(unittest.TestCase):
+    """Testy dokładnych wyników pojedynczego meczu."""
+
+    def test_match_probabilities_match_sampling(self):
+        """Test prawdopodobieństw wyniku względem losowania goli."""
+        lam1, lam2 = get_tables().match_lambdas(3, 60)
+        n = 200_000
+        g1, g2 = sample_goals(np.random.default_rng(2), np.full(n, lam1), np.full(n, lam2))
+        observed = [(g1 > g2).mean(), (g1 == g2).mean(), (g1 < g2).mean()]
+        expected = match_probabilities(3, 60)
+        self.assertAlmostEqual(expected.sum(), 1.0)
+        np.testing.assert_allclose(observed, expected, atol=0.005)
+
+    def test_knockout_symmetry(self):
+        """Test sumowania się szans awansu obu drużyn do jedności."""
+        self.assertAlmostEqual(knockout_probability(10, 40) + knockout_probability(40, 10), 1.0)
+        self.assertAlmostEqual(knockout_probability(25, 25), 0.5)
+
+
+class TestExactGroup(unittest.TestCase):
+    """Testy dokładnego rozkładu tabeli grupy."""
+
+    def test_distributions_sum_to_one(self):
+        """Test sum rozkładów awansu i punktów."""
+        result = group_probabilities((3, 20, 45, 100))
+        self.assertAlmostEqual(result['advance'].sum(), 1.0)
+        np.testing.assert_allclose(result['points'].sum(axis=1), 1.0)
+        self.assertEqual(np.trace(result['advance']), 0.0)
+        self.assertGreater(result['advance'][0].sum(), result['advance'][3].sum())
+
+    def test_equal_teams_are_symmetric(self):
+        """Test losowego rozstrzygania pełnych remisów."""
+        advance = group_probabilities((8, 8, 8, 8))['advance']
+        expected = (1 - np.eye(4)) / 12
+        np.testing.assert_allclose(advance, expected, atol=1e-12)
+
+
+class TestExactTournament(unittest.TestCase):
+    """Testy dokładnych szans w turnieju."""
+
+    def test_reference_for_monte_carlo(self):
+        """Test zgodności z silnikiem Monte Carlo."""
+        exact = place_probabilities(RANKS)
+        np.testing.assert_allclose(exact.sum(axis=1), 1.0)
+        np.testing.assert_allclose(exact.sum(axis=0), [1, 1, 1, 1, 4])
+        simulated = simulated_probabilities(RANKS, 400_000, np.random.default_rng(4))
+        np.testing.assert_allclose(simulated, exact, atol=0.005)
+
+    def test_wrong_team_count(self):
+        """Test odrzucenia turnieju z inną liczbą drużyn."""
+        with self.assertRaises(ValueError):
+            place_probabilities(RANKS[:6])
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank')
+    def test_tournament_probabilities(self, mock_get_team_rank, mock_load_rankings):
+        """Test słownika szans dla obiektów Team."""
+        mock_get_team_rank.side_effect = [10] * 8
+        teams = [Team(name) for name in "ABCDEFGH"]
+        odds = tournament_probabilities(teams)
+        self.assertEqual(set(odds["A"]), set(PLACES))
+        self.assertAlmostEqual(odds["C"]["mistrz"], 1 / 8)
+        self.assertAlmostEqual(odds["H"]["faza grupowa"], 1 / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Testy jednostkowe dla modułu formats.py
+"""
+
+import io
+import random
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import main
+from exact_probabilities import place_probabilities as exact_place_probabilities
+from formats import FORMATS, TournamentFormat, compile_format, play_format
+from parallel import run_parallel, table_teams
+from simulation import SEMIFINAL, place_labels, simulate_batch, simulate_format_batch
+
+RANKS = [1, 5, 12, 30, 45, 70, 120, 200]
+
+
+def ranks_for(fmt):
+    """Pozycje rankingowe dla wszystkich drużyn formatu."""
+    return list(range(1, 4 * FORMATS[fmt].teams, 4))
+
+
+class TestSchedule(unittest.TestCase):
+    """Testy kompilacji opisu formatu do terminarza."""
+
+    def test_classic_bracket(self):
+        """Test par półfinałowych A1-B2 i B1-A2 jak w main.play_tournament()."""
+        schedule = compile_format('classic8')
+        labels = [f"{group}{place}" for group, place in schedule.qualifiers]
+        self.assertEqual([(labels[a], labels[b]) for a, b in schedule.first_round], [("A1", "B2"), ("B1", "A2")])
+        self.assertEqual(schedule.round_phases, [["Półfinał 1", "Półfinał 2"], ["Finał"]])
+        self.assertEqual(schedule.n_matches, 16)
+        self.assertIs(compile_format('classic8'), schedule)
+
+    def test_builtin_formats(self):
+        """Test liczby meczów i faz wbudowanych formatów."""
+        self.assertEqual(compile_format('wc32').n_matches, 64)
+        self.assertEqual(compile_format('euro24').n_matches, 51)
+        self.assertEqual(compile_format('wc48').n_matches, 104)
+        self.assertEqual(compile_format('wc48').round_phases[0][0], "1/16 finału 1")
+
+    def test_invalid_specs(self):
+        """Test odrzucania niespójnych opisów formatu."""
+        for fmt in (TournamentFormat('x', 10, 3, 2), TournamentFormat('x', 12, 3, 2),
+                    TournamentFormat('x', 8, 2, 4, best_thirds=1),
+                    TournamentFormat('x', 8, 2, 2, bracket=(("A1", "B2"), ("A2", "B2")))):
+            with self.assertRaises(ValueError):
+                compile_format(fmt)
+        with self.assertRaises(ValueError):
+            compile_format('nieznany')
+
+
+class TestPlayFormat(unittest.TestCase):
+    """Testy rozgrywania turnieju na obiektach Team i Match."""
+
+    def test_classic_flow(self):
+        """Test kolejności faz turnieju classic8 w main.play_tournament()."""
+        _, teams = table_teams(RANKS)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            podium = main.play_tournament(teams, random.Random(3), verbose=True)
+        printed = out.getvalue()
+        phases = ["Grupa A", "Grupa B", "Półfinał 1", "Półfinał 2", "Mecz o 3. miejsce", "=== Finał"]
+        positions = [printed.index(phase) for phase in phases]
+        self.assertEqual(positions, sorted(positions))
+        _, teams = table_teams(RANKS)
+        self.assertEqual([t.name for t in podium],
+                         [t.name for t in play_format('classic8', teams, random.Random(3))])
+
+    def test_large_format(self):
+        """Test przebiegu turnieju 48 drużyn i wypisywania faz."""
+        _, teams = table_teams(ranks_for('wc48'))
+        out = io.StringIO()
+        with redirect_stdout(out):
+            podium = main.play_tournament(teams, random.Random(1), verbose=True, fmt='wc48')
+        self.assertEqual(len({t.name for t in podium}), 4)
+        self.assertIn("Grupa L", out.getvalue())
+        self.assertIn("1/16 finału 16", out.getvalue())
+        with self.assertRaises(ValueError):
+            play_format('wc48', teams[:8])
+
+
+class TestVectorizedFormats(unittest.TestCase):
+    """Testy wektorowego silnika dla dowolnego formatu."""
+
+    def test_generic_engine_matches_exact(self):
+        """Test ogólnego silnika na formacie classic8 z wynikiem dokładnym."""
+        podium = simulate_format_batch(compile_format('classic8'), RANKS, 100_000, np.random.default_rng(4))['podium']
+        estimate = np.array([np.bincount(podium[:, place], minlength=8) for place in range(4)]).T / 100_000
+        np.testing.assert_allclose(estimate, exact_place_probabilities(RANKS)[:, :4], atol=0.01)
+
+    def test_podium_and_totals(self):
+        """Test unikalności podium i sum punktów w dużych formatach."""
+        for name in ('groups16', 'euro24', 'wc48'):
+            fmt = FORMATS[name]
+            result = simulate_batch(ranks_for(name), 500, np.random.default_rng(2), fmt=name)
+            podium = np.sort(result['podium'], axis=1)
+            self.assertTrue((np.diff(podium, axis=1) > 0).all())
+            schedule = compile_format(name)
+            group_matches = fmt.groups * len(schedule.group_pairs)
+            points = result['points'].sum(axis=1)
+            self.assertTrue(((points >= 2 * group_matches) & (points <= 3 * group_matches)).all())
+
+    def test_no_third_place(self):
+        """Test formatu euro24 bez meczu o 3. miejsce: obaj przegrani półfinałów w kolumnie SEMIFINAL."""
+        ranks = ranks_for('euro24')
+        self.assertEqual(place_labels('euro24')[2:3], (SEMIFINAL,))
+        self.assertNotIn("trzecie miejsce", place_labels('euro24'))
+        for engine, runs in (('batch', 4000), ('object', 200)):
+            with self.subTest(engine=engine):
+                result = run_parallel(ranks, runs, seed=2, workers=1, engine=engine, fmt='euro24')
+                self.assertEqual(result['places'].shape, (24, 4))
+                np.testing.assert_array_equal(result['places'].sum(axis=0), [runs, runs, 2 * runs, 20 * runs])
+
+    def test_engines_agree(self):
+        """Test zgodności silnika obiektowego i wektorowego dla formatu wc32."""
+        ranks = ranks_for('wc32')
+        batch = run_parallel(ranks, 20_000, seed=3, workers=1, engine='batch', fmt='wc32')
+        objects = run_parallel(ranks, 4_000, seed=3, workers=1, engine='object', fmt='wc32')
+        np.testing.assert_allclose(batch['probabilities'][:, 0], objects['probabilities'][:, 0], atol=0.03)
+        with self.assertRaises(ValueError):
+            run_parallel(RANKS, 10, fmt='wc32')
+
+
+if __name__ == "__main__":
+    unittest.main()
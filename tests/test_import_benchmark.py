@@ -0,0 +1,40 @@
+"""
+Testy czasu importu rdzenia symulacji (import_benchmark.py)
+"""
+
+import unittest
+
+from import_benchmark import CORE_MODULES, HEAVY_MODULES, measure, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1530 |      79532 |       numpy
+import time:      3325 |     110028 | main
+"""
+
+
+class TestImportBenchmark(unittest.TestCase):
+    """Testy pomiaru czasu importu."""
+
+    def test_parse_importtime(self):
+        """Test parsowania wyniku -X importtime (pominięcie nagłówka)."""
+        times = parse_importtime(SAMPLE)
+        self.assertEqual(times, {"_io": (120, 120), "numpy": (1530, 79532), "main": (3325, 110028)})
+
+    def test_core_skips_heavy_modules(self):
+        """Test zimnego startu rdzenia bez matplotlib, bs4 i requests (budżet czasu sprawdza CLI)."""
+        for module in CORE_MODULES:
+            with self.subTest(module=module):
+                self.assertEqual(measure(module, repeat=1)["heavy"], [])
+
+    def test_heavy_modules_detected(self):
+        """Test wykrycia ciężkich bibliotek wczytywanych przez moduł."""
+        result = measure("requests", repeat=1)
+        self.assertIn("requests", result["heavy"])
+        self.assertFalse(result["ok"])
+        self.assertIn("requests", HEAVY_MODULES)
+
+
+if __name__ == "__main__":
+    unittest.main()
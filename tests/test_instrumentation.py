@@ -0,0 +1,95 @@
+"""
+Testy jednostkowe dla modułu instrumentation.py
+"""
+
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import instrumentation
+import main
+import utils
+from models import Match
+from parallel import play_tournament, table_teams
+
+TEAMS = ["Brazil", "Argentina", "France", "Spain", "Poland", "Japan", "Panama", "Fiji"]
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Testy pomiarów funkcji i eksportu metryk."""
+
+    def setUp(self):
+        """Wyzerowanie pomiarów przed każdym testem."""
+        instrumentation.reset()
+        self.addCleanup(instrumentation.disable)
+
+    def test_enable_and_restore(self):
+        """Test podmiany funkcji (także kopii w main) i przywrócenia oryginałów."""
+        play, save = Match.play, main.save_results
+        with instrumentation.instrumented():
+            self.assertIsNot(Match.play, play)
+            self.assertIs(main.save_results, utils.save_results)
+            self.assertIsNot(main.save_results, save)
+            _, teams = table_teams([1, 5, 12, 30, 45, 70, 120, 200])
+            play_tournament(teams, random.Random(3))
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertIs(Match.play, play)
+        self.assertIs(main.save_results, save)
+
+        timers = instrumentation.snapshot()["timers"]
+        self.assertEqual(timers["Match.play"]["count"], 16)
+        self.assertEqual(instrumentation.phase_summary()["mecze"]["count"], 16)
+        self.assertNotIn("Team.__init__", timers)  # drużyny z table_teams() bez __init__
+
+    def test_timer_counter_and_export(self):
+        """Test ręcznych pomiarów oraz formatów JSON i Prometheus."""
+        with instrumentation.timer("losowanie"):
+            time.sleep(0.01)
+        instrumentation.count("turnieje", 3)
+        data = json.loads(instrumentation.to_json())
+        self.assertGreaterEqual(data["timers"]["losowanie"]["total_s"], 0.009)
+        self.assertEqual(data["counters"], {"turnieje": 3})
+        self.assertIn("losowanie", data["phases"])
+
+        text = instrumentation.to_prometheus()
+        self.assertIn('# TYPE symulator_calls_total counter', text)
+        self.assertIn('symulator_calls_total{name="losowanie"} 1', text)
+        self.assertIn('symulator_events_total{name="turnieje"} 3', text)
+
+    def test_sampler(self):
+        """Test próbkowania stosu bieżącego wątku."""
+        with instrumentation.Sampler(interval=0.001) as sampler:
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                sum(range(1000))
+        self.assertGreater(sum(sampler.samples.values()), 0)
+        self.assertIn("test_sampler", sampler.collapsed())
+        self.assertAlmostEqual(sum(share for _, share in sampler.top(100)), 1.0)
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank', side_effect=lambda name, index: TEAMS.index(name) * 20 + 1)
+    def test_main_metrics_and_profile(self, *mocks):
+        """Test opcji --metrics i --profile w main.py."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {name: os.path.join(tmp, name) for name in ("wyniki.json", "metryki.prom", "profil.pstats")}
+            out = io.StringIO()
+            with redirect_stdout(out):
+                main.main(TEAMS + ["--seed", "1", "--no-plots", "--output", paths["wyniki.json"],
+                                   "--metrics", paths["metryki.prom"], "--profile", paths["profil.pstats"]])
+            with open(paths["metryki.prom"], encoding="utf-8") as f:
+                metrics = f.read()
+            self.assertGreater(os.path.getsize(paths["profil.pstats"]), 0)
+        self.assertIn('symulator_calls_total{name="Team.__init__"} 8', metrics)
+        self.assertIn('symulator_calls_total{name="save_results"} 1', metrics)
+        self.assertIn("Czas faz", out.getvalue())
+        self.assertFalse(instrumentation.is_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
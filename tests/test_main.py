@@ -0,0 +1,161 @@
+"""
+Testy jednostkowe dla trybu wsadowego modułu main.py
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import main
+import strength_tables
+
+TEAMS = ["Brazil", "Argentina", "France", "Spain", "Poland", "Japan", "Panama", "Fiji"]
+
+
+class TestParseArgs(unittest.TestCase):
+    """Testy argumentów wiersza poleceń."""
+
+    def setUp(self):
+        """Przygotowanie katalogu tymczasowego."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_teams_file(self):
+        """Test wczytania drużyn z pliku z komentarzami i pustymi wierszami."""
+        path = os.path.join(self.tmp.name, "teams.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# grupa testowa\n\n" + "\n".join(TEAMS) + "\n")
+        args = main.parse_args(["-f", path, "--runs", "10", "--seed", "3"])
+        self.assertEqual(args.teams, TEAMS)
+        self.assertEqual((args.runs, args.seed, args.quiet), (10, 3, False))
+
+    def test_invalid_arguments(self):
+        """Test odrzucenia złej liczby drużyn i turniejów."""
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main.parse_args(TEAMS[:7])
+            with self.assertRaises(SystemExit):
+                main.parse_args(TEAMS + ["--runs", "0"])
+
+    def test_duplicate_teams(self):
+        """Test odrzucenia powtórzonych drużyn, także w różnych wariantach nazwy."""
+        error = io.StringIO()
+        with patch('sys.stderr', error), self.assertRaises(SystemExit):
+            main.parse_args(["Polska"] + TEAMS[1:])
+        self.assertIn("nie mogą się powtarzać: Poland", error.getvalue())
+
+
+@patch('models.load_rankings', return_value=[])
+@patch('models.get_team_rank', side_effect=lambda name, index: TEAMS.index(name) * 20 + 1)
+class TestBatchMode(unittest.TestCase):
+    """Testy uruchomienia bez interakcji z użytkownikiem."""
+
+    def setUp(self):
+        """Przygotowanie katalogu tymczasowego."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output = os.path.join(self.tmp.name, "wyniki.json")
+
+    def run_main(self, *extra):
+        out = io.StringIO()
+        with redirect_stdout(out), patch('builtins.input', side_effect=AssertionError):
+            main.main(TEAMS + ["--output", self.output] + list(extra))
+        with open(self.output, encoding="utf-8") as f:
+            return json.load(f), out.getvalue()
+
+    def test_many_runs_quiet(self, *mocks):
+        """Test wielu turniejów: cisza na konsoli i powtarzalność dla ziarna."""
+        data, printed = self.run_main("--runs", "200", "--seed", "5", "--quiet")
+        again, _ = self.run_main("--runs", "200", "--seed", "5", "--quiet")
+
+        self.assertEqual(printed, "")
+        self.assertEqual(data, again)
+        self.assertEqual((data["turnieje"], data["ziarno"]), (200, 5))
+        self.assertEqual(len(data["drużyny"]), 8)
+        self.assertAlmostEqual(sum(team["mistrz"] for team in data["drużyny"]), 1.0)
+
+    def test_run_many_duplicate_names(self, *mocks):
+        """Test odrzucenia drużyn o tej samej nazwie zamiast łączenia ich wyników."""
+        teams = main.create_teams(TEAMS[:7] + ["Brazil"], verbose=False)
+        with self.assertRaises(ValueError):
+            main.run_many(teams, 10)
+
+    def test_strength_model(self, *mocks):
+        """Test opcji --model: inne szanse niż model domyślny, przywrócenie modelu po zakończeniu."""
+        data, _ = self.run_main("--runs", "300", "--seed", "2", "--quiet", "--model", "elo")
+        default, _ = self.run_main("--runs", "300", "--seed", "2", "--quiet")
+        self.assertNotEqual(data["drużyny"], default["drużyny"])
+        self.assertEqual(strength_tables.get_tables().model, "rank")
+
+    def test_result_cache(self, *mocks):
+        """Test opcji --cache: powtórzony scenariusz bez ponownej symulacji."""
+        cache = os.path.join(self.tmp.name, "cache")
+        data, _ = self.run_main("--runs", "200", "--seed", "5", "--quiet", "--cache", cache)
+        with patch('main.run_many', side_effect=AssertionError) as run_many:
+            again, printed = self.run_main("--runs", "200", "--seed", "5", "--cache", cache)
+            self.assertIn("Wynik z pamięci podręcznej", printed)
+            self.assertEqual(data["drużyny"], again["drużyny"])
+            with self.assertRaises(AssertionError):
+                self.run_main("--runs", "200", "--seed", "6", "--quiet", "--cache", cache)
+        self.assertEqual(run_many.call_count, 1)
+
+    def test_precision(self, *mocks):
+        """Test opcji --precision: liczba turniejów z dokładności, błędy w wyniku, --runs jako limit."""
+        data, printed = self.run_main("--precision", "0.02", "--seed", "1")
+        self.assertIn("Dokładność: ±", printed)
+        self.assertLessEqual(max(team["błąd awans"] for team in data["drużyny"]), 0.02)
+        self.assertLess(data["turnieje"], 100_000)
+        limited, printed = self.run_main("--precision", "0.0001", "--runs", "30000", "--seed", "1")
+        self.assertEqual(limited["turnieje"], 30000)
+        self.assertIn("limit turniejów", printed)
+
+    def test_tournament_state(self, *mocks):
+        """Test opcji --state: drużyny ze stanu, rozegrany mecz pucharowy zmienia szanse."""
+        path = os.path.join(self.tmp.name, "stan.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"bracket": [TEAMS[:2], TEAMS[6:]], "results": [["Panama", "Fiji", 0, 1]]}, f)
+        with redirect_stdout(io.StringIO()):
+            main.main(["--state", path, "--runs", "2000", "--seed", "1", "--quiet", "--output", self.output])
+        with open(self.output, encoding="utf-8") as f:
+            data = json.load(f)
+        odds = {team["team"]: team for team in data["drużyny"]}
+        self.assertEqual(list(odds), ["Brazil", "Argentina", "Panama", "Fiji"])
+        self.assertEqual(odds["Panama"]["mistrz"] + odds["Panama"]["wicemistrz"], 0.0)
+        self.assertEqual(data["turnieje"], 2000)
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main.parse_args(TEAMS + ["--state", path, "--runs", "10"])
+
+    @patch('stats.plt')
+    def test_single_run_without_plots(self, mock_plt, *mocks):
+        """Test pojedynczego turnieju bez wykresów."""
+        data, printed = self.run_main("--seed", "1", "--no-plots")
+        mock_plt.savefig.assert_not_called()
+        self.assertEqual(len(data), 8)
+        self.assertIn("Końcowa Klasyfikacja", printed)
+        self.assertNotIn("wykres", printed.lower())
+
+    @patch('stats.plt')
+    def test_format_without_third_place(self, mock_plt, mock_get_team_rank, mock_load_rankings):
+        """Test formatu euro24: przegrani półfinałów dzielą miejsce zamiast 3. i 4. miejsca."""
+        mock_get_team_rank.side_effect = lambda name, index: 50
+        names = TEAMS + [f"Drużyna {i}" for i in range(16)]
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main.main(names + ["--format", "euro24", "--seed", "1", "--no-plots", "--output", self.output])
+            main.main(names + ["--format", "euro24", "--seed", "1", "--runs", "40", "--output", self.output])
+        printed = out.getvalue()
+        self.assertIn("🥉 Półfinał: ", printed)
+        self.assertNotIn("Trzecie miejsce", printed)
+        self.assertIn("półfinał: ", printed)
+        with open(self.output, encoding="utf-8") as f:
+            teams = json.load(f)["drużyny"]
+        self.assertNotIn("trzecie miejsce", teams[0])
+        self.assertAlmostEqual(sum(team["półfinał"] for team in teams), 2.0)
+
+if __name__ == "__main__":
+    unittest.main()
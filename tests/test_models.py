@@ -10,11 +10,11 @@ from models import Team, Match
 class TestTeam(unittest.TestCase):
     """Testy dla klasy Team."""
 
-    @patch('models.get_full_rankings')
+    @patch('models.load_rankings')
     @patch('models.get_team_rank')
-    def setUp(self, mock_get_team_rank, mock_get_full_rankings):
+    def setUp(self, mock_get_team_rank, mock_load_rankings):
         """Przygotowanie danych testowych."""
-        mock_get_full_rankings.return_value = [{'country': 'Poland', 'rank': 34}]
+        mock_load_rankings.return_value = [{'country': 'Poland', 'rank': 34}]
         mock_get_team_rank.return_value = 34
         self.team = Team("Polska")
 
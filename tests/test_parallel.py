@@ -0,0 +1,91 @@
+"""
+Testy jednostkowe dla modułu parallel.py
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from models import Team, Match
+from parallel import run_parallel, run_chunk, merge_totals, empty_totals
+from state import TeamTable
+
+RANKS = [1, 5, 12, 30, 45, 70, 120, 200]
+
+
+class TestMatchGenerator(unittest.TestCase):
+    """Testy generatora przekazywanego do meczu."""
+
+    def setUp(self):
+        """Przygotowanie drużyn bez pobierania rankingu."""
+        table = TeamTable(2)
+        table.add("Brazylia", 1)
+        table.add("Panama", 100)
+        self.team1, self.team2 = Team.from_row(table, 0), Team.from_row(table, 1)
+
+    def test_own_generator_is_reproducible(self):
+        """Test powtarzalności wyników i niezależności od globalnego random."""
+        scores = []
+        for _ in range(2):
+            rng = random.Random(42)
+            random.seed()  # stan globalny nie może mieć wpływu
+            matches = [Match(self.team1, self.team2, "Grupa A", rng=rng) for _ in range(20)]
+            for match in matches:
+                match.play()
+            scores.append([match.score for match in matches])
+        self.assertEqual(scores[0], scores[1])
+
+class TestRunParallel(unittest.TestCase):
+    """Testy równoległego uruchamiania symulacji."""
+
+    def test_same_result_for_any_worker_count(self):
+        """Test niezależności wyniku od liczby procesów."""
+        for engine, runs, chunk_size in (('batch', 20_000, 3_000), ('object', 600, 100)):
+            single = run_parallel(RANKS, runs, seed=9, workers=1, chunk_size=chunk_size, engine=engine)
+            pooled = run_parallel(RANKS, runs, seed=9, workers=2, chunk_size=chunk_size, engine=engine)
+            for key in ('places', 'points', 'goals'):
+                np.testing.assert_array_equal(single[key], pooled[key])
+            self.assertEqual(single['runs'], runs)
+
+    def test_random_seed_is_recorded(self):
+        """Test odtworzenia wyniku z zapisanego ziarna."""
+        first = run_parallel(RANKS, 5_000, workers=1, chunk_size=1_000)
+        again = run_parallel(RANKS, 5_000, seed=first['seed'], workers=1, chunk_size=1_000)
+        np.testing.assert_array_equal(first['places'], again['places'])
+
+    def test_engines_agree(self):
+        """Test zgodności silnika obiektowego z wektorowym."""
+        batch = run_parallel(RANKS, 100_000, seed=1, workers=1)
+        objects = run_parallel(RANKS, 3_000, seed=1, workers=1, chunk_size=1_000, engine='object')
+        np.testing.assert_allclose(objects['probabilities'], batch['probabilities'], atol=0.035)
+        np.testing.assert_allclose(objects['goals'] / 3_000, batch['goals'] / 100_000, atol=0.15)
+
+    def test_merge_totals(self):
+        """Test sumowania wyników porcji."""
+        seeds = np.random.SeedSequence(3).spawn(2)
+        parts = [run_chunk(tuple(RANKS), 100, seed_seq) for seed_seq in seeds]
+        total = merge_totals(merge_totals(empty_totals(8), parts[0]), parts[1])
+        self.assertEqual(total['runs'], 200)
+        np.testing.assert_array_equal(total['places'].sum(axis=0), [200, 200, 200, 200, 800])
+        np.testing.assert_array_equal(total['advanced'], total['places'][:, :4].sum(axis=1))
+
+    def test_advancement_counts_qualifiers(self):
+        """Test wyjścia z grupy w formacie wc32 (16 drużyn w fazie pucharowej) w obu silnikach."""
+        ranks = list(range(1, 129, 4))
+        for engine, runs in (('batch', 2000), ('object', 50)):
+            with self.subTest(engine=engine):
+                result = run_parallel(ranks, runs, seed=2, workers=1, engine=engine, fmt='wc32')
+                self.assertAlmostEqual(result['advancement'].sum(), 16.0)
+                self.assertTrue(np.all(result['advancement'] >= result['probabilities'][:, :4].sum(axis=1)))
+
+    def test_invalid_arguments(self):
+        """Test odrzucenia nieznanego silnika i złej liczby drużyn."""
+        with self.assertRaises(ValueError):
+            run_parallel(RANKS, 10, engine='gpu')
+        with self.assertRaises(ValueError):
+            run_parallel(RANKS[:4], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Testy jednostkowe dla modułu ranking_cache.py
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import ranking_cache
+from http_stub import StubServer, fixture_pages
+from ranking_cache import CACHE_VERSION, load_rankings, read_cache, write_cache, refresh_rankings
+from transfermarkt_rankings import parse_rankings_page, parse_last_page
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name):
+    """Wczytuje zapisaną stronę Transfermarkt."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def fixture_rankings():
+    """Ranking złożony ze wszystkich zapisanych stron."""
+    first = read_fixture("transfermarkt_page1.html")
+    rankings = parse_rankings_page(first)
+    for page in range(2, parse_last_page(first) + 1):
+        rankings.extend(parse_rankings_page(read_fixture(f"transfermarkt_page{page}.html")))
+    return rankings
+
+
+class TestParser(unittest.TestCase):
+    """Testy parsowania zapisanych stron rankingu."""
+
+    def test_parse_page(self):
+        """Test odczytu rekordów z pierwszej strony."""
+        rankings = parse_rankings_page(read_fixture("transfermarkt_page1.html"))
+        self.assertEqual(len(rankings), 5)
+        self.assertEqual(rankings[0], {'rank': 1, 'country': 'Argentina', 'points': 1885.36})
+
+    def test_last_page(self):
+        """Test odczytu liczby podstron."""
+        self.assertEqual(parse_last_page(read_fixture("transfermarkt_page1.html")), 3)
+
+
+class TestRankingCache(unittest.TestCase):
+    """Testy pamięci podręcznej rankingu."""
+
+    def setUp(self):
+        """Przygotowanie katalogu tymczasowego."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rankings.json")
+        self.env = patch.dict(os.environ, {}, clear=False)
+        self.env.start()
+        os.environ.pop("SYMULATOR_ALLOW_NETWORK", None)
+
+    def tearDown(self):
+        """Sprzątanie katalogu tymczasowego."""
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_refresh_and_load_without_network(self):
+        """Test odczytu z pliku bez wywołania funkcji pobierającej."""
+        refresh_rankings(self.path, fetch=fixture_rankings)
+
+        def fail():
+            raise AssertionError("sieć nie powinna być używana")
+
+        rankings = load_rankings(self.path, allow_network=True, fetch=fail)
+        self.assertEqual(len(rankings), 15)
+        self.assertEqual(rankings[13]['country'], 'Poland')
+
+    def test_network_is_opt_in(self):
+        """Test braku pobierania bez jawnej zgody."""
+        calls = []
+        with patch('builtins.print'):
+            rankings = load_rankings(self.path, fetch=lambda: calls.append(1) or [])
+        self.assertEqual(rankings, [])
+        self.assertEqual(calls, [])
+
+    def test_expired_cache_is_refreshed(self):
+        """Test odświeżenia przeterminowanego pliku."""
+        write_cache([{'rank': 1, 'country': 'Old', 'points': 1.0}], self.path)
+        rankings = load_rankings(self.path, ttl=0, allow_network=True, fetch=fixture_rankings)
+        self.assertEqual(rankings[0]['country'], 'Argentina')
+        self.assertEqual(read_cache(self.path)['rankings'][0]['country'], 'Argentina')
+
+    def test_expired_cache_used_offline(self):
+        """Test użycia nieaktualnego pliku bez dostępu do sieci."""
+        write_cache([{'rank': 1, 'country': 'Old', 'points': 1.0}], self.path)
+        with patch('builtins.print'):
+            rankings = load_rankings(self.path, ttl=0, allow_network=False)
+        self.assertEqual(rankings[0]['country'], 'Old')
+
+    def test_failed_refresh_keeps_file(self):
+        """Test zachowania pliku przy nieudanym pobieraniu."""
+        write_cache([{'rank': 1, 'country': 'Old', 'points': 1.0}], self.path)
+        self.assertEqual(refresh_rankings(self.path, fetch=lambda: []), [])
+        self.assertEqual(read_cache(self.path)['rankings'][0]['country'], 'Old')
+
+    def test_version_mismatch(self):
+        """Test odrzucenia pliku w innej wersji formatu."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION + 1, "fetched_at": time.time(), "rankings": []}, f)
+        self.assertIsNone(read_cache(self.path))
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        """Test braku plików tymczasowych po zapisie."""
+        write_cache([], self.path)
+        self.assertEqual(os.listdir(self.tmp.name), ["rankings.json"])
+
+    def test_incremental_refresh(self):
+        """Test odświeżenia przyrostowego ze stanem stron zapisanym w pliku."""
+        with StubServer() as server:
+            first = refresh_rankings(self.path, url=server.url)
+            stats = {}
+            refresh_rankings(self.path, url=server.url, stats=stats)
+            self.assertEqual((stats['not_modified'], stats['changed']), ([1], False))
+            server.publish(fixture_pages(2))
+            refresh_rankings(self.path, url=server.url, stats=stats)
+            self.assertEqual((stats['parsed'], stats['not_modified']), ([1, 3], [2]))
+            refresh_rankings(self.path, url=server.url, stats=stats, full=True)
+            self.assertEqual(stats['parsed'], [1, 2, 3])
+        data = read_cache(self.path)
+        self.assertEqual(first, fixture_rankings())
+        self.assertEqual(data['rankings'][14]['country'], 'Poland')
+        self.assertEqual(sorted(data['pages']['pages']), ['1', '2', '3'])
+
+    def test_env_configuration(self):
+        """Test konfiguracji przez zmienne środowiskowe."""
+        with patch.dict(os.environ, {"SYMULATOR_RANKINGS_CACHE": self.path,
+                                     "SYMULATOR_RANKINGS_TTL": "60",
+                                     "SYMULATOR_ALLOW_NETWORK": "1"}):
+            self.assertEqual(ranking_cache.cache_path(), self.path)
+            self.assertEqual(ranking_cache.cache_ttl(), 60.0)
+            self.assertTrue(ranking_cache.network_allowed())
+
+
+if __name__ == "__main__":
+    unittest.main()
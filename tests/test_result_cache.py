@@ -0,0 +1,106 @@
+"""
+Testy pamięci podręcznej wyników scenariuszy (result_cache.py)
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from result_cache import CACHE_NAMESPACE, ResultCache, scenario_key
+
+TEAMS = ["Brazil", "Argentina", "France", "Spain", "Poland", "Japan", "Panama", "Fiji"]
+
+
+def key(teams=TEAMS, seed=None, snapshot="a" * 64, **kwargs):
+    """Klucz scenariusza z domyślnymi parametrami."""
+    options = dict(fmt="classic8", model="rank", runs=1000, engine="batch")
+    options.update(kwargs)
+    return scenario_key(teams, options["fmt"], options["model"], options["runs"], seed, snapshot, options["engine"])
+
+
+class TestScenarioKey(unittest.TestCase):
+    """Testy kanonicznej postaci klucza."""
+
+    def test_canonical_teams(self):
+        """Test normalizacji nazw i kolejności drużyn zależnej od ziarna."""
+        self.assertEqual(key(), key(TEAMS[::-1]))
+        self.assertEqual(key(), key(["Brazylia"] + TEAMS[1:4] + ["Polska"] + TEAMS[5:]))
+        self.assertEqual(key(seed=1), key(seed=1))
+        self.assertNotEqual(key(seed=1), key(TEAMS[::-1], seed=1))
+
+    def test_every_input_changes_key(self):
+        """Test zmiany klucza dla każdego parametru scenariusza."""
+        variants = [key(), key(seed=1), key(snapshot="b" * 64), key(fmt="fifa8"), key(model="elo"),
+                    key(runs=2000), key(engine="object")]
+        self.assertEqual(len(set(variants)), len(variants))
+
+
+class TestResultCache(unittest.TestCase):
+    """Testy poziomu w pamięci i na dysku."""
+
+    def setUp(self):
+        """Przygotowanie katalogu tymczasowego."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_memory_lru(self):
+        """Test wypierania najdawniej używanego wyniku i kopii przy odczycie."""
+        cache = ResultCache(memory_items=2)
+        cache.put("a", {"x": np.int16(1)})
+        cache.put("b", {"x": 2.5})
+        self.assertEqual(cache.get("a"), {"x": 1})
+        cache.get("a")["x"] = 7
+        cache.put("c", {"x": 3})
+        self.assertEqual((cache.get("a"), cache.get("b")), ({"x": 1}, None))
+        self.assertEqual((cache.stats["memory_hits"], cache.stats["misses"]), (3, 1))
+
+    def test_disk_tier_and_eviction(self):
+        """Test odczytu z dysku w nowym procesie i usuwania plików ponad limit rozmiaru."""
+        snapshot = "a" * 64
+        cache = ResultCache(self.tmp.name, snapshot=snapshot, max_bytes=250)
+        for name in "abc":
+            cache.put(name * 64, {"drużyna": name * 80})
+        self.assertLessEqual(cache.disk_bytes(), 250)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+        fresh = ResultCache(self.tmp.name, snapshot=snapshot, max_bytes=250)
+        self.assertIsNone(fresh.get("a" * 64))
+        self.assertEqual(fresh.get("c" * 64), {"drużyna": "c" * 80})
+        self.assertEqual(fresh.stats["disk_hits"], 1)
+        self.assertIn("b" * 64, fresh)
+
+    def test_snapshot_invalidation(self):
+        """Test usunięcia wyników po zmianie stanu rankingu."""
+        cache = ResultCache(self.tmp.name, snapshot="a" * 64)
+        value, cached = cache.get_or_compute("k" * 64, lambda: {"runs": np.int64(5)})
+        self.assertEqual((value, cached), ({"runs": 5}, False))
+        self.assertEqual(cache.get_or_compute("k" * 64, lambda: self.fail("ponowne liczenie")), ({"runs": 5}, True))
+
+        self.assertFalse(cache.use_snapshot("a" * 64))
+        self.assertTrue(cache.use_snapshot("b" * 64))
+        self.assertEqual((len(cache), os.listdir(cache.root)), (0, []))
+        self.assertIsNone(cache.get("k" * 64))
+
+    def test_foreign_files_survive(self):
+        """Test zachowania cudzych plików i katalogów przy zmianie rankingu i czyszczeniu."""
+        foreign = [os.path.join(self.tmp.name, "important", "dane.json"), os.path.join(self.tmp.name, "notatki.txt"),
+                   os.path.join(self.tmp.name, CACHE_NAMESPACE, "inne", "plik.json")]
+        for path in foreign:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{}")
+
+        cache = ResultCache(self.tmp.name, snapshot="a" * 64, max_bytes=1)
+        cache.put("k" * 64, {"runs": 5})
+        cache.use_snapshot("../poza")
+        cache.put("k" * 64, {"runs": 6})
+        self.assertEqual(len(os.listdir(cache.root)), 2)
+        cache.clear()
+        self.assertEqual(os.listdir(cache.root), ["inne"])
+        self.assertTrue(all(os.path.exists(path) for path in foreign))
+
+
+if __name__ == "__main__":
+    unittest.main()
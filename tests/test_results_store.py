@@ -0,0 +1,100 @@
+"""
+Testy jednostkowe dla modułu results_store.py
+"""
+
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from aggregation import StreamingStats, iter_batches, iter_tournaments
+from parallel import table_teams
+from ranking_cache import snapshot_hash
+from results_store import ResultsStore, ResultsWriter, SCHEMA_VERSION, read_header, simulate_to_store
+
+RANKS = [1, 5, 12, 30, 45, 70, 120, 200]
+NAMES = [f"Drużyna {i + 1}" for i in range(len(RANKS))]
+
+
+class TestResultsStore(unittest.TestCase):
+    """Testy zapisu i odczytu katalogu wyników."""
+
+    def setUp(self):
+        """Przygotowanie katalogu tymczasowego."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "wyniki")
+
+    def test_round_trip_matches_streaming_stats(self):
+        """Test zgodności statystyk z odczytu z liczonymi w locie."""
+        direct = StreamingStats(NAMES, RANKS)
+        with ResultsWriter(self.path, NAMES, RANKS, seed=7, chunk_runs=64) as writer:
+            for item in iter_tournaments(RANKS, 300, random.Random(7), NAMES):
+                direct.add_tournament(*item)
+                writer.add_tournament(*item)
+
+        store = ResultsStore(self.path)
+        self.assertEqual(len(store), 300)
+        self.assertEqual(len(store.chunks("teams")), 5)
+        self.assertIsInstance(store.chunks("matches")[0], np.memmap)
+        self.assertEqual(len(store.column("matches", "run")), 300 * 16)
+        self.assertEqual(store.header["phases"][:2], ["Grupa A", "Grupa B"])
+
+        stored = store.to_stats()
+        for name in ('places', 'points', 'goals', 'scorelines'):
+            np.testing.assert_array_equal(getattr(stored, name), getattr(direct, name))
+        self.assertEqual((stored.knockouts, stored.shootouts), (direct.knockouts, direct.shootouts))
+        np.testing.assert_allclose(stored.team_goals.variance, direct.team_goals.variance)
+
+    def test_append_sessions(self):
+        """Test dopisywania kolejnej sesji i kontroli zgodności drużyn."""
+        _, teams = table_teams(RANKS, NAMES)
+        simulate_to_store(self.path, teams, 100, seed=1, chunk_runs=40)
+        store = simulate_to_store(self.path, teams, 50, seed=2, chunk_runs=40)
+
+        self.assertEqual(len(store), 150)
+        np.testing.assert_array_equal(np.unique(store.column("teams", "run")), np.arange(150))
+        self.assertEqual([s["first_run"] for s in store.header["sessions"]], [0, 100])
+        self.assertEqual(store.header["sessions"][1]["seed"], 2)
+        with self.assertRaises(ValueError):
+            ResultsWriter(self.path, NAMES[::-1], RANKS)
+
+    def test_batches_and_ranking_snapshot(self):
+        """Test zapisu partii silnika wektorowego i skrótu rankingu w nagłówku."""
+        rankings = [{'rank': 1, 'country': 'Brazil', 'points': 1800.0}]
+        direct = StreamingStats(NAMES, RANKS)
+        with ResultsWriter(self.path, NAMES, RANKS, rankings_hash=snapshot_hash(rankings), chunk_runs=700) as writer:
+            for result in iter_batches(RANKS, 2_000, np.random.default_rng(3), 900):
+                direct.add_batch(result)
+                writer.add_batch(result)
+
+        header = read_header(self.path)
+        self.assertEqual(header["schema_version"], SCHEMA_VERSION)
+        self.assertEqual(header["ranking_snapshot"], snapshot_hash(rankings))
+        stored = ResultsStore(self.path).to_stats()
+        np.testing.assert_array_equal(stored.places, direct.places)
+        np.testing.assert_allclose(stored.total_goals.mean, direct.total_goals.mean)
+
+    def test_export_json(self):
+        """Test wolnej ścieżki eksportu do JSON."""
+        with ResultsWriter(self.path, NAMES, RANKS) as writer:
+            writer.consume(iter_tournaments(RANKS, 3, random.Random(2), NAMES))
+        filename = os.path.join(self.tmp.name, "wyniki.json")
+        ResultsStore(self.path).export_json(filename)
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(len(data["runs"]), 3)
+        self.assertEqual(len(data["runs"][0]["matches"]), 16)
+        self.assertEqual(sorted(t["miejsce"] for t in data["runs"][0]["teams"]), [0, 1, 2, 3, 4, 4, 4, 4])
+
+    def test_missing_store(self):
+        """Test otwarcia katalogu bez wyników."""
+        with self.assertRaises(FileNotFoundError):
+            ResultsStore(self.tmp.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
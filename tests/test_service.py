@@ -0,0 +1,143 @@
+"""
+Testy serwisu symulacji (service.py)
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from exact_probabilities import knockout_probability
+from http_stub import fixture_pages
+from parallel import run_parallel
+from service import SimulationService, request
+from simulation import PLACES
+from strength_tables import compile_model
+from transfermarkt_rankings import parse_rankings_page
+
+TEAMS = ["Brazil", "Argentina", "France", "Spain", "Poland", "Japan", "Panama", "Fiji"]
+RANKINGS = [team for html in fixture_pages().values() for team in parse_rankings_page(html)]
+
+
+class TestSimulationService(unittest.IsolatedAsyncioTestCase):
+    """Testy łączenia zapytań, protokołu HTTP i metryk serwisu."""
+
+    async def asyncSetUp(self):
+        """Serwis z rankingiem z zapisanych stron i dłuższym oknem łączenia zapytań."""
+        self.service = SimulationService(RANKINGS, window=0.05, workers=2)
+        self.addAsyncCleanup(self.service.close)
+
+    async def test_coalesced_requests(self):
+        """Test wspólnej porcji dla równoczesnych zapytań o ten sam turniej."""
+        results = await asyncio.gather(
+            self.service.simulate(TEAMS, runs=2000),
+            self.service.simulate(TEAMS, runs=5000),
+            self.service.simulate(TEAMS[::-1], runs=1000),
+            self.service.simulate(TEAMS, runs=3000, seed=7),
+            self.service.simulate(TEAMS, runs=3000, seed=7),
+        )
+        self.assertEqual(self.service.metrics.batches, 3)
+        self.assertEqual(self.service.metrics.coalesced, 2)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual((results[0]["runs"], results[0]["coalesced"]), (5000, 2))
+        self.assertEqual(results[3], results[4])
+
+        ranks = [entry["fifa_ranking"] for entry in results[3]["teams"].values()]
+        expected = run_parallel(ranks, 3000, seed=7, workers=1)["probabilities"]
+        odds = [[entry[place] for place in PLACES] for entry in results[3]["teams"].values()]
+        np.testing.assert_array_equal(odds, expected)
+        self.assertEqual(self.service.metrics.tournaments, 5000 + 1000 + 3000)
+
+    async def test_result_cache(self):
+        """Test odpowiedzi z pamięci podręcznej i unieważnienia po zmianie rankingu."""
+        first = await self.service.simulate(TEAMS, runs=1000)
+        again = await self.service.simulate(TEAMS[::-1], runs=1000)
+        self.assertEqual((first["cached"], again["cached"]), (False, True))
+        self.assertEqual(again["teams"], first["teams"])
+        self.assertEqual((self.service.metrics.batches, self.service.metrics.cache_hits), (1, 1))
+
+        self.service.reload([dict(team, points=team["points"] + 1) for team in RANKINGS])
+        self.assertFalse((await self.service.simulate(TEAMS, runs=1000))["cached"])
+        self.assertEqual(self.service.metrics.batches, 2)
+
+    async def test_http_and_metrics(self):
+        """Test zapytań HTTP przez gniazdo uniksowe: symulacja, mecz, błędy i metryki."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "serwis.sock")
+            await self.service.start(unix_path=path)
+            status, odds = await request("POST", "/simulate", {"teams": TEAMS, "runs": 500, "model": "elo"},
+                                         unix_path=path)
+            self.assertEqual((status, odds["model"]), (200, "elo"))
+            self.assertAlmostEqual(sum(entry["mistrz"] for entry in odds["teams"].values()), 1.0)
+
+            status, match = await request("POST", "/match", {"teams": ["Polska", "Brazil"]}, unix_path=path)
+            self.assertEqual(match["teams"], ["Poland", "Brazil"])
+            ranks = match["fifa_ranking"]
+            self.assertAlmostEqual(match["wygrana"] + match["remis"] + match["porażka"], 1.0)
+            self.assertAlmostEqual(match["awans"], knockout_probability(*ranks, compile_model("rank", RANKINGS)))
+
+            errors = [
+                await request("POST", "/simulate", {"teams": TEAMS[:3]}, unix_path=path),
+                await request("POST", "/simulate", {"teams": TEAMS, "model": "nieznany"}, unix_path=path),
+                await request("GET", "/simulate", unix_path=path),
+                await request("GET", "/nieznana", unix_path=path),
+            ]
+            self.assertEqual([status for status, _ in errors], [400, 400, 405, 404])
+            self.assertIn("8 drużyn", errors[0][1]["error"])
+
+            malformed = [
+                ("/simulate", {"teams": [["x"]] + TEAMS[1:]}),
+                ("/simulate", {"teams": TEAMS, "model": ["rank"]}),
+                ("/simulate", {"teams": TEAMS, "format": {"classic8": 1}}),
+                ("/simulate", {"teams": TEAMS, "runs": True}),
+                ("/simulate", {"teams": TEAMS, "seed": False}),
+                ("/match", {"teams": [{"name": "Poland"}, "Brazil"]}),
+                ("/match", {"teams": ["Poland", "Brazil"], "model": ["elo"]}),
+            ]
+            for route, body in malformed:
+                status, error = await request("POST", route, body, unix_path=path)
+                self.assertEqual(status, 400, error)
+
+            status, health = await request("GET", "/health", unix_path=path)
+            self.assertEqual(health["teams"], len(RANKINGS))
+            status, text = await request("GET", "/metrics", unix_path=path)
+            self.assertIn('symulator_service_requests_total{path="/simulate"} 9', text)
+            self.assertIn('symulator_service_errors_total{path="/simulate"} 8', text)
+            self.assertIn('symulator_service_latency_seconds{quantile="0.99"}', text)
+            status, data = await request("GET", "/metrics.json", unix_path=path)
+            self.assertEqual(data["tournaments"], 500)
+            self.assertGreater(data["tournaments_per_s"], 0)
+
+    async def test_team_cache_bounded(self):
+        """Test ograniczenia zapamiętanych nazw drużyn do ostatnio używanych."""
+        with patch("service.TEAM_CACHE_ITEMS", 2):
+            for name in ("Poland", "Brazil", "Poland", "Japan"):
+                self.service.team(name)
+        self.assertEqual(list(self.service._teams), ["Poland", "Japan"])
+        self.assertEqual(self.service.team("Polska")[0], "Poland")
+
+    async def test_tcp_and_reload(self):
+        """Test zapytań przez TCP i podmiany rankingu w pamięci."""
+        server = await self.service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        status, health = await request("GET", "/health", port=port)
+        self.assertEqual((status, health["status"]), (200, "ok"))
+
+        before = self.service.match("Poland", "Morocco")
+        swapped = [dict(team) for team in RANKINGS]
+        for team in swapped:
+            if team["country"] == "Poland":
+                team["rank"] = 2
+        diff = self.service.reload(swapped)
+        self.assertEqual(diff["changed"], ["Poland"])
+        self.assertNotEqual(self.service.snapshot, health["snapshot"])
+        after = self.service.match("Poland", "Morocco")
+        self.assertEqual(after["fifa_ranking"][0], 2)
+        self.assertGreater(after["wygrana"], before["wygrana"])
+
+
+if __name__ == "__main__":
+    unittest.main()
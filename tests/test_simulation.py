@@ -0,0 +1,136 @@
+"""
+Testy jednostkowe dla modułu simulation.py
+"""
+
+import contextlib
+import io
+import random
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from models import Team, Match
+from simulation import (
+    OUTSIDE_PODIUM, PLACES, SEMIFINAL, place_labels, sample_goals, simulate_batch,
+    place_probabilities, simulate_tournaments, podium_to_places, _group_leaders,
+)
+from strength_tables import shootout_win_probability
+
+RANKS = [1, 5, 12, 30, 45, 70, 120, 200]
+
+
+class TestMatchModel(unittest.TestCase):
+    """Zgodność rozkładów z models.Match."""
+
+    def setUp(self):
+        """Przygotowanie danych testowych."""
+        with patch('models.load_rankings', return_value=[]), \
+                patch('models.get_team_rank', return_value=211):
+            self.team1 = Team("Brazylia")
+            self.team2 = Team("Panama")
+        self.team1.fifa_rank = 1
+        self.team2.fifa_rank = 100
+
+    def test_goal_distribution_matches_play(self):
+        """Test rozkładu goli względem Match.play."""
+        random.seed(7)
+        n = 20000
+        expected = np.zeros((2, 8))
+        for _ in range(n):
+            match = Match(self.team1, self.team2)
+            match.play()
+            expected[0, match.score[0]] += 1
+            expected[1, match.score[1]] += 1
+        expected /= n
+
+        s1, s2 = self.team1.get_strength(), self.team2.get_strength()
+        lam1 = np.full(200000, 2.5 * (s1 / (s1 + s2)))
+        lam2 = np.full(200000, 2.5 * (s2 / (s1 + s2)))
+        g1, g2 = sample_goals(np.random.default_rng(7), lam1, lam2)
+        actual = np.stack([np.bincount(g1, minlength=8), np.bincount(g2, minlength=8)]) / 200000
+
+        np.testing.assert_allclose(actual, expected, atol=0.015)
+
+    def test_shootout_probability_matches_play_penalties(self):
+        """Test dokładnego prawdopodobieństwa wygrania karnych."""
+        random.seed(11)
+        n = 20000
+        wins = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(n):
+                match = Match(self.team1, self.team2, "Finał")
+                match.play_penalties()
+                wins += match.penalty_result[0] > match.penalty_result[1]
+
+        prob1 = 0.7 + self.team1.get_strength() * 0.2
+        prob2 = 0.7 + self.team2.get_strength() * 0.2
+        self.assertAlmostEqual(shootout_win_probability(prob1, prob2), wins / n, delta=0.015)
+
+    def test_shootout_symmetry(self):
+        """Test sumowania się szans obu drużyn do jedności."""
+        p = shootout_win_probability(0.8, 0.75) + shootout_win_probability(0.75, 0.8)
+        self.assertAlmostEqual(p, 1.0)
+
+
+class TestBatchEngine(unittest.TestCase):
+    """Testy wektorowego silnika turniejowego."""
+
+    def test_probabilities_are_consistent(self):
+        """Test sum prawdopodobieństw miejsc."""
+        probs = place_probabilities(RANKS, 20000, np.random.default_rng(1))
+        self.assertEqual(probs.shape, (8, len(PLACES)))
+        np.testing.assert_allclose(probs.sum(axis=1), 1.0)
+        np.testing.assert_allclose(probs.sum(axis=0), [1, 1, 1, 1, 4])
+        self.assertGreater(probs[0, 0], probs[-1, 0])
+
+    def test_seed_reproducibility(self):
+        """Test powtarzalności wyników dla tego samego ziarna."""
+        a = place_probabilities(RANKS, 5000, np.random.default_rng(3), batch_size=1000)
+        b = place_probabilities(RANKS, 5000, np.random.default_rng(3), batch_size=1000)
+        np.testing.assert_array_equal(a, b)
+
+    def test_batch_detail(self):
+        """Test punktów i goli zwracanych przez simulate_batch."""
+        result = simulate_batch(RANKS, 1000, np.random.default_rng(5))
+        self.assertEqual(result['podium'].shape, (1000, 4))
+        self.assertEqual(result['points'].sum(axis=1).max(), 2 * 6 * 3)
+        self.assertTrue((result['points'].sum(axis=1) >= 2 * 6 * 2).all())
+        self.assertTrue((result['goals'] >= 0).all())
+
+        places = podium_to_places(result['podium'], 8)
+        self.assertTrue(((places < 4).sum(axis=1) == 4).all())
+
+    def test_group_leaders_keep_draw_order(self):
+        """Test stabilnego rozstrzygania remisów jak w main.sort_group."""
+        points = np.array([[[3, 5, 5, 3]]], dtype=np.int8)
+        goals = np.array([[[4, 2, 2, 1]]], dtype=np.int8)
+        first, second = _group_leaders(points, goals)
+        self.assertEqual((first[0, 0], second[0, 0]), (1, 2))
+
+    def test_wrong_team_count(self):
+        """Test odrzucenia turnieju z inną liczbą drużyn."""
+        with self.assertRaises(ValueError):
+            simulate_batch(RANKS[:6], 10, np.random.default_rng())
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank')
+    def test_simulate_tournaments(self, mock_get_team_rank, mock_load_rankings):
+        """Test słownika szans dla obiektów Team."""
+        mock_get_team_rank.side_effect = RANKS
+        teams = [Team(name) for name in "ABCDEFGH"]
+        odds = simulate_tournaments(teams, 2000, seed=1)
+        self.assertEqual(list(odds), [t.name for t in teams])
+        self.assertEqual(set(odds["A"]), set(PLACES))
+
+    def test_place_labels(self):
+        """Test etykiety drużyn spoza podium zależnej od formatu."""
+        self.assertEqual(place_labels('fifa8'), PLACES)
+        for name in ('groups16', 'wc32', 'wc48'):
+            with self.subTest(fmt=name):
+                self.assertEqual(place_labels(name), PLACES[:-1] + (OUTSIDE_PODIUM,))
+        self.assertEqual(place_labels('euro24'), PLACES[:2] + (SEMIFINAL, OUTSIDE_PODIUM))
+
+
+if __name__ == "__main__":
+    unittest.main()
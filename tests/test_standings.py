@@ -0,0 +1,97 @@
+"""
+Testy jednostkowe dla modułu standings.py
+"""
+
+import itertools
+import random
+import unittest
+
+import numpy as np
+
+from formats import play_format
+from parallel import run_parallel, table_teams
+from simulation import _group_keys, _group_tables
+from standings import GroupStandings
+
+PAIRS = tuple(itertools.combinations(range(4), 2))
+
+
+def play(results):
+    """Tabela grupy 4 drużyn z wynikami {(i, j): (gole i, gole j)}."""
+    table = GroupStandings("ABCD")
+    for (i, j), (goals_i, goals_j) in results.items():
+        table.record(i, j, goals_i, goals_j)
+    return table
+
+
+class TestGroupStandings(unittest.TestCase):
+    """Testy tabeli grupy i kryteriów rozstrzygania remisów."""
+
+    def test_incremental_update(self):
+        """Test aktualizacji tabeli i zapamiętanej kolejności po każdym wyniku."""
+        table = GroupStandings("ABCD")
+        table.record(0, 1, 0, 2)
+        self.assertEqual(table.ranked(), ["B", "C", "D", "A"])
+        self.assertIs(table.order(), table.order())
+        table.record(2, 3, 1, 1)
+        self.assertEqual((table.points, table.goal_difference(0)), ([0, 3, 1, 1], -2))
+        self.assertEqual(table.ranked(), ["B", "C", "D", "A"])
+
+    def test_goal_difference_before_goals(self):
+        """Test różnicy goli przed golami zdobytymi (zasada 'goals' odwrotnie)."""
+        table = play({(0, 1): (0, 0), (0, 2): (5, 4), (0, 3): (0, 3),
+                      (1, 2): (1, 0), (1, 3): (0, 1), (2, 3): (0, 0)})
+        # A i B: 4 pkt; A: 5-7, B: 1-1
+        self.assertEqual(table.ranked('fifa'), ["D", "B", "A", "C"])
+        self.assertEqual(table.ranked('goals'), ["D", "A", "B", "C"])
+
+    def test_head_to_head(self):
+        """Test małej tabeli przy równych punktach, różnicy goli i golach."""
+        table = play({(0, 1): (1, 0), (0, 2): (0, 1), (0, 3): (1, 1),
+                      (1, 2): (1, 0), (1, 3): (1, 1), (2, 3): (0, 0)})
+        # A i B: 4 pkt, 2-2; C: 4 pkt, 1-1; A wygrało z B
+        self.assertEqual(table.head_to_head([0, 1]), {0: (3, 1, 1), 1: (0, -1, 0)})
+        self.assertEqual(table.ranked(), ["A", "B", "C", "D"])
+        table.penalize(0, 2)
+        self.assertEqual(table.ranked(), ["A", "B", "C", "D"])
+
+    def test_fair_play_and_lots(self):
+        """Test fair play i kolejności losowania przy pełnym remisie."""
+        table = play({(0, 1): (1, 0), (0, 2): (0, 1), (0, 3): (0, 0),
+                      (1, 2): (1, 0), (1, 3): (0, 0), (2, 3): (0, 0)})
+        # A, B i C: 4 pkt, 1-1, w małej tabeli po 3 pkt i 1-1
+        self.assertEqual(table.ranked(), ["A", "B", "C", "D"])
+        table.penalize(0, 2)
+        self.assertEqual(table.ranked(), ["B", "C", "A", "D"])
+        with self.assertRaises(ValueError):
+            table.order('uefa')
+
+    def test_vectorized_keys_match(self):
+        """Test zgodności kluczy wektorowych z kolejnością GroupStandings."""
+        rng = np.random.default_rng(5)
+        g1 = rng.integers(0, 3, (3000, 1, len(PAIRS))).astype(np.int8)
+        g2 = rng.integers(0, 3, (3000, 1, len(PAIRS))).astype(np.int8)
+        points = np.zeros((3000, 1, 4), dtype=np.int16)
+        goals = np.zeros((3000, 1, 4), dtype=np.int16)
+        _group_tables(points, goals, g1, g2, PAIRS)
+        for rule in ('goals', 'fifa'):
+            key, _ = _group_keys(points, goals, g1, g2, PAIRS, rule)
+            order = np.argsort(-key[:, 0], axis=-1)
+            for run in range(len(order)):
+                table = GroupStandings("ABCD")
+                for k, (i, j) in enumerate(PAIRS):
+                    table.record(i, j, int(g1[run, 0, k]), int(g2[run, 0, k]))
+                self.assertEqual(table.order(rule), order[run].tolist())
+
+    def test_engines_agree(self):
+        """Test zgodności silnika obiektowego i wektorowego dla formatu fifa8."""
+        ranks = [1, 5, 12, 30, 45, 70, 120, 200]
+        _, teams = table_teams(ranks)
+        self.assertEqual(len(play_format('fifa8', teams, random.Random(1))), 4)
+        batch = run_parallel(ranks, 40_000, seed=2, workers=1, engine='batch', fmt='fifa8')
+        objects = run_parallel(ranks, 10_000, seed=2, workers=1, engine='object', fmt='fifa8')
+        np.testing.assert_allclose(batch['probabilities'], objects['probabilities'], atol=0.025)
+
+
+if __name__ == "__main__":
+    unittest.main()
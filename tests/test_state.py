@@ -0,0 +1,122 @@
+"""
+Testy jednostkowe dla modułu state.py
+"""
+
+import random
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from models import Team, Match
+from state import TeamTable, MatchLog, MATCH_DTYPE
+
+
+class TestTeamTable(unittest.TestCase):
+    """Testy tabeli drużyn i widoków Team."""
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank')
+    def setUp(self, mock_get_team_rank, mock_load_rankings):
+        """Przygotowanie danych testowych."""
+        mock_get_team_rank.side_effect = [1, 100]
+        self.table = TeamTable(4)
+        self.team1 = Team("Brazylia", self.table)
+        self.team2 = Team("Panama", self.table)
+
+    def test_team_is_view(self):
+        """Test zapisu stanu drużyny w kolumnach tabeli."""
+        self.team1.points += 3
+        self.team2.goals = 2
+        arrays = self.table.arrays()
+        np.testing.assert_array_equal(arrays['points'], [3, 0])
+        np.testing.assert_array_equal(arrays['goals'], [0, 2])
+        np.testing.assert_array_equal(arrays['fifa_rank'], [1, 100])
+        self.assertNotIn('__dict__', dir(self.team1))
+
+    def test_numpy_views_share_memory(self):
+        """Test widoków NumPy bez kopiowania."""
+        self.table.arrays()['goals'][1] = 5
+        self.assertEqual(self.team2.goals, 5)
+        self.assertIsInstance(self.team2.goals, int)
+
+    def test_reset(self):
+        """Test zerowania tabeli przed kolejną symulacją."""
+        self.team1.points = 7
+        self.team1.goals = 4
+        self.table.reset()
+        self.assertEqual((self.team1.points, self.team1.goals, self.team1.fifa_rank), (0, 0, 1))
+
+    def test_from_row_and_capacity(self):
+        """Test widoku na istniejący wiersz i limitu pojemności."""
+        view = Team.from_row(self.table, 1)
+        self.assertEqual((view.name, view.fifa_rank), ("Panama", 100))
+        self.table.add("C", 5)
+        self.table.add("D", 6)
+        with self.assertRaises(ValueError):
+            self.table.add("E", 7)
+
+
+class TestMatchLog(unittest.TestCase):
+    """Testy bufora wyników meczów."""
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank')
+    def setUp(self, mock_get_team_rank, mock_load_rankings):
+        """Przygotowanie danych testowych."""
+        mock_get_team_rank.side_effect = [1, 100]
+        self.table = TeamTable(2)
+        self.team1 = Team("Brazylia", self.table)
+        self.team2 = Team("Panama", self.table)
+
+    def test_results_written_to_log(self):
+        """Test zapisu wyniku meczu w buforze."""
+        log = MatchLog(4)
+        random.seed(1)
+        match = Match(self.team1, self.team2, "Grupa A", log=log)
+        match.play()
+
+        records = log.to_records()
+        self.assertEqual(records.dtype, MATCH_DTYPE)
+        self.assertEqual((records['g1'][0], records['g2'][0]), match.score)
+        self.assertEqual(log.phases[records['phase'][0]], "Grupa A")
+        self.assertEqual(self.team1.goals, match.score[0])
+        self.assertIsNone(match.penalty_result)
+
+    def test_penalties_and_summary(self):
+        """Test rzutów karnych i podsumowania meczu z bufora."""
+        log = MatchLog(1)
+        match = Match(self.team1, self.team2, "Finał", log=log)
+        match.score = (1, 1)
+        match.penalty_result = (3, 5)
+        self.assertEqual(match.get_winner(), self.team2)
+        self.assertIn("karne: Brazil 3 - 5 Panama", match.summary())
+
+    def test_clear_reuses_buffer(self):
+        """Test ponownego użycia bufora bez realokacji."""
+        log = MatchLog(1)
+        Match(self.team1, self.team2, log=log)
+        with self.assertRaises(ValueError):
+            Match(self.team1, self.team2, log=log)
+        buffer = log.g1
+        log.clear()
+        Match(self.team1, self.team2, log=log)
+        self.assertIs(log.g1, buffer)
+        self.assertEqual(len(log), 1)
+
+    def test_memory_per_match(self):
+        """Test pamięci na mecz (rekord ~9 B wobec ~180 B obiektu Match z __dict__)."""
+        n = 2000
+        tracemalloc.start()
+        log = MatchLog(n)
+        for _ in range(n):
+            Match(self.team1, self.team2, "Grupa A", log=log).score = (1, 0)
+        log_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(MATCH_DTYPE.itemsize, 9)
+        self.assertLess(log_bytes / n, 18)
+
+if __name__ == "__main__":
+    unittest.main()
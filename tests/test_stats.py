@@ -0,0 +1,97 @@
+"""
+Testy jednostkowe dla modułu stats.py
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+import stats
+from models import Team
+from state import TeamTable
+
+ROWS = [("Brazil", 1, 7, 9), ("Poland", 30, 4, 3), ("Japan", 15, 7, 9), ("Fiji", 160, 0, 1),
+        ("Spain", 3, 6, 9), ("Ghana", 60, 1, 2), ("Panama", 40, 3, 4), ("Chile", 50, 4, 5)]
+
+
+def make_teams():
+    """Drużyny o ustalonych wynikach bez wyszukiwania w rankingu."""
+    table = TeamTable(len(ROWS))
+    for name, rank, points, goals in ROWS:
+        table.add(name, rank, points, goals)
+    return [Team.from_row(table, row) for row in range(len(ROWS))]
+
+
+class TestComputeStats(unittest.TestCase):
+    """Testy warstwy obliczeniowej na tablicach."""
+
+    def test_top_indices_matches_sorted(self):
+        """Test zgodności argpartition z sorted (także kolejności remisów)."""
+        values = np.random.default_rng(1).integers(0, 6, size=200)
+        expected = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+        for n in (1, 5, 37, 200, 300):
+            np.testing.assert_array_equal(stats.top_indices(values, n), expected[:n])
+        points, goals = np.array([3, 4, 4, 1]), np.array([5, 2, 6, 9])
+        np.testing.assert_array_equal(stats.top_indices(points, 2, goals), [2, 1])
+
+    def test_report_matches_team_helpers(self):
+        """Test zgodności raportu z funkcjami operującymi na obiektach Team."""
+        teams = make_teams()
+        report = stats.generate_stats_report(teams, plots=False)
+        self.assertEqual(report['total_goals'], stats.get_total_goals(teams))
+        self.assertEqual(report['top_scorers'], [(t.name, t.goals) for t in stats.get_top_scorers(teams)])
+        expected = sorted(teams, key=lambda t: (t.points, t.goals), reverse=True)[:5]
+        self.assertEqual([t.name for t in report['best_performance_by_rank']], [t.name for t in expected])
+        self.assertLess(report['rank_points_correlation'], 0)
+        self.assertEqual(report['plots'], [])
+
+    def test_many_tournaments(self):
+        """Test statystyk dla macierzy (turnieje, drużyny)."""
+        goals = np.array([[1, 2, 3], [3, 2, 1], [2, 5, 2]])
+        points = np.array([[3, 1, 0], [0, 1, 3], [1, 3, 1]])
+        result = stats.compute_stats([1, 2, 3], points, goals, ["A", "B", "C"], top_n=2)
+        self.assertEqual(result['runs'], 3)
+        self.assertAlmostEqual(result['total_goals'], 7.0)
+        np.testing.assert_allclose(result['team_goals'], [2, 3, 2])
+        np.testing.assert_array_equal(result['top_scorers'], [1, 0])
+        self.assertEqual(stats.rank_correlation([1, 2, 3], [5, 5, 5]), 0.0)
+
+
+class TestRendering(unittest.TestCase):
+    """Testy etapu rysowania wykresów."""
+
+    def setUp(self):
+        """Przygotowanie katalogu tymczasowego."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        arrays = stats.team_arrays(make_teams())
+        self.specs = stats.chart_specs(arrays['names'], arrays['fifa_rank'], arrays['points'], arrays['goals'],
+                                       prefix=os.path.join(self.tmp.name, ""))
+
+    def test_specs_order(self):
+        """Test kolejności drużyn na wykresach jak w funkcjach plot_*."""
+        teams = make_teams()
+        goals_spec, rank_spec = self.specs
+        self.assertEqual(goals_spec['names'], [t.name for t in sorted(teams, key=lambda t: t.goals, reverse=True)])
+        self.assertEqual(rank_spec['ranks'], sorted(t.fifa_rank for t in teams))
+
+    @patch('stats.plt')
+    def test_render_in_one_pass(self, mock_plt):
+        """Test rysowania wszystkich wykresów jednym wywołaniem."""
+        mock_plt.subplots.return_value = (mock_plt.figure(), (mock_plt.ax1, mock_plt.ax2))
+        files = stats.render_charts(self.specs)
+        self.assertEqual(files, [spec['filename'] for spec in self.specs])
+        self.assertEqual(mock_plt.savefig.call_count, 2)
+
+    def test_render_in_background(self):
+        """Test rysowania w osobnym procesie z nieinteraktywnym backendem."""
+        files = stats.render_in_background(self.specs).result(timeout=120)
+        for filename in files:
+            self.assertGreater(os.path.getsize(filename), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Testy jednostkowe dla modułu strength_tables.py
+"""
+
+import random
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from exact_probabilities import place_probabilities
+from models import Team
+from parallel import run_parallel
+from strength_tables import (MAX_RANK, STRENGTH_MODELS, compile_model, dixon_coles_scores, get_tables, goal_pmf,
+                             poisson_pmf, rank_points, rank_strength, use_model)
+
+RANKS = (1, 5, 12, 30, 45, 70, 120, 200)
+
+
+class TestStrengthTables(unittest.TestCase):
+    """Testy tablic siły i parametrów meczu."""
+
+    def setUp(self):
+        """Tablice modelu domyślnego."""
+        self.tables = get_tables()
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank')
+    def test_strength_matches_team(self, mock_get_team_rank, mock_load_rankings):
+        """Test zgodności tablicy siły z Team.get_strength."""
+        for rank in (1, 10, 11, 50, 51, 150, MAX_RANK):
+            mock_get_team_rank.return_value = rank
+            self.assertEqual(self.tables.strength[rank], Team("Polska").get_strength())
+            self.assertEqual(self.tables.strength_list[rank], rank_strength(rank))
+
+    def test_lambdas(self):
+        """Test oczekiwanych liczb goli i wartości spoza zakresu."""
+        lam1, lam2 = self.tables.match_lambdas(1, 100)
+        strength1, strength2 = rank_strength(1), rank_strength(100)
+        self.assertEqual(lam1, 2.5 * (strength1 / (strength1 + strength2)))
+        self.assertAlmostEqual(lam1 + lam2, 2.5)
+        self.assertAlmostEqual(sum(self.tables.match_lambdas(1, 300)), 2.5)
+        self.assertEqual(self.tables.penalty_probability(1), 0.7 + rank_strength(1) * 0.2)
+
+    def test_weak_teams(self):
+        """Test dodatniej siły i skończonych lambd dla pozycji 170 i dalszych."""
+        self.assertTrue((self.tables.strength > 0).all())
+        for rank in (170, 190, MAX_RANK, 300):
+            self.assertGreater(rank_strength(rank), 0)
+            lam1, lam2 = self.tables.match_lambdas(rank, rank)
+            self.assertAlmostEqual(lam1, 1.25)
+            self.assertAlmostEqual(lam2, 1.25)
+        np.testing.assert_allclose(place_probabilities([MAX_RANK] * 8)[:, 0], 1 / 8)
+
+    def test_goal_pmf_matches_sampling(self):
+        """Test dokładnego rozkładu goli względem losowania jak w Match.play."""
+        lam = 1.7
+        rng = random.Random(3)
+        samples = [max(0, min(int(rng.gauss(lam, 1)), 7)) for _ in range(100_000)]
+        observed = np.bincount(samples, minlength=8) / len(samples)
+        expected = goal_pmf(lam)
+        self.assertAlmostEqual(expected.sum(), 1.0)
+        np.testing.assert_allclose(observed, expected, atol=0.01)
+
+    def test_score_matrix(self):
+        """Test macierzy wyników 8x8."""
+        matrix = self.tables.score_matrix(5, 80)
+        self.assertEqual(matrix.shape, (8, 8))
+        self.assertAlmostEqual(matrix.sum(), 1.0)
+        self.assertGreater(np.tril(matrix, -1).sum(), np.triu(matrix, 1).sum())
+
+    def test_cached_per_model(self):
+        """Test budowania tablic raz dla modelu siły."""
+        self.assertIs(get_tables('rank'), self.tables)
+        with self.assertRaises(KeyError):
+            get_tables('nieznany')
+
+
+class TestStrengthModels(unittest.TestCase):
+    """Testy wymiennych modeli siły."""
+
+    def test_points_profile(self):
+        """Test punktów według pozycji z rankingu i profilu domyślnego."""
+        rankings = [{'rank': 1, 'country': 'A', 'points': 1900.0}, {'rank': 3, 'country': 'B', 'points': 1700.0}]
+        points = rank_points(rankings)
+        self.assertEqual(points.shape, (MAX_RANK + 1,))
+        self.assertEqual(points[1:5].tolist(), [1900.0, 1800.0, 1700.0, 1700.0])
+        self.assertTrue(np.all(np.diff(rank_points()[1:]) < 0))
+
+    def test_compiled_tables(self):
+        """Test tablic każdego modelu i zapamiętania ich dla stanu rankingu."""
+        for name in STRENGTH_MODELS:
+            tables = get_tables(name)
+            self.assertEqual(tables.lam.shape, (MAX_RANK + 1, MAX_RANK + 1))
+            self.assertTrue(np.all((tables.pen_prob > 0.6) & (tables.pen_prob <= 0.9)))
+            self.assertAlmostEqual(tables.score_matrix(3, 150).sum(), 1.0)
+            self.assertGreater(tables.lam[3, 150], tables.lam[150, 3])
+
+        elo = get_tables('elo')
+        points = rank_points()
+        expected = 1 / (1 + 10 ** (-(points[1] - points[40]) / 600))
+        self.assertAlmostEqual(elo.lam[1, 40] / 2.5, expected)
+
+        rankings = [{'rank': r, 'country': str(r), 'points': 2000.0 - r} for r in range(1, 212)]
+        self.assertIs(compile_model('points', rankings), compile_model('points', list(rankings)))
+        self.assertIsNot(compile_model('points', rankings), get_tables('points'))
+        self.assertIs(compile_model('rank', rankings), get_tables('rank'))
+
+    def test_dixon_coles_scores(self):
+        """Test poprawki Dixona-Colesa: więcej remisów 0:0 i 1:1, ta sama suma."""
+        scores = dixon_coles_scores(1.2, 0.9, -0.1)
+        independent = np.outer(poisson_pmf(1.2), poisson_pmf(0.9))
+        self.assertAlmostEqual(scores.sum(), 1.0)
+        self.assertGreater(scores[0, 0], independent[0, 0])
+        self.assertGreater(scores[1, 1], independent[1, 1])
+        tables = get_tables('dixon_coles')
+        self.assertAlmostEqual(tables.goal_pmf[1, 40].sum(), 1.0)
+        self.assertEqual(tables.sample_score(1, 40, 0.0), (0, 0))
+
+    def test_engines_agree(self):
+        """Test zgodności silnika wektorowego i obiektowego z dokładnymi szansami dla każdego modelu."""
+        for name in ('points', 'elo', 'dixon_coles'):
+            with self.subTest(model=name):
+                exact = place_probabilities(RANKS, name)
+                batch = run_parallel(RANKS, 100_000, seed=1, workers=1, model=name)['probabilities']
+                objects = run_parallel(RANKS, 5_000, seed=1, workers=1, engine='object', model=name)['probabilities']
+                np.testing.assert_allclose(batch, exact, atol=0.01)
+                np.testing.assert_allclose(objects, exact, atol=0.03)
+        self.assertEqual(get_tables().model, 'rank')
+
+    @patch('models.load_rankings', return_value=[])
+    @patch('models.get_team_rank', return_value=1)
+    def test_use_model(self, *mocks):
+        """Test wyboru modelu dla ścieżki obiektowej (Team.get_strength)."""
+        team = Team("Argentina")
+        previous = use_model('elo')
+        try:
+            self.assertEqual(team.get_strength(), 1.0)
+        finally:
+            use_model(previous)
+        self.assertEqual(team.get_strength(), rank_strength(1))
+        with self.assertRaises(KeyError):
+            use_model('nieznany')
+        with self.assertRaises(ValueError):
+            run_parallel(RANKS, 10, model='nieznany')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+Testy jednostkowe dla modułu transfermarkt_rankings.py
+"""
+
+import unittest
+from unittest.mock import patch
+
+from http_stub import StubServer, fixture_pages
+from transfermarkt_rankings import (
+    get_full_rankings, format_timings, get_team_rank, RankingIndex, ranking_index, UNRANKED,
+    PARSERS, available_parsers, compare_parsers, parse_rankings_page, get_rankings_incremental,
+)
+
+
+class TestGetFullRankings(unittest.TestCase):
+    """Testy pobierania rankingu z lokalnego serwera."""
+
+    def test_pages_assembled_in_order(self):
+        """Test kolejności rekordów przy równoległym pobieraniu."""
+        with StubServer() as server:
+            rankings = get_full_rankings(server.url, max_workers=4)
+        self.assertEqual([r['rank'] for r in rankings], list(range(1, 16)))
+        self.assertEqual(rankings[13]['country'], 'Poland')
+
+    def test_concurrent_fetch_is_faster(self):
+        """Test równoległego pobierania stron 2..N."""
+        timings = {}
+        with StubServer(delay=0.2) as server:
+            get_full_rankings(server.url, max_workers=4, timings=timings)
+        serial = timings['first_page'] + sum(timings['pages'].values())
+        self.assertEqual(sorted(timings['pages']), [2, 3])
+        self.assertLess(timings['total'], serial - 0.1)
+        self.assertIn("przyspieszenie", format_timings(timings))
+
+    def test_retry_after_server_error(self):
+        """Test ponowienia żądania po odpowiedzi 503."""
+        with StubServer(failures={2: 2}) as server:
+            rankings = get_full_rankings(server.url, backoff=0.01)
+            pages = [page for page, _ in server.requests]
+        self.assertEqual(len(rankings), 15)
+        self.assertEqual(pages.count(2), 3)
+
+    def test_gives_up_after_retries(self):
+        """Test zwrócenia pustej listy po wyczerpaniu prób."""
+        with StubServer(failures={3: 10}) as server, patch('builtins.print'):
+            rankings = get_full_rankings(server.url, retries=1, backoff=0.01)
+        self.assertEqual(rankings, [])
+
+    def test_timeout(self):
+        """Test limitu czasu pojedynczego żądania."""
+        timings = {}
+        with StubServer(delay=0.5) as server, patch('builtins.print'):
+            rankings = get_full_rankings(server.url, timeout=0.1, retries=0, timings=timings)
+        self.assertEqual(rankings, [])
+        self.assertLess(timings['total'], 0.5)
+
+
+def rankings_from(pages):
+    """Ranking złożony ze stron {numer: html}."""
+    return [team for page in sorted(pages) for team in parse_rankings_page(pages[page])]
+
+
+class TestIncrementalRankings(unittest.TestCase):
+    """Testy przyrostowego odświeżania rankingu na wersjonowanych stronach."""
+
+    def test_unchanged_snapshot_skipped(self):
+        """Test odpowiedzi 304 dla pierwszej strony - pozostałe strony nie są pobierane."""
+        with StubServer() as server:
+            rankings, state, stats = get_rankings_incremental(url=server.url, max_workers=2)
+            self.assertEqual(stats['parsed'], [1, 2, 3])
+            del server.requests[:]
+            again, _, stats = get_rankings_incremental(rankings, state, server.url)
+            requests = list(server.requests)
+        self.assertIs(again, rankings)
+        self.assertEqual((stats['not_modified'], stats['changed']), ([1], False))
+        self.assertEqual(len(requests), 1)
+        self.assertIn('If-None-Match', requests[0][1])
+
+    def test_only_changed_pages_parsed(self):
+        """Test nowej wersji rankingu: strona 2 bez zmian (304), strony 1 i 3 parsowane."""
+        with StubServer() as server:
+            rankings, state, _ = get_rankings_incremental(url=server.url)
+            index = RankingIndex(rankings)
+            server.publish(fixture_pages(2))
+            with patch('transfermarkt_rankings.parse_rankings_page', wraps=parse_rankings_page) as parse:
+                updated, state, stats = get_rankings_incremental(rankings, state, server.url, index=index)
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual((stats['parsed'], stats['not_modified']), ([1, 3], [2]))
+        self.assertIs(updated[5], rankings[5])
+        self.assertEqual(updated[13]['country'], "Côte d'Ivoire")
+        self.assertEqual(stats['diff'], {'added': [], 'removed': [],
+                                         'changed': ['Argentina', 'France', "Côte d'Ivoire", 'Poland']})
+        self.assertEqual(index.lookup("Polska"), 15)
+        self.assertEqual(state['pages']['3'], dict(state['pages']['3'], start=10, size=5))
+
+    def test_content_hash_without_validators(self):
+        """Test serwera bez ETag i Last-Modified - niezmienione strony rozpoznawane po skrócie."""
+        with StubServer(validators=False) as server:
+            rankings, state, _ = get_rankings_incremental(url=server.url)
+            again, _, stats = get_rankings_incremental(rankings, state, server.url)
+            server.publish(fixture_pages(2))
+            updated, _, stats2 = get_rankings_incremental(rankings, state, server.url)
+        self.assertIs(again, rankings)
+        self.assertEqual(stats['reused'], [1])
+        self.assertEqual((stats2['parsed'], stats2['reused']), ([1, 3], [2]))
+        self.assertEqual(updated, rankings_from(fixture_pages(2)))
+
+    def test_index_update_matches_rebuild(self):
+        """Test aktualizacji indeksu w miejscu przy dodanych i usuniętych drużynach."""
+        rankings = rankings_from(fixture_pages())
+        updated = [dict(team) for team in rankings if team['country'] != 'United States']
+        updated[0]['points'] += 1
+        updated.append({'rank': 16, 'country': 'Wales', 'points': 1400.0})
+        index = RankingIndex(rankings)
+        diff = index.update(updated)
+        self.assertEqual(diff['added'], ['Wales'])
+        self.assertEqual(diff['removed'], ['United States'])
+        self.assertEqual(diff['changed'], ['Argentina'])
+        self.assertEqual(index._entries, RankingIndex(updated)._entries)
+        self.assertEqual(index.lookup("USA"), UNRANKED)
+        self.assertEqual(index.lookup("Walia"), 16)
+
+
+EDGE_CASES = """
+<table class="menu"><tr><td>1</td><td>Menu</td><td>x</td><td>9,00</td></tr></table>
+<table class="items responsive">
+  <tr><th>#</th><th>Country</th><th>Conf.</th><th>Points</th></tr>
+  <tr><td> 7 </td><td><a>Bosnia &amp; Herzegovina</a></td><td>UEFA</td><td>1.412,5</td></tr>
+  <tr><td>8</td><td><span><img title="C&ocirc;te d'Ivoire"></span></td>
+      <td>CAF</td><td>1.489,05</td></tr>
+  <tr><td>za mało komórek</td></tr>
+  <tr><td>9</td><td><img title="Cura&#231;ao"> Curacao</td><td>CONCACAF</td><td><b>1</b>.301,<!-- x -->00</td></tr>
+  <tr><td>10</td><td><img src="fj.png"> Fiji <img title="Flaga"></td><td>OFC</td><td>1.000,00</td></tr>
+</table>
+<table class="items"><tr><td>99</td><td>Druga tabela</td><td>-</td><td>1,0</td></tr></table>
+"""
+
+
+class TestParsers(unittest.TestCase):
+    """Testy parserów strony rankingu."""
+
+    def test_fixtures_identical(self):
+        """Test identycznych rekordów wszystkich dostępnych parserów na zapisanych stronach."""
+        pages = list(fixture_pages().values())
+        expected = [parse_rankings_page(html, 'bs4') for html in pages]
+        self.assertEqual(expected[0][0], {'rank': 1, 'country': 'Argentina', 'points': 1885.36})
+        self.assertIn('tokenizer', available_parsers())
+        for name in available_parsers():
+            with self.subTest(parser=name):
+                self.assertEqual([parse_rankings_page(html, name) for html in pages], expected)
+
+    def test_edge_cases_identical(self):
+        """Test kilku tabel, encji, komentarzy, zagnieżdżonych flag, wierszy bez flagi i flag bez title."""
+        expected = parse_rankings_page(EDGE_CASES, 'bs4')
+        self.assertEqual([r['country'] for r in expected],
+                         ["Bosnia & Herzegovina", "Côte d'Ivoire", "Curaçao", "Fiji"])
+        for name in available_parsers():
+            with self.subTest(parser=name):
+                self.assertEqual(parse_rankings_page(EDGE_CASES, name), expected)
+        with self.assertRaises(ValueError):
+            parse_rankings_page(EDGE_CASES, 'regex')
+
+    def test_compare_parsers(self):
+        """Test porównania czasu parsowania."""
+        times = compare_parsers(list(fixture_pages().values()), repeat=1)
+        self.assertEqual(sorted(times), sorted(available_parsers()))
+        self.assertLess(times['tokenizer'], times['bs4'])
+        self.assertLessEqual(set(times), set(PARSERS))
+
+
+RANKINGS = [
+    {'rank': 1, 'country': 'Argentina', 'points': 1885.36},
+    {'rank': 14, 'country': 'Poland', 'points': 1532.44},
+    {'rank': 16, 'country': 'United States', 'points': 1673.49},
+    {'rank': 23, 'country': 'Korea, South', 'points': 1574.0},
+    {'rank': 37, 'country': "Côte d'Ivoire", 'points': 1489.05},
+    {'rank': 26, 'country': 'Türkiye', 'points': 1505.0},
+]
+
+
+class TestRankingIndex(unittest.TestCase):
+    """Testy indeksu rankingu."""
+
+    def setUp(self):
+        """Przygotowanie indeksu."""
+        self.index = RankingIndex(RANKINGS)
+
+    def test_polish_and_english_names(self):
+        """Test wyszukiwania po nazwach polskich i angielskich."""
+        self.assertEqual(self.index.lookup("Polska"), 14)
+        self.assertEqual(self.index.lookup("poland"), 14)
+        self.assertEqual(self.index.lookup("Argentyna"), 1)
+        self.assertEqual(self.index.lookup("USA"), 16)
+
+    def test_spelling_variants(self):
+        """Test wariantów pisowni FIFA i Transfermarkt."""
+        self.assertEqual(self.index.lookup("Korea Republic"), 23)
+        self.assertEqual(self.index.lookup("South Korea"), 23)
+        self.assertEqual(self.index.lookup("Ivory Coast"), 37)
+        self.assertEqual(self.index.lookup("cote d'ivoire"), 37)
+        self.assertEqual(self.index.lookup("Turkey"), 26)
+        self.assertEqual(self.index.lookup("Turcja"), 26)
+
+    def test_unknown_team(self):
+        """Test drużyny spoza rankingu."""
+        self.assertEqual(self.index.lookup("Atlantyda"), UNRANKED)
+        self.assertNotIn("Atlantyda", self.index)
+        self.assertIn("Polska", self.index)
+
+    def test_lookup_many(self):
+        """Test wyszukiwania wielu drużyn naraz."""
+        self.assertEqual(self.index.lookup_many(["Polska", "Atlantyda", "Argentina"]), [14, UNRANKED, 1])
+
+    def test_get_team_rank_reuses_index(self):
+        """Test budowania indeksu raz dla danej listy rankingowej."""
+        self.assertEqual(get_team_rank("Polska", RANKINGS), 14)
+        self.assertIs(ranking_index(RANKINGS), ranking_index(RANKINGS))
+        self.assertEqual(get_team_rank("Polska", self.index), 14)
+
+
+if __name__ == "__main__":
+    unittest.main()
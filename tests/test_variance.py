@@ -0,0 +1,103 @@
+"""
+Testy trybów redukcji wariancji (variance.py) i porównania scenariuszy
+"""
+
+import unittest
+from statistics import NormalDist
+
+import numpy as np
+
+from exact_probabilities import place_probabilities as exact_place_probabilities
+from parallel import compare_parallel, run_parallel
+from simulation import place_probabilities
+from variance import AntitheticNoise, CommonNoise, StratifiedNoise, noise_source, normal_ppf
+
+RANKS = (1, 5, 12, 30, 45, 70, 120, 200)
+
+
+class TestNoiseSources(unittest.TestCase):
+    """Testy źródeł liczb losowych."""
+
+    def test_normal_ppf(self):
+        """Test odwrotnej dystrybuanty względem statistics.NormalDist."""
+        u = np.array([1e-12, 1e-4, 0.02, 0.3, 0.5, 0.8, 0.99, 1 - 1e-9])
+        expected = [NormalDist().inv_cdf(x) for x in u]
+        np.testing.assert_allclose(normal_ppf(u), expected, atol=1e-8)
+
+    def test_antithetic_pairs(self):
+        """Test par przebiegów z przeciwnymi liczbami wzdłuż osi przebiegów."""
+        noise = AntitheticNoise(np.random.default_rng(1))
+        z = noise.standard_normal((2, 7, 3), axis=1)
+        self.assertEqual(z.shape, (2, 7, 3))
+        np.testing.assert_array_equal(z[:, :3], -z[:, 4:7])
+        u = noise.random((6, 2), dtype=np.float32)
+        np.testing.assert_allclose(u[:3] + u[3:], 1.0, atol=1e-6)
+        self.assertTrue(np.all(u < 1))
+        k = noise.integers(10, 6)
+        np.testing.assert_array_equal(k[:3], k[3:])
+
+    def test_stratified_columns(self):
+        """Test po jednej liczbie w każdej warstwie każdej kolumny."""
+        noise = StratifiedNoise(np.random.default_rng(2))
+        u = noise.random((50, 4))
+        np.testing.assert_array_equal(np.sort((u * 50).astype(int), axis=0), np.tile(np.arange(50)[:, None], 4))
+        k = noise.integers(5, 100)
+        np.testing.assert_array_equal(np.bincount(k), [20] * 5)
+        self.assertAlmostEqual(float(noise.standard_normal(10_000).mean()), 0.0, places=3)
+
+    def test_noise_source(self):
+        """Test wyboru źródła według nazwy."""
+        rng = np.random.default_rng(3)
+        self.assertIs(noise_source(rng), rng)
+        self.assertIsInstance(noise_source(rng, 'common'), CommonNoise)
+        noise = noise_source(rng, 'antithetic')
+        self.assertIs(noise_source(noise, 'stratified'), noise)
+        with self.assertRaises(ValueError):
+            noise_source(rng, 'quasi')
+
+
+class TestVarianceReduction(unittest.TestCase):
+    """Testy nieobciążoności trybów i porównań na wspólnych liczbach losowych."""
+
+    def test_modes_are_unbiased(self):
+        """Test zgodności szans każdego trybu z modelem na wspólnej tabeli wyników."""
+        reference = place_probabilities(RANKS, 200_000, np.random.default_rng(4))
+        for variance in ('common', 'antithetic', 'stratified'):
+            with self.subTest(variance=variance):
+                probs = place_probabilities(RANKS, 100_000, np.random.default_rng(5), batch_size=20_000,
+                                            variance=variance)
+                np.testing.assert_allclose(probs, reference, atol=0.01)
+                np.testing.assert_allclose(probs.sum(axis=1), 1.0)
+        dixon_coles = place_probabilities(RANKS, 50_000, np.random.default_rng(6), model='dixon_coles',
+                                          variance='antithetic')
+        np.testing.assert_allclose(dixon_coles, exact_place_probabilities(RANKS, 'dixon_coles'), atol=0.01)
+        wc = place_probabilities(RANKS * 4, 2000, np.random.default_rng(7), fmt='wc32', variance='stratified')
+        np.testing.assert_allclose(wc[:, 0].sum(), 1.0)
+
+    def test_run_parallel_modes(self):
+        """Test trybów w run_parallel(): powtarzalność i silnik obiektowy."""
+        a = run_parallel(RANKS, 4000, seed=8, workers=1, chunk_size=1000, variance='antithetic')
+        b = run_parallel(RANKS, 4000, seed=8, workers=2, chunk_size=1000, variance='antithetic')
+        np.testing.assert_array_equal(a['places'], b['places'])
+        with self.assertRaises(ValueError):
+            run_parallel(RANKS, 100, engine='object', variance='antithetic')
+
+    def test_compare_scenarios(self):
+        """Test różnicy szans na wspólnych liczbach losowych."""
+        same = compare_parallel(RANKS, RANKS, 5000, seed=9, workers=1)
+        np.testing.assert_array_equal(same['difference'], 0.0)
+        np.testing.assert_array_equal(same['stderr'], 0.0)
+
+        changed = RANKS[:3] + (3,) + RANKS[4:]
+        result = compare_parallel(RANKS, changed, 40_000, seed=10, workers=1)
+        self.assertGreater(result['difference'][3, 0], 0.1)
+        self.assertLess(result['difference'][0, 0], 0)
+        pa, pb = result['probabilities_a'], result['probabilities_b']
+        independent = np.sqrt((pa * (1 - pa) + pb * (1 - pb)) / 40_000)
+        self.assertLess((result['stderr'] ** 2).sum(), 0.6 * (independent ** 2).sum())
+        with self.assertRaises(ValueError):
+            compare_parallel(RANKS, changed, 100, variance='plain')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Testy symulacji warunkowej (whatif.py)
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from exact_probabilities import _knockout_matrix
+from formats import compile_format
+from simulation import podium_to_places, simulate_format_batch
+from whatif import ConditionalSimulation, TournamentState
+
+NAMES = ["Brazil", "Poland", "Japan", "Spain", "Ghana", "Panama", "Chile", "Fiji"]
+RANKS = (1, 5, 12, 30, 45, 70, 120, 200)
+GROUP_A = [("Brazil", "Poland", 2, 0), ("Brazil", "Japan", 1, 1), ("Brazil", "Spain", 3, 1),
+           ("Poland", "Japan", 0, 1), ("Poland", "Spain", 2, 2), ("Japan", "Spain", 0, 0)]
+GROUP_B = [("Ghana", "Panama", 1, 0), ("Ghana", "Chile", 0, 2), ("Ghana", "Fiji", 4, 0),
+           ("Panama", "Chile", 1, 1), ("Panama", "Fiji", 2, 0), ("Chile", "Fiji", 1, 0)]
+
+
+class FixedDraw:
+    """Generator, którego pierwsze losowanie (grup) daje kolejność drużyn z listy."""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.draw = True
+
+    def random(self, size=None, **kwargs):
+        if self.draw:
+            self.draw = False
+            return np.broadcast_to(np.arange(size[1], dtype=float), size).copy()
+        return self.rng.random(size, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.rng, name)
+
+
+class TestTournamentState(unittest.TestCase):
+    """Testy opisu stanu turnieju."""
+
+    def setUp(self):
+        """Grupy A i B formatu domyślnego."""
+        self.state = TournamentState(groups=[NAMES[:4], NAMES[4:]])
+
+    def test_group_and_knockout_results(self):
+        """Test rozróżnienia meczu grupowego i pucharowego oraz zapisu JSON."""
+        self.state.record("Poland", "Brazil", 2, 1)
+        self.assertEqual(self.state.results, {(0, 0): (1, 2)})
+        self.assertEqual(self.state.remaining, 11)
+        self.state.record("Polska", "Brazylia", 0, 0, "Brazil")
+        self.state.record("Brazil", "Ghana", 3, 1)
+        self.assertEqual(self.state.knockout, {(0, 1): (0, 0, 0), (0, 4): (3, 1, 0)})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stan.json")
+            self.state.save(path)
+            loaded = TournamentState.load(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["results"][0], ["Brazil", "Poland", 1, 2])
+        self.assertEqual((loaded.results, loaded.knockout), (self.state.results, self.state.knockout))
+
+    def test_copy_does_not_change_state(self):
+        """Test scenariusza na kopii stanu."""
+        scenario = self.state.with_result("Ghana", "Fiji", 1, 0)
+        self.assertEqual((len(scenario.results), len(self.state.results)), (1, 0))
+        self.assertTrue(scenario.same_tournament(self.state))
+
+    def test_invalid_state(self):
+        """Test błędów: skład grup, drużyny spoza turnieju, wyniki."""
+        invalid = [
+            lambda: TournamentState(groups=[NAMES[:4]]),
+            lambda: TournamentState(groups=[NAMES[:4], NAMES[:4]]),
+            lambda: TournamentState(groups=[NAMES[:4], NAMES[4:]], bracket=[NAMES[:2]]),
+            lambda: TournamentState(bracket=[NAMES[:2]]),
+            lambda: self.state.record("Brazil", "Germany", 1, 0),
+            lambda: self.state.record("Brazil", "Brazil", 1, 0),
+            lambda: self.state.record("Brazil", "Poland", -1, 0),
+            lambda: self.state.record("Brazil", "Ghana", 1, 1),
+            lambda: self.state.record("Brazil", "Ghana", 1, 0, "Ghana"),
+        ]
+        for call in invalid:
+            with self.assertRaises(ValueError):
+                call()
+
+
+class TestConditionalSimulation(unittest.TestCase):
+    """Testy szans warunkowych względem stanu turnieju."""
+
+    def test_matches_batch_engine(self):
+        """Test zgodności z silnikiem wektorowym dla ustalonych grup bez wyników."""
+        state = TournamentState(groups=[NAMES[:4], NAMES[4:]])
+        odds = ConditionalSimulation(state, RANKS, 100_000, seed=1).probabilities()
+        self.assertEqual(odds["runs"], 100_000)
+        batch = simulate_format_batch(compile_format(), RANKS, 100_000, FixedDraw(2), detail=False)
+        places = podium_to_places(batch["podium"], len(RANKS))
+        expected = np.stack([(places == place).mean(axis=0) for place in range(5)], axis=1)
+        np.testing.assert_allclose(odds["probabilities"], expected, atol=0.01)
+
+    def test_played_group_stage(self):
+        """Test dokładnych szans po rozegranej fazie grupowej (półfinały A1-B2, B1-A2)."""
+        state = TournamentState(groups=[NAMES[:4], NAMES[4:]], results=GROUP_A + GROUP_B)
+        probs = ConditionalSimulation(state, RANKS, 100_000, seed=3).probabilities()["probabilities"]
+        # A: Brazil 7, Japan 5 pkt; B: Chile 7, Ghana 6 pkt
+        knock = _knockout_matrix(RANKS, 'rank')
+        brazil, japan, ghana, chile = 0, 2, 4, 6
+        final = knock[chile, japan] * knock[brazil, chile] + knock[japan, chile] * knock[brazil, japan]
+        self.assertAlmostEqual(probs[brazil, 0], knock[brazil, ghana] * final, delta=0.01)
+        self.assertEqual(probs[[1, 3, 5, 7], 4].tolist(), [1.0] * 4)
+
+    def test_bracket_state(self):
+        """Test turnieju od fazy pucharowej z ustalonym wynikiem półfinału."""
+        state = TournamentState(bracket=[["Brazil", "Fiji"], ["Poland", "Japan"]])
+        simulation = ConditionalSimulation(state, (1, 200, 5, 12), 100_000, seed=4)
+        knock = _knockout_matrix((1, 200, 5, 12), 'rank')
+        champion = knock[0, 1] * (knock[2, 3] * knock[0, 2] + knock[3, 2] * knock[0, 3])
+        self.assertAlmostEqual(simulation.probabilities()["probabilities"][0, 0], champion, delta=0.01)
+
+        odds = simulation.record("Fiji", "Brazil", 1, 0).odds()
+        self.assertEqual(odds["Brazil"]["mistrz"] + odds["Brazil"]["wicemistrz"], 0.0)
+        self.assertAlmostEqual(odds["Fiji"]["mistrz"] + odds["Fiji"]["wicemistrz"], 1.0)
+        self.assertAlmostEqual(odds["Fiji"]["mistrz"], knock[1, 2] * knock[2, 3] + knock[1, 3] * knock[3, 2],
+                               delta=0.01)
+
+    def test_what_if_reuses_random_numbers(self):
+        """Test scenariuszy na tych samych liczbach losowych i warunkowania meczem pucharowym."""
+        state = TournamentState(groups=[NAMES[:4], NAMES[4:]], results=GROUP_A[:5])
+        simulation = ConditionalSimulation(state, RANKS, 20_000, seed=5)
+        base = simulation.probabilities()
+        np.testing.assert_array_equal(simulation.what_if("Spain", "Japan", 0, 0)["places"],
+                                      simulation.probabilities(state.with_result("Japan", "Spain", 0, 0))["places"])
+        self.assertEqual(len(simulation.state.results), 5)
+
+        japan_wins = simulation.what_if("Japan", "Spain", 3, 0)["probabilities"]
+        spain_wins = simulation.what_if("Japan", "Spain", 0, 3)["probabilities"]
+        self.assertGreater(japan_wins[2, :4].sum(), base["probabilities"][2, :4].sum())
+        self.assertGreater(spain_wins[3, :4].sum(), base["probabilities"][3, :4].sum())
+        np.testing.assert_array_equal(simulation.probabilities()["places"], base["places"])
+
+        final = simulation.what_if("Brazil", "Chile", 1, 2)
+        self.assertLess(final["runs"], 20_000)
+        self.assertEqual(final["probabilities"][0, 0], 0.0)  # półfinał albo finał przegrany z Chile
+        eliminated = ConditionalSimulation(TournamentState(groups=[NAMES[:4], NAMES[4:]], results=GROUP_B),
+                                           RANKS, 1000, seed=5)
+        with self.assertRaises(ValueError):
+            eliminated.what_if("Fiji", "Brazil", 1, 0)  # Fiji nie wychodzi z grupy w żadnym przebiegu
+        with self.assertRaises(ValueError):
+            simulation.probabilities(TournamentState(groups=[NAMES[4:], NAMES[:4]]))
+
+    def test_dixon_coles(self):
+        """Test modelu z macierzą wyników - szanse sumują się do jedności."""
+        state = TournamentState(groups=[NAMES[:4], NAMES[4:]], results=GROUP_A)
+        probs = ConditionalSimulation(state, RANKS, 10_000, seed=6, model="dixon_coles").probabilities()
+        np.testing.assert_allclose(probs["probabilities"][:, :4].sum(axis=0), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
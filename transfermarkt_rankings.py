@@ -2,75 +2,616 @@
 @brief Moduł do pobierania i przetwarzania rankingu FIFA z Transfermarkt
 
 Moduł zawiera funkcje do:
-- Pobierania pełnego rankingu 211 drużyn narodowych
+- Pobierania pełnego rankingu 211 drużyn narodowych (strony 2..N równolegle)
+- Przyrostowego odświeżania rankingu (żądania warunkowe i skróty treści stron)
 - Normalizacji nazw krajów
-- Wyszukiwania pozycji konkretnych drużyn
+- Wyszukiwania pozycji konkretnych drużyn (indeks RankingIndex)
+
+Biblioteki requests i bs4 importowane są dopiero przy pobieraniu i parsowaniu
+stron - wyszukiwanie w rankingu (RankingIndex) ich nie wymaga, więc symulacje
+nie płacą za ich import.
+
+Stronę rankingu parsuje jeden z PARSERS: 'bs4' (drzewo całego dokumentu),
+'strainer' (drzewo tylko dla tabel), 'lxml' (opcjonalna biblioteka w C) albo
+'tokenizer' (strumieniowy parser z biblioteki standardowej). Wszystkie dają
+identyczne rekordy; domyślnie używany jest najszybszy dostępny.
+
+get_rankings_incremental() pobiera strony warunkowo (If-None-Match /
+If-Modified-Since) i porównuje skróty tabel rankingu z poprzednim stanem -
+parsowane są tylko strony, które się zmieniły.
 
 @requires requests
 @requires bs4.BeautifulSoup
 
 """
 
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import functools
+import hashlib
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Iterable, List, Dict, Optional, Tuple
+
+RANKINGS_URL = "https://www.transfermarkt.com/statistik/weltrangliste"  #!< Adres strony z rankingiem
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}  #!< Nagłówki HTTP wysyłane do Transfermarkt
+
+
+def parse_last_page(html: str) -> int:
+    """!
+    @brief Odczytuje numer ostatniej podstrony rankingu
+
+    @param html str Treść HTML pierwszej strony rankingu
+    @return int Numer ostatniej podstrony
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return int(soup.find('li', class_='tm-pagination__list-item--icon-last-page').a['href'].split('=')[-1])
+
+
+def _ranking_record(rank: str, country: str, points: str) -> Dict:
+    """!
+    @brief Zamienia teksty komórek wiersza rankingu na rekord
+
+    @param rank str Tekst komórki z pozycją
+    @param country str Nazwa kraju (atrybut title pierwszej flagi, a bez niego tekst komórki)
+    @param points str Tekst komórki z punktami w zapisie niemieckim (1.885,36)
+    @return dict Rekord {'rank': int, 'country': str, 'points': float}
+    """
+    return {
+        'rank': int(rank.strip()),
+        'country': country,
+        'points': float(points.strip().replace('.', '').replace(',', '.'))
+    }
+
+
+def _parse_bs4(html: str, strainer: bool = False) -> List[Dict]:
+    """!
+    @brief Parser BeautifulSoup ('html.parser'); ze strainer=True drzewo budowane jest tylko dla tabel
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('table') if strainer else None)
+    table = soup.find('table', {'class': 'items'})
+    rows = table.find_all('tr')[1:]
+
+    rankings = []
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) >= 4:
+            title = cols[1].img.get('title') if cols[1].img else None
+            country = title if title is not None else cols[1].text.strip()
+            rankings.append(_ranking_record(cols[0].text, country, cols[3].text))
+
+    return rankings
+
+
+def _parse_lxml(html: str) -> List[Dict]:
+    """!
+    @brief Parser lxml.html (biblioteka w C, opcjonalna)
+    """
+    import lxml.html
+    root = lxml.html.document_fromstring(html)
+    table = root.xpath("(//table[contains(concat(' ', normalize-space(@class), ' '), ' items ')])[1]")[0]
+
+    rankings = []
+    for row in list(table.iter('tr'))[1:]:
+        cols = list(row.iter('td'))
+        if len(cols) >= 4:
+            img = cols[1].find('.//img')
+            title = img.get('title') if img is not None else None
+            country = title if title is not None else cols[1].text_content().strip()
+            rankings.append(_ranking_record(cols[0].text_content(), country, cols[3].text_content()))
+
+    return rankings
+
+
+class _RankingTokenizer(HTMLParser):
+    """!
+    @brief Strumieniowy parser tabeli 'items' bez budowania drzewa dokumentu
+
+    Odtwarza semantykę wersji BeautifulSoup: wiersze to wszystkie elementy tr
+    w tabeli (także zagnieżdżone), komórki wiersza - wszystkie jego potomne td,
+    a tekst komórki - cały tekst jej potomków. Flaga bez atrybutu title
+    oznacza nazwę kraju z tekstu komórki.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []        # komórki kolejnych wierszy: [tekst, title pierwszej flagi, czy była flaga]
+        self._depth = 0       # głębokość zagnieżdżenia tabel wewnątrz tabeli 'items' (0 - poza nią)
+        self._done = False
+        self._open_rows = []  # (głębokość tabeli, komórki) otwartych wierszy
+        self._open_cells = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if tag == 'table':
+            if self._depth or 'items' in (dict(attrs).get('class') or '').split():
+                self._depth += 1
+        elif not self._depth:
+            return
+        elif tag == 'tr':
+            cells = []
+            self.rows.append(cells)
+            self._open_rows.append((self._depth, cells))
+        elif tag == 'td':
+            cell = [[], None, False]
+            self._open_cells.append(cell)
+            for _, cells in self._open_rows:
+                cells.append(cell)
+        elif tag == 'img':
+            for cell in self._open_cells:
+                if not cell[2]:
+                    cell[1:] = dict(attrs).get('title'), True
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == 'td' and self._open_cells:
+            self._open_cells.pop()
+        elif tag == 'tr' and self._open_rows and self._open_rows[-1][0] == self._depth:
+            self._open_rows.pop()
+        elif tag == 'table':
+            self._open_rows = [(depth, cells) for depth, cells in self._open_rows if depth < self._depth]
+            self._depth -= 1
+            self._done = not self._depth
+
+    def handle_data(self, data):
+        for cell in self._open_cells:
+            cell[0].append(data)
+
+
+def _parse_tokenizer(html: str) -> List[Dict]:
+    """!
+    @brief Strumieniowy parser z biblioteki standardowej (html.parser.HTMLParser)
+    """
+    parser = _RankingTokenizer()
+    parser.feed(html)
+    parser.close()
+
+    rankings = []
+    for cells in parser.rows[1:]:
+        if len(cells) >= 4:
+            text, title, _ = cells[1]
+            country = title if title is not None else ''.join(text).strip()
+            rankings.append(_ranking_record(''.join(cells[0][0]), country, ''.join(cells[3][0])))
+
+    return rankings
+
+
+PARSERS = {
+    'bs4': _parse_bs4,
+    'strainer': lambda html: _parse_bs4(html, strainer=True),
+    'lxml': _parse_lxml,
+    'tokenizer': _parse_tokenizer,
+}
+"""!Parsery strony rankingu według nazwy - wszystkie zwracają identyczne rekordy"""
+
+PARSER_REQUIREMENTS = {'bs4': 'bs4', 'strainer': 'bs4', 'lxml': 'lxml', 'tokenizer': None}
+"""!Biblioteka wymagana przez parser (None - tylko biblioteka standardowa)"""
+
+PARSER_PREFERENCE = ('lxml', 'tokenizer')  #!< Kolejność wyboru parsera domyślnego
+
+
+def available_parsers() -> List[str]:
+    """!
+    @brief Parsery, których biblioteki są zainstalowane (bez ich importowania)
+
+    @return List[str] Nazwy z PARSERS
+    """
+    from importlib.util import find_spec
+    return [name for name, module in PARSER_REQUIREMENTS.items() if module is None or find_spec(module)]
+
+
+def default_parser() -> str:
+    """!
+    @brief Najszybszy dostępny parser z PARSER_PREFERENCE
+
+    @return str Nazwa z PARSERS
+    """
+    available = available_parsers()
+    return next(name for name in PARSER_PREFERENCE if name in available)
+
+
+def parse_rankings_page(html: str, parser: Optional[str] = None) -> List[Dict]:
+    """!
+    @brief Parsuje jedną stronę rankingu Transfermarkt
+
+    @param html str Treść HTML strony z tabelą 'items'
+    @param parser str Nazwa parsera z PARSERS (None - default_parser())
+    @return List[Dict] Lista słowników {'rank': int, 'country': str, 'points': float}
+
+    @throws ValueError Dla nieznanego parsera
+    """
+    if parser is None:
+        parser = default_parser()
+    if parser not in PARSERS:
+        raise ValueError(f"Nieznany parser: {parser}. Dostępne: {', '.join(PARSERS)}.")
+    return PARSERS[parser](html)
+
+
+def compare_parsers(pages: List[str], parsers: Optional[Iterable[str]] = None, repeat: int = 5) -> Dict[str, float]:
+    """!
+    @brief Porównuje czas parsowania stron różnymi parserami
+
+    @param pages List[str] Treści HTML stron
+    @param parsers Iterable[str] Nazwy parserów (domyślnie wszystkie dostępne)
+    @param repeat int Liczba powtórzeń (liczy się najszybsze)
+    @return Dict[str, float] Średni czas parsowania jednej strony w sekundach
+
+    @throws ValueError Gdy parser zwróci inne rekordy niż 'bs4'
+    """
+    names = list(parsers) if parsers is not None else available_parsers()
+    expected = [_parse_bs4(html) for html in pages]
+    times = {}
+    for name in names:
+        if [parse_rankings_page(html, name) for html in pages] != expected:
+            raise ValueError(f"Parser {name} zwraca inne rekordy niż bs4.")
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for html in pages:
+                parse_rankings_page(html, name)
+            best = min(best, time.perf_counter() - start)
+        times[name] = best / len(pages)
+    return times
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}  #!< Kody HTTP, po których ponawiamy żądanie
+
+
+def create_session(pool_size: int = 8) -> 'requests.Session':
+    """!
+    @brief Tworzy sesję HTTP z pulą połączeń keep-alive
+
+    @param pool_size int Maksymalna liczba równoległych połączeń do jednego hosta
+    @return requests.Session Sesja z ustawionymi nagłówkami HEADERS
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-def get_full_rankings() -> List[Dict[str, str]]:
+
+def fetch_page(session: 'requests.Session', url: str, timeout: float = 10,
+               retries: int = 3, backoff: float = 0.5) -> str:
+    """!
+    @brief Pobiera jedną stronę z ponawianiem prób
+
+    @details Po błędzie połączenia, przekroczeniu czasu lub kodzie z RETRY_STATUSES
+    czeka backoff * 2^próba sekund i ponawia żądanie.
+
+    @param session requests.Session Współdzielona sesja HTTP
+    @param url str Adres strony
+    @param timeout float Limit czasu pojedynczego żądania w sekundach
+    @param retries int Liczba ponownych prób po pierwszym niepowodzeniu
+    @param backoff float Podstawa opóźnienia między próbami w sekundach
+    @return str Treść strony
+
+    @throws requests.RequestException Gdy wszystkie próby się nie powiodą
+    """
+    return _get(session, url, timeout, retries, backoff).text
+
+
+def _get(session: 'requests.Session', url: str, timeout: float = 10, retries: int = 3,
+         backoff: float = 0.5, headers: Optional[Dict] = None) -> 'requests.Response':
+    """!
+    @brief Żądanie GET z ponawianiem prób (wspólne dla fetch_page() i fetch_page_conditional())
+    """
+    import requests
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, timeout=timeout, headers=headers)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                response.raise_for_status()
+                return response
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_page_conditional(session: 'requests.Session', url: str, validators: Optional[Dict] = None,
+                           timeout: float = 10, retries: int = 3,
+                           backoff: float = 0.5) -> Tuple[Optional[str], Dict]:
+    """!
+    @brief Pobiera stronę tylko wtedy, gdy zmieniła się od poprzedniego pobrania
+
+    @details Walidatory z poprzedniej odpowiedzi wysyłane są w nagłówkach
+    If-None-Match i If-Modified-Since; serwer odpowiada wtedy kodem 304 bez
+    treści, jeśli strona się nie zmieniła.
+
+    @param session requests.Session Współdzielona sesja HTTP
+    @param url str Adres strony
+    @param validators dict Walidatory poprzedniej odpowiedzi {'etag', 'last_modified'} (opcjonalnie)
+    @param timeout float Limit czasu pojedynczego żądania w sekundach
+    @param retries int Liczba ponownych prób po pierwszym niepowodzeniu
+    @param backoff float Podstawa opóźnienia między próbami w sekundach
+    @return tuple (treść strony lub None dla 304, walidatory {'etag', 'last_modified'} odpowiedzi)
+
+    @throws requests.RequestException Gdy wszystkie próby się nie powiodą
+    """
+    validators = validators or {}
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+
+    response = _get(session, url, timeout, retries, backoff, headers)
+    current = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+    if response.status_code == 304:
+        return None, {key: current[key] or validators.get(key) for key in current}
+    return response.text, current
+
+
+def content_hash(html: str) -> str:
+    """!
+    @brief Skrót tabeli rankingu na stronie
+
+    @details Liczony jest tylko z tabeli class="items" (gdy jej brak - z całej
+    strony), więc zmiany reklam czy liczników poza tabelą nie wymuszają
+    ponownego parsowania.
+
+    @param html str Treść strony rankingu
+    @return str Skrót SHA-1 (szesnastkowo)
+    """
+    start = html.find('class="items"')
+    end = html.find('</table>', start) if start >= 0 else -1
+    fragment = html[start:end] if end >= 0 else html
+    return hashlib.sha1(fragment.encode('utf-8')).hexdigest()
+
+
+def get_full_rankings(url: str = RANKINGS_URL, max_workers: int = 8, timeout: float = 10,
+                      retries: int = 3, backoff: float = 0.5,
+                      timings: Optional[Dict] = None) -> List[Dict[str, str]]:
     """!
     @brief Pobiera pełny ranking FIFA ze strony Transfermarkt
 
     @details Wykonuje następujące kroki:
     1. Łączy się z główną stroną rankingu
     2. Określa liczbę podstron z rankingiem
-    3. Iteracyjnie pobiera dane ze wszystkich stron
-    4. Parsuje dane przy użyciu BeautifulSoup
-
+    3. Pobiera strony 2..N równolegle w puli wątków przez jedną sesję keep-alive
+    4. Parsuje dane parserem default_parser() i składa je w kolejności stron
+
+    Funkcja zawsze korzysta z sieci - symulacje powinny czytać ranking
+    przez ranking_cache.load_rankings().
+
+    @param url str Adres pierwszej strony rankingu
+    @param max_workers int Maksymalna liczba równolegle pobieranych stron
+    @param timeout float Limit czasu pojedynczego żądania w sekundach
+    @param retries int Liczba ponownych prób dla każdej strony
+    @param backoff float Podstawa opóźnienia między próbami w sekundach
+    @param timings dict Opcjonalny słownik uzupełniany czasami pobierania:
+    'first_page', 'pages' ({numer: sekundy}), 'total' i 'workers'
     @return List[Dict] Lista słowników z danymi drużyn w formacie:
-
+    {'rank': int, 'country': str, 'points': float}
 
     @throws Exception W przypadku problemów z połączeniem lub parsowaniem
 
     """
-    url = "https://www.transfermarkt.com/statistik/weltrangliste"
+    if timings is None:
+        timings = {}
+    start = time.perf_counter()
+
+    def load_page(session, page):
+        page_start = time.perf_counter()
+        rankings = parse_rankings_page(fetch_page(session, f"{url}?page={page}", timeout, retries, backoff))
+        timings['pages'][page] = time.perf_counter() - page_start
+        return rankings
 
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        with create_session(max_workers) as session:
+            html = fetch_page(session, url, timeout, retries, backoff)
+            rankings = parse_rankings_page(html)
+            last_page = parse_last_page(html)
+            timings.update(first_page=time.perf_counter() - start, pages={}, workers=max_workers)
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        rankings = []
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for page_rankings in executor.map(lambda p: load_page(session, p), range(2, last_page + 1)):
+                    rankings.extend(page_rankings)
 
-        last_page = int(soup.find('li', class_='tm-pagination__list-item--icon-last-page').a['href'].split('=')[-1])
+        return rankings
 
-        for page in range(1, last_page + 1):
-            if page > 1:
-                response = requests.get(f"{url}?page={page}", headers=headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
+    except Exception as e:
+        print(f"Błąd podczas pobierania rankingu: {e}")
+        return []
 
-            table = soup.find('table', {'class': 'items'})
-            rows = table.find_all('tr')[1:]
+    finally:
+        timings['total'] = time.perf_counter() - start
 
-            for row in rows:
-                cols = row.find_all('td')
-                if len(cols) >= 4:
-                    rank = cols[0].text.strip()
-                    country = cols[1].img['title'] if cols[1].img else cols[1].text.strip()
-                    points = cols[3].text.strip().replace('.', '').replace(',', '.')
 
-                    rankings.append({
-                        'rank': int(rank),
-                        'country': country,
-                        'points': float(points)
-                    })
+def get_rankings_incremental(rankings: Optional[List[Dict]] = None, state: Optional[Dict] = None,
+                             url: str = RANKINGS_URL, max_workers: int = 8, timeout: float = 10,
+                             retries: int = 3, backoff: float = 0.5, timings: Optional[Dict] = None,
+                             index: Optional['RankingIndex'] = None) -> Tuple[List[Dict], Dict, Dict]:
+    """!
+    @brief Odświeża ranking, pobierając i parsując tylko zmienione strony
 
-        return rankings
+    @details Wykonuje następujące kroki:
+    1. Pobiera warunkowo pierwszą stronę - odpowiedź 304 albo niezmieniony
+       skrót tabeli (content_hash()) oznacza niezmieniony ranking; Transfermarkt
+       publikuje cały ranking naraz, a punkty czołówki zmieniają się przy
+       każdej aktualizacji, więc pozostałe strony nie są wtedy pobierane
+    2. W przeciwnym razie pobiera warunkowo strony 2..N równolegle; strony
+       z odpowiedzią 304 lub niezmienionym skrótem biorą rekordy z rankings
+    3. Parsuje tylko strony o zmienionej treści i składa ranking
+
+    Bez poprzedniego stanu (rankings i state równe None) działa jak
+    get_full_rankings(), zwracając dodatkowo stan do następnego odświeżenia.
+
+    @param rankings List[Dict] Ranking z poprzedniego odświeżenia
+    @param state dict Stan stron z poprzedniego odświeżenia (drugi element wyniku)
+    @param url str Adres pierwszej strony rankingu
+    @param max_workers int Maksymalna liczba równolegle pobieranych stron
+    @param timeout float Limit czasu pojedynczego żądania w sekundach
+    @param retries int Liczba ponownych prób dla każdej strony
+    @param backoff float Podstawa opóźnienia między próbami w sekundach
+    @param timings dict Opcjonalny słownik na czasy pobierania (jak w get_full_rankings())
+    @param index RankingIndex Indeks aktualizowany w miejscu, gdy ranking się zmienił (opcjonalnie)
+    @return tuple (ranking, stan, statystyki): ranking jest tym samym obiektem
+    co rankings, jeśli się nie zmienił (pusty przy błędzie pobierania); stan
+    ma postać {'last_page': int, 'pages': {'numer': {'etag', 'last_modified',
+    'hash', 'start', 'size'}}} i da się zapisać w JSON; statystyki to
+    {'changed': bool, 'not_modified', 'reused', 'parsed': [numery stron],
+    'diff': wynik RankingIndex.update() (tylko z parametrem index)}
+    """
+    if timings is None:
+        timings = {}
+    rankings = rankings or []
+    state = state or {}
+    previous = state.get('pages', {}) if rankings else {}
+    stats = {'changed': False, 'not_modified': [], 'reused': [], 'parsed': []}
+    start = time.perf_counter()
+
+    def refresh_page(session, page, page_url):
+        entry = previous.get(str(page))
+        old = rankings[entry['start']:entry['start'] + entry['size']] if entry else None
+        html, validators = fetch_page_conditional(session, page_url, entry, timeout, retries, backoff)
+        if html is None:
+            return 'not_modified', old, dict(entry, **validators), None
+        digest = content_hash(html)
+        if entry is not None and entry['hash'] == digest:
+            return 'reused', old, dict(entry, hash=digest, **validators), html
+        return 'parsed', parse_rankings_page(html), dict(validators, hash=digest), html
+
+    def load_page(session, page):
+        page_start = time.perf_counter()
+        result = refresh_page(session, page, f"{url}?page={page}")
+        timings['pages'][page] = time.perf_counter() - page_start
+        return result
+
+    try:
+        with create_session(max_workers) as session:
+            status, records, entry, html = refresh_page(session, 1, url)
+            stats[status].append(1)
+            timings.update(first_page=time.perf_counter() - start, pages={}, workers=max_workers)
+            if status != 'parsed':
+                return rankings, dict(state, pages=dict(previous, **{'1': entry})), stats
+
+            last_page = parse_last_page(html)
+            pages = [(1, status, records, entry)]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(lambda p: load_page(session, p), range(2, last_page + 1))
+                pages += [(page, *result[:3]) for page, result in zip(range(2, last_page + 1), results)]
+
+        new_rankings, new_pages = [], {}
+        for page, status, records, entry in pages:
+            if page > 1:
+                stats[status].append(page)
+            new_pages[str(page)] = dict(entry, start=len(new_rankings), size=len(records))
+            new_rankings.extend(records)
+        new_state = {'last_page': last_page, 'pages': new_pages}
+
+        if new_rankings == rankings:
+            return rankings, new_state, stats
+        stats['changed'] = True
+        if index is not None:
+            stats['diff'] = index.update(new_rankings)
+        return new_rankings, new_state, stats
 
     except Exception as e:
         print(f"Błąd podczas pobierania rankingu: {e}")
-        return []
+        return [], state, stats
+
+    finally:
+        timings['total'] = time.perf_counter() - start
+
+
+def format_timings(timings: Dict) -> str:
+    """!
+    @brief Formatuje czasy pobierania zebrane przez get_full_rankings()
+
+    @param timings dict Słownik wypełniony przez get_full_rankings()
+    @return str Podsumowanie: czas całkowity, czas pierwszej strony i suma czasów
+    pozostałych stron (czas, jaki zajęłoby ich pobieranie sekwencyjne)
+    """
+    pages = timings.get('pages', {})
+    serial = timings.get('first_page', 0.0) + sum(pages.values())
+    total = timings.get('total', 0.0)
+    speedup = serial / total if total else 0.0
+    return (f"Pobrano {len(pages) + 1} stron w {total:.2f} s "
+            f"(pierwsza strona {timings.get('first_page', 0.0):.2f} s, "
+            f"suma czasów stron {serial:.2f} s, przyspieszenie x{speedup:.1f}, "
+            f"wątki: {timings.get('workers', 1)})")
+
+
+UNRANKED = 211  #!< Pozycja przypisywana drużynom spoza rankingu
+
+COUNTRY_MAPPING = {
+    'polska': 'Poland',
+    'niemcy': 'Germany',
+    'usa': 'United States',
+    'holandia': 'Netherlands',
+    'włochy': 'Italy',
+    'francja': 'France',
+    'hiszpania': 'Spain',
+    'anglia': 'England',
+    'brazylia': 'Brazil',
+    'argentyna': 'Argentina'
+}  #!< Polskie nazwy krajów zamieniane na angielskie w normalize_country_name()
+
+ALIAS_GROUPS = (
+    ('United States', 'USA', 'United States of America', 'Stany Zjednoczone'),
+    ('South Korea', 'Korea, South', 'Korea Republic', 'Republic of Korea', 'Korea Południowa'),
+    ('North Korea', 'Korea, North', 'Korea DPR', 'Korea Północna'),
+    ("Cote d'Ivoire", 'Ivory Coast', 'Wybrzeże Kości Słoniowej'),
+    ('Iran', 'IR Iran', 'Islamic Republic of Iran'),
+    ('Türkiye', 'Turkey', 'Turcja'),
+    ('Czech Republic', 'Czechia', 'Czechy'),
+    ('Cape Verde', 'Cabo Verde', 'Republika Zielonego Przylądka'),
+    ('Bosnia-Herzegovina', 'Bosnia and Herzegovina', 'Bośnia i Hercegowina'),
+    ('Republic of Ireland', 'Ireland', 'Irlandia'),
+    ('China', 'China PR', 'Chiny'),
+    ('DR Congo', 'Congo DR', 'Democratic Republic of the Congo', 'Demokratyczna Republika Konga'),
+    ('North Macedonia', 'Macedonia', 'Macedonia Północna'),
+    ('Eswatini', 'Swaziland'),
+    ('Curacao', 'Curaçao'),
+    ('Kyrgyzstan', 'Kyrgyz Republic', 'Kirgistan'),
+    ('Saudi Arabia', 'Arabia Saudyjska'),
+    ('United Arab Emirates', 'UAE', 'Zjednoczone Emiraty Arabskie'),
+    ('Switzerland', 'Szwajcaria'),
+    ('Belgium', 'Belgia'),
+    ('Portugal', 'Portugalia'),
+    ('Croatia', 'Chorwacja'),
+    ('Denmark', 'Dania'),
+    ('Sweden', 'Szwecja'),
+    ('Norway', 'Norwegia'),
+    ('Austria',),
+    ('Hungary', 'Węgry'),
+    ('Ukraine', 'Ukraina'),
+    ('Scotland', 'Szkocja'),
+    ('Wales', 'Walia'),
+    ('Greece', 'Grecja'),
+    ('Romania', 'Rumunia'),
+    ('Slovakia', 'Słowacja'),
+    ('Slovenia', 'Słowenia'),
+    ('Japan', 'Japonia'),
+    ('Mexico', 'Meksyk'),
+    ('Morocco', 'Maroko'),
+    ('Canada', 'Kanada'),
+    ('Uruguay', 'Urugwaj'),
+    ('Colombia', 'Kolumbia'),
+    ('Ecuador', 'Ekwador'),
+    ('Paraguay', 'Paragwaj'),
+    ('Egypt', 'Egipt'),
+    ('Cameroon', 'Kamerun'),
+    ('Tunisia', 'Tunezja'),
+    ('Algeria', 'Algieria'),
+    ('Qatar', 'Katar'),
+)
+"""!Grupy równoważnych nazw kraju: polskie nazwy oraz pisownia FIFA i Transfermarkt"""
+
 
 def normalize_country_name(name: str) -> str:
     """!
@@ -78,7 +619,7 @@ def normalize_country_name(name: str) -> str:
 
     @details Wykonuje następujące operacje:
     1. Konwersja na małe litery
-    2. Mapowanie znanych nazw lokalnych na angielskie
+    2. Mapowanie znanych nazw lokalnych na angielskie (COUNTRY_MAPPING)
     3. Kapitalizacja pierwszej litery
 
     @param name str Oryginalna nazwa kraju
@@ -86,26 +627,175 @@ def normalize_country_name(name: str) -> str:
 
 
     """
-    country_mapping = {
-        'polska': 'Poland',
-        'niemcy': 'Germany',
-        'usa': 'United States',
-        'holandia': 'Netherlands',
-        'włochy': 'Italy',
-        'francja': 'France',
-        'hiszpania': 'Spain',
-        'anglia': 'England',
-        'brazylia': 'Brazil',
-        'argentyna': 'Argentina'
-    }
-    return country_mapping.get(name.lower(), name.title())
+    return COUNTRY_MAPPING.get(name.lower(), name.title())
 
-def get_team_rank(team_name: str, rankings: List[Dict]) -> int:
+
+def country_key(name: str) -> str:
+    """!
+    @brief Klucz porównywania nazw krajów
+
+    @details Ignoruje wielkość liter, znaki diakrytyczne, interpunkcję i nadmiarowe
+    spacje, np. "Côte d'Ivoire" i "cote divoire" dają ten sam klucz.
+
+    @param name str Nazwa kraju
+    @return str Znormalizowany klucz
+    """
+    decomposed = unicodedata.normalize('NFKD', name.casefold())
+    letters = ''.join(c if c.isalnum() else ' ' for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(letters.split())
+
+
+class RankingIndex:
+    """!
+    @brief Indeks rankingu FIFA ze stałym czasem wyszukiwania drużyny
+
+    Budowany raz dla danego stanu rankingu - zawiera wszystkie nazwy z rankingu
+    oraz ich aliasy z ALIAS_GROUPS i COUNTRY_MAPPING.
+    """
+
+    __slots__ = ('rankings', '_entries')
+
+    def __init__(self, rankings: List[Dict]):
+        """!
+        @brief Buduje indeks dla listy z get_full_rankings()
+
+        @param rankings List[Dict] Pełna lista rankingowa
+        """
+        self.rankings = rankings
+        self._entries = {}
+        for team in rankings:
+            self._entries.setdefault(country_key(team['country']), team)
+        self._add_aliases(_alias_groups())
+
+    def _add_aliases(self, groups):
+        for group in groups:
+            team = next((self._entries[k] for k in group if k in self._entries), None)
+            if team is not None:
+                for k in group:
+                    self._entries.setdefault(k, team)
+
+    def update(self, rankings: List[Dict]) -> Dict[str, List[str]]:
+        """!
+        @brief Aktualizuje indeks w miejscu do nowego stanu rankingu
+
+        @details Zmienione wpisy są podmieniane pod istniejącymi kluczami
+        (także aliasami), a klucze i aliasy przeliczane są tylko dla drużyn
+        dodanych lub usuniętych z rankingu.
+
+        @param rankings List[Dict] Nowa pełna lista rankingowa
+        @return dict Różnice {'added', 'removed', 'changed': [nazwy krajów]}
+        """
+        old, new = {}, {}
+        for team in self.rankings:
+            old.setdefault(country_key(team['country']), team)
+        for team in rankings:
+            new.setdefault(country_key(team['country']), team)
+        added = [k for k in new if k not in old]
+        removed = {id(old[k]) for k in old if k not in new}
+        replaced = {id(old[k]): new[k] for k in new if k in old}
+        diff = {
+            'added': [new[k]['country'] for k in added],
+            'removed': [old[k]['country'] for k in old if k not in new],
+            'changed': [new[k]['country'] for k in new if k in old and new[k] != old[k]],
+        }
+
+        for k, team in list(self._entries.items()):
+            if id(team) in removed:
+                del self._entries[k]
+            else:
+                self._entries[k] = replaced[id(team)]
+        for k in added:
+            self._entries[k] = new[k]
+        if added or removed:
+            self._add_aliases(_alias_groups())
+        self.rankings = rankings
+        return diff
+
+    def get(self, team_name: str) -> Optional[Dict]:
+        """!
+        @brief Zwraca wpis rankingu dla drużyny
+
+        @param team_name str Nazwa drużyny (angielska, polska lub wariant pisowni)
+        @return dict Wpis {'rank', 'country', 'points'} lub None
+        """
+        team = self._entries.get(country_key(normalize_country_name(team_name)))
+        if team is None:
+            team = self._entries.get(country_key(team_name))
+        return team
+
+    def lookup(self, team_name: str) -> int:
+        """!
+        @brief Zwraca pozycję drużyny w rankingu
+
+        @param team_name str Nazwa drużyny
+        @return int Pozycja w rankingu
+
+        @retval 211 Jeśli drużyna nie zostanie znaleziona w rankingu
+        """
+        team = self.get(team_name)
+        return team['rank'] if team is not None else UNRANKED
+
+    def lookup_many(self, team_names: Iterable[str]) -> List[int]:
+        """!
+        @brief Zwraca pozycje wielu drużyn naraz
+
+        @param team_names Iterable[str] Nazwy drużyn
+        @return List[int] Pozycje w rankingu w kolejności nazw (211 dla nieznalezionych)
+        """
+        return [self.lookup(name) for name in team_names]
+
+    def __len__(self):
+        """!
+        @brief Liczba drużyn w rankingu
+        """
+        return len(self.rankings)
+
+    def __contains__(self, team_name):
+        """!
+        @brief Sprawdza, czy drużyna występuje w rankingu
+        """
+        return self.get(team_name) is not None
+
+
+_last_index = (None, None)  #!< Ostatnio zbudowany indeks (lista rankingowa, RankingIndex)
+
+
+@functools.lru_cache(maxsize=None)
+def _alias_groups() -> Tuple[Tuple[str, ...], ...]:
+    """!
+    @brief Grupy kluczy country_key() oznaczających tę samą drużynę (ALIAS_GROUPS i COUNTRY_MAPPING)
+    """
+    groups = [tuple(country_key(n) for n in group) for group in ALIAS_GROUPS]
+    groups += [(country_key(english), country_key(polish)) for polish, english in COUNTRY_MAPPING.items()]
+    return tuple(groups)
+
+
+def ranking_index(rankings) -> RankingIndex:
+    """!
+    @brief Zwraca indeks dla listy rankingowej, budując go tylko raz
+
+    @details Indeks jest zapamiętywany dla ostatnio użytej listy (porównanie
+    tożsamości obiektu), więc kolejne wywołania z tym samym stanem rankingu
+    nie przebudowują go.
+
+    @param rankings List[Dict] | RankingIndex Lista z get_full_rankings() lub gotowy indeks
+    @return RankingIndex Indeks rankingu
+    """
+    global _last_index
+    if isinstance(rankings, RankingIndex):
+        return rankings
+    if _last_index[0] is not rankings:
+        _last_index = (rankings, RankingIndex(rankings))
+    return _last_index[1]
+
+
+def get_team_rank(team_name: str, rankings) -> int:
     """!
     @brief Wyszukuje pozycję drużyny w rankingu FIFA
 
     @param team_name str Nazwa drużyny do wyszukania
-    @param rankings List[Dict] Pełna lista rankingowa z get_full_rankings()
+    @param rankings List[Dict] | RankingIndex Pełna lista rankingowa z get_full_rankings()
+    albo zbudowany z niej RankingIndex
     @return int Pozycja w rankingu
 
     @retval 211 Jeśli drużyna nie zostanie znaleziona w rankingu
@@ -113,10 +803,4 @@ def get_team_rank(team_name: str, rankings: List[Dict]) -> int:
 
 
     """
-    normalized_name = normalize_country_name(team_name)
-
-    for team in rankings:
-        if team['country'].lower() == normalized_name.lower():
-            return team['rank']
-
-    return 211
\ No newline at end of file
+    return ranking_index(rankings).lookup(team_name)
@@ -11,7 +11,7 @@ Moduł zawiera funkcje do:
 
 import json
 
-def save_results(teams, filename="data.json"):
+def save_results(teams, filename="data.json", verbose=True):
     """!
     @brief Zapisuje wyniki turnieju do pliku w formacie JSON
 
@@ -19,6 +19,7 @@ def save_results(teams, filename="data.json"):
 
     @param teams List[Team] Lista obiektów Team do zapisania
     @param filename str Nazwa pliku wyjściowego (domyślnie "data.json")
+    @param verbose bool Czy wypisać komunikat o zapisie
 
     @throws IOError W przypadku problemów z zapisem do pliku
     @post Tworzy plik JSON z danymi turniejowymi
@@ -34,9 +35,39 @@ def save_results(teams, filename="data.json"):
         } for t in teams
     ]
 
+    _write_json(data, filename, verbose)
+
+
+def save_summary(summary, runs, seed=None, filename="data.json", verbose=True):
+    """!
+    @brief Zapisuje podsumowanie wielu turniejów do pliku w formacie JSON
+
+    @param summary dict Podsumowanie {nazwa_drużyny: {pole: wartość}} (main.run_many())
+    @param runs int Liczba rozegranych turniejów
+    @param seed int Ziarno generatora (None, jeśli losowe)
+    @param filename str Nazwa pliku wyjściowego (domyślnie "data.json")
+    @param verbose bool Czy wypisać komunikat o zapisie
+    """
+    data = {
+        "turnieje": runs,
+        "ziarno": seed,
+        "drużyny": [{"team": name, **entry} for name, entry in summary.items()],
+    }
+    _write_json(data, filename, verbose)
+
+
+def _write_json(data, filename, verbose):
+    """!
+    @brief Zapisuje dane do pliku JSON i informuje o wyniku
+
+    @param data object Dane do zapisania
+    @param filename str Nazwa pliku wyjściowego
+    @param verbose bool Czy wypisać komunikat o zapisie
+    """
     try:
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
-        print(f"\nRezultat zapisany do: {filename}")
+        if verbose:
+            print(f"\nRezultat zapisany do: {filename}")
     except IOError as e:
         print(f"Błąd zapisu do pliku: {e}")
\ No newline at end of file
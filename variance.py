@@ -0,0 +1,178 @@
+"""!
+@brief Źródła liczb losowych z redukcją wariancji dla silnika wektorowego
+
+Silnik simulation.simulate_batch() pobiera liczby losowe tylko metodami
+random(), standard_normal() i integers(). Źródła z tego modułu mają te same
+metody, ale wiedzą, która oś tablicy to kolejne turnieje (przebiegi),
+i wiążą ze sobą losowania różnych przebiegów:
+- 'common': zwykłe losowanie o kształcie niezależnym od wyników meczów
+  (także rzuty karne), więc dwa scenariusze z tym samym ziarnem zużywają te
+  same liczby losowe w tych samych meczach (wspólne liczby losowe)
+- 'antithetic': druga połowa przebiegów dostaje liczby przeciwne do pierwszej
+  (z i -z dla goli, u i 1-u dla liczb jednostajnych, to samo losowanie grup)
+- 'stratified': w każdej kolumnie losowań przebiegi dzielą przedział [0, 1)
+  na równe warstwy - po jednej liczbie w każdej (hiperkostka łacińska), więc
+  losowanie grup i wyniki meczów grupowych pokrywają rozkład równomiernie
+
+Wszystkie źródła dają nieobciążone oszacowania; 'plain' to zwykły
+np.random.Generator (dotychczasowy strumień liczb losowych).
+
+@requires numpy
+"""
+
+import numpy as np
+
+_ONE_BELOW = {np.dtype(np.float32): np.float32(np.nextafter(np.float32(1), np.float32(0))),
+              np.dtype(np.float64): np.nextafter(1.0, 0.0)}
+
+# współczynniki przybliżenia odwrotnej dystrybuanty rozkładu normalnego (P. J. Acklam)
+_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+      6.680131188771972e+01, -1.328068155288572e+01, 1.0)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+      -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00, 1.0)
+_P_LOW = 0.02425
+
+
+def normal_ppf(u):
+    """!
+    @brief Odwrotna dystrybuanta standardowego rozkładu normalnego
+
+    @details Przybliżenie wymierne Acklama (błąd względny poniżej 1.2e-9) -
+    wystarcza do zamiany warstwowych liczb jednostajnych na normalne bez SciPy.
+
+    @param u np.ndarray Liczby z przedziału (0, 1)
+    @return np.ndarray Kwantyle rozkładu normalnego (float64)
+    """
+    u = np.clip(np.asarray(u, dtype=np.float64), 1e-300, 1 - 1e-16)
+    tail = np.minimum(u, 1 - u)
+    q = np.sqrt(-2 * np.log(np.maximum(tail, 1e-300)))
+    x_tail = np.polyval(_C, q) / np.polyval(_D, q)
+    x_tail = np.where(u < 0.5, x_tail, -x_tail)
+    q = u - 0.5
+    r = q * q
+    x_central = np.polyval(_A, r) * q / np.polyval(_B, r)
+    return np.where(tail < _P_LOW, x_tail, x_central)
+
+
+class CommonNoise:
+    """!
+    @brief Zwykłe liczby losowe z osią przebiegów (wspólne liczby losowe scenariuszy)
+
+    Klasa bazowa źródeł: metody mają sygnaturę jak np.random.Generator
+    z dodatkowym parametrem axis - osią przebiegów w tablicy wyniku.
+    """
+
+    name = 'common'
+
+    def __init__(self, rng):
+        """!
+        @brief Tworzy źródło na podstawie generatora
+
+        @param rng np.random.Generator Generator liczb losowych
+        """
+        self.rng = rng
+
+    def random(self, size, dtype=np.float64, axis=0):
+        """!
+        @brief Liczby jednostajne z przedziału [0, 1)
+        """
+        return self.rng.random(size, dtype=dtype)
+
+    def standard_normal(self, size, dtype=np.float64, axis=0):
+        """!
+        @brief Liczby z rozkładu normalnego N(0, 1)
+        """
+        return self.rng.standard_normal(size, dtype=dtype)
+
+    def integers(self, high, size, axis=0):
+        """!
+        @brief Liczby całkowite z przedziału [0, high)
+        """
+        return self.rng.integers(high, size=size)
+
+
+class AntitheticNoise(CommonNoise):
+    """!
+    @brief Pary przebiegów i oraz i + połowa z przeciwnymi liczbami losowymi
+    """
+
+    name = 'antithetic'
+
+    @staticmethod
+    def _half(size, axis):
+        size = (size,) if np.ndim(size) == 0 else tuple(size)
+        half = list(size)
+        half[axis] = (size[axis] + 1) // 2
+        return tuple(half), size[axis]
+
+    @staticmethod
+    def _join(first, second, n, axis):
+        return np.concatenate((first, second), axis=axis).take(np.arange(n), axis=axis)
+
+    def random(self, size, dtype=np.float64, axis=0):
+        half, n = self._half(size, axis)
+        u = self.rng.random(half, dtype=dtype)
+        return self._join(u, np.minimum(1 - u, _ONE_BELOW[np.dtype(dtype)]), n, axis)
+
+    def standard_normal(self, size, dtype=np.float64, axis=0):
+        half, n = self._half(size, axis)
+        z = self.rng.standard_normal(half, dtype=dtype)
+        return self._join(z, -z, n, axis)
+
+    def integers(self, high, size, axis=0):
+        half, n = self._half(size, axis)
+        k = self.rng.integers(high, size=half)
+        return self._join(k, k, n, axis)
+
+
+class StratifiedNoise(CommonNoise):
+    """!
+    @brief Hiperkostka łacińska: w każdej kolumnie po jednej liczbie w każdej z n warstw
+    """
+
+    name = 'stratified'
+
+    def _uniform(self, size, axis):
+        size = (size,) if np.ndim(size) == 0 else tuple(size)
+        strata = np.argsort(self.rng.random(size), axis=axis)
+        return (strata + self.rng.random(size)) / size[axis]
+
+    def random(self, size, dtype=np.float64, axis=0):
+        return np.minimum(self._uniform(size, axis), _ONE_BELOW[np.dtype(dtype)]).astype(dtype)
+
+    def standard_normal(self, size, dtype=np.float64, axis=0):
+        return normal_ppf(self._uniform(size, axis)).astype(dtype)
+
+    def integers(self, high, size, axis=0):
+        return np.minimum((self._uniform(size, axis) * high).astype(np.int64), high - 1)
+
+
+VARIANCE_REDUCTIONS = {
+    'plain': None,
+    'common': CommonNoise,
+    'antithetic': AntitheticNoise,
+    'stratified': StratifiedNoise,
+}
+"""!Tryby losowania według nazwy ('plain' - np.random.Generator bez zmian)"""
+
+
+def noise_source(rng, variance='plain'):
+    """!
+    @brief Źródło liczb losowych dla trybu redukcji wariancji
+
+    @param rng np.random.Generator | CommonNoise Generator (albo gotowe źródło - zwracane bez zmian)
+    @param variance str Tryb z VARIANCE_REDUCTIONS
+    @return np.random.Generator | CommonNoise Źródło dla silnika wektorowego
+
+    @throws ValueError Dla nieznanego trybu
+    """
+    if variance not in VARIANCE_REDUCTIONS:
+        raise ValueError(f"Nieznany tryb redukcji wariancji: {variance}. "
+                         f"Dostępne: {', '.join(VARIANCE_REDUCTIONS)}.")
+    factory = VARIANCE_REDUCTIONS[variance]
+    if factory is None or isinstance(rng, CommonNoise):
+        return rng
+    return factory(rng)
@@ -0,0 +1,462 @@
+"""!
+@brief Symulacja warunkowa od stanu częściowo rozegranego turnieju
+
+TournamentState opisuje stan turnieju: ustalone grupy (albo od razu pary
+pierwszej rundy pucharowej) oraz wyniki rozegranych meczów. Symulowane są
+tylko mecze, które jeszcze się nie odbyły.
+
+ConditionalSimulation losuje raz na przebieg wyniki wszystkich meczów
+grupowych (pary w grupach są znane) i liczby losowe każdego miejsca
+w drabince pucharowej. Nowy wynik - prawdziwy (record()) albo hipotetyczny
+(what_if()) - tylko podmienia wynik jednego meczu we wszystkich przebiegach:
+- tabele grupy liczone są od nowa tylko dla grupy, której wynik się zmienił
+  (tabele pozostałych grup są zapamiętane dla ich wyników)
+- faza pucharowa rozgrywana jest ponownie z zapisanymi liczbami losowymi,
+  więc różnice między scenariuszami nie zawierają szumu losowania
+  (wspólne liczby losowe)
+
+Wynik meczu pucharowego ustalony w stanie obowiązuje tylko w przebiegach,
+w których te drużyny się spotykają - pozostałe przebiegi są odrzucane, więc
+szanse są warunkowe względem całego stanu.
+
+Pamięć: ok. 12 bajtów na przebieg i mecz pucharowy oraz 2 bajty na przebieg
+i mecz grupowy.
+
+@requires numpy
+"""
+
+import collections
+import json
+
+import numpy as np
+
+from formats import DEFAULT_FORMAT, compile_format
+from simulation import (_group_keys, _group_tables, _pair_tables, _score_aliases, count_places, place_labels,
+                        sample_goals, sample_scores, scores_from_uniform)
+from strength_tables import DEFAULT_MODEL, MAX_GOALS, get_tables
+from transfermarkt_rankings import normalize_country_name
+
+DEFAULT_RUNS = 100_000   #!< Domyślna liczba przebiegów symulacji warunkowej
+GROUP_CACHE_SIZE = 32    #!< Liczba zapamiętanych tabel grup (różne wyniki tej samej grupy)
+
+
+class TournamentState:
+    """!
+    @brief Stan turnieju: skład grup albo drabinki i wyniki rozegranych meczów
+
+    Drużyny numerowane są w kolejności grup (albo par drabinki); kolejność
+    w grupie odpowiada pozycjom w formats.Schedule.group_pairs i rozstrzyga
+    ostatnie kryterium kolejności (wcześniejsza drużyna wyżej).
+    """
+
+    __slots__ = ('fmt', 'groups', 'bracket', 'teams', 'results', 'knockout', '_index')
+
+    def __init__(self, fmt=DEFAULT_FORMAT, groups=None, bracket=None, results=()):
+        """!
+        @brief Tworzy stan turnieju
+
+        @param fmt str Format turnieju (formats.FORMATS)
+        @param groups List[List[str]] Skład grup w kolejności A, B, ...
+        @param bracket List[List[str]] Pary pierwszej rundy pucharowej w kolejności drabinki
+        (zamiast groups - turniej bez fazy grupowej)
+        @param results Iterable[tuple] Wyniki meczów jak argumenty record()
+
+        @throws ValueError Dla niepełnego składu, powtórzonych drużyn lub błędnego wyniku
+        """
+        schedule = compile_format(fmt)
+        self.fmt = schedule.fmt.name
+        if (groups is None) == (bracket is None):
+            raise ValueError("Stan turnieju wymaga składu grup albo par pierwszej rundy pucharowej.")
+        if groups is not None:
+            groups = tuple(tuple(normalize_country_name(name) for name in group) for group in groups)
+            if len(groups) != schedule.fmt.groups or any(len(g) != schedule.group_size for g in groups):
+                raise ValueError(f"Format {self.fmt} wymaga {schedule.fmt.groups} grup "
+                                 f"po {schedule.group_size} drużyny.")
+            teams = [name for group in groups for name in group]
+        else:
+            bracket = tuple(tuple(normalize_country_name(name) for name in pair) for pair in bracket)
+            if len(bracket) != len(schedule.first_round) or any(len(pair) != 2 for pair in bracket):
+                raise ValueError(f"Drabinka formatu {self.fmt} wymaga {len(schedule.first_round)} par.")
+            teams = [name for pair in bracket for name in pair]
+        if len(set(teams)) != len(teams):
+            raise ValueError("Drużyny nie mogą się powtarzać.")
+        self.groups = groups
+        self.bracket = bracket
+        self.teams = tuple(teams)
+        self._index = {name: i for i, name in enumerate(teams)}
+        self.results = {}   # (grupa, numer meczu w group_pairs) -> (gole gospodarzy, gole gości)
+        self.knockout = {}  # (i, j), i < j -> (gole i, gole j, zwycięzca)
+        for result in results:
+            self.record(*result)
+
+    def index(self, team):
+        """!
+        @brief Numer drużyny w stanie
+
+        @param team str Nazwa drużyny
+        @return int Numer drużyny
+
+        @throws ValueError Dla drużyny spoza turnieju
+        """
+        i = self._index.get(normalize_country_name(team))
+        if i is None:
+            raise ValueError(f"Drużyna {team} nie występuje w turnieju.")
+        return i
+
+    def _fixture(self, i, j):
+        """!
+        @brief Mecz grupowy drużyn i oraz j: (grupa, numer meczu, czy odwrócony) albo None
+        """
+        if self.groups is None:
+            return None
+        size = len(self.groups[0])
+        group, a, b = i // size, i % size, j % size
+        if j // size != group:
+            return None
+        pairs = compile_format(self.fmt).group_pairs
+        return (group, pairs.index((a, b)), False) if a < b else (group, pairs.index((b, a)), True)
+
+    def record(self, team1, team2, goals1, goals2, winner=None):
+        """!
+        @brief Zapisuje wynik meczu
+
+        @details Wynik drużyn z tej samej grupy bez podanego zwycięzcy jest
+        wynikiem meczu grupowego, dopóki ten mecz nie zostanie zapisany;
+        pozostałe wyniki dotyczą meczu pucharowego tych drużyn. Ponowny zapis
+        meczu pucharowego zastępuje poprzedni wynik.
+
+        @param team1 str Pierwsza drużyna
+        @param team2 str Druga drużyna
+        @param goals1 int Gole pierwszej drużyny
+        @param goals2 int Gole drugiej drużyny
+        @param winner str Zwycięzca meczu pucharowego (wymagany przy remisie - rzuty karne)
+        @return TournamentState Ten sam stan (do łączenia wywołań)
+
+        @throws ValueError Dla drużyny spoza turnieju, ujemnych goli lub brakującego zwycięzcy
+        """
+        i, j = self.index(team1), self.index(team2)
+        if i == j:
+            raise ValueError("Drużyna nie może grać sama ze sobą.")
+        if not all(isinstance(g, int) and 0 <= g <= MAX_GOALS for g in (goals1, goals2)):
+            raise ValueError(f"Liczba goli musi być liczbą całkowitą od 0 do {MAX_GOALS}.")
+
+        fixture = self._fixture(i, j)
+        if winner is None and fixture is not None and fixture[:2] not in self.results:
+            group, match, swapped = fixture
+            self.results[group, match] = (goals2, goals1) if swapped else (goals1, goals2)
+            return self
+
+        if goals1 != goals2:
+            expected = i if goals1 > goals2 else j
+            if winner is not None and self.index(winner) != expected:
+                raise ValueError("Zwycięzca nie zgadza się z wynikiem meczu.")
+            winner = expected
+        elif winner is None:
+            raise ValueError("Remis w meczu pucharowym wymaga zwycięzcy rzutów karnych.")
+        else:
+            winner = self.index(winner)
+            if winner not in (i, j):
+                raise ValueError("Zwycięzca musi być jedną z drużyn meczu.")
+        key = (min(i, j), max(i, j))
+        self.knockout[key] = (goals1, goals2, winner) if i < j else (goals2, goals1, winner)
+        return self
+
+    def copy(self):
+        """!
+        @brief Kopia stanu (do scenariuszy bez zmiany oryginału)
+        """
+        state = TournamentState.__new__(TournamentState)
+        for attr in TournamentState.__slots__:
+            setattr(state, attr, getattr(self, attr))
+        state.results = dict(self.results)
+        state.knockout = dict(self.knockout)
+        return state
+
+    def with_result(self, team1, team2, goals1, goals2, winner=None):
+        """!
+        @brief Kopia stanu z dodatkowym wynikiem (argumenty jak record())
+        """
+        return self.copy().record(team1, team2, goals1, goals2, winner)
+
+    def same_tournament(self, other):
+        """!
+        @brief Czy drugi stan opisuje ten sam turniej (format, grupy, drabinka)
+        """
+        return (self.fmt, self.groups, self.bracket) == (other.fmt, other.groups, other.bracket)
+
+    @property
+    def remaining(self):
+        """!
+        @brief Liczba nierozegranych meczów grupowych
+        """
+        if self.groups is None:
+            return 0
+        return len(self.groups) * len(compile_format(self.fmt).group_pairs) - len(self.results)
+
+    def to_dict(self):
+        """!
+        @brief Stan w postaci JSON (odwrotność from_dict())
+
+        @return dict {'format', 'groups' albo 'bracket', 'results': [[drużyna1, drużyna2, gole1, gole2(, zwycięzca)]]}
+        """
+        data = {"format": self.fmt}
+        if self.groups is not None:
+            data["groups"] = [list(group) for group in self.groups]
+        else:
+            data["bracket"] = [list(pair) for pair in self.bracket]
+        results = []
+        pairs = compile_format(self.fmt).group_pairs
+        for (group, match), goals in sorted(self.results.items()):
+            i, j = pairs[match]
+            results.append([self.groups[group][i], self.groups[group][j], *goals])
+        for (i, j), (goals_i, goals_j, winner) in self.knockout.items():
+            entry = [self.teams[i], self.teams[j], goals_i, goals_j]
+            results.append(entry + [self.teams[winner]] if goals_i == goals_j else entry)
+        data["results"] = results
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """!
+        @brief Tworzy stan z postaci JSON
+
+        @param data dict {'format', 'groups' albo 'bracket', 'results'}
+        @return TournamentState Stan turnieju
+
+        @throws ValueError Dla niepoprawnego opisu stanu
+        """
+        return cls(data.get("format", DEFAULT_FORMAT), data.get("groups"), data.get("bracket"),
+                   [tuple(result) for result in data.get("results", ())])
+
+    @classmethod
+    def load(cls, path):
+        """!
+        @brief Wczytuje stan z pliku JSON
+
+        @param path str Ścieżka pliku
+        @return TournamentState Stan turnieju
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path):
+        """!
+        @brief Zapisuje stan do pliku JSON
+
+        @param path str Ścieżka pliku
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+
+
+class ConditionalSimulation:
+    """!
+    @brief Szanse drużyn na miejsca warunkowo względem stanu turnieju
+
+    Wyniki meczów grupowych i liczby losowe meczów pucharowych losowane są
+    raz w konstruktorze; probabilities() dla kolejnych stanów tego samego
+    turnieju tylko je ponownie wykorzystuje.
+    """
+
+    def __init__(self, state, ranks, runs=DEFAULT_RUNS, seed=None, model=DEFAULT_MODEL):
+        """!
+        @brief Losuje wyniki wszystkich meczów dla stanu turnieju
+
+        @param state TournamentState Stan turnieju (kopiowany)
+        @param ranks List[int] Pozycje drużyn w rankingu FIFA w kolejności state.teams
+        @param runs int Liczba przebiegów
+        @param seed int Ziarno (None - losowe)
+        @param model str | StrengthTables Model siły
+
+        @throws ValueError Dla liczby pozycji niezgodnej z liczbą drużyn
+        """
+        if len(ranks) != len(state.teams):
+            raise ValueError(f"Podano {len(ranks)} pozycji w rankingu dla {len(state.teams)} drużyn.")
+        self.state = state.copy()
+        self.ranks = tuple(int(r) for r in ranks)
+        self.runs = runs
+        self.schedule = compile_format(state.fmt)
+        rng = np.random.default_rng(seed)
+        n_teams = len(self.ranks)
+        lam, pen_win = _pair_tables(self.ranks, model)
+        self._lam = lam.ravel().astype(np.float32)
+        self._pen_win = pen_win.ravel().astype(np.float32)
+        self._scores = _score_aliases(self.ranks, model) if get_tables(model).rho is not None else None
+
+        if state.groups is not None:
+            groups = np.arange(n_teams).reshape(len(state.groups), -1)
+            home = groups[:, [i for i, _ in self.schedule.group_pairs]]
+            away = groups[:, [j for _, j in self.schedule.group_pairs]]
+            shape = (runs,) + home.shape
+            if self._scores is None:
+                self._g1, self._g2 = sample_goals(rng, np.broadcast_to(self._lam[home * n_teams + away], shape),
+                                                  np.broadcast_to(self._lam[away * n_teams + home], shape))
+            else:
+                self._g1, self._g2 = sample_scores(rng, self._scores, np.broadcast_to(home * n_teams + away, shape))
+            self._groups = groups
+
+        matches = len(self.schedule.first_round) * 2 - 1 + bool(self.schedule.fmt.third_place)
+        if self._scores is None:
+            self._noise = rng.standard_normal((2, runs, matches), dtype=np.float32)
+        else:
+            self._noise = rng.random((runs, matches))
+        self._pens = rng.random((runs, matches), dtype=np.float32)
+        self._group_cache = collections.OrderedDict()
+
+    def record(self, team1, team2, goals1, goals2, winner=None):
+        """!
+        @brief Zapisuje prawdziwy wynik meczu w stanie symulacji (argumenty jak TournamentState.record())
+
+        @return ConditionalSimulation Ta sama symulacja
+        """
+        self.state.record(team1, team2, goals1, goals2, winner)
+        return self
+
+    def what_if(self, team1, team2, goals1, goals2, winner=None):
+        """!
+        @brief Szanse po hipotetycznym wyniku meczu (stan symulacji się nie zmienia)
+
+        @return dict Wynik jak probabilities()
+        """
+        return self.probabilities(self.state.with_result(team1, team2, goals1, goals2, winner))
+
+    def _group_standings(self, state, group):
+        """!
+        @brief Kolejność drużyn grupy w każdym przebiegu (zapamiętywana dla wyników grupy)
+
+        @return tuple Numery drużyn (runs, rozmiar grupy) od pierwszego miejsca oraz
+        klucz ogólny drużyny z miejsca advance+1 (runs,) - tylko dla best_thirds
+        """
+        schedule, fmt = self.schedule, self.schedule.fmt
+        pinned = tuple(state.results.get((group, k)) for k in range(len(schedule.group_pairs)))
+        cached = self._group_cache.get((group, pinned))
+        if cached is not None:
+            self._group_cache.move_to_end((group, pinned))
+            return cached
+
+        g1, g2 = self._g1[:, group].copy(), self._g2[:, group].copy()
+        for k, goals in enumerate(pinned):
+            if goals is not None:
+                g1[:, k], g2[:, k] = goals
+        size = schedule.group_size
+        points = np.zeros((self.runs, 1, size), dtype=np.int16)
+        goals = np.zeros((self.runs, 1, size), dtype=np.int16)
+        g1, g2 = g1[:, None], g2[:, None]
+        _group_tables(points, goals, g1, g2, schedule.group_pairs)
+        key, overall = _group_keys(points, goals, g1, g2, schedule.group_pairs, fmt.tiebreak)
+        order = np.argsort(-key[:, 0], axis=-1)
+        standings = self._groups[group].astype(np.int8)[order]
+        place_key = None
+        if fmt.best_thirds:
+            place_key = np.take_along_axis(overall[:, 0], order[:, fmt.advance:fmt.advance + 1], axis=1)[:, 0]
+        cached = self._group_cache[group, pinned] = (standings, place_key)
+        while len(self._group_cache) > GROUP_CACHE_SIZE:
+            self._group_cache.popitem(last=False)
+        return cached
+
+    def _slots(self, state):
+        """!
+        @brief Drużyny na miejscach drabinki (runs, len(qualifiers)) albo pary z drabinki stanu
+        """
+        schedule, fmt = self.schedule, self.schedule.fmt
+        first = np.array(schedule.first_round, dtype=np.intp)
+        if state.bracket is not None:
+            pairs = np.broadcast_to(np.arange(len(state.teams)).reshape(-1, 2), (self.runs, len(state.bracket), 2))
+            return pairs[..., 0], pairs[..., 1]
+
+        tables = [self._group_standings(state, g) for g in range(len(state.groups))]
+        slots = np.empty((self.runs, len(schedule.qualifiers)), dtype=np.intp)
+        if fmt.best_thirds:
+            n_groups = len(tables)
+            place_key = np.stack([key * n_groups + (n_groups - 1 - g) for g, (_, key) in enumerate(tables)], axis=1)
+            best = np.argsort(-place_key, axis=1)[:, :fmt.best_thirds]
+            candidates = np.stack([standings[:, fmt.advance] for standings, _ in tables], axis=1)
+            thirds = np.take_along_axis(candidates, best, axis=1)
+        group_index = {name: g for g, name in enumerate(schedule.group_names)}
+        for slot, (group, place) in enumerate(schedule.qualifiers):
+            if group == 'T':
+                slots[:, slot] = thirds[:, place - 1]
+            else:
+                slots[:, slot] = tables[group_index[group]][0][:, place - 1]
+        return slots[:, first[:, 0]], slots[:, first[:, 1]]
+
+    def _knockout(self, match, team1, team2, pins, occurred):
+        """!
+        @brief Mecze pucharowe z miejsc match, match+1, ... drabinki z zapisanymi liczbami losowymi
+
+        @param match int Numer pierwszego meczu rundy w drabince
+        @param team1 np.ndarray Drużyny (runs, liczba meczów)
+        @param team2 np.ndarray Rywale, kształt jak team1
+        @param pins list Wyniki meczów pucharowych ze stanu
+        @param occurred np.ndarray Macierz (len(pins), runs) - modyfikowana: czy mecz ze stanu się odbył
+        @return tuple (zwycięzcy, przegrani)
+        """
+        n_teams = len(self.ranks)
+        matches = slice(match, match + team1.shape[1])
+        pair = team1 * n_teams + team2
+        if self._scores is None:
+            goals = np.stack((self._lam.take(pair), self._lam.take(team2 * n_teams + team1)))
+            goals += self._noise[:, :, matches]
+            np.clip(goals, 0, MAX_GOALS, out=goals)
+            g1, g2 = goals.astype(np.int8)
+        else:
+            g1, g2 = scores_from_uniform(self._scores, pair, self._noise[:, matches])
+        wins = (g1 > g2) | ((g1 == g2) & (self._pens[:, matches] < self._pen_win.take(pair)))
+        for p, ((i, j), (_, _, winner)) in enumerate(pins):
+            hit = ((team1 == i) & (team2 == j)) | ((team1 == j) & (team2 == i))
+            if hit.any():
+                wins[hit] = team1[hit] == winner
+                occurred[p] |= hit.any(axis=1)
+        return np.where(wins, team1, team2), np.where(wins, team2, team1)
+
+    def probabilities(self, state=None):
+        """!
+        @brief Szanse drużyn na miejsca warunkowo względem stanu
+
+        @param state TournamentState Stan tego samego turnieju (domyślnie stan symulacji)
+
+        @return dict Słownik:
+        - 'runs': liczba przebiegów zgodnych ze stanem
+        - 'places': liczniki miejsc (n, len(place_labels(format)))
+        - 'probabilities': macierz prawdopodobieństw miejsc tego samego kształtu
+
+        @throws ValueError Dla stanu innego turnieju albo stanu, z którym nie jest
+        zgodny żaden przebieg (np. wynik meczu pucharowego drużyn, które nie mogą się spotkać)
+        """
+        state = self.state if state is None else state
+        if not state.same_tournament(self.state):
+            raise ValueError("Stan dotyczy innego turnieju niż symulacja.")
+        pins = list(state.knockout.items())
+        occurred = np.zeros((len(pins), self.runs), dtype=bool)
+
+        team1, team2 = self._slots(state)
+        match = 0
+        while team1.shape[1] > 1:
+            winners, losers = self._knockout(match, team1, team2, pins, occurred)
+            match += team1.shape[1]
+            team1, team2 = winners[:, 0::2], winners[:, 1::2]
+        if self.schedule.fmt.third_place:
+            third, fourth = self._knockout(match, losers[:, :1], losers[:, 1:], pins, occurred)
+            match += 1
+        else:
+            third, fourth = losers[:, :1], losers[:, 1:]  # wspólne miejsce simulation.SEMIFINAL
+        champion, runner_up = self._knockout(match, team1, team2, pins, occurred)
+
+        podium = np.concatenate((champion, runner_up, third, fourth), axis=1)
+        if pins:
+            podium = podium[occurred.all(axis=0)]
+        if not len(podium):
+            raise ValueError("Żaden przebieg nie jest zgodny z wynikami meczów pucharowych stanu.")
+        counts = count_places(podium, len(self.ranks), self.schedule)
+        return {'runs': len(podium), 'places': counts, 'probabilities': counts / len(podium)}
+
+    def odds(self, state=None):
+        """!
+        @brief Szanse drużyn według nazw
+
+        @param state TournamentState Stan tego samego turnieju (domyślnie stan symulacji)
+        @return dict {nazwa_drużyny: {miejsce: prawdopodobieństwo}}
+        """
+        probs = self.probabilities(state)['probabilities']
+        labels = place_labels(self.schedule)
+        return {name: dict(zip(labels, row.tolist())) for name, row in zip(self.state.teams, probs)}